@@ -2,10 +2,11 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import qrcode
-from PIL import Image, ImageDraw, ImageFont
 import io
+import os
+import sys
 import base64
+import tempfile
 import streamlit.components.v1 as components
 
 # Page Config
@@ -70,415 +71,19 @@ if 'batch_data' not in st.session_state:
     st.session_state['batch_data'] = {}
 
 # ===== HELPER FUNCTIONS =====
+# Rendering lives in services/label_service.py (cached fonts/templates, batch pipeline)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
-def generate_printable_label(data, size="medium", qr_img=None):
-    """
-    Generate print-ready label image with MODERN PREMIUM layout
-    Args:
-        data: batch data dictionary
-        size: "small" (5x5cm), "medium" (10x10cm), "large" (15x10cm)
-        qr_img: PIL Image of QR code
-    Returns:
-        PIL Image object
-    """
-    # Size mapping at 300 DPI for print quality
-    # Format: (width, height)
-    sizes = {
-        # Square/Portrait formats
-        "small": (590, 590),          # 5x5 cm
-        "medium": (1181, 1181),       # 10x10 cm
-        "large": (1772, 1181),        # 15x10 cm
-        
-        # Landscape formats (RECOMMENDED for products)
-        "small_landscape": (1181, 590),      # 10x5 cm - compact
-        "medium_landscape": (1772, 1181),    # 15x10 cm - standard
-        "large_landscape": (2362, 1181),     # 20x10 cm - premium
-    }
-    
-    width, height = sizes[size]
-    is_landscape = "landscape" in size
-    is_small = size == "small"  # Special handling for 5x5 cm
-    
-    # Create blank canvas with gradient background
-    label = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(label)
-    
-    # === MODERN GRADIENT BACKGROUND ===
-    # Create subtle gradient from light teal to white
-    for i in range(height):
-        # Gradient from top (light teal) to bottom (white)
-        ratio = i / height
-        r = int(240 + (255 - 240) * ratio)
-        g = int(253 + (255 - 253) * ratio)
-        b = int(250 + (255 - 250) * ratio)
-        draw.rectangle([(0, i), (width, i+1)], fill=(r, g, b))
-    
-    # === ADAPTIVE FONT SIZES based on label size ===
-    try:
-        if is_small:
-            # Smaller, more compact fonts for 5x5 cm
-            font_brand = ImageFont.truetype("arialbd.ttf", 22)      # Brand/header
-            font_title = ImageFont.truetype("arialbd.ttf", 48)      # Product name (bold)
-            font_subtitle = ImageFont.truetype("arialbd.ttf", 32)   # Varietas (bold for emphasis)
-            font_body = ImageFont.truetype("arial.ttf", 26)         # Body text
-            font_small = ImageFont.truetype("arial.ttf", 22)        # Small text
-            font_tiny = ImageFont.truetype("arial.ttf", 18)         # Tiny text
-        else:
-            # Standard fonts for larger labels
-            font_brand = ImageFont.truetype("arialbd.ttf", 45)      # Brand/header
-            font_title = ImageFont.truetype("arialbd.ttf", 70)      # Product name (bold)
-            font_subtitle = ImageFont.truetype("arial.ttf", 42)     # Varietas
-            font_body = ImageFont.truetype("arial.ttf", 38)         # Body text
-            font_small = ImageFont.truetype("arial.ttf", 32)        # Small text
-            font_tiny = ImageFont.truetype("arial.ttf", 28)         # Tiny text
-    except:
-        font_brand = ImageFont.load_default()
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_body = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-        font_tiny = ImageFont.load_default()
-    
-    # === MODERN COLOR PALETTE ===
-    color_primary = (16, 185, 129)      # Emerald-500
-    color_primary_dark = (5, 150, 105)  # Emerald-600
-    color_accent = (251, 191, 36)       # Amber-400
-    color_text = (31, 41, 55)           # Gray-800
-    color_text_light = (107, 114, 128)  # Gray-500
-    color_white = (255, 255, 255)
-    color_badge_organic = (34, 197, 94)     # Green-500
-    color_badge_halal = (59, 130, 246)      # Blue-500
-    color_badge_premium = (168, 85, 247)    # Purple-500
-    
-    # Adaptive margins and spacing
-    margin = 25 if is_small else 50
-    
-    # === HEADER CARD (Top Banner) ===
-    header_height = 50 if is_small else 100
-    # Draw header with gradient
-    for i in range(header_height):
-        ratio = i / header_height
-        r = int(16 + (5 - 16) * ratio)
-        g = int(185 + (150 - 185) * ratio)
-        b = int(129 + (105 - 129) * ratio)
-        draw.rectangle([(0, i), (width, i+1)], fill=(r, g, b))
-    
-    # AgriSensa branding in header
-    header_text_y = 15 if is_small else 30
-    draw.text((margin, header_text_y), "🌾 AgriSensa", fill=color_white, font=font_brand)
-    
-    # === MAIN CONTENT CARD ===
-    card_top = header_height + (10 if is_small else 20)
-    card_margin = 15 if is_small else 30
-    
-    # White card with shadow effect (multiple rectangles for shadow)
-    shadow_offset = 4 if is_small else 8
-    for i in range(shadow_offset, 0, -1):
-        alpha = int(20 * (shadow_offset - i) / shadow_offset)
-        shadow_color = (200 - alpha, 200 - alpha, 200 - alpha)
-        draw.rounded_rectangle(
-            [(card_margin + i, card_top + i), (width - card_margin + i, height - (15 if is_small else 30) + i)],
-            radius=15 if is_small else 25,
-            fill=shadow_color
-        )
-    
-    # Main white card
-    draw.rounded_rectangle(
-        [(card_margin, card_top), (width - card_margin, height - (15 if is_small else 30))],
-        radius=15 if is_small else 25,
-        fill=color_white,
-        outline=color_primary,
-        width=2 if is_small else 3
-    )
-    
-    # === LAYOUT: QR CODE + INFO ===
-    content_x = card_margin + (20 if is_small else 40)
-    content_y = card_top + (20 if is_small else 40)
-    
-    if qr_img:
-        # QR Code with rounded corners effect
-        # Adjust QR size based on label size and orientation
-        if is_small:
-            qr_size = 180  # Smaller QR for 5x5 cm
-        elif is_landscape:
-            qr_size = min(280, height - card_top - 100)  # Fit within height
-        else:
-            qr_size = 280 if "large" in size else 240
-        
-        qr_resized = qr_img.resize((qr_size, qr_size))
-        
-        # QR background card
-        qr_bg_padding = 8 if is_small else 15
-        draw.rounded_rectangle(
-            [(content_x - qr_bg_padding, content_y - qr_bg_padding),
-             (content_x + qr_size + qr_bg_padding, content_y + qr_size + qr_bg_padding)],
-            radius=12 if is_small else 20,
-            fill=(248, 250, 252),  # Light gray background
-            outline=color_primary,
-            width=2
-        )
-        
-        label.paste(qr_resized, (content_x, content_y))
-        
-        # "Scan Me" text below QR (skip for very small labels)
-        if not is_small:
-            scan_text_y = content_y + qr_size + 10
-            draw.text((content_x + qr_size//2 - 50, scan_text_y), "📱 Scan Me", 
-                     fill=color_primary_dark, font=font_small)
-        else:
-            scan_text_y = content_y + qr_size + 5
-        
-        # For landscape: always put text to the right of QR
-        # For square/portrait: text below QR
-        if is_landscape:
-            text_x = content_x + qr_size + 50
-            text_y = content_y
-        else:
-            # Original logic for square labels
-            if "large" in size and not is_landscape:
-                text_x = content_x + qr_size + 50
-                text_y = content_y
-            else:
-                text_x = content_x
-                text_y = scan_text_y + (30 if is_small else 60)
-    else:
-        text_x = content_x
-        text_y = content_y
-    
-    # === PRODUCT INFO (ADAPTIVE CONTENT) ===
-    # Product Name (Bold, Large)
-    product_name = data['produk'][:20] if is_small else (data['produk'][:28] if len(data['produk']) > 28 else data['produk'])
-    draw.text((text_x, text_y), product_name, fill=color_text, font=font_title)
-    text_y += 55 if is_small else 85
-    
-    # Varietas with accent color
-    varietas_text = data['varietas'][:22] if is_small else data['varietas'][:32]
-    draw.text((text_x, text_y), varietas_text, fill=color_primary_dark, font=font_subtitle)
-    text_y += 38 if is_small else 55
-    
-    # Divider line
-    divider_width = 180 if is_small else 300
-    draw.rectangle([(text_x, text_y), (text_x + divider_width, text_y + 2)], fill=color_primary)
-    text_y += 12 if is_small else 20
-    
-    # === CONDITIONAL CONTENT based on size ===
-    if is_small:
-        # For 5x5 cm: Show only ESSENTIAL info with larger spacing
-        
-        # Price (PRIORITY for small labels)
-        if data.get('harga'):
-            price_card_y = text_y
-            draw.rounded_rectangle(
-                [(text_x, price_card_y), (text_x + 200, price_card_y + 42)],
-                radius=10,
-                fill=color_accent,
-                outline=None
-            )
-            draw.text((text_x + 10, price_card_y + 8), f"💰 Rp {data['harga']:,}/kg", 
-                     fill=color_text, font=font_subtitle)
-            text_y += 50
-        
-        # Date (compact)
-        draw.text((text_x, text_y), f"📅 {data['tgl']}", fill=color_text_light, font=font_small)
-        text_y += 28
-        
-        # Location only (skip farmer name to save space)
-        location_short = data['lokasi'][:18] if len(data['lokasi']) > 18 else data['lokasi']
-        draw.text((text_x, text_y), f"📍 {location_short}", fill=color_text, font=font_small)
-        text_y += 35
-        
-        # Quality badges (compact, max 2)
-        if data.get('klaim'):
-            badge_colors = {
-                'Organik': color_badge_organic,
-                'Halal': color_badge_halal,
-                'Premium': color_badge_premium
-            }
-            
-            badge_x = text_x
-            for badge in data['klaim'][:2]:  # Max 2 badges for small labels
-                badge_color = badge_colors.get(badge, color_primary)
-                badge_width = 90
-                
-                # Compact badge
-                draw.rounded_rectangle(
-                    [(badge_x, text_y), (badge_x + badge_width, text_y + 28)],
-                    radius=14,
-                    fill=badge_color,
-                    outline=None
-                )
-                draw.text((badge_x + 10, text_y + 5), f"✓ {badge[:3]}", fill=color_white, font=font_tiny)
-                badge_x += badge_width + 8
-    else:
-        # For larger labels: Show ALL information
-        
-        # Date with icon
-        draw.text((text_x, text_y), f"📅 {data['tgl']}", fill=color_text_light, font=font_body)
-        text_y += 50
-        
-        # Farmer info
-        draw.text((text_x, text_y), f"👨‍🌾 {data['petani'][:28]}", fill=color_text, font=font_body)
-        text_y += 45
-        
-        # Location
-        draw.text((text_x, text_y), f"📍 {data['lokasi'][:30]}", fill=color_text, font=font_body)
-        text_y += 55
-        
-        # Price (if available) - HIGHLIGHTED
-        if data.get('harga'):
-            # Price card
-            price_card_y = text_y
-            draw.rounded_rectangle(
-                [(text_x, price_card_y), (text_x + 350, price_card_y + 55)],
-                radius=12,
-                fill=color_accent,
-                outline=None
-            )
-            draw.text((text_x + 15, price_card_y + 12), f"💰 Rp {data['harga']:,}/kg", 
-                     fill=color_text, font=font_subtitle)
-            text_y += 70
-        
-        # Contact (if available)
-        if data.get('kontak'):
-            draw.text((text_x, text_y), f"📞 {data['kontak']}", fill=color_text, font=font_body)
-            text_y += 55
-        
-        # === QUALITY BADGES (Modern Pills) ===
-        if data.get('klaim'):
-            text_y += 10
-            badge_colors = {
-                'Organik': color_badge_organic,
-                'Halal': color_badge_halal,
-                'Premium': color_badge_premium
-            }
-            
-            badge_x = text_x
-            for badge in data['klaim']:
-                badge_color = badge_colors.get(badge, color_primary)
-                badge_width = 160
-                
-                # Modern pill-shaped badge with shadow
-                draw.rounded_rectangle(
-                    [(badge_x + 2, text_y + 2), (badge_x + badge_width + 2, text_y + 47)],
-                    radius=25,
-                    fill=(200, 200, 200)  # Shadow
-                )
-                draw.rounded_rectangle(
-                    [(badge_x, text_y), (badge_x + badge_width, text_y + 45)],
-                    radius=25,
-                    fill=badge_color,
-                    outline=None
-                )
-                draw.text((badge_x + 20, text_y + 10), f"✓ {badge}", fill=color_white, font=font_small)
-                badge_x += badge_width + 15
-    
-    # === FOOTER: Batch ID ===
-    footer_y = height - (30 if is_small else 60)
-    footer_id_text = f"ID: {data['id'][-8:]}" if is_small else f"Batch ID: {data['id']}"
-    draw.text((margin + (10 if is_small else 20), footer_y), footer_id_text, 
-             fill=color_text_light, font=font_tiny)
-    
-    # Verification badge (skip for very small labels)
-    if not is_small:
-        verify_text = "✓ Verified Product"
-        draw.text((width - margin - 250, footer_y), verify_text, 
-                 fill=color_primary, font=font_tiny)
-    
-    return label
-
-def generate_qr_only(data, qr_img, size="medium"):
-    """
-    Generate QR code only with minimal branding
-    Args:
-        data: batch data dictionary
-        qr_img: PIL Image of QR code
-        size: "small" (5x5cm), "medium" (8x8cm), "large" (10x10cm)
-    Returns:
-        PIL Image object
-    """
-    # Size mapping for QR-only prints
-    sizes = {
-        "small": (590, 590),      # 5x5 cm
-        "medium": (945, 945),     # 8x8 cm
-        "large": (1181, 1181),    # 10x10 cm
-    }
-    
-    width, height = sizes[size]
-    
-    # Create white canvas
-    label = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(label)
-    
-    # Colors
-    color_primary = (16, 185, 129)
-    color_text = (31, 41, 55)
-    color_white = (255, 255, 255)
-    
-    # Fonts
-    try:
-        if size == "small":
-            font_brand = ImageFont.truetype("arialbd.ttf", 28)
-            font_small = ImageFont.truetype("arial.ttf", 22)
-        elif size == "medium":
-            font_brand = ImageFont.truetype("arialbd.ttf", 36)
-            font_small = ImageFont.truetype("arial.ttf", 28)
-        else:
-            font_brand = ImageFont.truetype("arialbd.ttf", 42)
-            font_small = ImageFont.truetype("arial.ttf", 32)
-    except:
-        font_brand = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-    
-    # Calculate QR size (80% of canvas)
-    qr_size = int(width * 0.7)
-    qr_resized = qr_img.resize((qr_size, qr_size))
-    
-    # Center QR code
-    qr_x = (width - qr_size) // 2
-    qr_y = (height - qr_size) // 2 - 30
-    
-    # Draw subtle border
-    border_padding = 20
-    draw.rounded_rectangle(
-        [(qr_x - border_padding, qr_y - border_padding),
-         (qr_x + qr_size + border_padding, qr_y + qr_size + border_padding)],
-        radius=15,
-        outline=color_primary,
-        width=3
-    )
-    
-    # Paste QR
-    label.paste(qr_resized, (qr_x, qr_y))
-    
-    # Top branding
-    brand_text = "🌾 AgriSensa"
-    bbox = draw.textbbox((0, 0), brand_text, font=font_brand)
-    text_width = bbox[2] - bbox[0]
-    draw.text(((width - text_width) // 2, 30), brand_text, fill=color_primary, font=font_brand)
-    
-    # Bottom text
-    scan_text = "Scan untuk info produk"
-    bbox = draw.textbbox((0, 0), scan_text, font=font_small)
-    text_width = bbox[2] - bbox[0]
-    draw.text(((width - text_width) // 2, qr_y + qr_size + 35), scan_text, fill=color_text, font=font_small)
-    
-    # Batch ID at bottom
-    id_text = f"ID: {data['id']}"
-    bbox = draw.textbbox((0, 0), id_text, font=font_small)
-    text_width = bbox[2] - bbox[0]
-    draw.text(((width - text_width) // 2, height - 50), id_text, fill=color_text, font=font_small)
-    
-    return label
-
-def pil_to_pdf_bytes(pil_image):
-    """Convert PIL Image to PDF bytes"""
-    pdf_buffer = io.BytesIO()
-    pil_image.save(pdf_buffer, format='PDF', resolution=300.0)
-    pdf_buffer.seek(0)
-    return pdf_buffer.getvalue()
+from services.label_service import (
+    LabelBatchService, build_passport_url, make_qr_matrix,
+    generate_printable_label, generate_qr_only, pil_to_pdf_bytes, records_from_dataframe
+)
 
 # TABS
-tab1, tab2, tab3 = st.tabs(["📝 Input Data Batch (Produksi)", "🖨️ Cetak Label", "📱 Simulasi Scan Konsumen"])
+tab1, tab2, tab3, tab4 = st.tabs(["📝 Input Data Batch (Produksi)", "🖨️ Cetak Label", "📱 Simulasi Scan Konsumen", "📦 Cetak Massal (CSV)"])
 
 # --- TAB 1: INPUT BATCH ---
 with tab1:
@@ -689,61 +294,14 @@ with tab2:
             else:
                 st.info("💡 QR Code akan dicetak dengan branding minimal AgriSensa")
         
-        # Generate QR Code - NOW USES VERCEL URL!
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        
         # Build Vercel Product Passport URL with Query Parameters
-        import urllib.parse
-        
-        base_url = "https://vercel-scan2.vercel.app/product"
-        
-        # Build query parameters
-        params = {
-            'name': data['produk'],
-            'variety': data['varietas'],
-            'farmer': data['petani'],
-            'location': data['lokasi'],
-            'harvest_date': str(data['tgl']),
-            'weight': f"{data.get('berat', 1)} kg",
-            'batch_id': data['id']
-        }
-        
-        # Add optional fields
-        if data.get('harga'):
-            params['price'] = str(data['harga'])
-        
-        # Add climate data if available
-        if data.get('climate'):
-            params['avg_temp'] = str(data['climate']['avg_temp'])
-            params['avg_hum'] = str(data['climate']['avg_hum'])
-            params['sun_hours'] = str(data['climate']['sun_hours'])
-        
-        # Add notes
-        if data.get('riwayat'):
-            params['notes'] = str(data['riwayat'])
-
-        # Add milestones as JSON string
-        if data.get('milestones'):
-            import json
-            params['milestones'] = json.dumps(data['milestones'])
-        
-        # Construct final URL
-        query_string = urllib.parse.urlencode(params)
-        qr_url = f"{base_url}/QR?{query_string}"
+        qr_url = build_passport_url(data)
         
         # DEBUG: Show URL to User
         st.caption("🔗 **Debug Link:** " + qr_url)
         
-        # Generate QR Code
-        qr = qrcode.QRCode(
-            version=None, 
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10, 
-            border=4
-        )
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-        img_qr = qr.make_image(fill_color="black", back_color="white")
+        # Generate QR Code (module matrix, scaled to the label without resampling blur)
+        img_qr = make_qr_matrix(qr_url)
 
         
         # Generate Image based on print type
@@ -968,3 +526,84 @@ with tab3:
 
     else:
         st.warning("⚠️ Belum ada data batch. Silakan input data di **Tab 1** terlebih dahulu.")
+
+# --- TAB 4: BULK PRINT ---
+with tab4:
+    st.subheader("📦 Cetak Label Massal dari CSV")
+    st.write("Untuk packhouse: generate ribuan label sekaligus dalam satu file PDF siap cetak atau ZIP berisi PNG.")
+    
+    st.markdown("""
+    **Format CSV:**
+    ```
+    id,produk,varietas,tgl,petani,lokasi,harga,kontak,klaim
+    LOT-001,Kopi Arabika,Gayo Grade 1,2024-05-01,KT Maju,Aceh Tengah,85000,0812-xxx,Organik;Premium
+    ```
+    Kolom `id`, `harga`, `kontak`, `klaim`, `berat`, `riwayat` opsional. ID kosong akan dibuat otomatis.
+    """)
+    
+    bulk_file = st.file_uploader("Upload CSV Lot/Batch", type=['csv'], key="bulk_label_csv")
+    
+    if bulk_file:
+        try:
+            bulk_records = records_from_dataframe(pd.read_csv(bulk_file))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            bulk_records = []
+        
+        if bulk_records:
+            st.success(f"✅ {len(bulk_records):,} label siap digenerate")
+            st.dataframe(pd.DataFrame(bulk_records[:10]), use_container_width=True, hide_index=True)
+            
+            col_b1, col_b2, col_b3 = st.columns(3)
+            with col_b1:
+                bulk_type = st.radio(
+                    "Jenis Cetakan",
+                    ["label_lengkap", "qr_only"],
+                    format_func=lambda x: "📋 Label Lengkap" if x == "label_lengkap" else "📱 QR Code Saja",
+                    key="bulk_type"
+                )
+            with col_b2:
+                if bulk_type == "label_lengkap":
+                    bulk_size = st.selectbox("Ukuran", ["medium_landscape", "large_landscape", "small_landscape",
+                                                        "medium", "large", "small"], key="bulk_size")
+                else:
+                    bulk_size = st.selectbox("Ukuran", ["medium", "large", "small"], key="bulk_qr_size")
+            with col_b3:
+                bulk_format = st.radio("Format Output", ["pdf", "zip"],
+                                       format_func=lambda x: "📄 PDF Multi-halaman" if x == "pdf" else "🗜️ ZIP (PNG)",
+                                       key="bulk_format")
+                bulk_workers = st.number_input("Jumlah Proses", 1, os.cpu_count() or 1,
+                                               max(1, (os.cpu_count() or 2) - 1), key="bulk_workers")
+            
+            if st.button("🚀 Generate Semua Label", type="primary", use_container_width=True):
+                progress = st.progress(0.0, text="Menyiapkan...")
+                
+                def on_progress(done, total):
+                    progress.progress(done / total, text=f"🏷️ {done:,} / {total:,} label")
+                
+                # Stream straight to disk; pages are never held in memory together
+                output = tempfile.NamedTemporaryFile(prefix="agripass_", suffix=f".{bulk_format}", delete=False)
+                with output:
+                    report = LabelBatchService(workers=int(bulk_workers)).render(
+                        bulk_records, output, output_format=bulk_format,
+                        print_type=bulk_type, size=bulk_size, progress_callback=on_progress
+                    )
+                st.session_state['bulk_label_file'] = (output.name, bulk_format)
+                
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Label", f"{report.labels:,}")
+                m2.metric("Waktu", f"{report.seconds:,.1f} detik")
+                m3.metric("Throughput", f"{report.labels_per_second:,.1f} label/detik")
+                st.caption(f"Ukuran file: {report.bytes_written / 1e6:,.1f} MB")
+            
+            if st.session_state.get('bulk_label_file'):
+                path, fmt = st.session_state['bulk_label_file']
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        st.download_button(
+                            "⬇️ Download Label Massal",
+                            f,
+                            f"AgriPass_Labels.{fmt}",
+                            "application/pdf" if fmt == "pdf" else "application/zip",
+                            use_container_width=True
+                        )
@@ -3,7 +3,6 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import time
@@ -23,560 +22,18 @@ except:
     pass # Dev mode fallback
 
 # ================================
-# 🧠 KNOWLEDGE BASE & MODELS
+# 🧠 KNOWLEDGE BASE & SIMULATION ENGINE
 # ================================
+# Response model & optimizer live in services/yield_engine.py (vectorized)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
-CROP_DB = {
-    "Padi": {
-        "varieties": {
-            "Ciherang": {"potential": 8500, "days": 115, "resilience": 0.8},
-            "Inpari 32": {"potential": 9200, "days": 110, "resilience": 0.9},
-            "IR64": {"potential": 7000, "days": 115, "resilience": 0.7}
-        },
-        "optimal": {"ph": 6.5, "n": 120, "p": 60, "k": 90, "water": 1500, "temp": 28},
-        "price": 7200
-    },
-    "Jagung": {
-        "varieties": {
-            "Bisi 18": {"potential": 9500, "days": 105, "resilience": 0.85},
-            "Pioneer P27": {"potential": 11000, "days": 110, "resilience": 0.9}
-        },
-        "optimal": {"ph": 6.8, "n": 180, "p": 80, "k": 100, "water": 1200, "temp": 30},
-        "price": 5800
-    },
-    "Cabai Merah": {
-         "varieties": {
-            "Laju": {"potential": 18000, "days": 90, "resilience": 0.7},
-            "Pilar": {"potential": 20000, "days": 95, "resilience": 0.8}
-        },
-        "optimal": {"ph": 6.5, "n": 200, "p": 150, "k": 200, "water": 1800, "temp": 26},
-        "price": 45000
-    },
-    "Kedelai": {
-        "varieties": {
-            "Anjasmoro": {"potential": 2500, "days": 85, "resilience": 0.8},
-            "Grobogan": {"potential": 3000, "days": 76, "resilience": 0.85}
-        },
-        "optimal": {"ph": 6.0, "n": 50, "p": 70, "k": 80, "water": 400, "temp": 28},
-        "price": 10500
-    },
-    "Bawang Merah": {
-        "varieties": {
-            "Bima Brebes": {"potential": 10000, "days": 60, "resilience": 0.75},
-            "Bauji": {"potential": 12000, "days": 58, "resilience": 0.8}
-        },
-        "optimal": {"ph": 6.5, "n": 150, "p": 100, "k": 120, "water": 600, "temp": 27},
-        "price": 28000
-    },
-    "Tomat": {
-        "varieties": {
-            "Servo F1": {"potential": 60000, "days": 75, "resilience": 0.85},
-            "Tymoti F1": {"potential": 55000, "days": 80, "resilience": 0.8}
-        },
-        "optimal": {"ph": 6.2, "n": 180, "p": 120, "k": 180, "water": 800, "temp": 24},
-        "price": 8000
-    },
-    "Kentang": {
-        "varieties": {
-            "Granola": {"potential": 25000, "days": 100, "resilience": 0.75},
-            "Atlantik": {"potential": 30000, "days": 110, "resilience": 0.8}
-        },
-        "optimal": {"ph": 5.5, "n": 200, "p": 150, "k": 200, "water": 600, "temp": 18},
-        "price": 14000
-    },
-    "Ubi Kayu": {
-        "varieties": {
-            "Manggu": {"potential": 35000, "days": 300, "resilience": 0.9},
-            "Casesa": {"potential": 40000, "days": 280, "resilience": 0.95}
-        },
-        "optimal": {"ph": 6.0, "n": 100, "p": 50, "k": 100, "water": 800, "temp": 30},
-        "price": 3500
-    },
-    "Kopi": {
-        "varieties": {
-            "Arabica Gayo 1": {"potential": 1500, "days": 365, "resilience": 0.8},
-            "Robusta BP 308": {"potential": 2500, "days": 365, "resilience": 0.9}
-        },
-        "optimal": {"ph": 5.5, "n": 120, "p": 80, "k": 120, "water": 2000, "temp": 22},
-        "price": 45000
-    },
-    "Kakao": {
-        "varieties": {
-            "MCC 02": {"potential": 2500, "days": 365, "resilience": 0.85},
-            "Sulawesi 1": {"potential": 2000, "days": 365, "resilience": 0.8}
-        },
-        "optimal": {"ph": 6.5, "n": 100, "p": 60, "k": 100, "water": 1800, "temp": 28},
-        "price": 38000
-    }
-}
-
-SOIL_TEXTURES = {
-    "Lempung (Ideal)": {"water_retention": 1.0, "nutrient_holding": 1.0, "desc": "Struktur tanah seimbang"},
-    "Pasir (Sandy)": {"water_retention": 0.6, "nutrient_holding": 0.5, "desc": "Cepat kering, boros pupuk"},
-    "Liat (Clay)": {"water_retention": 0.9, "nutrient_holding": 1.2, "desc": "Keras saat kering, mengikat air kuat"}
-}
-
-FERT_PRODUCTS = {
-    # Macros
-    "Urea": {"n": 0.46, "p": 0, "k": 0, "price": 4000, "type": "Solid"},
-    "ZA": {"n": 0.21, "p": 0, "k": 0, "s": 0.24, "price": 2500, "type": "Solid"},
-    "SP-36": {"n": 0, "p": 0.36, "k": 0, "s": 0.05, "price": 3500, "type": "Solid"},
-    "KCl": {"n": 0, "p": 0, "k": 0.60, "price": 12000, "type": "Solid"},
-    "NPK 16-16-16": {"n": 0.16, "p": 0.16, "k": 0.16, "price": 15000, "type": "Solid"},
-    
-    # Secondary & Micro
-    "Dolomit": {"ca": 0.30, "mg": 0.18, "price": 500, "type": "Solid"},
-    "Kieserite": {"mg": 0.27, "s": 0.20, "price": 4000, "type": "Solid"},
-    "Mikro Majemuk": {"fe":0.1, "zn":0.05, "b":0.02, "price": 80000, "type": "Soluble"}, # Simplified
-    
-    # Organics
-    "Kompos": {"price": 1000, "type": "Solid"},
-    "POC": {"price": 35000, "type": "Liquid"},
-    
-    # Hormones
-    "ZPT Auksin": {"price": 45000, "type": "Small"},
-    "ZPT Sitokinin": {"price": 50000, "type": "Small"},
-    "ZPT Giberelin": {"price": 60000, "type": "Small"},
-    "Kalium Booster": {"price": 40000, "type": "Soluble"}
-}
-
-# ... (Previous simulation code remains unchanged) ...
-
-
-# ================================
-# 🧮 SIMULATION ENGINE
-# ================================
-
-def gaussian_curve(val, optimal, sigma=1.0):
-    """Bell curve response: 1.0 at optimal, drops as you move away"""
-    # Simply: e^(-0.5 * ((x-mu)/sig)^2)
-    # We calibrate sigma so that +/- 20% deviation gives ~0.8 score
-    spread = optimal * 0.3 # 30% tolerance
-    return np.exp(-0.5 * ((val - optimal) / (spread/2))**2)
-
-def saturation_curve(val, optimal):
-    """Increases then plateaus (Law of Minimum)"""
-    # 1 - e^(-k * val)
-    # Calibrated so that at 'optimal' value, we reach 0.99
-    if val >= optimal * 1.5: return 0.95 # Toxicity/Waste penalty
-    k = 4.0 / optimal 
-    return 1 - np.exp(-k * val)
-
-def sigmoid_curve(val, max_boost=1.1, midpoint=50):
-    """S-curve for organic/bio boosters (diminishing returns)"""
-    return 1 + (max_boost - 1) / (1 + np.exp(-0.1 * (val - midpoint)))
-
-def run_simulation(crop, variety, texture_key, params):
-    # Get base potential
-    crop_data = CROP_DB[crop]
-    var_data = crop_data['varieties'][variety]
-    opt = crop_data['optimal']
-    
-    potential = var_data['potential'] * params['area_ha']
-    
-    # Soil Texture Impact
-    texture = SOIL_TEXTURES[texture_key]
-    
-    # --- ORGANIC & BIO AMENDMENTS IMPACT ---
-    # Organic Solid improves Texture (Water retention & Nutrient Holding)
-    org_solid_factor = 1.0 + (params.get('org_solid', 0) / 10000) * 0.2 # Max 20% improvement at 10ton/ha
-    
-    current_water_retention = min(1.0, texture['water_retention'] * org_solid_factor)
-    current_nutrient_holding = min(1.2, texture['nutrient_holding'] * org_solid_factor)
-    
-    # Organic Liquid/POC acts as immediate nutrient efficiency booster
-    poc_eff_boost = 1.0 + (params.get('org_liquid', 0) / 100) * 0.15 # Max 15% efficiency boost at 100L/ha
-
-    # 1. Nutrient Factors (Saturation Curve)
-    # Effective N = Input N * Soil Holding Cap * POC Boost
-    eff_n = params['n'] * current_nutrient_holding * poc_eff_boost
-    score_n = saturation_curve(eff_n, opt['n'])
-    
-    eff_p = params['p'] * current_nutrient_holding * poc_eff_boost
-    score_p = saturation_curve(eff_p, opt['p'])
-    
-    eff_k = params['k'] * current_nutrient_holding * poc_eff_boost
-    score_k = saturation_curve(eff_k, opt['k'])
-    
-    # Secondary Macros (Ca, Mg, S) - Critical for quality/enzyme function
-    score_ca = saturation_curve(params.get('ca_ppm', 0), 200) # Need ~200ppm
-    score_mg = saturation_curve(params.get('mg_ppm', 0), 50)  # Need ~50ppm
-    score_s  = saturation_curve(params.get('s_ppm', 0), 30)   # Need ~30ppm
-    
-    # Micro Nutrients (Fe, Mn, Zn, B, Cu, Mo) - Trace but vital
-    score_fe = saturation_curve(params.get('fe_ppm', 0), 5)   # Iron
-    score_mn = saturation_curve(params.get('mn_ppm', 0), 5)   # Manganese
-    score_zn = saturation_curve(params.get('zn_ppm', 0), 2)   # Zinc
-    score_b  = saturation_curve(params.get('b_ppm', 0), 1)    # Boron
-    score_cu = saturation_curve(params.get('cu_ppm', 0), 0.5) # Copper
-    score_mo = saturation_curve(params.get('mo_ppm', 0), 0.1) # Molybdenum
-    
-    # Aggregate Micro Score (Geometric Mean for average health, but Min for Liebig)
-    micro_scores = [score_fe, score_mn, score_zn, score_b, score_cu, score_mo]
-    avg_micro_score = np.mean(micro_scores)
-    
-    # 2. Environmental Factors (Gaussian)
-    score_ph = gaussian_curve(params['ph'], opt['ph'])
-    score_temp = gaussian_curve(params['temp'], opt['temp'])
-    
-    # 3. Water (Linear with penalty)
-    eff_water = params['rain'] * current_water_retention
-    if eff_water < opt['water'] * 0.5:
-        score_water = 0.4 + (eff_water / opt['water']) * 0.6
-    elif eff_water > opt['water'] * 1.5:
-        score_water = 0.8 # Flood stress
-    else:
-        score_water = 1.0
-        
-    # LIEBIG'S LAW OF THE MINIMUM (Expanded)
-    factors = {
-        "Nitrogen": score_n, "Fosfor": score_p, "Kalium": score_k,
-        "Kalsium (Ca)": score_ca, "Magnesium (Mg)": score_mg, "Sulfur (S)": score_s,
-        "Mikro (Avg)": avg_micro_score, # For radar chart simplicity
-        "pH Tanah": score_ph, "Air": score_water, "Suhu": score_temp
-    }
-    
-    # Check strict limiting factor including specific micros
-    all_scores_dict = factors.copy()
-    all_scores_dict.update({
-        "Besi (Fe)": score_fe, "Mangan (Mn)": score_mn, "Seng (Zn)": score_zn,
-        "Boron (B)": score_b, "Tembaga (Cu)": score_cu, "Molibdenum (Mo)": score_mo
-    })
-    
-    limiting_factor_val = min(all_scores_dict.values())
-    limiting_factor_name = min(all_scores_dict, key=all_scores_dict.get)
-    
-    # Average of major groups
-    avg_factor_val = sum(factors.values()) / len(factors)
-    
-    # Hybrid model
-    final_yield_pct = (limiting_factor_val * 0.6) + (avg_factor_val * 0.4)
-    
-    # --- BOOSTERS & HORMONES (Multipliers) ---
-    # Hormones (ZPT) Split: Auksin, Sitokinin, Giberelin
-    
-    # Auksin: Rooting & Nutrient Uptake Efficiency (Gaussian)
-    # Optimal ~20-40 ppm. 
-    auxin_ppm = params.get('auxin_ppm', 0)
-    mu_auxin = 30
-    if auxin_ppm > 0:
-        auxin_mult = 1.0 + (0.12 * np.exp(-0.5 * ((auxin_ppm - mu_auxin) / 15)**2))
-        # High overdose penalty
-        if auxin_ppm > 80: auxin_mult -= ((auxin_ppm - 80) * 0.005) 
-    else:
-        auxin_mult = 1.0
-
-    # Sitokinin: Cell Division & Filling (Sigmoid -> Plateau)
-    # Good for grain filling / vegetable leafiness. Harder to overdose than Auxin.
-    cyto_ppm = params.get('cyto_ppm', 0)
-    if cyto_ppm > 0:
-        cyto_mult = 1.0 + (0.10 * (1 - np.exp(-0.05 * cyto_ppm)))    
-    else:
-        cyto_mult = 1.0
-        
-    # Giberelin (GA3): Size & Elongation (Gaussian broad)
-    # Powerful but risky (bolting). Optimal ~50-80 ppm.
-    ga3_ppm = params.get('ga3_ppm', 0)
-    mu_ga3 = 60
-    if ga3_ppm > 0:
-        ga3_mult = 1.0 + (0.15 * np.exp(-0.5 * ((ga3_ppm - mu_ga3) / 25)**2))
-        if ga3_ppm > 150: ga3_mult -= ((ga3_ppm - 150) * 0.003)
-    else:
-        ga3_mult = 1.0
-
-    # Combined ZPT Effect (Multiplicative with damping)
-    zpt_total_mult = auxin_mult * cyto_mult * ga3_mult
-        
-    # Booster (e.g. Kalium Booster for fruit phase)
-    # Modeled as Sigmoid - steady increase
-    booster_kg = params.get('booster_kg', 0)
-    booster_multiplier = 1.0 + (0.1 * (1 - np.exp(-0.1 * booster_kg))) # Max 10% boost
-    
-    final_yield_pct = final_yield_pct * zpt_total_mult * booster_multiplier
-    
-    # Variety resilience bonus
-    final_yield_pct = final_yield_pct * (0.9 + (var_data['resilience'] * 0.1))
-    
-    # Cap at 130% of standard potential (genetic breakdown limit)
-    final_yield_pct = min(1.3, final_yield_pct)
-    
-    predicted_kg = potential * final_yield_pct
-    
-    return {
-        "yield_kg": predicted_kg,
-        "yield_pct": final_yield_pct * 100,
-        "factors": factors,
-        "limiting_factor": limiting_factor_name,
-        "potential_kg": potential,
-        "multipliers": {
-            "auxin": auxin_mult,
-            "cyto": cyto_mult,
-            "ga3": ga3_mult,
-            "zpt_total": zpt_total_mult,
-            "booster": booster_multiplier,
-            "organic_solid": org_solid_factor,
-            "organic_liquid": poc_eff_boost
-        },
-        "micros": {
-            "fe": score_fe, "mn": score_mn, "zn": score_zn, 
-            "b": score_b, "cu": score_cu, "mo": score_mo
-        },
-        "macros_sec": {
-            "ca": score_ca, "mg": score_mg, "s": score_s
-        }
-    }
-
-def optimize_budget(budget, params, crop, var, texture_key, fert_prices):
-    """
-    Greedy Hill-Climbing Algorithm:
-    Allocates budget to the most limiting factor iteratively.
-    """
-    current_params = params.copy()
-    remaining_budget = budget
-    purchased_items = {} # Item: Qty
-    
-    # Cost definitions per unit step (Simplified Estimates for algorithm)
-    # Unit sizes chosen for granular increments
-    actions = {
-        "Nitrogen": {"key": "n", "amount": 2, "cost": (2/0.46) * fert_prices["Urea"], "product": "Urea", "p_unit": "kg"},
-        "Fosfor": {"key": "p", "amount": 2, "cost": (2/0.36) * fert_prices["SP-36"], "product": "SP-36", "p_unit": "kg"},
-        "Kalium": {"key": "k", "amount": 2, "cost": (2/0.60) * fert_prices["KCl"], "product": "KCl", "p_unit": "kg"},
-        "pH Tanah": {"key": "ph", "amount": 0.1, "cost": (200 * fert_prices["Dolomit"]), "product": "Dolomit/Kapur", "p_unit": "kg (est 200kg)"}, 
-        
-        # Secondary
-        "Kalsium (Ca)": {"key": "ca_ppm", "amount": 10, "cost": (20 * fert_prices["Dolomit"]), "product": "Dolomit", "p_unit": "kg"},
-        "Magnesium (Mg)": {"key": "mg_ppm", "amount": 5, "cost": (5 * fert_prices["Kieserite"]), "product": "Kieserite", "p_unit": "kg"},
-        "Sulfur (S)": {"key": "s_ppm", "amount": 5, "cost": (5 * fert_prices["ZA"]), "product": "ZA/Sulfur", "p_unit": "kg"},
-        
-        # General Boost fallback
-        "General_Boost": {"key": "booster_kg", "amount": 1, "cost": 1 * fert_prices["Kalium Booster"], "product": "Kalium Booster", "p_unit": "kg"}
-    }
-    
-    # Micro mapping (Compound Fertilizer bumps all micros)
-    micro_keys = ["Besi (Fe)", "Mangan (Mn)", "Seng (Zn)", "Boron (B)", "Tembaga (Cu)", "Molibdenum (Mo)", "Mikro (Avg)"]
-    micro_action = {"key": ["fe_ppm", "mn_ppm", "zn_ppm", "b_ppm", "cu_ppm", "mo_ppm"], "amount": 0.5, "cost": 0.5 * fert_prices["Mikro Majemuk"], "product": "Mikro Majemuk", "p_unit": "kg"}
-    
-    steps_log = []
-    
-    # Safety breakout
-    for _ in range(100): 
-        if remaining_budget <= 5000: break # Minimum transaction
-        
-        # 1. Run Sim to find Limiting Factor
-        res = run_simulation(crop, var, texture_key, current_params)
-        limit = res['limiting_factor']
-        
-        # 2. Determine Action
-        if limit in micro_keys:
-            action = micro_action
-        else:
-            action = actions.get(limit)
-        
-        # If limiting factor is Air/Temp (Unfixable by budget) -> Switch to Booster or Organic
-        if not action or limit in ['Air', 'Suhu']:
-             # Try Organic first if low, else Booster
-             if current_params['org_solid'] < 5000:
-                 action = {"key": "org_solid", "amount": 500, "cost": 500 * fert_prices["Kompos"], "product": "Kompos", "p_unit": "kg"}
-             elif current_params.get('auxin_ppm', 0) < 20: # Adjusted check
-                  action = {"key": "auxin_ppm", "amount": 5, "cost": 5000, "product": "ZPT Auksin", "p_unit": "ppm"} 
-             else:
-                 action = actions["General_Boost"]
-        
-        # 3. Check Affordability
-        if remaining_budget >= action['cost']:
-            # execute buy
-            remaining_budget -= action['cost']
-            
-            # Update Param (Handle list or single key)
-            keys = action['key'] if isinstance(action['key'], list) else [action['key']]
-            for k in keys:
-                current_params[k] = current_params.get(k, 0) + action['amount']
-            
-            # Log purchase
-            item_name = action['product']
-            # Approx qty (cost / unit_price)
-            # Safe division for logging
-            u_price = fert_prices.get(item_name.split("/")[0], 1000)
-            if u_price == 0: u_price = 1000
-            
-            purchased_items[item_name] = purchased_items.get(item_name, 0) + (action['cost'] / u_price) 
-            
-        else:
-            break # Can't afford the fix for the bottleneck
-            
-    final_res = run_simulation(crop, var, texture_key, current_params)
-    return current_params, final_res, remaining_budget
-
-# ================================
-# 🖥️ UI INTERFACE
-# ================================
-
-
-
-def run_simulation(crop, variety, texture_key, params):
-    # Get base potential
-    crop_data = CROP_DB[crop]
-    var_data = crop_data['varieties'][variety]
-    opt = crop_data['optimal']
-    
-    potential = var_data['potential'] * params['area_ha']
-    
-    # Soil Texture Impact
-    texture = SOIL_TEXTURES[texture_key]
-    
-    # --- ORGANIC & BIO AMENDMENTS IMPACT ---
-    # Organic Solid improves Texture (Water retention & Nutrient Holding)
-    org_solid_factor = 1.0 + (params.get('org_solid', 0) / 10000) * 0.2 # Max 20% improvement at 10ton/ha
-    
-    current_water_retention = min(1.0, texture['water_retention'] * org_solid_factor)
-    current_nutrient_holding = min(1.2, texture['nutrient_holding'] * org_solid_factor)
-    
-    # Organic Liquid/POC acts as immediate nutrient efficiency booster
-    poc_eff_boost = 1.0 + (params.get('org_liquid', 0) / 100) * 0.15 # Max 15% efficiency boost at 100L/ha
-
-    # 1. Nutrient Factors (Saturation Curve)
-    # Effective N = Input N * Soil Holding Cap * POC Boost
-    eff_n = params['n'] * current_nutrient_holding * poc_eff_boost
-    score_n = saturation_curve(eff_n, opt['n'])
-    
-    eff_p = params['p'] * current_nutrient_holding * poc_eff_boost
-    score_p = saturation_curve(eff_p, opt['p'])
-    
-    eff_k = params['k'] * current_nutrient_holding * poc_eff_boost
-    score_k = saturation_curve(eff_k, opt['k'])
-    
-    # Secondary Macros (Ca, Mg, S) - Critical for quality/enzyme function
-    # Modeled as sufficiency score (0.0 - 1.0) based on input ppm/kg
-    # Simplified thresholds for simulator
-    score_ca = saturation_curve(params.get('ca_ppm', 0), 200) # Need ~200ppm
-    score_mg = saturation_curve(params.get('mg_ppm', 0), 50)  # Need ~50ppm
-    score_s  = saturation_curve(params.get('s_ppm', 0), 30)   # Need ~30ppm
-    
-    # Micro Nutrients (Fe, Mn, Zn, B, Cu, Mo) - Trace but vital
-    # Modeled as individual sufficiency
-    score_fe = saturation_curve(params.get('fe_ppm', 0), 5)   # Iron
-    score_mn = saturation_curve(params.get('mn_ppm', 0), 5)   # Manganese
-    score_zn = saturation_curve(params.get('zn_ppm', 0), 2)   # Zinc
-    score_b  = saturation_curve(params.get('b_ppm', 0), 1)    # Boron
-    score_cu = saturation_curve(params.get('cu_ppm', 0), 0.5) # Copper
-    score_mo = saturation_curve(params.get('mo_ppm', 0), 0.1) # Molybdenum
-    
-    # Aggregate Micro Score (Geometric Mean for average health, but Min for Liebig)
-    # Using geometric mean for the "Micro Group" score to avoid one zero killing everything unduly in the display,
-    # but strictly, Liebig says Min.
-    micro_scores = [score_fe, score_mn, score_zn, score_b, score_cu, score_mo]
-    avg_micro_score = np.mean(micro_scores)
-    
-    # 2. Environmental Factors (Gaussian)
-    score_ph = gaussian_curve(params['ph'], opt['ph'])
-    score_temp = gaussian_curve(params['temp'], opt['temp'])
-    
-    # 3. Water (Linear with penalty)
-    eff_water = params['rain'] * current_water_retention
-    if eff_water < opt['water'] * 0.5:
-        score_water = 0.4 + (eff_water / opt['water']) * 0.6
-    elif eff_water > opt['water'] * 1.5:
-        score_water = 0.8 # Flood stress
-    else:
-        score_water = 1.0
-        
-    # LIEBIG'S LAW OF THE MINIMUM (Expanded)
-    factors = {
-        "Nitrogen": score_n, "Fosfor": score_p, "Kalium": score_k,
-        "Kalsium (Ca)": score_ca, "Magnesium (Mg)": score_mg, "Sulfur (S)": score_s,
-        "Mikro (Avg)": avg_micro_score, # For radar chart simplicity
-        "pH Tanah": score_ph, "Air": score_water, "Suhu": score_temp
-    }
-    
-    # Check strict limiting factor including specific micros
-    all_scores_dict = factors.copy()
-    all_scores_dict.update({
-        "Besi (Fe)": score_fe, "Mangan (Mn)": score_mn, "Seng (Zn)": score_zn,
-        "Boron (B)": score_b, "Tembaga (Cu)": score_cu, "Molibdenum (Mo)": score_mo
-    })
-    
-    limiting_factor_val = min(all_scores_dict.values())
-    limiting_factor_name = min(all_scores_dict, key=all_scores_dict.get)
-    
-    # Average of major groups
-    avg_factor_val = sum(factors.values()) / len(factors)
-    
-    # Hybrid model
-    final_yield_pct = (limiting_factor_val * 0.6) + (avg_factor_val * 0.4)
-    
-    # --- BOOSTERS & HORMONES (Multipliers) ---
-    # Hormones (ZPT) Split: Auksin, Sitokinin, Giberelin
-    
-    # Auksin: Rooting & Nutrient Uptake Efficiency (Gaussian)
-    # Optimal ~20-40 ppm. 
-    auxin_ppm = params.get('auxin_ppm', 0)
-    mu_auxin = 30
-    if auxin_ppm > 0:
-        auxin_mult = 1.0 + (0.12 * np.exp(-0.5 * ((auxin_ppm - mu_auxin) / 15)**2))
-        # High overdose penalty
-        if auxin_ppm > 80: auxin_mult -= ((auxin_ppm - 80) * 0.005) 
-    else:
-        auxin_mult = 1.0
-
-    # Sitokinin: Cell Division & Filling (Sigmoid -> Plateau)
-    # Good for grain filling / vegetable leafiness. Harder to overdose than Auxin.
-    cyto_ppm = params.get('cyto_ppm', 0)
-    if cyto_ppm > 0:
-        cyto_mult = 1.0 + (0.10 * (1 - np.exp(-0.05 * cyto_ppm)))    
-    else:
-        cyto_mult = 1.0
-        
-    # Giberelin (GA3): Size & Elongation (Gaussian broad)
-    # Powerful but risky (bolting). Optimal ~50-80 ppm.
-    ga3_ppm = params.get('ga3_ppm', 0)
-    mu_ga3 = 60
-    if ga3_ppm > 0:
-        ga3_mult = 1.0 + (0.15 * np.exp(-0.5 * ((ga3_ppm - mu_ga3) / 25)**2))
-        if ga3_ppm > 150: ga3_mult -= ((ga3_ppm - 150) * 0.003)
-    else:
-        ga3_mult = 1.0
-
-    # Combined ZPT Effect (Multiplicative with damping)
-    zpt_total_mult = auxin_mult * cyto_mult * ga3_mult
-        
-    # Booster (e.g. Kalium Booster for fruit phase)
-    # Modeled as Sigmoid - steady increase
-    booster_kg = params.get('booster_kg', 0)
-    booster_multiplier = 1.0 + (0.1 * (1 - np.exp(-0.1 * booster_kg))) # Max 10% boost
-    
-    final_yield_pct = final_yield_pct * zpt_total_mult * booster_multiplier
-    
-    # Variety resilience bonus
-    final_yield_pct = final_yield_pct * (0.9 + (var_data['resilience'] * 0.1))
-    
-    # Cap at 130% of standard potential (genetic breakdown limit)
-    final_yield_pct = min(1.3, final_yield_pct)
-    
-    predicted_kg = potential * final_yield_pct
-    
-    return {
-        "yield_kg": predicted_kg,
-        "yield_pct": final_yield_pct * 100,
-        "factors": factors,
-        "limiting_factor": limiting_factor_name,
-        "potential_kg": potential,
-        "multipliers": {
-            "auxin": auxin_mult,
-            "cyto": cyto_mult,
-            "ga3": ga3_mult,
-            "zpt_total": zpt_total_mult,
-            "booster": booster_multiplier,
-            "organic_solid": org_solid_factor,
-            "organic_liquid": poc_eff_boost
-        },
-        "micros": {
-            "fe": score_fe, "mn": score_mn, "zn": score_zn, 
-            "b": score_b, "cu": score_cu, "mo": score_mo
-        },
-        "macros_sec": {
-            "ca": score_ca, "mg": score_mg, "s": score_s
-        }
-    }
+from services.yield_engine import (
+    CROP_DB, SOIL_TEXTURES, FERT_PRODUCTS, DEFAULT_PARAMS,
+    run_simulation, optimize_budget, optimize_roster, clean_roster
+)
 
 # ================================
 # 🖥️ UI INTERFACE
@@ -631,7 +88,7 @@ params = {
 res = run_simulation(s_crop, s_var, s_grad, params)
 
 # TABS
-tab_sim, tab_eco, tab_whatif = st.tabs(["📊 Hasil & Analisis", "💰 Proyeksi Ekonomi", "🧪 What-If Simulator"])
+tab_sim, tab_eco, tab_whatif, tab_batch = st.tabs(["📊 Hasil & Analisis", "💰 Proyeksi Ekonomi", "🧪 What-If Simulator", "👥 Batch Kelompok Tani"])
 
 with tab_sim:
     # 1. HERO METRIC
@@ -934,25 +391,27 @@ with tab_whatif:
         st.info("Punya modal terbatas? Biarkan AI menentukan prioritas belanja pupuk paling efisien (Hukum Minimum Liebig).")
         
         budget_input = st.number_input("Masukkan Modal Tambahan (Rp)", 0, 100000000, 1000000, step=100000, help="Anggaran yang tersedia untuk optimalisasi.")
+        only_profitable = st.checkbox("Hanya beli input yang menguntungkan", value=True,
+                                      help="Berhenti belanja jika tambahan panen (x harga jual) lebih kecil dari biaya input.")
+        
+        # Capture current prices
+        current_prices = {
+            "Urea": p_urea, "SP-36": p_sp36, "KCl": p_kcl, 
+            "Dolomit": p_dolomit, "Kompos": p_kompos, "POC": p_poc,
+            "Kalium Booster": p_booster, "Kieserite": 4000, "ZA": 2500, "Mikro Majemuk": 80000 
+        }
         
         if st.button("✨ Optimalkan Modal Saya"):
-            # Capture current prices
-            current_prices = {
-                "Urea": p_urea, "SP-36": p_sp36, "KCl": p_kcl, 
-                "Dolomit": p_dolomit, "Kompos": p_kompos, "POC": p_poc,
-                "Kalium Booster": p_booster, "Kieserite": 4000, "ZA": 2500, "Mikro Majemuk": 80000 
-            }
-            
             base_params_for_opt = {
+                **DEFAULT_PARAMS,
                 "area_ha": s_area, "ph": i_ph, "temp": i_temp, "rain": i_rain,
                 "n": i_n, "p": i_p, "k": i_k,
-                "org_solid": 0, "org_liquid": 0, 
-                "ca_ppm": 100, "mg_ppm": 30, "s_ppm": 20,
-                "fe_ppm": 2, "mn_ppm": 2, "zn_ppm": 1, "b_ppm": 0.5, "cu_ppm": 0.2, "mo_ppm": 0.05,
-                "auxin_ppm": 0, "cyto_ppm": 0, "ga3_ppm": 0, "booster_kg": 0
             }
             
-            opt_params, opt_res, left_budget = optimize_budget(budget_input, base_params_for_opt, s_crop, s_var, s_grad, current_prices)
+            opt_params, opt_res, left_budget, shopping_list = optimize_budget(
+                budget_input, base_params_for_opt, s_crop, s_var, s_grad, current_prices,
+                value_per_kg=price_est if only_profitable else None
+            )
             
             opt_delta_kg = opt_res['yield_kg'] - res['yield_kg']
             opt_delta_rev = opt_delta_kg * price_est
@@ -966,45 +425,97 @@ with tab_whatif:
             c_o2.metric("Revenue Tambahan", f"Rp {opt_delta_rev:,.0f}")
             c_o3.metric("ROI Optimasi", f"{opt_roi:.1f}%", help="Return on Investment dari modal tambahan ini")
             
-            shopping_list = []
+            st.write("**Rekomendasi Belanja Prioritas:**")
+            if shopping_list:
+                st.dataframe(
+                    pd.DataFrame(shopping_list),
+                    column_config={"Biaya": st.column_config.NumberColumn(format="Rp %d")},
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Tidak ada input yang layak dibeli dengan modal & harga saat ini.")
+
+with tab_batch:
+    st.header("👥 Optimasi Massal Kelompok Tani")
+    st.write("Upload daftar lahan anggota kelompok tani untuk mengoptimalkan modal pupuk semua lahan sekaligus.")
+    
+    st.markdown("""
+    **Format CSV:**
+    ```
+    plot,crop,variety,texture,area_ha,ph,temp,rain,n,p,k,budget
+    Pak Budi,Padi,Ciherang,Lempung (Ideal),1.0,5.8,28,1200,60,30,45,1500000
+    ```
+    Kolom yang kosong memakai nilai default. Harga pupuk mengikuti tab What-If Simulator.
+    """)
+    
+    roster_file = st.file_uploader("Upload Daftar Lahan (CSV)", type=['csv'], key="roster_csv")
+    batch_profitable = st.checkbox("Hanya beli input yang menguntungkan", value=True, key="batch_profitable")
+    
+    if roster_file:
+        df_roster = pd.read_csv(roster_file)
+        df_roster.columns = [str(c).strip().lower() for c in df_roster.columns]
+        
+        missing_cols = {'crop', 'variety', 'texture'} - set(df_roster.columns)
+        if missing_cols:
+            st.error(f"❌ Kolom wajib tidak ada: {', '.join(sorted(missing_cols))}")
+            st.stop()
+        
+        # Validate crop/variety/texture against the knowledge base
+        valid = df_roster.apply(
+            lambda r: r['crop'] in CROP_DB
+            and r['variety'] in CROP_DB[r['crop']]['varieties']
+            and r['texture'] in SOIL_TEXTURES,
+            axis=1
+        ).astype(bool)
+        if (~valid).any():
+            st.warning(f"⚠️ {int((~valid).sum())} baris dilewati (komoditas/varietas/tekstur tidak dikenal).")
+        
+        roster, bad_rows = clean_roster([
+            {k: v for k, v in row.items() if pd.notna(v)}
+            for row in df_roster[valid].to_dict('records')
+        ])
+        if bad_rows:
+            valid_index = df_roster.index[valid]
+            st.warning(f"⚠️ {len(bad_rows)} baris dilewati (nilai bukan angka):")
+            st.dataframe(pd.DataFrame([
+                {'Baris CSV': int(valid_index[i]) + 2, 'Kolom': key, 'Nilai': str(value)}
+                for i, key, value in bad_rows
+            ]), hide_index=True)
+        st.caption(f"{len(roster)} lahan siap dioptimasi")
+        
+        if roster and st.button("🚀 Optimalkan Semua Lahan", type="primary"):
+            batch_results = optimize_roster(roster, current_prices, profitable_only=batch_profitable)
+            df_batch = pd.DataFrame(batch_results).drop(columns=['shopping_list'])
             
-            if opt_params['n'] > base_params_for_opt['n']:
-                added = opt_params['n'] - base_params_for_opt['n']
-                product_kg = added / 0.46
-                shopping_list.append({"Item": "Urea", "Qty": f"+{product_kg:.1f} kg", "Alasan": "Fix Defisiensi Nitrogen"})
+            b1, b2, b3 = st.columns(3)
+            b1.metric("Total Modal Terpakai", f"Rp {df_batch['spent'].sum():,.0f}")
+            b2.metric("Total Tambahan Panen", f"{df_batch['delta_kg'].sum():,.0f} kg")
+            b3.metric("Rata-rata ROI", f"{df_batch['roi_pct'].mean():.1f}%")
             
-            if opt_params['p'] > base_params_for_opt['p']:
-                added = opt_params['p'] - base_params_for_opt['p']
-                product_kg = added / 0.36
-                shopping_list.append({"Item": "SP-36", "Qty": f"+{product_kg:.1f} kg", "Alasan": "Fix Defisiensi Fosfor"})
-                
-            if opt_params['k'] > base_params_for_opt['k']:
-                added = opt_params['k'] - base_params_for_opt['k']
-                product_kg = added / 0.60
-                shopping_list.append({"Item": "KCl", "Qty": f"+{product_kg:.1f} kg", "Alasan": "Fix Defisiensi Kalium"})
-
-            if opt_params['ph'] > base_params_for_opt['ph']:
-                shopping_list.append({"Item": "Dolomit/Kapur", "Qty": "Sesuai dosis", "Alasan": "Netralisasi pH Masam"})
+            st.dataframe(
+                df_batch.rename(columns={
+                    'plot': 'Lahan', 'crop': 'Komoditas', 'variety': 'Varietas',
+                    'baseline_kg': 'Panen Awal (kg)', 'optimized_kg': 'Panen Optimal (kg)',
+                    'delta_kg': 'Tambahan (kg)', 'limiting_before': 'Pembatas Awal',
+                    'limiting_after': 'Pembatas Akhir', 'spent': 'Modal Terpakai',
+                    'remaining': 'Sisa Modal', 'roi_pct': 'ROI (%)'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
             
-            # Check for Micro nutrients (if Fe increased, assume Micro pack was bought)
-            if opt_params['fe_ppm'] > base_params_for_opt['fe_ppm']:
-                 # Amount added was 0.5kg per step? No, amount was nutrient based?
-                 # Action was: "amount": 0.5, "product": "Mikro Majemuk"
-                 # We can just count steps or approximate. 
-                 # Let's say: if changed, list it.
-                 shopping_list.append({"Item": "Mikro Majemuk", "Qty": "Sesuai dosis", "Alasan": "Fix Defisiensi Mikro (Fe, Zn, dll)"})
-
-            # Check Organic
-            if opt_params['org_solid'] > base_params_for_opt['org_solid']:
-                added = opt_params['org_solid']
-                shopping_list.append({"Item": "Kompos/Organik", "Qty": f"+{added:,.0f} kg", "Alasan": "Perbaiki Struktur Tanah (Faktor Air/Suhu)"})
-
-            # Check ZPT
-            if opt_params.get('auxin_ppm', 0) > base_params_for_opt.get('auxin_ppm', 0):
-                 shopping_list.append({"Item": "ZPT (Auksin/Hormon)", "Qty": "Sesuai dosis", "Alasan": "Booster Perakaran (Limitasi Lingkungan)"})
-
-            if opt_params['booster_kg'] > base_params_for_opt['booster_kg']:
-                 shopping_list.append({"Item": "Kalium Booster", "Qty": f"+{opt_params['booster_kg']:.1f} kg", "Alasan": "Maksimalkan fase generatif"})
-                 
-            st.write("**Rekomendasi Belanja Prioritas:**")
-            st.table(shopping_list)
+            # Group purchase list (merged across plots)
+            group_list = pd.DataFrame([
+                {"Lahan": r['plot'], **item} for r in batch_results for item in r['shopping_list']
+            ])
+            if not group_list.empty:
+                st.subheader("🛒 Rekap Belanja Kelompok")
+                st.dataframe(
+                    group_list.groupby('Item', as_index=False)['Biaya'].sum(),
+                    column_config={"Biaya": st.column_config.NumberColumn(format="Rp %d")},
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.download_button("📥 Download Rincian Belanja (CSV)", group_list.to_csv(index=False),
+                                   "rekap_belanja_kelompok.csv", "text/csv")
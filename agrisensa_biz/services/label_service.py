@@ -0,0 +1,592 @@
+"""
+Label Service - AgriPass Traceability
+Render label QR siap cetak, satu per satu atau massal dari CSV batch.
+
+Font dan template layout (gradient, header, kartu) di-cache per proses,
+QR dibangun langsung dari matriks modul pada ukuran akhir, dan label massal
+dirender di process pool lalu ditulis bertahap (streaming) ke satu PDF
+multi-halaman atau ZIP, sehingga 20k label tidak perlu ditahan di memori.
+"""
+import io
+import json
+import os
+import re
+import time
+import urllib.parse
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+PASSPORT_BASE_URL = "https://vercel-scan2.vercel.app/product"
+PRINT_DPI = 300
+
+# Size mapping at 300 DPI for print quality, format: (width, height)
+LABEL_SIZES = {
+    # Square/Portrait formats
+    "small": (590, 590),                 # 5x5 cm
+    "medium": (1181, 1181),              # 10x10 cm
+    "large": (1772, 1181),               # 15x10 cm
+    # Landscape formats (RECOMMENDED for products)
+    "small_landscape": (1181, 590),      # 10x5 cm - compact
+    "medium_landscape": (1772, 1181),    # 15x10 cm - standard
+    "large_landscape": (2362, 1181),     # 20x10 cm - premium
+}
+QR_ONLY_SIZES = {
+    "small": (590, 590),      # 5x5 cm
+    "medium": (945, 945),     # 8x8 cm
+    "large": (1181, 1181),    # 10x10 cm
+}
+
+# === MODERN COLOR PALETTE ===
+COLOR_PRIMARY = (16, 185, 129)      # Emerald-500
+COLOR_PRIMARY_DARK = (5, 150, 105)  # Emerald-600
+COLOR_ACCENT = (251, 191, 36)       # Amber-400
+COLOR_TEXT = (31, 41, 55)           # Gray-800
+COLOR_TEXT_LIGHT = (107, 114, 128)  # Gray-500
+COLOR_WHITE = (255, 255, 255)
+BADGE_COLORS = {
+    'Organik': (34, 197, 94),       # Green-500
+    'Halal': (59, 130, 246),        # Blue-500
+    'Premium': (168, 85, 247),      # Purple-500
+}
+
+BATCH_COLUMNS = ['id', 'produk', 'varietas', 'tgl', 'petani', 'lokasi', 'harga', 'kontak', 'klaim', 'berat', 'riwayat']
+
+
+# ==========================================
+# 🔤 FONTS & TEMPLATES (cached per process)
+# ==========================================
+
+def _truetype(name, size):
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def get_label_fonts(is_small):
+    """Adaptive font set for full labels (loaded once per process)"""
+    if is_small:
+        # Smaller, more compact fonts for 5x5 cm
+        spec = {"brand": ("arialbd.ttf", 22), "title": ("arialbd.ttf", 48), "subtitle": ("arialbd.ttf", 32),
+                "body": ("arial.ttf", 26), "small": ("arial.ttf", 22), "tiny": ("arial.ttf", 18)}
+    else:
+        spec = {"brand": ("arialbd.ttf", 45), "title": ("arialbd.ttf", 70), "subtitle": ("arial.ttf", 42),
+                "body": ("arial.ttf", 38), "small": ("arial.ttf", 32), "tiny": ("arial.ttf", 28)}
+    return {key: _truetype(name, size) for key, (name, size) in spec.items()}
+
+
+@lru_cache(maxsize=None)
+def get_qr_only_fonts(size):
+    """Font set for QR-only prints (loaded once per process)"""
+    brand, small = {"small": (28, 22), "medium": (36, 28)}.get(size, (42, 32))
+    return {"brand": _truetype("arialbd.ttf", brand), "small": _truetype("arial.ttf", small)}
+
+
+@lru_cache(maxsize=None)
+def _label_template(size):
+    """Static background of a full label: gradient, header banner, shadowed card"""
+    width, height = LABEL_SIZES[size]
+    is_small = size == "small"
+    fonts = get_label_fonts(is_small)
+
+    label = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(label)
+
+    # Subtle gradient from light teal (top) to white (bottom)
+    for i in range(height):
+        ratio = i / height
+        r = int(240 + (255 - 240) * ratio)
+        g = int(253 + (255 - 253) * ratio)
+        b = int(250 + (255 - 250) * ratio)
+        draw.rectangle([(0, i), (width, i + 1)], fill=(r, g, b))
+
+    margin = 25 if is_small else 50
+
+    # Header banner with gradient
+    header_height = 50 if is_small else 100
+    for i in range(header_height):
+        ratio = i / header_height
+        r = int(16 + (5 - 16) * ratio)
+        g = int(185 + (150 - 185) * ratio)
+        b = int(129 + (105 - 129) * ratio)
+        draw.rectangle([(0, i), (width, i + 1)], fill=(r, g, b))
+
+    header_text_y = 15 if is_small else 30
+    draw.text((margin, header_text_y), "🌾 AgriSensa", fill=COLOR_WHITE, font=fonts['brand'])
+
+    # Main content card with shadow effect (multiple rectangles)
+    card_top = header_height + (10 if is_small else 20)
+    card_margin = 15 if is_small else 30
+    card_bottom = height - (15 if is_small else 30)
+    radius = 15 if is_small else 25
+
+    shadow_offset = 4 if is_small else 8
+    for i in range(shadow_offset, 0, -1):
+        alpha = int(20 * (shadow_offset - i) / shadow_offset)
+        shadow_color = (200 - alpha, 200 - alpha, 200 - alpha)
+        draw.rounded_rectangle(
+            [(card_margin + i, card_top + i), (width - card_margin + i, card_bottom + i)],
+            radius=radius,
+            fill=shadow_color
+        )
+
+    draw.rounded_rectangle(
+        [(card_margin, card_top), (width - card_margin, card_bottom)],
+        radius=radius,
+        fill=COLOR_WHITE,
+        outline=COLOR_PRIMARY,
+        width=2 if is_small else 3
+    )
+    return label
+
+
+# ==========================================
+# 📱 QR CODE
+# ==========================================
+
+def build_passport_url(data, base_url=PASSPORT_BASE_URL):
+    """Product passport URL (query parameters read by the scan page)"""
+    params = {
+        'name': data['produk'],
+        'variety': data['varietas'],
+        'farmer': data['petani'],
+        'location': data['lokasi'],
+        'harvest_date': str(data['tgl']),
+        'weight': f"{data.get('berat', 1)} kg",
+        'batch_id': data['id']
+    }
+    if data.get('harga'):
+        params['price'] = str(data['harga'])
+    if data.get('climate'):
+        params['avg_temp'] = str(data['climate']['avg_temp'])
+        params['avg_hum'] = str(data['climate']['avg_hum'])
+        params['sun_hours'] = str(data['climate']['sun_hours'])
+    if data.get('riwayat'):
+        params['notes'] = str(data['riwayat'])
+    if data.get('milestones'):
+        params['milestones'] = json.dumps(data['milestones'])
+    return f"{base_url}/QR?{urllib.parse.urlencode(params)}"
+
+
+def make_qr_matrix(text, border=4):
+    """QR modules (incl. quiet zone) as a boolean array, True = dark"""
+    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_L, border=border)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+
+def qr_to_image(qr, size, box_size=10):
+    """
+    QR at exactly `size` px. Accepts a module matrix (nearest-neighbour scaling,
+    same pixels as resizing a box_size render) or an already rendered PIL image.
+    """
+    if not isinstance(qr, np.ndarray):
+        return qr.resize((size, size), Image.NEAREST)
+    n_px = qr.shape[0] * box_size
+    src = ((np.arange(size) + 0.5) * n_px / size).astype(int) // box_size
+    return Image.fromarray(np.where(qr[np.ix_(src, src)], 0, 255).astype(np.uint8), 'L')
+
+
+# ==========================================
+# 🏷️ LABEL RENDERING
+# ==========================================
+
+def generate_printable_label(data, size="medium", qr_img=None):
+    """
+    Generate print-ready label image with MODERN PREMIUM layout
+    Args:
+        data: batch data dictionary
+        size: "small" (5x5cm), "medium" (10x10cm), "large" (15x10cm), or *_landscape
+        qr_img: QR module matrix (make_qr_matrix) or PIL Image of QR code
+    Returns:
+        PIL Image object
+    """
+    width, height = LABEL_SIZES[size]
+    is_landscape = "landscape" in size
+    is_small = size == "small"  # Special handling for 5x5 cm
+
+    label = _label_template(size).copy()
+    draw = ImageDraw.Draw(label)
+    fonts = get_label_fonts(is_small)
+    font_title, font_subtitle, font_body = fonts['title'], fonts['subtitle'], fonts['body']
+    font_small, font_tiny = fonts['small'], fonts['tiny']
+
+    margin = 25 if is_small else 50
+    header_height = 50 if is_small else 100
+    card_top = header_height + (10 if is_small else 20)
+    card_margin = 15 if is_small else 30
+
+    # === LAYOUT: QR CODE + INFO ===
+    content_x = card_margin + (20 if is_small else 40)
+    content_y = card_top + (20 if is_small else 40)
+
+    if qr_img is not None:
+        # Adjust QR size based on label size and orientation
+        if is_small:
+            qr_size = 180
+        elif is_landscape:
+            qr_size = min(280, height - card_top - 100)
+        else:
+            qr_size = 280 if "large" in size else 240
+
+        # QR background card
+        qr_bg_padding = 8 if is_small else 15
+        draw.rounded_rectangle(
+            [(content_x - qr_bg_padding, content_y - qr_bg_padding),
+             (content_x + qr_size + qr_bg_padding, content_y + qr_size + qr_bg_padding)],
+            radius=12 if is_small else 20,
+            fill=(248, 250, 252),
+            outline=COLOR_PRIMARY,
+            width=2
+        )
+        label.paste(qr_to_image(qr_img, qr_size), (content_x, content_y))
+
+        # "Scan Me" text below QR (skip for very small labels)
+        if not is_small:
+            scan_text_y = content_y + qr_size + 10
+            draw.text((content_x + qr_size // 2 - 50, scan_text_y), "📱 Scan Me",
+                      fill=COLOR_PRIMARY_DARK, font=font_small)
+        else:
+            scan_text_y = content_y + qr_size + 5
+
+        # Landscape & wide: text right of QR, square: text below QR
+        if is_landscape or "large" in size:
+            text_x = content_x + qr_size + 50
+            text_y = content_y
+        else:
+            text_x = content_x
+            text_y = scan_text_y + (30 if is_small else 60)
+    else:
+        text_x = content_x
+        text_y = content_y
+
+    # === PRODUCT INFO (ADAPTIVE CONTENT) ===
+    product_name = data['produk'][:20] if is_small else data['produk'][:28]
+    draw.text((text_x, text_y), product_name, fill=COLOR_TEXT, font=font_title)
+    text_y += 55 if is_small else 85
+
+    varietas_text = data['varietas'][:22] if is_small else data['varietas'][:32]
+    draw.text((text_x, text_y), varietas_text, fill=COLOR_PRIMARY_DARK, font=font_subtitle)
+    text_y += 38 if is_small else 55
+
+    divider_width = 180 if is_small else 300
+    draw.rectangle([(text_x, text_y), (text_x + divider_width, text_y + 2)], fill=COLOR_PRIMARY)
+    text_y += 12 if is_small else 20
+
+    if is_small:
+        # For 5x5 cm: only ESSENTIAL info (price first)
+        if data.get('harga'):
+            draw.rounded_rectangle([(text_x, text_y), (text_x + 200, text_y + 42)], radius=10, fill=COLOR_ACCENT)
+            draw.text((text_x + 10, text_y + 8), f"💰 Rp {data['harga']:,}/kg", fill=COLOR_TEXT, font=font_subtitle)
+            text_y += 50
+
+        draw.text((text_x, text_y), f"📅 {data['tgl']}", fill=COLOR_TEXT_LIGHT, font=font_small)
+        text_y += 28
+
+        draw.text((text_x, text_y), f"📍 {data['lokasi'][:18]}", fill=COLOR_TEXT, font=font_small)
+        text_y += 35
+
+        # Quality badges (compact, max 2)
+        badge_x = text_x
+        for badge in (data.get('klaim') or [])[:2]:
+            badge_width = 90
+            draw.rounded_rectangle([(badge_x, text_y), (badge_x + badge_width, text_y + 28)],
+                                   radius=14, fill=BADGE_COLORS.get(badge, COLOR_PRIMARY))
+            draw.text((badge_x + 10, text_y + 5), f"✓ {badge[:3]}", fill=COLOR_WHITE, font=font_tiny)
+            badge_x += badge_width + 8
+    else:
+        # For larger labels: show ALL information
+        draw.text((text_x, text_y), f"📅 {data['tgl']}", fill=COLOR_TEXT_LIGHT, font=font_body)
+        text_y += 50
+
+        draw.text((text_x, text_y), f"👨‍🌾 {data['petani'][:28]}", fill=COLOR_TEXT, font=font_body)
+        text_y += 45
+
+        draw.text((text_x, text_y), f"📍 {data['lokasi'][:30]}", fill=COLOR_TEXT, font=font_body)
+        text_y += 55
+
+        if data.get('harga'):
+            draw.rounded_rectangle([(text_x, text_y), (text_x + 350, text_y + 55)], radius=12, fill=COLOR_ACCENT)
+            draw.text((text_x + 15, text_y + 12), f"💰 Rp {data['harga']:,}/kg", fill=COLOR_TEXT, font=font_subtitle)
+            text_y += 70
+
+        if data.get('kontak'):
+            draw.text((text_x, text_y), f"📞 {data['kontak']}", fill=COLOR_TEXT, font=font_body)
+            text_y += 55
+
+        # Quality badges (modern pills with shadow)
+        if data.get('klaim'):
+            text_y += 10
+            badge_x = text_x
+            for badge in data['klaim']:
+                badge_width = 160
+                draw.rounded_rectangle([(badge_x + 2, text_y + 2), (badge_x + badge_width + 2, text_y + 47)],
+                                       radius=25, fill=(200, 200, 200))
+                draw.rounded_rectangle([(badge_x, text_y), (badge_x + badge_width, text_y + 45)],
+                                       radius=25, fill=BADGE_COLORS.get(badge, COLOR_PRIMARY))
+                draw.text((badge_x + 20, text_y + 10), f"✓ {badge}", fill=COLOR_WHITE, font=font_small)
+                badge_x += badge_width + 15
+
+    # === FOOTER: Batch ID ===
+    footer_y = height - (30 if is_small else 60)
+    footer_id_text = f"ID: {data['id'][-8:]}" if is_small else f"Batch ID: {data['id']}"
+    draw.text((margin + (10 if is_small else 20), footer_y), footer_id_text, fill=COLOR_TEXT_LIGHT, font=font_tiny)
+
+    if not is_small:
+        draw.text((width - margin - 250, footer_y), "✓ Verified Product", fill=COLOR_PRIMARY, font=font_tiny)
+
+    return label
+
+
+def generate_qr_only(data, qr_img, size="medium"):
+    """
+    Generate QR code only with minimal branding
+    Args:
+        data: batch data dictionary
+        qr_img: QR module matrix (make_qr_matrix) or PIL Image of QR code
+        size: "small" (5x5cm), "medium" (8x8cm), "large" (10x10cm)
+    Returns:
+        PIL Image object
+    """
+    width, height = QR_ONLY_SIZES[size]
+    fonts = get_qr_only_fonts(size)
+
+    label = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(label)
+
+    # QR at 70% of canvas, centered
+    qr_size = int(width * 0.7)
+    qr_x = (width - qr_size) // 2
+    qr_y = (height - qr_size) // 2 - 30
+
+    border_padding = 20
+    draw.rounded_rectangle(
+        [(qr_x - border_padding, qr_y - border_padding),
+         (qr_x + qr_size + border_padding, qr_y + qr_size + border_padding)],
+        radius=15,
+        outline=COLOR_PRIMARY,
+        width=3
+    )
+    label.paste(qr_to_image(qr_img, qr_size), (qr_x, qr_y))
+
+    def centered(text, y, font, fill):
+        bbox = draw.textbbox((0, 0), text, font=font)
+        draw.text(((width - (bbox[2] - bbox[0])) // 2, y), text, fill=fill, font=font)
+
+    centered("🌾 AgriSensa", 30, fonts['brand'], COLOR_PRIMARY)
+    centered("Scan untuk info produk", qr_y + qr_size + 35, fonts['small'], COLOR_TEXT)
+    centered(f"ID: {data['id']}", height - 50, fonts['small'], COLOR_TEXT)
+    return label
+
+
+def render_label(data, print_type="label_lengkap", size="medium_landscape"):
+    """Label (or QR-only print) for one batch record, QR included"""
+    qr = make_qr_matrix(build_passport_url(data))
+    if print_type == "label_lengkap":
+        return generate_printable_label(data, size, qr)
+    return generate_qr_only(data, qr, size)
+
+
+def pil_to_pdf_bytes(pil_image):
+    """Convert PIL Image to PDF bytes"""
+    pdf_buffer = io.BytesIO()
+    pil_image.save(pdf_buffer, format='PDF', resolution=float(PRINT_DPI))
+    return pdf_buffer.getvalue()
+
+
+# ==========================================
+# 📦 BATCH PIPELINE
+# ==========================================
+
+def records_from_dataframe(df):
+    """
+    Normalize a lot/batch CSV into label records.
+
+    Columns: produk, varietas, tgl, petani, lokasi (required) and optional
+    id, harga, kontak, klaim ("Organik;Halal"), berat, riwayat. Missing or
+    blank IDs are generated as AGRI-<tgl>-<row>.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    missing = {'produk', 'varietas', 'tgl', 'petani', 'lokasi'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(sorted(missing))}")
+
+    out = pd.DataFrame(index=df.index)
+    for col in ('produk', 'varietas', 'petani', 'lokasi'):
+        out[col] = df[col].fillna('').astype(str).str.strip()
+    tgl = pd.to_datetime(df['tgl'], errors='coerce')
+    out['tgl'] = tgl.dt.strftime('%Y-%m-%d').fillna(df['tgl'].astype(str))
+
+    generated_id = 'AGRI-' + tgl.dt.strftime('%Y%m%d').fillna('00000000') + '-' + \
+        pd.Series(np.arange(1, len(df) + 1), index=df.index).map('{:05d}'.format)
+    if 'id' in df.columns:
+        # Blank IDs would give colliding QR labels: treat them as missing
+        out['id'] = df['id'].astype('string').str.strip().replace('', pd.NA).fillna(generated_id)
+    else:
+        out['id'] = generated_id
+
+    harga = pd.to_numeric(df['harga'], errors='coerce') if 'harga' in df.columns else pd.Series(np.nan, index=df.index)
+    out['harga'] = harga.where(harga > 0).round().astype('Int64')
+    out['kontak'] = df['kontak'].astype('string').str.strip() if 'kontak' in df.columns else pd.NA
+    out['berat'] = pd.to_numeric(df['berat'], errors='coerce').fillna(1) if 'berat' in df.columns else 1
+    out['riwayat'] = df['riwayat'].astype('string') if 'riwayat' in df.columns else pd.NA
+    klaim = df['klaim'].fillna('').astype(str) if 'klaim' in df.columns else pd.Series('', index=df.index)
+    out['klaim'] = klaim.map(lambda s: [k.strip() for k in re.split(r'[;,|]', s) if k.strip()])
+
+    records = out.astype(object).where(out.notna(), None).to_dict('records')
+    for record in records:
+        if record['harga'] is not None:
+            record['harga'] = int(record['harga'])
+    return records
+
+
+def _render_chunk(job):
+    """Worker: render & encode a chunk of labels (runs in a pool process)"""
+    records, print_type, size, fmt = job
+    encoded = []
+    for data in records:
+        image = render_label(data, print_type, size)
+        buffer = io.BytesIO()
+        if fmt == 'jpeg':
+            image.save(buffer, format='JPEG', quality=92, dpi=(PRINT_DPI, PRINT_DPI))
+        else:
+            image.save(buffer, format='PNG', dpi=(PRINT_DPI, PRINT_DPI))
+        encoded.append((data['id'], image.size, buffer.getvalue()))
+    return encoded
+
+
+class _PdfStreamWriter:
+    """Minimal PDF writer: one JPEG page at a time, xref written at the end."""
+
+    def __init__(self, fileobj, dpi=PRINT_DPI):
+        self.f = fileobj
+        self.dpi = dpi
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3  # 1 = catalog, 2 = page tree (written last)
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _write(self, data):
+        self.f.write(data)
+
+    def _object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.f.tell()
+        self._write(b"%d 0 obj\n" % obj_id + body)
+        if stream is not None:
+            self._write(b"\nstream\n" + stream + b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_jpeg_page(self, jpeg_bytes, size_px):
+        w_px, h_px = size_px
+        w_pt, h_pt = w_px * 72.0 / self.dpi, h_px * 72.0 / self.dpi
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        self._object(image_id, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>" % (w_px, h_px, len(jpeg_bytes))
+        ), jpeg_bytes)
+        content = b"q %.3f 0 0 %.3f 0 0 cm /Im0 Do Q" % (w_pt, h_pt)
+        self._object(content_id, b"<< /Length %d >>" % len(content), content)
+        self._object(page_id, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.3f %.3f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>" % (w_pt, h_pt, image_id, content_id)
+        ))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % pid for pid in self.page_ids)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+
+        xref_offset = self.f.tell()
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id)
+        for obj_id in range(1, self.next_id):
+            self._write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.next_id, xref_offset))
+
+
+@dataclass
+class BatchReport:
+    """Throughput summary of one batch run"""
+    labels: int
+    seconds: float
+    bytes_written: int
+    output_format: str
+
+    @property
+    def labels_per_second(self):
+        return self.labels / self.seconds if self.seconds > 0 else 0.0
+
+
+class LabelBatchService:
+    """Render thousands of labels across a process pool and stream them to PDF/ZIP."""
+
+    def __init__(self, workers=None, chunk_size=16):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.chunk_size = chunk_size
+
+    def _iter_rendered(self, records, print_type, size, fmt):
+        """Yield (id, size, encoded bytes) in input order, bounded chunks in flight."""
+        jobs = (
+            (records[i:i + self.chunk_size], print_type, size, fmt)
+            for i in range(0, len(records), self.chunk_size)
+        )
+        if self.workers <= 1:
+            for job in jobs:
+                yield from _render_chunk(job)
+            return
+
+        max_in_flight = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = []
+            for job in jobs:
+                pending.append(pool.submit(_render_chunk, job))
+                if len(pending) >= max_in_flight:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
+
+    def render(self, records, fileobj, output_format="pdf", print_type="label_lengkap",
+               size="medium_landscape", progress_callback=None):
+        """
+        Render `records` into `fileobj` as one multi-page PDF ("pdf") or a ZIP of PNGs ("zip").
+
+        Returns:
+            BatchReport with label count, elapsed seconds and bytes written.
+        """
+        start = time.perf_counter()
+        start_pos = fileobj.tell()
+        total = len(records)
+        fmt = 'jpeg' if output_format == 'pdf' else 'png'
+        rendered = self._iter_rendered(records, print_type, size, fmt)
+
+        done = 0
+        if output_format == 'pdf':
+            writer = _PdfStreamWriter(fileobj)
+            for _, size_px, payload in rendered:
+                writer.add_jpeg_page(payload, size_px)
+                done += 1
+                if progress_callback and (done % self.chunk_size == 0 or done == total):
+                    progress_callback(done, total)
+            writer.close()
+        else:
+            with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+                for label_id, _, payload in rendered:
+                    safe_id = re.sub(r'[^A-Za-z0-9._-]+', '_', str(label_id))
+                    archive.writestr(f"{done + 1:05d}_{safe_id}.png", payload)
+                    done += 1
+                    if progress_callback and (done % self.chunk_size == 0 or done == total):
+                        progress_callback(done, total)
+
+        return BatchReport(labels=done, seconds=time.perf_counter() - start,
+                           bytes_written=fileobj.tell() - start_pos, output_format=output_format)
@@ -0,0 +1,566 @@
+"""
+Yield Response Engine - Prediksi Hasil Panen
+Array-based crop response model (Liebig + hybrid average) and budget optimizer.
+
+Every function works on a parameter matrix X (n_scenarios x len(PARAM_KEYS))
+and a matching context matrix (crop/variety/soil constants per row), so a
+what-if sweep, an optimizer step or a whole farmer-group roster is a single
+numpy evaluation instead of one Python call per scenario.
+"""
+
+import numpy as np
+
+# ================================
+# 🧠 KNOWLEDGE BASE
+# ================================
+
+CROP_DB = {
+    "Padi": {
+        "varieties": {
+            "Ciherang": {"potential": 8500, "days": 115, "resilience": 0.8},
+            "Inpari 32": {"potential": 9200, "days": 110, "resilience": 0.9},
+            "IR64": {"potential": 7000, "days": 115, "resilience": 0.7}
+        },
+        "optimal": {"ph": 6.5, "n": 120, "p": 60, "k": 90, "water": 1500, "temp": 28},
+        "price": 7200
+    },
+    "Jagung": {
+        "varieties": {
+            "Bisi 18": {"potential": 9500, "days": 105, "resilience": 0.85},
+            "Pioneer P27": {"potential": 11000, "days": 110, "resilience": 0.9}
+        },
+        "optimal": {"ph": 6.8, "n": 180, "p": 80, "k": 100, "water": 1200, "temp": 30},
+        "price": 5800
+    },
+    "Cabai Merah": {
+         "varieties": {
+            "Laju": {"potential": 18000, "days": 90, "resilience": 0.7},
+            "Pilar": {"potential": 20000, "days": 95, "resilience": 0.8}
+        },
+        "optimal": {"ph": 6.5, "n": 200, "p": 150, "k": 200, "water": 1800, "temp": 26},
+        "price": 45000
+    },
+    "Kedelai": {
+        "varieties": {
+            "Anjasmoro": {"potential": 2500, "days": 85, "resilience": 0.8},
+            "Grobogan": {"potential": 3000, "days": 76, "resilience": 0.85}
+        },
+        "optimal": {"ph": 6.0, "n": 50, "p": 70, "k": 80, "water": 400, "temp": 28},
+        "price": 10500
+    },
+    "Bawang Merah": {
+        "varieties": {
+            "Bima Brebes": {"potential": 10000, "days": 60, "resilience": 0.75},
+            "Bauji": {"potential": 12000, "days": 58, "resilience": 0.8}
+        },
+        "optimal": {"ph": 6.5, "n": 150, "p": 100, "k": 120, "water": 600, "temp": 27},
+        "price": 28000
+    },
+    "Tomat": {
+        "varieties": {
+            "Servo F1": {"potential": 60000, "days": 75, "resilience": 0.85},
+            "Tymoti F1": {"potential": 55000, "days": 80, "resilience": 0.8}
+        },
+        "optimal": {"ph": 6.2, "n": 180, "p": 120, "k": 180, "water": 800, "temp": 24},
+        "price": 8000
+    },
+    "Kentang": {
+        "varieties": {
+            "Granola": {"potential": 25000, "days": 100, "resilience": 0.75},
+            "Atlantik": {"potential": 30000, "days": 110, "resilience": 0.8}
+        },
+        "optimal": {"ph": 5.5, "n": 200, "p": 150, "k": 200, "water": 600, "temp": 18},
+        "price": 14000
+    },
+    "Ubi Kayu": {
+        "varieties": {
+            "Manggu": {"potential": 35000, "days": 300, "resilience": 0.9},
+            "Casesa": {"potential": 40000, "days": 280, "resilience": 0.95}
+        },
+        "optimal": {"ph": 6.0, "n": 100, "p": 50, "k": 100, "water": 800, "temp": 30},
+        "price": 3500
+    },
+    "Kopi": {
+        "varieties": {
+            "Arabica Gayo 1": {"potential": 1500, "days": 365, "resilience": 0.8},
+            "Robusta BP 308": {"potential": 2500, "days": 365, "resilience": 0.9}
+        },
+        "optimal": {"ph": 5.5, "n": 120, "p": 80, "k": 120, "water": 2000, "temp": 22},
+        "price": 45000
+    },
+    "Kakao": {
+        "varieties": {
+            "MCC 02": {"potential": 2500, "days": 365, "resilience": 0.85},
+            "Sulawesi 1": {"potential": 2000, "days": 365, "resilience": 0.8}
+        },
+        "optimal": {"ph": 6.5, "n": 100, "p": 60, "k": 100, "water": 1800, "temp": 28},
+        "price": 38000
+    }
+}
+
+SOIL_TEXTURES = {
+    "Lempung (Ideal)": {"water_retention": 1.0, "nutrient_holding": 1.0, "desc": "Struktur tanah seimbang"},
+    "Pasir (Sandy)": {"water_retention": 0.6, "nutrient_holding": 0.5, "desc": "Cepat kering, boros pupuk"},
+    "Liat (Clay)": {"water_retention": 0.9, "nutrient_holding": 1.2, "desc": "Keras saat kering, mengikat air kuat"}
+}
+
+FERT_PRODUCTS = {
+    # Macros
+    "Urea": {"n": 0.46, "p": 0, "k": 0, "price": 4000, "type": "Solid"},
+    "ZA": {"n": 0.21, "p": 0, "k": 0, "s": 0.24, "price": 2500, "type": "Solid"},
+    "SP-36": {"n": 0, "p": 0.36, "k": 0, "s": 0.05, "price": 3500, "type": "Solid"},
+    "KCl": {"n": 0, "p": 0, "k": 0.60, "price": 12000, "type": "Solid"},
+    "NPK 16-16-16": {"n": 0.16, "p": 0.16, "k": 0.16, "price": 15000, "type": "Solid"},
+    
+    # Secondary & Micro
+    "Dolomit": {"ca": 0.30, "mg": 0.18, "price": 500, "type": "Solid"},
+    "Kieserite": {"mg": 0.27, "s": 0.20, "price": 4000, "type": "Solid"},
+    "Mikro Majemuk": {"fe":0.1, "zn":0.05, "b":0.02, "price": 80000, "type": "Soluble"}, # Simplified
+    
+    # Organics
+    "Kompos": {"price": 1000, "type": "Solid"},
+    "POC": {"price": 35000, "type": "Liquid"},
+    
+    # Hormones
+    "ZPT Auksin": {"price": 45000, "type": "Small"},
+    "ZPT Sitokinin": {"price": 50000, "type": "Small"},
+    "ZPT Giberelin": {"price": 60000, "type": "Small"},
+    "Kalium Booster": {"price": 40000, "type": "Soluble"}
+}
+
+# ================================
+# 🧮 PARAMETER LAYOUT
+# ================================
+
+PARAM_KEYS = (
+    "area_ha", "ph", "temp", "rain", "n", "p", "k",
+    "org_solid", "org_liquid",
+    "ca_ppm", "mg_ppm", "s_ppm",
+    "fe_ppm", "mn_ppm", "zn_ppm", "b_ppm", "cu_ppm", "mo_ppm",
+    "auxin_ppm", "cyto_ppm", "ga3_ppm", "booster_kg",
+)
+PARAM_INDEX = {key: i for i, key in enumerate(PARAM_KEYS)}
+
+DEFAULT_PARAMS = {
+    "area_ha": 1.0, "ph": 6.0, "temp": 28, "rain": 1200, "n": 0, "p": 0, "k": 0,
+    "org_solid": 0, "org_liquid": 0,
+    "ca_ppm": 100, "mg_ppm": 30, "s_ppm": 20,
+    "fe_ppm": 2, "mn_ppm": 2, "zn_ppm": 1, "b_ppm": 0.5, "cu_ppm": 0.2, "mo_ppm": 0.05,
+    "auxin_ppm": 0, "cyto_ppm": 0, "ga3_ppm": 0, "booster_kg": 0,
+}
+
+CONTEXT_KEYS = (
+    "potential", "resilience",
+    "opt_ph", "opt_n", "opt_p", "opt_k", "opt_water", "opt_temp",
+    "water_retention", "nutrient_holding",
+)
+
+# Sufficiency levels of secondary & micro nutrients (ppm)
+SECONDARY_OPTIMA = {"ca_ppm": 200, "mg_ppm": 50, "s_ppm": 30}
+MICRO_OPTIMA = {"fe_ppm": 5, "mn_ppm": 5, "zn_ppm": 2, "b_ppm": 1, "cu_ppm": 0.5, "mo_ppm": 0.1}
+
+# Radar-chart factors (order of the first columns of the score matrix)
+FACTOR_NAMES = (
+    "Nitrogen", "Fosfor", "Kalium",
+    "Kalsium (Ca)", "Magnesium (Mg)", "Sulfur (S)",
+    "Mikro (Avg)",
+    "pH Tanah", "Air", "Suhu",
+)
+MICRO_NAMES = ("Besi (Fe)", "Mangan (Mn)", "Seng (Zn)", "Boron (B)", "Tembaga (Cu)", "Molibdenum (Mo)")
+LIMIT_NAMES = FACTOR_NAMES + MICRO_NAMES
+
+
+def params_to_array(params):
+    """Dict (or list of dicts) of simulation params -> (n, len(PARAM_KEYS)) float array"""
+    if isinstance(params, dict):
+        params = [params]
+    return np.array([[float(p.get(key, 0)) for key in PARAM_KEYS] for p in params], dtype=float)
+
+
+def clean_roster(roster):
+    """
+    Split roster rows (e.g. from CSV) into numerically valid and invalid rows.
+
+    Returns:
+        (valid, errors): valid rows with PARAM_KEYS/budget converted to float,
+        and one (row_index, key, value) per row holding a non-numeric cell
+    """
+    valid, errors = [], []
+    for i, plot in enumerate(roster):
+        row = dict(plot)
+        for key in PARAM_KEYS + ("budget",):
+            if key not in row:
+                continue
+            try:
+                row[key] = float(row[key])
+            except (TypeError, ValueError):
+                errors.append((i, key, plot[key]))
+                break
+        else:
+            valid.append(row)
+    return valid, errors
+
+
+def array_to_params(row):
+    """Inverse of params_to_array for one row"""
+    return {key: float(row[i]) for i, key in enumerate(PARAM_KEYS)}
+
+
+def crop_context(crop, variety, texture_key):
+    """Crop/variety/soil constants as one context row (len(CONTEXT_KEYS),)"""
+    crop_data = CROP_DB[crop]
+    var_data = crop_data['varieties'][variety]
+    opt = crop_data['optimal']
+    texture = SOIL_TEXTURES[texture_key]
+    return np.array([
+        var_data['potential'], var_data['resilience'],
+        opt['ph'], opt['n'], opt['p'], opt['k'], opt['water'], opt['temp'],
+        texture['water_retention'], texture['nutrient_holding'],
+    ], dtype=float)
+
+
+# ================================
+# 📈 RESPONSE CURVES (vectorized)
+# ================================
+
+def gaussian_curve(val, optimal, sigma=1.0):
+    """Bell curve response: 1.0 at optimal, drops as you move away"""
+    # Calibrated so that +/- 20% deviation gives ~0.8 score (30% tolerance)
+    spread = optimal * 0.3
+    return np.exp(-0.5 * ((val - optimal) / (spread / 2)) ** 2)
+
+
+def saturation_curve(val, optimal):
+    """Increases then plateaus (Law of Minimum); 0.95 toxicity/waste penalty above 150%"""
+    # 1 - e^(-k * val), calibrated so that at 'optimal' value we reach ~0.98
+    k = 4.0 / optimal
+    return np.where(val >= optimal * 1.5, 0.95, 1 - np.exp(-k * val))
+
+
+def sigmoid_curve(val, max_boost=1.1, midpoint=50):
+    """S-curve for organic/bio boosters (diminishing returns)"""
+    return 1 + (max_boost - 1) / (1 + np.exp(-0.1 * (val - midpoint)))
+
+
+# ================================
+# 🧮 SIMULATION ENGINE
+# ================================
+
+def simulate_batch(X, ctx):
+    """
+    Evaluate the yield response model for many parameter vectors at once.
+
+    Args:
+        X: (n, len(PARAM_KEYS)) parameter matrix (see params_to_array)
+        ctx: (len(CONTEXT_KEYS),) or (n, len(CONTEXT_KEYS)) context (see crop_context)
+
+    Returns:
+        dict of arrays: yield_kg, yield_pct, potential_kg (n,), scores (n, len(LIMIT_NAMES)),
+        limiting_idx (n,) and the multiplier arrays.
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    ctx = np.broadcast_to(np.asarray(ctx, dtype=float), (X.shape[0], len(CONTEXT_KEYS)))
+    col = lambda key: X[:, PARAM_INDEX[key]]
+    c = {key: ctx[:, i] for i, key in enumerate(CONTEXT_KEYS)}
+
+    potential = c['potential'] * col('area_ha')
+
+    # --- ORGANIC & BIO AMENDMENTS IMPACT ---
+    # Organic solid improves texture (max 20% at 10 ton/ha); POC boosts uptake (max 15% at 100 L/ha)
+    org_solid_factor = 1.0 + (col('org_solid') / 10000) * 0.2
+    water_retention = np.minimum(1.0, c['water_retention'] * org_solid_factor)
+    nutrient_holding = np.minimum(1.2, c['nutrient_holding'] * org_solid_factor)
+    poc_eff_boost = 1.0 + (col('org_liquid') / 100) * 0.15
+
+    # 1. Nutrient factors (saturation). Effective = input * soil holding * POC boost
+    uptake = nutrient_holding * poc_eff_boost
+    score_npk = [saturation_curve(col(key) * uptake, c[f'opt_{key}']) for key in ('n', 'p', 'k')]
+    score_sec = [saturation_curve(col(key), opt) for key, opt in SECONDARY_OPTIMA.items()]
+    score_micro = np.column_stack([saturation_curve(col(key), opt) for key, opt in MICRO_OPTIMA.items()])
+
+    # 2. Environmental factors (Gaussian)
+    score_ph = gaussian_curve(col('ph'), c['opt_ph'])
+    score_temp = gaussian_curve(col('temp'), c['opt_temp'])
+
+    # 3. Water (linear below 50% of need, flood stress above 150%)
+    eff_water = col('rain') * water_retention
+    score_water = np.select(
+        [eff_water < c['opt_water'] * 0.5, eff_water > c['opt_water'] * 1.5],
+        [0.4 + (eff_water / c['opt_water']) * 0.6, 0.8],
+        default=1.0,
+    )
+
+    factors = np.column_stack(
+        score_npk + score_sec + [score_micro.mean(axis=1), score_ph, score_water, score_temp]
+    )
+    scores = np.hstack([factors, score_micro])
+
+    # LIEBIG'S LAW OF THE MINIMUM (hybrid with the group average)
+    limiting_idx = scores.argmin(axis=1)
+    yield_frac = scores.min(axis=1) * 0.6 + factors.mean(axis=1) * 0.4
+
+    # --- BOOSTERS & HORMONES (multipliers) ---
+    # Auksin: rooting, optimal ~30 ppm, overdose penalty above 80 ppm
+    auxin = col('auxin_ppm')
+    auxin_mult = np.where(
+        auxin > 0,
+        1.0 + 0.12 * np.exp(-0.5 * ((auxin - 30) / 15) ** 2) - np.maximum(auxin - 80, 0) * 0.005,
+        1.0,
+    )
+    # Sitokinin: cell division & filling (plateau)
+    cyto = col('cyto_ppm')
+    cyto_mult = np.where(cyto > 0, 1.0 + 0.10 * (1 - np.exp(-0.05 * cyto)), 1.0)
+    # Giberelin: size & elongation, optimal ~60 ppm, bolting penalty above 150 ppm
+    ga3 = col('ga3_ppm')
+    ga3_mult = np.where(
+        ga3 > 0,
+        1.0 + 0.15 * np.exp(-0.5 * ((ga3 - 60) / 25) ** 2) - np.maximum(ga3 - 150, 0) * 0.003,
+        1.0,
+    )
+    zpt_total_mult = auxin_mult * cyto_mult * ga3_mult
+
+    # Booster (e.g. Kalium Booster for fruit phase), max 10%
+    booster_mult = 1.0 + 0.1 * (1 - np.exp(-0.1 * col('booster_kg')))
+
+    yield_frac = yield_frac * zpt_total_mult * booster_mult
+    # Variety resilience bonus, capped at 130% of potential (genetic breakdown limit)
+    yield_frac = np.minimum(1.3, yield_frac * (0.9 + c['resilience'] * 0.1))
+
+    return {
+        "yield_kg": potential * yield_frac,
+        "yield_pct": yield_frac * 100,
+        "potential_kg": potential,
+        "scores": scores,
+        "limiting_idx": limiting_idx,
+        "multipliers": {
+            "auxin": auxin_mult, "cyto": cyto_mult, "ga3": ga3_mult,
+            "zpt_total": zpt_total_mult, "booster": booster_mult,
+            "organic_solid": org_solid_factor, "organic_liquid": poc_eff_boost,
+        },
+    }
+
+
+def _result_row(sim, i):
+    """One row of a simulate_batch result in the page's dict format"""
+    scores = sim['scores'][i]
+    micro = scores[len(FACTOR_NAMES):]
+    return {
+        "yield_kg": float(sim['yield_kg'][i]),
+        "yield_pct": float(sim['yield_pct'][i]),
+        "factors": dict(zip(FACTOR_NAMES, scores[:len(FACTOR_NAMES)].tolist())),
+        "limiting_factor": LIMIT_NAMES[sim['limiting_idx'][i]],
+        "potential_kg": float(sim['potential_kg'][i]),
+        "multipliers": {name: float(values[i]) for name, values in sim['multipliers'].items()},
+        "micros": dict(zip(("fe", "mn", "zn", "b", "cu", "mo"), micro.tolist())),
+        "macros_sec": dict(zip(("ca", "mg", "s"), scores[3:6].tolist())),
+    }
+
+
+def run_simulation(crop, variety, texture_key, params):
+    """Single-scenario simulation (dict in, dict out)"""
+    sim = simulate_batch(params_to_array(params), crop_context(crop, variety, texture_key))
+    return _result_row(sim, 0)
+
+
+# ================================
+# 🤖 BUDGET OPTIMIZER
+# ================================
+
+# One purchase step per action: nutrient increment and product quantity bought
+BUDGET_ACTIONS = (
+    {"name": "Nitrogen", "keys": ("n",), "amount": 2, "product": "Urea", "qty": 2 / 0.46, "unit": "kg",
+     "reason": "Fix Defisiensi Nitrogen"},
+    {"name": "Fosfor", "keys": ("p",), "amount": 2, "product": "SP-36", "qty": 2 / 0.36, "unit": "kg",
+     "reason": "Fix Defisiensi Fosfor"},
+    {"name": "Kalium", "keys": ("k",), "amount": 2, "product": "KCl", "qty": 2 / 0.60, "unit": "kg",
+     "reason": "Fix Defisiensi Kalium"},
+    {"name": "pH Tanah", "keys": ("ph",), "amount": 0.1, "product": "Dolomit", "qty": 200, "unit": "kg",
+     "reason": "Netralisasi pH Masam"},
+    {"name": "Kalsium (Ca)", "keys": ("ca_ppm",), "amount": 10, "product": "Dolomit", "qty": 20, "unit": "kg",
+     "reason": "Fix Defisiensi Kalsium"},
+    {"name": "Magnesium (Mg)", "keys": ("mg_ppm",), "amount": 5, "product": "Kieserite", "qty": 5, "unit": "kg",
+     "reason": "Fix Defisiensi Magnesium"},
+    {"name": "Sulfur (S)", "keys": ("s_ppm",), "amount": 5, "product": "ZA", "qty": 5, "unit": "kg",
+     "reason": "Fix Defisiensi Sulfur"},
+    {"name": "Mikro", "keys": tuple(MICRO_OPTIMA), "amount": 0.5, "product": "Mikro Majemuk", "qty": 0.5, "unit": "kg",
+     "reason": "Fix Defisiensi Mikro (Fe, Zn, dll)"},
+    {"name": "Organik", "keys": ("org_solid",), "amount": 500, "product": "Kompos", "qty": 500, "unit": "kg",
+     "reason": "Perbaiki Struktur Tanah (Faktor Air)"},
+    {"name": "Auksin", "keys": ("auxin_ppm",), "amount": 5, "product": "ZPT Auksin", "qty": 5, "unit": "ppm",
+     "reason": "Booster Perakaran", "cost": 5000},
+    {"name": "Booster", "keys": ("booster_kg",), "amount": 1, "product": "Kalium Booster", "qty": 1, "unit": "kg",
+     "reason": "Maksimalkan fase generatif"},
+)
+
+# Candidate multiples of one step evaluated per round (marginal-gain table columns)
+STEP_MULTIPLES = (1, 2, 4, 8, 16, 32)
+
+
+def _action_tables(fert_prices):
+    """(A, P) increment matrix and (A,) cost per step for BUDGET_ACTIONS"""
+    deltas = np.zeros((len(BUDGET_ACTIONS), len(PARAM_KEYS)))
+    costs = np.empty(len(BUDGET_ACTIONS))
+    for a, action in enumerate(BUDGET_ACTIONS):
+        for key in action['keys']:
+            deltas[a, PARAM_INDEX[key]] = action['amount']
+        if 'cost' in action:
+            costs[a] = action['cost']
+        else:
+            price = fert_prices.get(action['product'], FERT_PRODUCTS[action['product']]['price'])
+            costs[a] = action['qty'] * price
+    return deltas, costs
+
+
+def optimize_budgets(budgets, X0, ctx, fert_prices, value_per_kg=None, max_rounds=200,
+                     min_transaction=5000, keep_ratio=0.8):
+    """
+    Allocate a fertilizer budget per row of X0 to maximize predicted yield.
+
+    Each round builds a marginal-gain table for every plot: all actions x
+    STEP_MULTIPLES are evaluated in ONE simulate_batch call. A plot buys the
+    action with the best yield gain per rupiah, taking the largest multiple
+    whose gain/cost is still within `keep_ratio` of that action's best. Plots
+    stop when nothing affordable increases yield (or, with `value_per_kg`,
+    when no purchase pays for itself at that crop price).
+
+    Args:
+        budgets: (n,) budget per plot (Rp)
+        X0: (n, P) starting parameters
+        ctx: (P_ctx,) or (n, P_ctx) context rows
+        fert_prices: {product name: price per kg/L}
+        value_per_kg: optional (n,) or scalar crop price (Rp/kg)
+
+    Returns:
+        (X_opt, remaining (n,), steps (n, len(BUDGET_ACTIONS)))
+    """
+    X = np.array(np.atleast_2d(X0), dtype=float)
+    n = X.shape[0]
+    ctx = np.broadcast_to(np.asarray(ctx, dtype=float), (n, len(CONTEXT_KEYS)))
+    remaining = np.broadcast_to(np.asarray(budgets, dtype=float), (n,)).copy()
+    min_ratio = 0.0 if value_per_kg is None else 1.0 / np.broadcast_to(np.asarray(value_per_kg, dtype=float), (n,))
+    steps = np.zeros((n, len(BUDGET_ACTIONS)))
+
+    deltas, costs = _action_tables(fert_prices)
+    mult = np.asarray(STEP_MULTIPLES, dtype=float)
+    n_act, n_mult = len(BUDGET_ACTIONS), len(mult)
+    cand_delta = (deltas[:, None, :] * mult[None, :, None]).reshape(n_act * n_mult, -1)
+    cand_cost = (costs[:, None] * mult[None, :]).reshape(-1)
+
+    active = remaining > min_transaction
+    for _ in range(max_rounds):
+        rows = np.flatnonzero(active)
+        if rows.size == 0:
+            break
+
+        base = simulate_batch(X[rows], ctx[rows])['yield_kg']
+        cand = (X[rows][:, None, :] + cand_delta[None]).reshape(-1, X.shape[1])
+        cand_yield = simulate_batch(cand, np.repeat(ctx[rows], len(cand_cost), axis=0))['yield_kg']
+        gain = cand_yield.reshape(rows.size, -1) - base[:, None]
+
+        affordable = cand_cost[None, :] <= remaining[rows][:, None]
+        ratio = np.where(affordable & (gain > 1e-9), gain / cand_cost[None, :], 0.0)
+        ratio = ratio.reshape(rows.size, n_act, n_mult)
+
+        best_per_action = ratio.max(axis=2)
+        best_action = best_per_action.argmax(axis=1)
+        best_ratio = best_per_action[np.arange(rows.size), best_action]
+
+        # Largest multiple of the chosen action that is nearly as efficient
+        chosen = ratio[np.arange(rows.size), best_action]
+        good = chosen >= keep_ratio * best_ratio[:, None]
+        best_mult = n_mult - 1 - np.argmax(good[:, ::-1], axis=1)
+
+        buy = (best_ratio > 0) & (best_ratio >= (min_ratio if np.isscalar(min_ratio) else min_ratio[rows]))
+        active[rows[~buy]] = False
+        rows, best_action, best_mult = rows[buy], best_action[buy], best_mult[buy]
+
+        X[rows] += deltas[best_action] * mult[best_mult][:, None]
+        remaining[rows] -= costs[best_action] * mult[best_mult]
+        steps[rows, best_action] += mult[best_mult]
+        active &= remaining > min_transaction
+
+    return X, remaining, steps
+
+
+def shopping_list(steps_row, fert_prices):
+    """Purchased products for one optimized plot (merged per product)"""
+    _, costs = _action_tables(fert_prices)
+    items = {}
+    for a, action in enumerate(BUDGET_ACTIONS):
+        if steps_row[a] <= 0:
+            continue
+        item = items.setdefault(action['product'], {
+            "Item": action['product'], "qty": 0.0, "unit": action['unit'], "Biaya": 0.0, "Alasan": []
+        })
+        item['qty'] += steps_row[a] * action['qty']
+        item['Biaya'] += steps_row[a] * costs[a]
+        item['Alasan'].append(action['reason'])
+    return [
+        {"Item": i['Item'], "Qty": f"+{i['qty']:,.1f} {i['unit']}", "Biaya": float(i['Biaya']),
+         "Alasan": ", ".join(i['Alasan'])}
+        for i in items.values()
+    ]
+
+
+def optimize_budget(budget, params, crop, var, texture_key, fert_prices, value_per_kg=None):
+    """
+    Single-plot budget optimizer.
+
+    Returns (optimized params, simulation result, remaining budget, shopping list).
+    """
+    X_opt, remaining, steps = optimize_budgets(
+        [budget], params_to_array(params), crop_context(crop, var, texture_key), fert_prices,
+        value_per_kg=value_per_kg
+    )
+    opt_params = {**params, **array_to_params(X_opt[0])}
+    return opt_params, run_simulation(crop, var, texture_key, opt_params), float(remaining[0]), \
+        shopping_list(steps[0], fert_prices)
+
+
+def optimize_roster(roster, fert_prices, crop_prices=None, profitable_only=False):
+    """
+    Batch optimizer for a farmer-group roster.
+
+    Args:
+        roster: list of dicts with crop, variety, texture, budget and any PARAM_KEYS
+                (missing params fall back to DEFAULT_PARAMS)
+        crop_prices: optional {crop: Rp/kg} for revenue columns (default CROP_DB price)
+        profitable_only: only buy inputs whose extra harvest value covers their cost
+
+    Returns:
+        list of per-plot result dicts (baseline/optimized yield, spent budget, shopping list)
+    """
+    if not roster:
+        return []
+    crop_prices = crop_prices or {}
+    params = [{**DEFAULT_PARAMS, **{k: v for k, v in plot.items() if k in PARAM_INDEX}} for plot in roster]
+    X0 = params_to_array(params)
+    ctx = np.vstack([crop_context(p['crop'], p['variety'], p['texture']) for p in roster])
+    budgets = np.array([float(p.get('budget', 0)) for p in roster])
+    prices = np.array([float(crop_prices.get(p['crop'], CROP_DB[p['crop']]['price'])) for p in roster])
+
+    before = simulate_batch(X0, ctx)
+    X_opt, remaining, steps = optimize_budgets(budgets, X0, ctx, fert_prices,
+                                               value_per_kg=prices if profitable_only else None)
+    after = simulate_batch(X_opt, ctx)
+
+    results = []
+    for i, plot in enumerate(roster):
+        price = prices[i]
+        delta_kg = after['yield_kg'][i] - before['yield_kg'][i]
+        spent = budgets[i] - remaining[i]
+        results.append({
+            "plot": plot.get('plot', i + 1),
+            "crop": plot['crop'],
+            "variety": plot['variety'],
+            "baseline_kg": float(before['yield_kg'][i]),
+            "optimized_kg": float(after['yield_kg'][i]),
+            "delta_kg": float(delta_kg),
+            "limiting_before": LIMIT_NAMES[before['limiting_idx'][i]],
+            "limiting_after": LIMIT_NAMES[after['limiting_idx'][i]],
+            "spent": float(spent),
+            "remaining": float(remaining[i]),
+            "roi_pct": float((delta_kg * price - spent) / spent * 100) if spent > 0 else 0.0,
+            "shopping_list": shopping_list(steps[i], fert_prices),
+        })
+    return results
@@ -0,0 +1,99 @@
+"""
+Benchmark: WAGRI refresh + price store, fully offline (local mock endpoint)
+
+- refresh: one blocking fetch_commodity_data per commodity vs refresh_prices
+- store: legacy JSON history files vs the SQLite time-series store
+- trends: per-commodity calculate_price_trend vs one calculate_price_trends
+
+    python agrisensa_commodities/benchmarks/bench_wagri_refresh.py --commodities 200 --latency 0.05
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from agrisensa_commodities.services.wagri_market_service import WagriMarketService
+from agrisensa_commodities.services.wagri_mock_server import mock_survey, start_mock_server
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<48} {time.perf_counter() - started:8.3f} s")
+    return result
+
+
+def legacy_json_append(history_dir, code, entry):
+    """What cache_price_data used to do per point: read, append, truncate to 90, rewrite"""
+    path = history_dir / f"{code}.json"
+    try:
+        history = json.loads(path.read_text())
+    except (OSError, ValueError):
+        history = []
+    history.append(entry)
+    path.write_text(json.dumps(history[-90:], indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commodities", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock API latency per request (s)")
+    parser.add_argument("--workers", type=int, default=WagriMarketService.REFRESH_WORKERS)
+    parser.add_argument("--days", type=int, default=365, help="history depth for store/trend benchmarks")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(latency=args.latency)
+    WagriMarketService.BASE_URL = base_url
+    codes = [f"{33000 + i}" for i in range(args.commodities)]
+    surveys = {code: f"{code}-{date.today():%Y%m%d}" for code in codes}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = WagriMarketService(cache_dir=Path(tmp) / "store")
+
+        print(f"== refresh {args.commodities} commodities, mock latency {args.latency * 1000:.0f} ms ==")
+        timed("sequential fetch_commodity_data", lambda: [
+            WagriMarketService.fetch_commodity_data(survey_id) for survey_id in surveys.values()
+        ])
+        results = timed(f"refresh_prices ({args.workers} workers)",
+                        lambda: service.refresh_prices(surveys, force=True, max_workers=args.workers))
+        print(f"  fetched {sum(1 for r in results.values() if r)}/{len(codes)}, "
+              f"{server.request_count} requests served")
+
+        print(f"== store {args.days} days x {args.commodities} commodities ==")
+        history_dir = Path(tmp) / "json_history"
+        history_dir.mkdir()
+        start = date.today() - timedelta(days=args.days)
+        points = [
+            (code, mock_survey(f"{code}-{start + timedelta(days=d):%Y%m%d}"))
+            for d in range(args.days) for code in codes
+        ]
+        timed("legacy JSON append (90-entry cap)", lambda: [
+            legacy_json_append(history_dir, code, {"date": data["TargetDate"], "price": data["AveragePrice"]})
+            for code, data in points
+        ])
+        timed("store: one cache_price_batch per day", lambda: [
+            service.cache_price_batch(points[d * len(codes):(d + 1) * len(codes)]) for d in range(args.days)
+        ])
+        db_size = os.path.getsize(service.db_path) / 1e6
+        print(f"  {len(points):,} points kept (JSON keeps {90 * len(codes):,}), {db_size:.1f} MB")
+
+        timed("range query: 30 days, all commodities", lambda: service.get_price_range(
+            codes, start + timedelta(days=args.days - 30), start + timedelta(days=args.days)))
+
+        print("== 7-day trends, all commodities ==")
+        single = timed("calculate_price_trend per commodity",
+                       lambda: {code: service.calculate_price_trend(code) for code in codes})
+        batch = timed("calculate_price_trends (one query)", lambda: service.calculate_price_trends(codes))
+        print(f"  identical: {single == batch}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
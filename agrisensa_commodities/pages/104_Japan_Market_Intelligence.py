@@ -204,24 +204,30 @@ with tabs[1]:
     # Create opportunity cards
     opportunities = []
     
-    for code, data in export_commodities.items():
-        # Get typical costs
-        costs = commodity_db.get_typical_costs(code)
-        
-        # Sample Japan price (in real implementation, fetch from WAGRI)
-        # For demo, estimate based on typical markup
-        sample_japan_price_jpy = data['typical_price_idr'] / market_service.EXCHANGE_RATE_JPY_TO_IDR * 3
-        
-        # Calculate margin
-        margin_analysis = market_service.calculate_export_margin(
-            japan_price_jpy=sample_japan_price_jpy,
-            indonesia_production_cost=costs['production'],
-            packaging_cost=costs['packaging'],
-            transport_to_port=costs['transport_to_port'],
-            air_freight_per_kg=costs['air_freight'],
-            customs_duty=costs['customs_duty'],
-            certification_cost=costs['certification']
-        )
+    # Get typical costs
+    codes = list(export_commodities)
+    costs = pd.DataFrame([commodity_db.get_typical_costs(code) for code in codes])
+    
+    # Sample Japan price (in real implementation, fetch from WAGRI)
+    # For demo, estimate based on typical markup
+    sample_japan_prices_jpy = [
+        export_commodities[code]['typical_price_idr'] / market_service.EXCHANGE_RATE_JPY_TO_IDR * 3
+        for code in codes
+    ]
+    
+    # Calculate margins for all commodities at once
+    margin_analyses = market_service.margin_records(market_service.calculate_export_margins(
+        japan_price_jpy=sample_japan_prices_jpy,
+        indonesia_production_cost=costs['production'],
+        packaging_cost=costs['packaging'],
+        transport_to_port=costs['transport_to_port'],
+        air_freight_per_kg=costs['air_freight'],
+        customs_duty=costs['customs_duty'],
+        certification_cost=costs['certification']
+    )) if codes else []
+    
+    for code, margin_analysis in zip(codes, margin_analyses):
+        data = export_commodities[code]
         
         opportunities.append({
             "code": code,
@@ -9,54 +9,163 @@ Date: 2025-12-30
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import json
 import os
+import sqlite3
+import threading
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+
+# Profitability levels: (margin % lower bound, label, score), checked top-down
+PROFITABILITY_LEVELS = [
+    (40, "Sangat Menguntungkan", 5),
+    (25, "Menguntungkan", 4),
+    (10, "Cukup Menguntungkan", 3),
+    (0, "Kurang Menguntungkan", 2),
+]
+NOT_PROFITABLE = ("Tidak Menguntungkan", 1)
+
+COST_BREAKDOWN_COLUMNS = {
+    "production": "indonesia_production_cost",
+    "packaging": "packaging_cost",
+    "transport": "transport_to_port",
+    "air_freight": "air_freight_per_kg",
+    "customs": "customs_duty",
+    "certification": "certification_cost",
+}
+
 
 class WagriMarketService:
     """
     Service for fetching and analyzing Japan wholesale market data from WAGRI API.
+    
+    Prices are kept in an embedded SQLite time-series store (one row per
+    commodity per market date, no retention limit).
     """
     
-    BASE_URL = "https://api.wagri2.net/MaffOpenData/market/FreshWholesaleMarketSurveyByNational/Get"
+    # WAGRI_BASE_URL points the service at another endpoint (e.g. wagri_mock_server)
+    BASE_URL = os.getenv(
+        "WAGRI_BASE_URL",
+        "https://api.wagri2.net/MaffOpenData/market/FreshWholesaleMarketSurveyByNational/Get"
+    )
     
     # Cache directory
     CACHE_DIR = Path(__file__).parent.parent / "data" / "wagri_cache"
     
+    # Latest price is considered fresh for this long
+    CACHE_TTL = timedelta(hours=1)
+    
+    # Concurrent requests when refreshing many commodities
+    REFRESH_WORKERS = 8
+    
     # Exchange rate (JPY to IDR) - can be updated
     EXCHANGE_RATE_JPY_TO_IDR = 105.0
     
-    def __init__(self):
-        """Initialize service and ensure cache directory exists."""
-        self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        self._ensure_cache_files()
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """Initialize service and ensure the price store exists."""
+        self.cache_dir = Path(cache_dir) if cache_dir else self.CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "prices.db"
+        self._local = threading.local()
+        self._init_store()
+    
+    # ========== PRICE STORE ==========
     
-    def _ensure_cache_files(self):
-        """Create cache files if they don't exist."""
-        latest_cache = self.CACHE_DIR / "prices_latest.json"
-        if not latest_cache.exists():
-            latest_cache.write_text(json.dumps({}))
-        
-        history_dir = self.CACHE_DIR / "prices_history"
-        history_dir.mkdir(exist_ok=True)
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (WAL: refresh writes never block page reads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _init_store(self):
+        """Create the price tables; import the legacy JSON cache once."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_history (
+                    commodity_code TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    price REAL,
+                    volume REAL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (commodity_code, date)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_latest (
+                    commodity_code TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL
+                )
+            """)
+            is_empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM price_latest)").fetchone()[0]
+            if is_empty:
+                self._import_json_cache(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _import_json_cache(self, conn: sqlite3.Connection):
+        """Move prices_latest.json / prices_history/*.json (old cache format) into the store."""
+        latest_cache_file = self.cache_dir / "prices_latest.json"
+        try:
+            latest_cache = json.loads(latest_cache_file.read_text())
+        except (OSError, ValueError):
+            latest_cache = {}
+        conn.executemany(
+            "INSERT OR REPLACE INTO price_latest (commodity_code, data, fetched_at) VALUES (?, ?, ?)",
+            [(code, json.dumps(entry["data"]), entry["timestamp"]) for code, entry in latest_cache.items()]
+        )
+        
+        for history_file in sorted((self.cache_dir / "prices_history").glob("*.json")):
+            try:
+                history = json.loads(history_file.read_text())
+            except (OSError, ValueError):
+                continue
+            conn.executemany(
+                self._HISTORY_UPSERT,
+                [(history_file.stem, str(entry["date"]), entry.get("price"), entry.get("volume"),
+                  entry.get("timestamp", "")) for entry in history]
+            )
+    
+    _HISTORY_UPSERT = """
+        INSERT INTO price_history (commodity_code, date, price, volume, fetched_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (commodity_code, date) DO UPDATE SET
+            price = excluded.price, volume = excluded.volume, fetched_at = excluded.fetched_at
+    """
+    
+    # ========== FETCH ==========
     
     @staticmethod
-    def fetch_commodity_data(market_survey_id: str) -> Optional[Dict]:
+    def fetch_commodity_data(market_survey_id: str,
+                             session: Optional[requests.Session] = None) -> Optional[Dict]:
         """
         Fetch commodity data from WAGRI API by MarketSurveyId.
         
         Args:
             market_survey_id: Unique ID for market survey entry
+            session: Optional shared session (connection pooling for refresh_prices)
         
         Returns:
             Dictionary with market data or None if failed
         """
         try:
             url = f"{WagriMarketService.BASE_URL}/{market_survey_id}"
-            response = requests.get(url, timeout=10)
+            response = (session or requests).get(url, timeout=10)
             
             if response.status_code == 200:
                 return response.json()
@@ -67,6 +176,44 @@ class WagriMarketService:
             print(f"Error fetching WAGRI data: {str(e)}")
             return None
     
+    def refresh_prices(self, market_survey_ids: Dict[str, str], force: bool = False,
+                       max_workers: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """
+        Refresh many commodities concurrently and store the results.
+        
+        Args:
+            market_survey_ids: {commodity_code: market_survey_id}
+            force: Refetch even if the cached price is still fresh
+            max_workers: Concurrent requests (default REFRESH_WORKERS)
+        
+        Returns:
+            {commodity_code: market data, or None if the fetch failed}
+        """
+        results = {} if force else {
+            code: data for code, data in self.get_cached_prices(market_survey_ids).items()
+        }
+        pending = {code: survey_id for code, survey_id in market_survey_ids.items() if code not in results}
+        if not pending:
+            return results
+        
+        workers = min(max_workers or self.REFRESH_WORKERS, len(pending))
+        with requests.Session() as session:
+            # One pooled keep-alive connection per worker
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(self.fetch_commodity_data, survey_id, session): code
+                    for code, survey_id in pending.items()
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        
+        # Single write transaction for the whole batch
+        self.cache_price_batch([(code, results[code]) for code in pending if results[code]])
+        return results
+    
     @staticmethod
     def convert_jpy_to_idr(jpy_amount: float) -> float:
         """Convert JPY to IDR using current exchange rate."""
@@ -77,74 +224,67 @@ class WagriMarketService:
         """Convert IDR to JPY using current exchange rate."""
         return idr_amount / WagriMarketService.EXCHANGE_RATE_JPY_TO_IDR
     
-    def calculate_export_margin(
+    def calculate_export_margins(
         self,
-        japan_price_jpy: float,
-        indonesia_production_cost: float,
-        packaging_cost: float = 5000,
-        transport_to_port: float = 3000,
-        air_freight_per_kg: float = 80000,
-        customs_duty: float = 10000,
-        certification_cost: float = 2000
-    ) -> Dict:
+        japan_price_jpy,
+        indonesia_production_cost,
+        packaging_cost=5000,
+        transport_to_port=3000,
+        air_freight_per_kg=80000,
+        customs_duty=10000,
+        certification_cost=2000
+    ) -> pd.DataFrame:
         """
-        Calculate export margin and profitability.
+        Vectorized export margin for many commodities at once.
         
-        Args:
-            japan_price_jpy: Current price in Japan (JPY per kg)
-            indonesia_production_cost: Production cost in Indonesia (IDR per kg)
-            packaging_cost: Packaging cost (IDR)
-            transport_to_port: Transport to port (IDR)
-            air_freight_per_kg: Air freight cost (IDR per kg)
-            customs_duty: Customs duty (IDR)
-            certification_cost: Certification cost (IDR)
-        
-        Returns:
-            Dictionary with margin analysis
+        Every argument is a scalar or an array-like (broadcast against each
+        other); one row per commodity with the calculate_export_margin fields.
         """
+        inputs = dict(zip(
+            ["japan_price_jpy"] + list(COST_BREAKDOWN_COLUMNS.values()),
+            np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (
+                japan_price_jpy, indonesia_production_cost, packaging_cost, transport_to_port,
+                air_freight_per_kg, customs_duty, certification_cost
+            )))
+        ))
+        inputs = {name: np.atleast_1d(values) for name, values in inputs.items()}
+        
         # Convert Japan price to IDR
-        japan_price_idr = self.convert_jpy_to_idr(japan_price_jpy)
+        japan_price_idr = inputs["japan_price_jpy"] * self.EXCHANGE_RATE_JPY_TO_IDR
         
         # Calculate total Indonesia cost
         total_indonesia_cost = (
-            indonesia_production_cost +
-            packaging_cost +
-            transport_to_port
+            inputs["indonesia_production_cost"] +
+            inputs["packaging_cost"] +
+            inputs["transport_to_port"]
         )
         
         # Calculate total export cost
         total_export_cost = (
-            air_freight_per_kg +
-            customs_duty +
-            certification_cost
+            inputs["air_freight_per_kg"] +
+            inputs["customs_duty"] +
+            inputs["certification_cost"]
         )
         
         # Total cost
         total_cost = total_indonesia_cost + total_export_cost
         
-        # Margin calculations
+        # Margin calculations (0 where the denominator is not positive)
         gross_margin = japan_price_idr - total_cost
-        margin_percentage = (gross_margin / japan_price_idr * 100) if japan_price_idr > 0 else 0
+        margin_percentage = np.divide(gross_margin * 100, japan_price_idr,
+                                      out=np.zeros_like(gross_margin), where=japan_price_idr > 0)
+        roi_percentage = np.divide(gross_margin * 100, total_cost,
+                                   out=np.zeros_like(gross_margin), where=total_cost > 0)
         
         # Profitability score
-        if margin_percentage > 40:
-            profitability = "Sangat Menguntungkan"
-            score = 5
-        elif margin_percentage > 25:
-            profitability = "Menguntungkan"
-            score = 4
-        elif margin_percentage > 10:
-            profitability = "Cukup Menguntungkan"
-            score = 3
-        elif margin_percentage > 0:
-            profitability = "Kurang Menguntungkan"
-            score = 2
-        else:
-            profitability = "Tidak Menguntungkan"
-            score = 1
-        
-        return {
-            "japan_price_jpy": japan_price_jpy,
+        conditions = [margin_percentage > bound for bound, _, _ in PROFITABILITY_LEVELS]
+        profitability = np.select(conditions, [label for _, label, _ in PROFITABILITY_LEVELS],
+                                  default=NOT_PROFITABLE[0])
+        score = np.select(conditions, [level for _, _, level in PROFITABILITY_LEVELS],
+                          default=NOT_PROFITABLE[1])
+        
+        return pd.DataFrame({
+            "japan_price_jpy": inputs["japan_price_jpy"],
             "japan_price_idr": japan_price_idr,
             "indonesia_cost": total_indonesia_cost,
             "export_cost": total_export_cost,
@@ -153,16 +293,53 @@ class WagriMarketService:
             "margin_percentage": margin_percentage,
             "profitability": profitability,
             "profitability_score": score,
-            "roi_percentage": (gross_margin / total_cost * 100) if total_cost > 0 else 0,
-            "cost_breakdown": {
-                "production": indonesia_production_cost,
-                "packaging": packaging_cost,
-                "transport": transport_to_port,
-                "air_freight": air_freight_per_kg,
-                "customs": customs_duty,
-                "certification": certification_cost
-            }
-        }
+            "roi_percentage": roi_percentage,
+            **{name: inputs[column] for name, column in COST_BREAKDOWN_COLUMNS.items()},
+        })
+    
+    @staticmethod
+    def margin_records(margins: pd.DataFrame) -> List[Dict]:
+        """calculate_export_margins rows as calculate_export_margin dictionaries."""
+        records = []
+        for row in margins.to_dict("records"):
+            record = {key: float(value) for key, value in row.items()
+                      if key not in COST_BREAKDOWN_COLUMNS and key != "profitability"}
+            record["profitability"] = row["profitability"]
+            record["profitability_score"] = int(row["profitability_score"])
+            record["cost_breakdown"] = {name: float(row[name]) for name in COST_BREAKDOWN_COLUMNS}
+            records.append(record)
+        return records
+    
+    def calculate_export_margin(
+        self,
+        japan_price_jpy: float,
+        indonesia_production_cost: float,
+        packaging_cost: float = 5000,
+        transport_to_port: float = 3000,
+        air_freight_per_kg: float = 80000,
+        customs_duty: float = 10000,
+        certification_cost: float = 2000
+    ) -> Dict:
+        """
+        Calculate export margin and profitability.
+        
+        Args:
+            japan_price_jpy: Current price in Japan (JPY per kg)
+            indonesia_production_cost: Production cost in Indonesia (IDR per kg)
+            packaging_cost: Packaging cost (IDR)
+            transport_to_port: Transport to port (IDR)
+            air_freight_per_kg: Air freight cost (IDR per kg)
+            customs_duty: Customs duty (IDR)
+            certification_cost: Certification cost (IDR)
+        
+        Returns:
+            Dictionary with margin analysis
+        """
+        margins = self.calculate_export_margins(
+            japan_price_jpy, indonesia_production_cost, packaging_cost, transport_to_port,
+            air_freight_per_kg, customs_duty, certification_cost
+        )
+        return self.margin_records(margins)[0]
     
     def cache_price_data(self, commodity_code: str, data: Dict):
         """
@@ -172,44 +349,54 @@ class WagriMarketService:
             commodity_code: Item code (e.g., "33100")
             data: Market data to cache
         """
-        # Update latest prices cache
-        latest_cache_file = self.CACHE_DIR / "prices_latest.json"
-        
-        try:
-            with open(latest_cache_file, 'r') as f:
-                latest_cache = json.load(f)
-        except:
-            latest_cache = {}
-        
-        latest_cache[commodity_code] = {
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        with open(latest_cache_file, 'w') as f:
-            json.dump(latest_cache, f, indent=2)
-        
-        # Update historical data
-        history_file = self.CACHE_DIR / "prices_history" / f"{commodity_code}.json"
+        self.cache_price_batch([(commodity_code, data)])
+    
+    def cache_price_batch(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        Store latest price + history point for many commodities in one transaction.
         
+        History is keyed by (commodity, TargetDate): refetching the same market
+        day updates that point instead of appending a duplicate.
+        """
+        now = datetime.now().isoformat()
+        latest_rows, history_rows = [], []
+        for commodity_code, data in items:
+            latest_rows.append((commodity_code, json.dumps(data), now))
+            history_rows.append((
+                commodity_code,
+                str(data.get("TargetDate") or now),
+                data.get("AveragePrice"),
+                data.get("TradingVolume"),
+                now
+            ))
+        if not latest_rows:
+            return
+        
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-        except:
-            history = []
-        
-        history.append({
-            "date": data.get("TargetDate", datetime.now().isoformat()),
-            "price": data.get("AveragePrice"),
-            "volume": data.get("TradingVolume"),
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        # Keep only last 90 days
-        history = history[-90:]
-        
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_latest (commodity_code, data, fetched_at) VALUES (?, ?, ?)",
+                latest_rows
+            )
+            conn.executemany(self._HISTORY_UPSERT, history_rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def get_cached_prices(self, commodity_codes: Iterable[str]) -> Dict[str, Dict]:
+        """Fresh (< CACHE_TTL) cached data for the given commodities that have it."""
+        codes = list(commodity_codes)
+        if not codes:
+            return {}
+        cutoff = (datetime.now() - self.CACHE_TTL).isoformat()
+        rows = self._connection().execute(
+            f"SELECT commodity_code, data FROM price_latest "
+            f"WHERE commodity_code IN ({', '.join('?' * len(codes))}) AND fetched_at > ?",
+            (*codes, cutoff)
+        ).fetchall()
+        return {code: json.loads(data) for code, data in rows}
     
     def get_cached_price(self, commodity_code: str) -> Optional[Dict]:
         """
@@ -221,22 +408,7 @@ class WagriMarketService:
         Returns:
             Cached data or None
         """
-        latest_cache_file = self.CACHE_DIR / "prices_latest.json"
-        
-        try:
-            with open(latest_cache_file, 'r') as f:
-                latest_cache = json.load(f)
-            
-            if commodity_code in latest_cache:
-                cached = latest_cache[commodity_code]
-                # Check if cache is fresh (< 1 hour)
-                cache_time = datetime.fromisoformat(cached["timestamp"])
-                if datetime.now() - cache_time < timedelta(hours=1):
-                    return cached["data"]
-        except:
-            pass
-        
-        return None
+        return self.get_cached_prices([commodity_code]).get(commodity_code)
     
     def get_price_history(self, commodity_code: str, days: int = 30) -> List[Dict]:
         """
@@ -249,16 +421,98 @@ class WagriMarketService:
         Returns:
             List of historical price data
         """
-        history_file = self.CACHE_DIR / "prices_history" / f"{commodity_code}.json"
+        rows = self._connection().execute(
+            "SELECT date, price, volume, fetched_at FROM price_history "
+            "WHERE commodity_code = ? ORDER BY date DESC LIMIT ?",
+            (commodity_code, days)
+        ).fetchall()
+        return [
+            {"date": date, "price": price, "volume": volume, "timestamp": fetched_at}
+            for date, price, volume, fetched_at in reversed(rows)
+        ]
+    
+    def get_price_range(self, commodity_codes: Optional[Iterable[str]] = None,
+                        start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Price points between start_date and end_date (inclusive, ISO dates).
         
-        try:
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-            
-            # Return last N days
-            return history[-days:]
-        except:
-            return []
+        Returns:
+            DataFrame [commodity_code, date, price, volume] ordered by commodity, date
+        """
+        where, params = [], []
+        if commodity_codes is not None:
+            codes = list(commodity_codes)
+            where.append(f"commodity_code IN ({', '.join('?' * len(codes))})")
+            params.extend(codes)
+        if start_date:
+            where.append("date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            # Dates may carry a time part (fallback timestamp); compare the day only
+            where.append("substr(date, 1, 10) <= ?")
+            params.append(str(end_date)[:10])
+        query = "SELECT commodity_code, date, price, volume FROM price_history"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY commodity_code, date"
+        return pd.read_sql_query(query, self._connection(), params=params)
+    
+    def calculate_price_trends(self, commodity_codes: Iterable[str], days: int = 7) -> Dict[str, Dict]:
+        """
+        Vectorized calculate_price_trend for many commodities (one query).
+        
+        Args:
+            commodity_codes: Item codes
+            days: Number of most recent price points per commodity
+        
+        Returns:
+            {commodity_code: trend analysis data}
+        """
+        codes = list(commodity_codes)
+        unknown = {"trend": "Unknown", "change_percentage": 0, "direction": "stable"}
+        if not codes:
+            return {}
+        
+        history = pd.read_sql_query(
+            f"""
+            SELECT commodity_code, date, price FROM (
+                SELECT commodity_code, date, price,
+                       ROW_NUMBER() OVER (PARTITION BY commodity_code ORDER BY date DESC) AS rn
+                FROM price_history
+                WHERE commodity_code IN ({', '.join('?' * len(codes))})
+            ) WHERE rn <= ? ORDER BY commodity_code, date
+            """,
+            self._connection(), params=(*codes, days)
+        )
+        
+        frame = history.groupby("commodity_code").agg(
+            points=("price", "size"), first_price=("price", "first"), last_price=("price", "last")
+        )
+        first = frame["first_price"].to_numpy(dtype=float)
+        last = frame["last_price"].to_numpy(dtype=float)
+        known = (frame["points"].to_numpy() >= 2) & (first != 0) & ~np.isnan(first) & ~np.isnan(last)
+        
+        # Calculate change
+        change = last - first
+        change_percentage = np.divide(change * 100, first, out=np.zeros_like(change), where=known)
+        
+        # Determine direction
+        rising, falling = change_percentage > 5, change_percentage < -5
+        direction = np.select([rising, falling], ["rising", "falling"], default="stable")
+        trend = np.select([rising, falling], ["📈 Naik", "📉 Turun"], default="→ Stabil")
+        
+        trends = {code: dict(unknown) for code in codes}
+        for i, code in enumerate(frame.index):
+            if known[i]:
+                trends[code] = {
+                    "trend": str(trend[i]),
+                    "change_percentage": float(change_percentage[i]),
+                    "direction": str(direction[i]),
+                    "first_price": float(first[i]),
+                    "last_price": float(last[i]),
+                    "change_amount": float(change[i])
+                }
+        return trends
     
     def calculate_price_trend(self, commodity_code: str, days: int = 7) -> Dict:
         """
@@ -271,49 +525,7 @@ class WagriMarketService:
         Returns:
             Trend analysis data
         """
-        history = self.get_price_history(commodity_code, days)
-        
-        if len(history) < 2:
-            return {
-                "trend": "Unknown",
-                "change_percentage": 0,
-                "direction": "stable"
-            }
-        
-        # Get first and last prices
-        first_price = history[0].get("price", 0)
-        last_price = history[-1].get("price", 0)
-        
-        if first_price == 0:
-            return {
-                "trend": "Unknown",
-                "change_percentage": 0,
-                "direction": "stable"
-            }
-        
-        # Calculate change
-        change = last_price - first_price
-        change_percentage = (change / first_price) * 100
-        
-        # Determine direction
-        if change_percentage > 5:
-            direction = "rising"
-            trend = "📈 Naik"
-        elif change_percentage < -5:
-            direction = "falling"
-            trend = "📉 Turun"
-        else:
-            direction = "stable"
-            trend = "→ Stabil"
-        
-        return {
-            "trend": trend,
-            "change_percentage": change_percentage,
-            "direction": direction,
-            "first_price": first_price,
-            "last_price": last_price,
-            "change_amount": change
-        }
+        return self.calculate_price_trends([commodity_code], days)[commodity_code]
     
     @staticmethod
     def format_price_idr(amount: float) -> str:
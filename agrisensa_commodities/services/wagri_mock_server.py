@@ -0,0 +1,116 @@
+"""
+Mock WAGRI Market Endpoint
+Local stand-in for FreshWholesaleMarketSurveyByNational, for offline and load testing
+
+Responses are deterministic per MarketSurveyId (same id -> same price), so
+refresh results can be asserted. A survey id ending in "-YYYYMMDD" sets the
+TargetDate; other ids get today's date.
+
+Usage:
+    python -m agrisensa_commodities.services.wagri_mock_server --port 8765 --latency 0.05
+    WAGRI_BASE_URL=http://127.0.0.1:8765/MaffOpenData/market/FreshWholesaleMarketSurveyByNational/Get \
+        streamlit run agrisensa_commodities/Home.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+ENDPOINT_PATH = "/MaffOpenData/market/FreshWholesaleMarketSurveyByNational/Get"
+
+PRODUCTION_AREAS = ["Saga", "Hokkaido", "Nagano", "Kumamoto", "Ibaraki", "Chiba", "Okinawa"]
+
+
+def mock_survey(market_survey_id: str) -> dict:
+    """Deterministic market record for a MarketSurveyId."""
+    digest = int(hashlib.sha256(market_survey_id.encode("utf-8")).hexdigest(), 16)
+    target_date = date.today().isoformat()
+    suffix = market_survey_id.rsplit("-", 1)[-1]
+    if len(suffix) == 8 and suffix.isdigit():
+        target_date = datetime.strptime(suffix, "%Y%m%d").date().isoformat()
+    return {
+        "MarketSurveyId": market_survey_id,
+        "AveragePrice": 200 + digest % 4800,           # JPY per kg
+        "TradingVolume": 100 + (digest >> 16) % 20000,  # kg
+        "ProductionAreaName": PRODUCTION_AREAS[(digest >> 32) % len(PRODUCTION_AREAS)],
+        "TargetDate": target_date,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API behind a load balancer
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        prefix = ENDPOINT_PATH + "/"
+        if not self.path.startswith(prefix) or len(self.path) == len(prefix):
+            return self._send(404, {"error": "not found"})
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(503, {"error": "mock failure"})
+        return self._send(200, mock_survey(self.path[len(prefix):]))
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(port: int = 0, latency: float = 0.0,
+                      error_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the mock in a background thread.
+
+    Args:
+        port: TCP port (0 = any free port)
+        latency: Seconds of simulated network/API latency per request
+        error_rate: Fraction of requests answered with HTTP 503
+
+    Returns:
+        (server, base_url) - use base_url as WagriMarketService.BASE_URL,
+        stop with server.shutdown()
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.request_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{ENDPOINT_PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock WAGRI wholesale market endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.port, args.latency, args.error_rate)
+    print(f"Mock WAGRI endpoint: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
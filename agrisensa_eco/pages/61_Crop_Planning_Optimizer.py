@@ -24,8 +24,12 @@ st.set_page_config(
 # user = require_auth()
 # show_user_info_sidebar()
 
-# Initialize calculator
-calc = CropPlanningCalculator()
+# Initialize calculator (shared so its solution cache survives reruns)
+@st.cache_resource
+def get_calculator():
+    return CropPlanningCalculator()
+
+calc = get_calculator()
 
 # Header
 st.title("🥗 Crop Planning Optimizer")
@@ -64,81 +68,193 @@ default_market = [c for c in ['Selada (Lettuce)', 'Pakcoy', 'Kale'] if c in avai
 default_selection = default_personal if goal_key == 'personal' else default_market
 selected_crops = st.sidebar.multiselect("Pilih Jenis Tanaman (Min. 2)", options=available_crops, default=default_selection)
 
-if st.sidebar.button("🚀 Buat Rencana Tanam", type="primary"):
-    if not selected_crops:
-        st.error("Mohon pilih minimal satu jenis tanaman.")
-    else:
-        # Run Calculation
-        inputs = {
-            'area_m2': area_input,
-            'system': system_key,
-            'goal': goal_key,
-            'selected_crops': selected_crops
-        }
-        result = calc.calculate_plan(inputs)
+# 5. Parameter Optimasi
+with st.sidebar.expander("⚙️ Parameter Optimasi"):
+    season_days = st.number_input("Panjang Musim (hari)", min_value=20, max_value=365, value=120, step=10,
+                                  help="Jumlah siklus panen per tanaman dihitung dari umur panen")
+    turnaround_days = st.number_input("Jeda Antar Siklus (hari)", min_value=0, max_value=30, value=7,
+                                      help="Waktu persiapan bedengan/instalasi sebelum tanam ulang")
+    min_share, max_share = st.slider("Porsi Lahan per Tanaman (%)", 0, 100, (10, 60), step=5)
+    min_block_m2 = st.number_input("Blok Minimum per Tanaman (m²)", min_value=0.0, value=0.0, step=1.0,
+                                   help="0 = tanpa batas. >0 memakai MILP (tanaman ditanam minimal seluas ini atau tidak sama sekali)")
+
+opt_params = {
+    'season_days': int(season_days),
+    'turnaround_days': int(turnaround_days),
+    'min_share': min_share / 100,
+    'max_share': max_share / 100,
+    'min_block_m2': min_block_m2,
+}
+
+tab_single, tab_coop = st.tabs(["🌱 Lahan Tunggal", "👥 Koperasi (Multi-Lahan)"])
+
+with tab_single:
+    if st.button("🚀 Buat Rencana Tanam", type="primary"):
+        if not selected_crops:
+            st.error("Mohon pilih minimal satu jenis tanaman.")
+        else:
+            # Run Calculation
+            inputs = {
+                'area_m2': area_input,
+                'system': system_key,
+                'goal': goal_key,
+                'selected_crops': selected_crops
+            }
+            try:
+                result = calc.calculate_plan(inputs, **opt_params)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                st.stop()
         
-        # --- RESULTS DISPLAY ---
+            # --- RESULTS DISPLAY ---
         
-        # 1. Summary Metrics
-        st.subheader("📊 Ringkasan Rencana")
-        col1, col2, col3 = st.columns(3)
+            # 1. Summary Metrics
+            st.subheader("📊 Ringkasan Rencana")
+            col1, col2, col3, col4 = st.columns(4)
         
-        with col1:
-            st.metric("Total Luas", f"{result['total_area']} m²")
-        with col2:
-            st.metric("Estimasi Total Panen", f"{result['total_yield_kg']:.1f} kg", "per siklus")
-        with col3:
-            st.metric("Variasi Tanaman", f"{len(result['plan'])} Jenis")
+            with col1:
+                st.metric("Total Luas", f"{result['total_area']} m²")
+            with col2:
+                st.metric("Estimasi Total Panen", f"{result['total_yield_kg']:.1f} kg", "per siklus")
+            with col3:
+                st.metric("Panen Semusim", f"{result['season_yield_kg']:.1f} kg", f"{season_days} hari")
+            with col4:
+                if goal_key == 'market':
+                    st.metric("Estimasi Omzet Semusim", f"Rp {result['revenue_rp']:,.0f}")
+                else:
+                    st.metric("Variasi Tanaman", f"{len(result['plan'])} Jenis")
             
-        # 2. Visualization (Pie Chart)
-        labels = list(result['plan'].keys())
-        values = [d['allocation_pct'] for d in result['plan'].values()]
+            # 2. Visualization (Pie Chart)
+            labels = list(result['plan'].keys())
+            values = [d['allocation_pct'] for d in result['plan'].values()]
         
-        fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.4)])
-        fig.update_layout(title="Proporsi Alokasi Lahan (%)")
-        st.plotly_chart(fig, use_container_width=True)
+            fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.4)])
+            fig.update_layout(title="Proporsi Alokasi Lahan (%)")
+            st.plotly_chart(fig, use_container_width=True)
         
-        # 3. Detailed Plan
-        st.subheader("📝 Detail & Jadwal Tanam")
+            # 3. Detailed Plan
+            st.subheader("📝 Detail & Jadwal Tanam")
         
-        for crop, data in result['plan'].items():
-            with st.expander(f"🥬 {crop} ({data['allocation_pct']}%)", expanded=True):
-                c1, c2, c3, c4 = st.columns(4)
-                with c1:
-                    st.markdown(f"**Alokasi Area:**\n{data['area_alloc_m2']:.1f} m²")
-                with c2:
-                    st.markdown(f"**Jumlah Tanaman:**\n~{data['plant_count']} lubang/btg")
-                with c3:
-                    st.markdown(f"**Estimasi Panen:**\n{data['yield_est_kg']:.1f} kg")
-                with c4:
-                    st.markdown(f"**Slus Panen:**\n{data['harvest_days']} Hari")
+            for crop, data in result['plan'].items():
+                with st.expander(f"🥬 {crop} ({data['allocation_pct']}%)", expanded=True):
+                    c1, c2, c3, c4 = st.columns(4)
+                    with c1:
+                        st.markdown(f"**Alokasi Area:**\n{data['area_alloc_m2']:.1f} m²")
+                    with c2:
+                        st.markdown(f"**Jumlah Tanaman:**\n~{data['plant_count']} lubang/btg")
+                    with c3:
+                        st.markdown(f"**Estimasi Panen:**\n{data['yield_est_kg']:.1f} kg")
+                    with c4:
+                        st.markdown(f"**Siklus Panen:**\n{data['harvest_days']} Hari × {data['cycles']}")
                     
-                if goal_key == 'personal':
-                     st.caption(f"💡 Cukup untuk konsumsi sayur keluarga selama {(data['yield_est_kg']/0.5):.0f} kali makan (asumsi 0.5kg/masak).")
-                else:
-                     st.caption(f"💡 Perputaran {365/data['harvest_days']:.0f}x setahun. Fokus kualitas visual daun.")
-
-        # 4. Recommendation Note
-        st.info("""
-        **💡 Tips Implementasi:**
-        - **Semaian:** Lakukan penyemaian (seeding) 10-14 hari sebelum panen siklus sebelumnya agar lahan tidak kosong (continuous farming).
-        - **Rotasi:** Pertimbangkan rotasi jenis tanaman antar blok untuk memutus siklus hama (terutama di lahan tanah).
-        - **Nutrisi (Hidroponik):** Pastikan kepekatan nutrisi (PPM) disesuaikan. Sayur daun (Leafy) biasanya butuh 800-1200 PPM, sayur buah butuh lebih tinggi.
-        """)
-else:
-    st.info("👈 Mulai dengan mengatur parameter di Sidebar kiri.")
+                    if goal_key == 'personal':
+                         st.caption(f"💡 Cukup untuk konsumsi sayur keluarga selama {(data['yield_est_kg']/0.5):.0f} kali makan (asumsi 0.5kg/masak).")
+                    else:
+                         st.caption(f"💡 Perputaran {365/data['harvest_days']:.0f}x setahun. Fokus kualitas visual daun.")
+
+            # 4. Planting Calendar
+            if result['schedule']:
+                with st.expander("📅 Kalender Tanam Semusim"):
+                    schedule_df = pd.DataFrame(result['schedule']).rename(columns={
+                        'crop': 'Tanaman', 'cycle': 'Siklus', 'plant_day': 'Hari Tanam', 'harvest_day': 'Hari Panen'
+                    })
+                    st.dataframe(schedule_df, use_container_width=True, hide_index=True)
+
+            # 5. Recommendation Note
+            st.info("""
+            **💡 Tips Implementasi:**
+            - **Semaian:** Lakukan penyemaian (seeding) 10-14 hari sebelum panen siklus sebelumnya agar lahan tidak kosong (continuous farming).
+            - **Rotasi:** Pertimbangkan rotasi jenis tanaman antar blok untuk memutus siklus hama (terutama di lahan tanah).
+            - **Nutrisi (Hidroponik):** Pastikan kepekatan nutrisi (PPM) disesuaikan. Sayur daun (Leafy) biasanya butuh 800-1200 PPM, sayur buah butuh lebih tinggi.
+            """)
+    else:
+        st.info("👈 Mulai dengan mengatur parameter di Sidebar kiri.")
     
-    # Static Guide
-    st.markdown("### Panduan Pemilihan Sistem & Tujuan")
-    c1, c2 = st.columns(2)
-    with c1:
-        st.markdown("**Hidroponik**")
-        st.markdown("- ✅ Bersih, pertumbuhan cepat, bebas gulma.")
-        st.markdown("- ❌ Investasi awal tinggi, butuh listrik.")
-    with c2:
-        st.markdown("**Lahan Tanah (Konvensional)**")
-        st.markdown("- ✅ Rasa lebih 'rich', investasi rendah.")
-        st.markdown("- ❌ Butuh olah tanah, risiko hama tanah.")
+        # Static Guide
+        st.markdown("### Panduan Pemilihan Sistem & Tujuan")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.markdown("**Hidroponik**")
+            st.markdown("- ✅ Bersih, pertumbuhan cepat, bebas gulma.")
+            st.markdown("- ❌ Investasi awal tinggi, butuh listrik.")
+        with c2:
+            st.markdown("**Lahan Tanah (Konvensional)**")
+            st.markdown("- ✅ Rasa lebih 'rich', investasi rendah.")
+            st.markdown("- ❌ Butuh olah tanah, risiko hama tanah.")
+
+with tab_coop:
+    st.markdown("""
+    Optimasi alokasi tanaman untuk **banyak lahan anggota sekaligus** dalam satu model LP/MILP.
+    Batas permintaan pasar (kg/musim) berlaku untuk seluruh koperasi sehingga anggota tidak menanam komoditas yang sama berlebihan.
+    """)
+    st.caption("Format CSV: `plot_id, area_m2, system, crops` — kolom `crops` opsional, nama tanaman dipisah `;`. "
+               "Parameter tujuan dan optimasi mengikuti Sidebar.")
+
+    plots_file = st.file_uploader("Upload CSV Lahan Anggota", type=['csv'], key='coop_plots')
+    if plots_file is not None:
+        plots_df = pd.read_csv(plots_file)
+        plots_df.columns = [str(c).strip().lower() for c in plots_df.columns]
+
+        if 'area_m2' not in plots_df.columns:
+            st.error("❌ Kolom `area_m2` wajib ada.")
+        else:
+            plots = []
+            for i, row in enumerate(plots_df.to_dict('records')):
+                crops = row.get('crops')
+                plots.append({
+                    'plot_id': row.get('plot_id', i + 1),
+                    'area_m2': row['area_m2'],
+                    'system': row.get('system') if row.get('system') in system_display else system_key,
+                    'selected_crops': [c.strip() for c in str(crops).split(';')] if isinstance(crops, str) else selected_crops,
+                })
+
+            st.markdown("**Batas Permintaan Pasar (kg/musim, 0 = tanpa batas)**")
+            caps_df = st.data_editor(
+                pd.DataFrame({'Tanaman': available_crops, 'Batas (kg)': [0.0] * len(available_crops)}),
+                use_container_width=True, hide_index=True, disabled=['Tanaman'], key='coop_caps'
+            )
+            demand_caps = {row['Tanaman']: row['Batas (kg)'] for _, row in caps_df.iterrows() if row['Batas (kg)'] > 0}
+            max_crops = st.number_input("Maks. Jenis Tanaman per Lahan (0 = bebas)", min_value=0, max_value=9, value=0)
+
+            if st.button("🚀 Optimasi Koperasi", type="primary"):
+                try:
+                    with st.spinner(f"Mengoptimasi {len(plots)} lahan..."):
+                        coop = calc.optimize(plots, goal=goal_key, demand_caps=demand_caps,
+                                             max_crops_per_plot=int(max_crops) or None, **opt_params)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    st.stop()
+
+                total_area = sum(p['total_area'] for p in coop['plots'])
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Jumlah Lahan", len(coop['plots']))
+                col2.metric("Total Luas", f"{total_area:,.0f} m²")
+                col3.metric("Panen Semusim", f"{sum(p['season_yield_kg'] for p in coop['plots']):,.0f} kg")
+                col4.metric("Estimasi Omzet", f"Rp {sum(p['revenue_rp'] for p in coop['plots']):,.0f}")
+
+                totals_df = pd.DataFrame([
+                    {'Tanaman': crop, 'Luas (m²)': round(t['area_m2'], 1), 'Panen Semusim (kg)': round(t['season_yield_kg'], 1),
+                     'Batas (kg)': demand_caps.get(crop), 'Omzet (Rp)': round(t['revenue_rp'])}
+                    for crop, t in sorted(coop['crop_totals'].items(), key=lambda kv: -kv[1]['area_m2'])
+                ])
+                st.subheader("🧺 Rekap per Komoditas")
+                st.dataframe(totals_df, use_container_width=True, hide_index=True)
+
+                fig = go.Figure(data=[go.Bar(x=totals_df['Tanaman'], y=totals_df['Luas (m²)'], marker_color='#10b981')])
+                fig.update_layout(title="Total Alokasi Luas per Komoditas (m²)", height=350)
+                st.plotly_chart(fig, use_container_width=True)
+
+                alloc_df = pd.DataFrame([
+                    {'plot_id': p['plot_id'], 'system': p['system'], 'crop': crop, 'area_m2': d['area_alloc_m2'],
+                     'plant_count': d['plant_count'], 'cycles': d['cycles'], 'season_yield_kg': d['season_yield_kg'],
+                     'revenue_rp': d['revenue_rp']}
+                    for p in coop['plots'] for crop, d in p['plan'].items()
+                ])
+                st.subheader("📋 Alokasi per Lahan")
+                st.dataframe(alloc_df, use_container_width=True, hide_index=True)
+                st.download_button("📥 Download Rencana Koperasi (CSV)", alloc_df.to_csv(index=False).encode('utf-8'),
+                                   "rencana_tanam_koperasi.csv", "text/csv")
+                st.caption(f"Cache solusi: {coop['solver']['cache_hits']} hit / {coop['solver']['cache_misses']} solve")
 
 # Footer
 st.markdown("---")
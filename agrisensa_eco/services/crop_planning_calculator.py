@@ -1,7 +1,27 @@
 """
 Crop Planning Optimizer Service
 Calculates optimal vegetable proportions based on farming system and goals (Personal vs Market).
+
+Allocation is solved as an LP (or MILP when minimum block sizes / crop
+counts are requested) over many plots at once, so a whole cooperative is
+planned in one solve. Solutions are memoized per input signature.
 """
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+# Expected farm-gate price per market tier (Rp/kg); 'volatile' is risk-discounted
+MARKET_PRICE_RP = {'low': 6000, 'medium': 12000, 'high': 25000, 'premium': 45000, 'volatile': 30000}
+# Household value weight per personal tier (nutrition-weighted kg)
+PERSONAL_WEIGHT = {'low': 1.0, 'medium': 2.0, 'high': 3.0, 'premium': 3.0}
+# Hydroponic holes per m2 (leafy vs fruiting)
+HYDRO_DENSITY = {'leaf': 25, 'fruit': 4}
+
 
 class CropPlanningCalculator:
     """
@@ -105,98 +125,306 @@ class CropPlanningCalculator:
         }
     }
 
-    def calculate_plan(self, inputs):
+    def __init__(self, max_cache_entries=4096):
+        self.max_cache_entries = max_cache_entries
+        self._cache = OrderedDict()
+        # Instance is shared across Streamlit sessions: guard cache + counters
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ========== CROP COEFFICIENTS ==========
+
+    def crop_coefficients(self, crop, system, season_days=120, turnaround_days=7, price=None):
         """
-        Generate planting plan.
-        inputs = {
-            'area_m2': 100,
-            'system': 'soil' | 'hydroponic' | 'mixed',
-            'goal': 'personal' | 'market',
-            'selected_crops': ['Pakcoy', 'Selada', 'Cabai Rawit']
-        }
+        Per-m2 figures for one crop under one system.
+
+        Returns dict with yield_kg_m2 (per cycle), plants_m2, cycles per season,
+        price (Rp/kg) and personal weight.
         """
-        area = inputs['area_m2'] or 1 # Avoid zero div
-        system = inputs['system']
-        goal = inputs['goal']
-        selected = inputs.get('selected_crops', [])
-        
-        # If no crops selected, suggest default based on goal
-        if not selected:
-            if goal == 'personal':
-                selected = ['Pakcoy', 'Kangkung', 'Cabai Rawit', 'Tomat Cherry']
-            else:
-                selected = ['Selada', 'Pakcoy', 'Kale'] # Commercial favorites
-        
-        # Determine Allocation Weights
-        allocation = {}
-        
+        c_data = self.VEGETABLE_DB[crop]
+        harvest_days = c_data.get('harvest_days', 30)
+
+        if system == 'hydroponic':
+            plants_m2 = HYDRO_DENSITY.get(c_data.get('type'), 4)
+            yield_kg_m2 = plants_m2 * c_data.get('yield_hydro_g_per_hole', 100) / 1000
+        else:  # soil / mixed
+            spacing_m = c_data.get('spacing_cm', 30) / 100
+            plants_m2 = 1 / (spacing_m * spacing_m)
+            yield_kg_m2 = c_data.get('yield_soil_kg_m2', 1.0)
+
+        # Sequential cycles on the same bed: grow + turnaround (bed prep) between cycles
+        if harvest_days > season_days:
+            cycles = 0
+        else:
+            cycles = int((season_days - harvest_days) // (harvest_days + turnaround_days)) + 1
+
+        return {
+            'yield_kg_m2': yield_kg_m2,
+            'plants_m2': plants_m2,
+            'cycles': cycles,
+            'price': price if price is not None else MARKET_PRICE_RP.get(c_data.get('market_value'), 12000),
+            'personal_weight': PERSONAL_WEIGHT.get(c_data.get('personal_value'), 1.0),
+        }
+
+    def default_crops(self, system, goal):
+        """Crops suited to the system when the user selects none"""
         if goal == 'personal':
-            # Balance: 50% Daily Greens, 30% Fruit/Spice, 20% Fancy/Salad
-            for crop in selected:
-                c_data = self.VEGETABLE_DB.get(crop, {})
-                weight = 1
-                if c_data.get('type') == 'leaf':
-                    weight = 2 # Prioritize daily greens
-                if c_data.get('personal_value') == 'high':
-                    weight += 1
-                allocation[crop] = weight
-                
-        elif goal == 'market':
-            # Profit focus: 70% Fast Turnover/High Value, 30% Filler
-            for crop in selected:
-                c_data = self.VEGETABLE_DB.get(crop, {})
-                weight = 1
-                if c_data.get('market_value') in ['high', 'premium']:
-                    weight = 3
-                if c_data.get('harvest_days') < 40: # Fast turnover
-                    weight += 1
-                allocation[crop] = weight
-
-        # Normalize Allocation to Percentage
-        total_weight = sum(allocation.values())
+            preferred = ['Pakcoy', 'Kangkung', 'Cabai Rawit', 'Tomat Cherry']
+        else:
+            preferred = ['Selada (Lettuce)', 'Pakcoy', 'Kale']  # Commercial favorites
+        if system == 'mixed':
+            return preferred
+        suited = [c for c in preferred if system in self.VEGETABLE_DB[c]['system_pref']]
+        return suited or preferred
+
+    # ========== OPTIMIZER ==========
+
+    def optimize(self, plots, goal='market', demand_caps=None, prices=None, season_days=120,
+                 turnaround_days=7, min_share=0.1, max_share=0.6, min_block_m2=0.0, max_crops_per_plot=None):
+        """
+        Allocate area across crops for many plots in one LP/MILP.
+
+        Args:
+            plots: list of dicts {plot_id, area_m2, system, selected_crops (optional)}
+            goal: 'market' (maximize season revenue) or 'personal' (nutrition-weighted kg)
+            demand_caps: optional {crop: max kg per season} shared by the whole cooperative
+            prices: optional {crop: Rp/kg} overriding the market tier price
+            min_share / max_share: per-crop share of each plot's area
+            min_block_m2: if > 0, a planted crop needs at least this many m2 (MILP)
+            max_crops_per_plot: optional limit on crops per plot (MILP)
+
+        Returns:
+            dict with 'plots' (calculate_plan-style result per plot), 'crop_totals' and 'solver' info.
+        """
+        prices = prices or {}
+        demand_caps = {c: float(v) for c, v in (demand_caps or {}).items() if c in self.VEGETABLE_DB and v is not None}
+        options = {
+            'goal': goal, 'prices': prices, 'season_days': season_days, 'turnaround_days': turnaround_days,
+            'min_share': min_share, 'max_share': max_share, 'min_block_m2': min_block_m2,
+            'max_crops_per_plot': max_crops_per_plot,
+        }
+
+        normalized = []
+        for i, plot in enumerate(plots):
+            system = plot.get('system', 'soil')
+            crops = [c for c in (plot.get('selected_crops') or self.default_crops(system, goal)) if c in self.VEGETABLE_DB]
+            normalized.append({
+                'plot_id': plot.get('plot_id', i + 1),
+                'area_m2': float(plot.get('area_m2') or 1),
+                'system': system,
+                'crops': sorted(set(crops)),
+            })
+
+        if demand_caps:
+            # Plots are coupled by the shared caps: one joint solve, cached as a whole
+            key = self._signature({'plots': [dict(p, plot_id=None) for p in normalized],
+                                   'caps': demand_caps, **options})
+            allocations = self._cached(key, lambda: self._solve(normalized, demand_caps, options))
+        else:
+            # Independent plots: identical signatures are solved once and reused
+            keys = [self._signature({**dict(p, plot_id=None), **options}) for p in normalized]
+            found, todo = {}, {}
+            for key, plot in zip(keys, normalized):
+                if key in found or key in todo:
+                    continue
+                cached = self._lookup(key)
+                if cached is not None:
+                    found[key] = cached[0]
+                else:
+                    todo[key] = plot
+            if todo:
+                with self._cache_lock:
+                    self.cache_misses += len(todo)
+                solved = self._solve(list(todo.values()), {}, options)
+                for key, allocation in zip(todo, solved):
+                    found[key] = allocation
+                    self._store(key, [allocation])
+            # Built from local results: later evictions cannot drop entries mid-call
+            allocations = [found[key] for key in keys]
+
+        results = [self._plot_result(plot, alloc, options) for plot, alloc in zip(normalized, allocations)]
+
+        crop_totals = {}
+        for result in results:
+            for crop, data in result['plan'].items():
+                total = crop_totals.setdefault(crop, {'area_m2': 0.0, 'season_yield_kg': 0.0, 'revenue_rp': 0.0})
+                total['area_m2'] += data['area_alloc_m2']
+                total['season_yield_kg'] += data['season_yield_kg']
+                total['revenue_rp'] += data['revenue_rp']
+
+        return {
+            'plots': results,
+            'crop_totals': crop_totals,
+            'solver': {'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses},
+        }
+
+    def _signature(self, payload):
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _lookup(self, key):
+        """Cached value (counted as a hit) or None; does not count misses."""
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return value
+
+    def _cached(self, key, solve):
+        value = self._lookup(key)
+        if value is not None:
+            return value
+        with self._cache_lock:
+            self.cache_misses += 1
+        value = solve()
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+    def _solve(self, plots, demand_caps, options):
+        """Build and solve the (block-diagonal + coupling) program; returns {crop: m2} per plot."""
+        var_plot, var_crop, objective, season_kg, upper, lower, area = [], [], [], [], [], [], []
+        for p, plot in enumerate(plots):
+            n_crops = len(plot['crops'])
+            # Keep the share bounds feasible for the number of selected crops
+            lo_share = min(options['min_share'], 1.0 / max(n_crops, 1))
+            hi_share = max(options['max_share'], 1.0 / max(n_crops, 1))
+            for crop in plot['crops']:
+                coef = self.crop_coefficients(crop, plot['system'], options['season_days'],
+                                              options['turnaround_days'], options['prices'].get(crop))
+                kg_m2 = coef['yield_kg_m2'] * coef['cycles']
+                value = coef['price'] if options['goal'] == 'market' else coef['personal_weight']
+                var_plot.append(p)
+                var_crop.append(crop)
+                objective.append(kg_m2 * value)
+                season_kg.append(kg_m2)
+                upper.append(hi_share * plot['area_m2'])
+                # A cooperative cap on the crop overrides the per-plot minimum share
+                floor = coef['cycles'] and crop not in demand_caps
+                lower.append(lo_share * plot['area_m2'] if floor else 0.0)
+            area.append(plot['area_m2'])
+
+        n = len(var_plot)
+        if n == 0:
+            return [{} for _ in plots]
+        var_plot = np.array(var_plot)
+        objective, season_kg = np.array(objective), np.array(season_kg)
+        upper, lower, area = np.array(upper), np.array(lower), np.array(area)
+
+        # Area per plot
+        rows = [sparse.csr_matrix((np.ones(n), (var_plot, np.arange(n))), shape=(len(plots), n))]
+        row_lo, row_hi = [np.zeros(len(plots))], [area]
+
+        # Cooperative demand caps (kg per season per crop)
+        for crop, cap in demand_caps.items():
+            idx = np.flatnonzero(np.array(var_crop) == crop)
+            if idx.size:
+                rows.append(sparse.csr_matrix((season_kg[idx], (np.zeros(idx.size, dtype=int), idx)), shape=(1, n)))
+                row_lo.append([0.0])
+                row_hi.append([cap])
+
+        use_milp = options['min_block_m2'] > 0 or options['max_crops_per_plot']
+        if not use_milp:
+            A = sparse.vstack(rows).tocsr()
+            res = linprog(-objective, A_ub=A, b_ub=np.concatenate(row_hi), bounds=np.column_stack([lower, upper]),
+                          method='highs')
+            if res.status != 0:
+                raise ValueError(f"Optimasi gagal: {res.message}")
+            x = res.x
+        else:
+            # x (continuous m2) followed by z (1 if the crop is planted on the plot)
+            eye = sparse.identity(n, format='csr')
+            block_lo = np.maximum(lower, np.minimum(options['min_block_m2'], upper))
+            rows = [sparse.hstack([r, sparse.csr_matrix(r.shape)]) for r in rows]
+            rows.append(sparse.hstack([eye, -sparse.diags(block_lo)]))   # x >= lo * z
+            rows.append(sparse.hstack([eye, -sparse.diags(upper)]))      # x <= hi * z
+            row_lo += [np.zeros(n), np.full(n, -np.inf)]
+            row_hi += [np.full(n, np.inf), np.zeros(n)]
+            if options['max_crops_per_plot']:
+                rows.append(sparse.hstack([sparse.csr_matrix((len(plots), n)),
+                                           sparse.csr_matrix((np.ones(n), (var_plot, np.arange(n))),
+                                                             shape=(len(plots), n))]))
+                row_lo.append(np.zeros(len(plots)))
+                row_hi.append(np.full(len(plots), options['max_crops_per_plot']))
+            res = milp(
+                np.concatenate([-objective, np.zeros(n)]),
+                constraints=LinearConstraint(sparse.vstack(rows).tocsr(), np.concatenate(row_lo), np.concatenate(row_hi)),
+                integrality=np.concatenate([np.zeros(n), np.ones(n)]),
+                bounds=Bounds(np.zeros(2 * n), np.concatenate([upper, np.ones(n)])),
+                options={'time_limit': 30},
+            )
+            if res.x is None:
+                raise ValueError(f"Optimasi gagal: {res.message}")
+            x = res.x[:n]
+
+        allocations = [{} for _ in plots]
+        for value, p, crop in zip(x, var_plot, var_crop):
+            if value > 1e-6:
+                allocations[p][crop] = float(value)
+        return allocations
+
+    def _plot_result(self, plot, allocation, options):
+        """calculate_plan-style result for one plot (plus season totals & schedule)"""
+        area, system = plot['area_m2'], plot['system']
         final_plan = {}
-        
-        for crop, weight in allocation.items():
-            pct = (weight / total_weight) * 100
-            
-            c_data = self.VEGETABLE_DB.get(crop, {})
+        schedule = []
+        for crop, space_alloc in sorted(allocation.items(), key=lambda kv: -kv[1]):
+            c_data = self.VEGETABLE_DB[crop]
+            coef = self.crop_coefficients(crop, system, options['season_days'], options['turnaround_days'],
+                                          options['prices'].get(crop))
+            yield_est_kg = space_alloc * coef['yield_kg_m2']
+            season_yield = yield_est_kg * coef['cycles']
             harvest_days = c_data.get('harvest_days', 30)
-            
-            # Calculate Physical Capacity
-            plant_count = 0
-            yield_est_kg = 0
-            space_alloc = 0
-            
-            if system == 'hydroponic':
-                # Assume density based on spacing or fixed holes per meter pipe
-                # Simple approximation: Hydro holes density ~ 20-30 holes/m2 for leafy
-                # Fruit veg needs more space
-                density = 25 if c_data.get('type') == 'leaf' else 4
-                space_alloc = (area * (pct/100)) # m2 allocated
-                plant_count = int(space_alloc * density)
-                yield_est_kg = (plant_count * c_data.get('yield_hydro_g_per_hole', 100)) / 1000
-                
-            else: # soil / mixed
-                space_alloc = (area * (pct/100))
-                # Soil yield directly from kg/m2
-                yield_est_kg = space_alloc * c_data.get('yield_soil_kg_m2', 1.0)
-                # Plant count estimate based on spacing
-                spacing_m = c_data.get('spacing_cm', 30) / 100
-                plant_count = int(space_alloc / (spacing_m * spacing_m))
-
             final_plan[crop] = {
-                'allocation_pct': round(pct, 1),
+                'allocation_pct': round(space_alloc / area * 100, 1),
                 'area_alloc_m2': round(space_alloc, 1),
-                'plant_count': plant_count,
+                'plant_count': int(space_alloc * coef['plants_m2']),
                 'yield_est_kg': round(yield_est_kg, 1),
                 'harvest_days': harvest_days,
-                'type': c_data.get('type')
+                'type': c_data.get('type'),
+                'cycles': coef['cycles'],
+                'season_yield_kg': round(season_yield, 1),
+                'revenue_rp': round(season_yield * coef['price']),
             }
-            
+            for cycle in range(coef['cycles']):
+                plant_day = cycle * (harvest_days + options['turnaround_days'])
+                schedule.append({'crop': crop, 'cycle': cycle + 1, 'plant_day': plant_day,
+                                 'harvest_day': plant_day + harvest_days})
+
         return {
+            'plot_id': plot['plot_id'],
             'system': system,
-            'goal': goal,
+            'goal': options['goal'],
             'total_area': area,
             'plan': final_plan,
-            'total_yield_kg': sum(d['yield_est_kg'] for d in final_plan.values())
+            'total_yield_kg': round(sum(d['yield_est_kg'] for d in final_plan.values()), 1),
+            'season_yield_kg': round(sum(d['season_yield_kg'] for d in final_plan.values()), 1),
+            'revenue_rp': sum(d['revenue_rp'] for d in final_plan.values()),
+            'schedule': sorted(schedule, key=lambda s: (s['plant_day'], s['crop'])),
+        }
+
+    def calculate_plan(self, inputs, **options):
+        """
+        Generate planting plan for a single plot (optimizer-backed).
+        inputs = {
+            'area_m2': 100,
+            'system': 'soil' | 'hydroponic' | 'mixed',
+            'goal': 'personal' | 'market',
+            'selected_crops': ['Pakcoy', 'Selada (Lettuce)', 'Cabai Rawit']
+        }
+        options: see optimize() (season_days, min_share, max_share, ...)
+        """
+        plot = {
+            'plot_id': 1,
+            'area_m2': inputs['area_m2'] or 1,  # Avoid zero area
+            'system': inputs['system'],
+            'selected_crops': inputs.get('selected_crops', []),
         }
+        return self.optimize([plot], goal=inputs['goal'], **options)['plots'][0]
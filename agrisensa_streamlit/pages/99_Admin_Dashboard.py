@@ -1,5 +1,5 @@
 # AgriSensa Admin Dashboard
-# Streamlit-only admin panel with session-based authentication
+# Streamlit admin console backed by the paginated /api/admin endpoints
 
 import streamlit as st
 import pandas as pd
@@ -7,7 +7,8 @@ from datetime import datetime, date
 import json
 
 # Auth imports 
-from utils.auth import require_auth, show_user_info_sidebar, get_current_user, is_authenticated, get_activity_log, get_users
+from utils.auth import require_auth, show_user_info_sidebar, get_current_user, is_authenticated, get_users
+from utils.admin_api import AdminAPI, CATEGORIES, prepare_commodity_import, flatten_prices
 
 # ========== PAGE CONFIG ==========
 st.set_page_config(
@@ -57,45 +58,67 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ========== SESSION STATE FOR DATA ==========
-if 'commodities_db' not in st.session_state:
-    st.session_state.commodities_db = [
-        {'id': 1, 'name': 'Beras Premium', 'category': 'Pangan', 'unit': 'kg', 'price': 15000, 'active': True},
-        {'id': 2, 'name': 'Cabai Rawit', 'category': 'Sayuran', 'unit': 'kg', 'price': 80000, 'active': True},
-        {'id': 3, 'name': 'Bawang Merah', 'category': 'Sayuran', 'unit': 'kg', 'price': 45000, 'active': True},
-        {'id': 4, 'name': 'Jagung Pipil', 'category': 'Pangan', 'unit': 'kg', 'price': 8000, 'active': True},
-        {'id': 5, 'name': 'Kedelai', 'category': 'Pangan', 'unit': 'kg', 'price': 12000, 'active': True},
-        {'id': 6, 'name': 'Gula Pasir', 'category': 'Pangan', 'unit': 'kg', 'price': 16000, 'active': True},
-        {'id': 7, 'name': 'Bayam', 'category': 'Sayuran', 'unit': 'ikat', 'price': 5000, 'active': True},
-        {'id': 8, 'name': 'Kangkung', 'category': 'Sayuran', 'unit': 'ikat', 'price': 4000, 'active': True},
-        {'id': 9, 'name': 'Tomat', 'category': 'Sayuran', 'unit': 'kg', 'price': 15000, 'active': True},
-        {'id': 10, 'name': 'Jeruk', 'category': 'Buah', 'unit': 'kg', 'price': 25000, 'active': True},
-    ]
+# ========== ADMIN API CONNECTION ==========
+# Data lives in the Flask admin API; the console only holds the current page.
+if 'admin_api_token' not in st.session_state:
+    st.markdown("### 🔌 Hubungkan ke Admin API")
+    st.info("Masuk dengan akun admin API untuk memuat data komoditas, harga, dan audit log.")
+    with st.form("admin_api_login"):
+        api_username = st.text_input("Username Admin API", value=user.get('username', ''))
+        api_password = st.text_input("Password", type="password")
+        if st.form_submit_button("🔐 Hubungkan", type="primary"):
+            result = AdminAPI().login(api_username, api_password)
+            if result.get('success'):
+                st.session_state.admin_api_token = result['access_token']
+                st.rerun()
+            else:
+                st.error(f"❌ {result.get('error', 'Gagal terhubung ke Admin API')}")
+    st.stop()
+
+api = AdminAPI(token=st.session_state.admin_api_token)
+
+
+def show_api_error(result):
+    """Show API error; drop the token when it has expired."""
+    if result.get('msg') or result.get('error') == 'Admin access required':
+        st.session_state.pop('admin_api_token', None)
+    st.error(f"❌ {result.get('error') or result.get('msg') or 'Gagal memuat data dari API'}")
+
+
+def page_selector(key, pagination):
+    """Page number input; returns the selected page (1-based).
+
+    Also shown for empty results, so a filter that leaves the current page
+    out of range snaps back to the last page instead of hiding the selector.
+    """
+    pages = max(pagination.get('pages', 1), 1)
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+        st.rerun()
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = st.number_input("Halaman", min_value=1, max_value=pages, key=key)
+    with col2:
+        st.caption(f"Total {pagination.get('total', 0):,} data • {pages} halaman")
+    return page
 
-if 'manual_prices_db' not in st.session_state:
-    st.session_state.manual_prices_db = []
 
-if 'audit_log_db' not in st.session_state:
-    st.session_state.audit_log_db = []
+def current_page(key):
+    return st.session_state.get(key, 1)
 
 
 def log_action(action, table, record_id=None, details=""):
-    """Log admin action."""
-    st.session_state.audit_log_db.append({
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'user': user['username'],
-        'action': action,
-        'table': table,
-        'record_id': record_id,
-        'details': details
-    })
+    """Log admin action done outside the admin API (API writes are logged server-side)."""
+    result = api.log_action(action, table, record_id, details)
+    if not result.get('success'):
+        st.warning(f"⚠️ Audit log gagal dicatat: {result.get('error') or result.get('msg')}")
 
 
-def get_next_id(db_list):
-    """Get next ID for a database."""
-    if not db_list:
-        return 1
-    return max(item['id'] for item in db_list) + 1
+@st.cache_data(ttl=60, show_spinner=False)
+def get_stats(token):
+    """Dashboard counts (one aggregate query per table on the server)."""
+    result = AdminAPI(token=token).stats()
+    return result.get('stats', {}) if result.get('success') else {}
 
 
 # ========== HEADER ==========
@@ -121,6 +144,13 @@ menu = st.sidebar.radio(
     label_visibility="collapsed"
 )
 
+if st.sidebar.button("🔌 Putuskan Admin API", use_container_width=True):
+    st.session_state.pop('admin_api_token', None)
+    get_stats.clear()
+    st.rerun()
+
+stats = get_stats(st.session_state.admin_api_token)
+
 
 
 # ========== DASHBOARD ==========
@@ -130,22 +160,23 @@ if menu == "📊 Dashboard":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📦 Total Komoditas", len(st.session_state.commodities_db))
+        st.metric("📦 Total Komoditas", stats.get('total_commodities', 0))
     with col2:
-        active = len([c for c in st.session_state.commodities_db if c['active']])
-        st.metric("✅ Komoditas Aktif", active)
+        st.metric("✅ Komoditas Aktif", stats.get('active_commodities', 0))
     with col3:
-        st.metric("💰 Harga Manual", len(st.session_state.manual_prices_db))
+        st.metric("💰 Harga Manual", stats.get('total_manual_prices', 0))
     with col4:
-        st.metric("📝 Total Log", len(st.session_state.audit_log_db))
+        st.metric("📝 Total Log", stats.get('total_audit_logs', 0))
     
     st.markdown("---")
     
     # Recent activity
     st.subheader("📋 Aktivitas Terbaru")
-    if st.session_state.audit_log_db:
-        recent = st.session_state.audit_log_db[-10:][::-1]  # Last 10, reversed
-        df = pd.DataFrame(recent)
+    result = api.audit_log(page=1, per_page=10)
+    if not result.get('success'):
+        show_api_error(result)
+    elif result['logs']:
+        df = pd.DataFrame(result['logs'])[['created_at', 'username', 'action', 'table_name', 'record_id', 'notes']]
         st.dataframe(df, use_container_width=True, hide_index=True)
     else:
         st.info("Belum ada aktivitas tercatat")
@@ -157,75 +188,80 @@ elif menu == "🌾 Komoditas":
     tab1, tab2, tab3 = st.tabs(["📋 Daftar", "➕ Tambah Baru", "📁 Import CSV"])
     
     with tab1:
-        # Filters
+        # Filters (applied server-side)
         col1, col2 = st.columns(2)
         with col1:
             search = st.text_input("🔍 Cari", placeholder="Nama komoditas...")
         with col2:
-            category_filter = st.selectbox("Kategori", ["Semua", "Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"])
+            category_filter = st.selectbox("Kategori", ["Semua"] + CATEGORIES)
         
-        # Filter data
-        commodities = st.session_state.commodities_db
-        if search:
-            commodities = [c for c in commodities if search.lower() in c['name'].lower()]
-        if category_filter != "Semua":
-            commodities = [c for c in commodities if c['category'] == category_filter]
+        result = api.commodities(page=current_page('commodity_page'), per_page=20,
+                                 search=search, category=category_filter)
+        commodities = result.get('commodities', []) if result.get('success') else []
+        if not result.get('success'):
+            show_api_error(result)
         
         if commodities:
-            df = pd.DataFrame(commodities)
-            df['active'] = df['active'].apply(lambda x: '✅' if x else '❌')
-            df['price'] = df['price'].apply(lambda x: f"Rp {x:,}")
+            df = pd.DataFrame(commodities)[['id', 'name', 'category', 'unit', 'price_reference', 'is_active']]
+            df['is_active'] = df['is_active'].map({True: '✅', False: '❌'})
+            df['price_reference'] = df['price_reference'].fillna(0).map(lambda x: f"Rp {x:,.0f}")
             df.columns = ['ID', 'Nama', 'Kategori', 'Unit', 'Harga', 'Aktif']
             
             st.dataframe(df, use_container_width=True, hide_index=True)
+            page_selector('commodity_page', result['pagination'])
             
             # Edit section
             st.markdown("---")
             st.subheader("✏️ Edit / Hapus Komoditas")
             
-            commodity_options = {c['name']: c['id'] for c in commodities}
-            if commodity_options:
-                selected_name = st.selectbox("Pilih komoditas", list(commodity_options.keys()))
-                selected_id = commodity_options[selected_name]
-                selected = next(c for c in st.session_state.commodities_db if c['id'] == selected_id)
+            commodity_options = {c['name']: c for c in commodities}
+            selected_name = st.selectbox("Pilih komoditas", list(commodity_options.keys()))
+            selected = commodity_options[selected_name]
+            selected_id = selected['id']
                 
-                with st.form("edit_form"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        new_name = st.text_input("Nama", value=selected['name'])
-                        new_category = st.selectbox("Kategori", 
-                            ["Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"],
-                            index=["Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"].index(selected['category']) if selected['category'] in ["Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"] else 0
-                        )
-                    with col2:
-                        new_unit = st.text_input("Unit", value=selected['unit'])
-                        new_price = st.number_input("Harga", value=selected['price'])
+            with st.form("edit_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    new_name = st.text_input("Nama", value=selected['name'])
+                    new_category = st.selectbox("Kategori", 
+                        CATEGORIES,
+                        index=CATEGORIES.index(selected['category']) if selected['category'] in CATEGORIES else 0
+                    )
+                with col2:
+                    new_unit = st.text_input("Unit", value=selected['unit'] or 'kg')
+                    new_price = st.number_input("Harga", value=float(selected['price_reference'] or 0))
                     
-                    new_active = st.checkbox("Aktif", value=selected['active'])
+                new_active = st.checkbox("Aktif", value=selected['is_active'])
                     
-                    col_btn1, col_btn2 = st.columns(2)
-                    with col_btn1:
-                        if st.form_submit_button("💾 Simpan", type="primary", use_container_width=True):
-                            for c in st.session_state.commodities_db:
-                                if c['id'] == selected_id:
-                                    c['name'] = new_name
-                                    c['category'] = new_category
-                                    c['unit'] = new_unit
-                                    c['price'] = new_price
-                                    c['active'] = new_active
-                                    break
-                            log_action('UPDATE', 'commodities', selected_id, f"Updated {new_name}")
+                col_btn1, col_btn2 = st.columns(2)
+                with col_btn1:
+                    if st.form_submit_button("💾 Simpan", type="primary", use_container_width=True):
+                        result = api.update_commodity(selected_id, {
+                            'name': new_name,
+                            'category': new_category,
+                            'unit': new_unit,
+                            'price_reference': new_price,
+                            'is_active': new_active
+                        })
+                        if result.get('success'):
+                            get_stats.clear()
                             st.success("✅ Berhasil diupdate!")
                             st.rerun()
+                        else:
+                            show_api_error(result)
                     
-                    with col_btn2:
-                        if st.form_submit_button("🗑️ Hapus", use_container_width=True):
-                            st.session_state.commodities_db = [c for c in st.session_state.commodities_db if c['id'] != selected_id]
-                            log_action('DELETE', 'commodities', selected_id, f"Deleted {selected['name']}")
+                with col_btn2:
+                    if st.form_submit_button("🗑️ Hapus", use_container_width=True):
+                        result = api.delete_commodity(selected_id)
+                        if result.get('success'):
+                            get_stats.clear()
                             st.success("✅ Berhasil dihapus!")
                             st.rerun()
-        else:
+                        else:
+                            show_api_error(result)
+        elif result.get('success'):
             st.info("Tidak ada komoditas ditemukan")
+            page_selector('commodity_page', result['pagination'])
     
     with tab2:
         st.subheader("➕ Tambah Komoditas Baru")
@@ -234,25 +270,25 @@ elif menu == "🌾 Komoditas":
             col1, col2 = st.columns(2)
             with col1:
                 name = st.text_input("Nama Komoditas *")
-                category = st.selectbox("Kategori *", ["Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"])
+                category = st.selectbox("Kategori *", CATEGORIES)
             with col2:
                 unit = st.selectbox("Unit", ["kg", "ikat", "butir", "ton"])
                 price = st.number_input("Harga Referensi (Rp)", min_value=0)
             
             if st.form_submit_button("💾 Simpan", type="primary", use_container_width=True):
                 if name:
-                    new_id = get_next_id(st.session_state.commodities_db)
-                    st.session_state.commodities_db.append({
-                        'id': new_id,
+                    result = api.create_commodity({
                         'name': name,
                         'category': category,
                         'unit': unit,
-                        'price': price,
-                        'active': True
+                        'price_reference': price
                     })
-                    log_action('CREATE', 'commodities', new_id, f"Created {name}")
-                    st.success(f"✅ Komoditas '{name}' berhasil ditambahkan!")
-                    st.rerun()
+                    if result.get('success'):
+                        get_stats.clear()
+                        st.success(f"✅ Komoditas '{name}' berhasil ditambahkan!")
+                        st.rerun()
+                    else:
+                        show_api_error(result)
                 else:
                     st.warning("Nama komoditas wajib diisi!")
     
@@ -272,21 +308,21 @@ elif menu == "🌾 Komoditas":
             st.dataframe(df.head(10), use_container_width=True)
             
             if st.button("📤 Import", type="primary"):
-                count = 0
-                for _, row in df.iterrows():
-                    new_id = get_next_id(st.session_state.commodities_db)
-                    st.session_state.commodities_db.append({
-                        'id': new_id,
-                        'name': row.get('name', ''),
-                        'category': row.get('category', 'Lainnya'),
-                        'unit': row.get('unit', 'kg'),
-                        'price': row.get('price', 0),
-                        'active': True
-                    })
-                    count += 1
-                log_action('BULK_IMPORT', 'commodities', None, f"Imported {count} items")
-                st.success(f"✅ {count} komoditas berhasil diimport!")
-                st.rerun()
+                rows = prepare_commodity_import(df)
+                if not rows:
+                    st.warning("CSV tidak memiliki kolom 'name' atau baris yang valid.")
+                else:
+                    # Single bulk request; the server upserts by name
+                    result = api.bulk_import_commodities(rows)
+                    if result.get('success'):
+                        summary = result['result']
+                        get_stats.clear()
+                        st.success(f"✅ {summary['created']} komoditas baru, {summary['updated']} diperbarui!")
+                        if summary['errors']:
+                            st.warning(f"⚠️ {len(summary['errors'])} baris gagal diimport")
+                            st.dataframe(pd.DataFrame(summary['errors']), use_container_width=True, hide_index=True)
+                    else:
+                        show_api_error(result)
 
 # ========== MANUAL PRICES ==========
 elif menu == "💰 Harga Manual":
@@ -295,17 +331,37 @@ elif menu == "💰 Harga Manual":
     tab1, tab2 = st.tabs(["📋 Daftar", "➕ Tambah Harga"])
     
     with tab1:
-        if st.session_state.manual_prices_db:
-            df = pd.DataFrame(st.session_state.manual_prices_db)
-            df['price'] = df['price'].apply(lambda x: f"Rp {x:,}")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            price_search = st.text_input("🔍 Komoditas", placeholder="Nama komoditas...", key="price_search")
+        with col2:
+            type_filter = st.selectbox("Tipe", ["Semua", "retail", "wholesale", "farm_gate"])
+        with col3:
+            date_range = st.date_input("Rentang Tanggal", value=(), key="price_dates")
+        
+        date_from = date_range[0].isoformat() if len(date_range) > 0 else None
+        date_to = date_range[1].isoformat() if len(date_range) > 1 else None
+        
+        result = api.prices(page=current_page('price_page'), per_page=20, search=price_search,
+                            price_type=type_filter, date_from=date_from, date_to=date_to)
+        if not result.get('success'):
+            show_api_error(result)
+        elif result['prices']:
+            df = flatten_prices(result['prices'])
+            df = df[[c for c in ['id', 'commodity', 'price', 'date', 'province', 'city', 'type'] if c in df.columns]]
+            df['price'] = df['price'].map(lambda x: f"Rp {x:,.0f}")
             st.dataframe(df, use_container_width=True, hide_index=True)
+            page_selector('price_page', result['pagination'])
         else:
             st.info("Belum ada harga manual. Tambahkan di tab 'Tambah Harga'.")
+            page_selector('price_page', result['pagination'])
     
     with tab2:
         st.subheader("➕ Tambah Harga Baru")
         
-        commodity_options = {c['name']: c['id'] for c in st.session_state.commodities_db if c['active']}
+        commodity_search = st.text_input("🔍 Cari komoditas", placeholder="Ketik nama komoditas...")
+        options_result = api.commodities(page=1, per_page=50, search=commodity_search, active_only=True)
+        commodity_options = {c['name']: c['id'] for c in options_result.get('commodities', [])}
         
         with st.form("add_price"):
             col1, col2 = st.columns(2)
@@ -319,21 +375,21 @@ elif menu == "💰 Harga Manual":
                 price_type = st.selectbox("Tipe", ["retail", "wholesale", "farm_gate"])
             
             if st.form_submit_button("💾 Simpan", type="primary", use_container_width=True):
-                if selected_commodity and price > 0:
-                    new_id = get_next_id(st.session_state.manual_prices_db)
-                    st.session_state.manual_prices_db.append({
-                        'id': new_id,
-                        'commodity': selected_commodity,
+                if selected_commodity in commodity_options and price > 0:
+                    result = api.create_price({
+                        'commodity_id': commodity_options[selected_commodity],
                         'price': price,
-                        'date': price_date.isoformat(),
-                        'province': province,
-                        'city': city,
-                        'type': price_type,
-                        'reporter': user['username']
+                        'price_date': price_date.isoformat(),
+                        'province_name': province,
+                        'city_name': city,
+                        'price_type': price_type
                     })
-                    log_action('CREATE', 'manual_prices', new_id, f"Price for {selected_commodity}")
-                    st.success("✅ Harga berhasil ditambahkan!")
-                    st.rerun()
+                    if result.get('success'):
+                        get_stats.clear()
+                        st.success("✅ Harga berhasil ditambahkan!")
+                        st.rerun()
+                    else:
+                        show_api_error(result)
                 else:
                     st.warning("Pilih komoditas dan isi harga!")
 
@@ -341,106 +397,92 @@ elif menu == "💰 Harga Manual":
 elif menu == "📝 Audit Log":
     st.subheader("📝 Audit Log")
     
-    if st.session_state.audit_log_db:
-        # Filters
-        col1, col2 = st.columns(2)
-        with col1:
-            action_filter = st.selectbox("Filter Aksi", ["Semua", "CREATE", "UPDATE", "DELETE", "BULK_IMPORT"])
-        with col2:
-            table_filter = st.selectbox("Filter Tabel", ["Semua", "commodities", "manual_prices"])
+    # Filters (applied server-side, newest first)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        action_filter = st.selectbox("Filter Aksi", ["Semua", "CREATE", "UPDATE", "DELETE", "BULK_IMPORT", "LOGIN"])
+    with col2:
+        table_filter = st.selectbox("Filter Tabel", ["Semua", "commodities", "manual_prices"])
+    with col3:
+        log_dates = st.date_input("Rentang Tanggal", value=(), key="audit_dates")
         
-        logs = st.session_state.audit_log_db[::-1]  # Reverse to show newest first
+    result = api.audit_log(
+        page=current_page('audit_page'), per_page=50,
+        action=action_filter, table=table_filter,
+        date_from=log_dates[0].isoformat() if len(log_dates) > 0 else None,
+        date_to=log_dates[1].isoformat() if len(log_dates) > 1 else None
+    )
         
-        if action_filter != "Semua":
-            logs = [l for l in logs if l['action'] == action_filter]
-        if table_filter != "Semua":
-            logs = [l for l in logs if l['table'] == table_filter]
+    if not result.get('success'):
+        show_api_error(result)
+    elif result['logs']:
+        counts = result['counts']['by_action']
+        if counts:
+            metric_cols = st.columns(len(counts))
+            for col, (action_name, count) in zip(metric_cols, sorted(counts.items())):
+                col.metric(action_name, f"{count:,}")
         
-        if logs:
-            df = pd.DataFrame(logs)
-            st.dataframe(df, use_container_width=True, hide_index=True)
-        else:
-            st.info("Tidak ada log yang cocok dengan filter")
+        df = pd.DataFrame(result['logs'])[['created_at', 'username', 'action', 'table_name', 'record_id', 'notes']]
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        page_selector('audit_page', result['pagination'])
     else:
-        st.info("Belum ada aktivitas tercatat")
+        st.info("Tidak ada log yang cocok dengan filter")
+        page_selector('audit_page', result['pagination'])
 
 # ========== USER ACTIVITY (SUPERADMIN ONLY) ==========
 elif menu == "👥 User Activity":
     st.subheader("👥 User Activity Log")
     st.info("🔍 Monitor semua aktivitas login user di platform")
     
-    activity_log = get_activity_log()
+    summary_result = api.user_activity_summary(days=365)
+    usernames = summary_result.get('summary', {}).get('usernames', [])
     
-    if activity_log:
-        # Filters
-        col1, col2 = st.columns(2)
-        with col1:
-            action_filter = st.selectbox("Filter Aksi", ["Semua", "LOGIN", "LOGIN_FAILED", "REGISTER", "LOGOUT"])
-        with col2:
-            users_list = list(set([a['username'] for a in activity_log]))
-            user_filter = st.selectbox("Filter User", ["Semua"] + users_list)
+    # Filters
+    col1, col2 = st.columns(2)
+    with col1:
+        action_filter = st.selectbox("Filter Aksi", ["Semua", "LOGIN", "LOGIN_FAILED", "REGISTER", "LOGOUT"])
+    with col2:
+        user_filter = st.selectbox("Filter User", ["Semua"] + usernames)
+    
+    result = api.user_activity(page=current_page('activity_page'), per_page=50,
+                               action=action_filter, username=user_filter)
+    
+    if not result.get('success'):
+        show_api_error(result)
+    elif result['activities']:
+        df = pd.DataFrame(result['activities'])
+        df = df[[c for c in ['timestamp', 'username', 'action', 'details'] if c in df.columns]]
         
-        logs = activity_log[::-1]  # Newest first
+        # Add status icons
+        icons = {
+            'LOGIN': '✅',
+            'LOGIN_FAILED': '❌',
+            'REGISTER': '🆕',
+            'LOGOUT': '🚪'
+        }
+        df['action'] = df['action'].map(lambda action: f"{icons.get(action, '📋')} {action}")
         
-        if action_filter != "Semua":
-            logs = [l for l in logs if l['action'] == action_filter]
-        if user_filter != "Semua":
-            logs = [l for l in logs if l['username'] == user_filter]
+        # Rename columns for display
+        col_names = {'timestamp': 'Waktu', 'username': 'Username', 'action': 'Aksi', 'details': 'Detail'}
+        df = df.rename(columns=col_names)
         
-        if logs:
-            df = pd.DataFrame(logs)
-            
-            # Select only needed columns (handle both API and local format)
-            display_cols = []
-            if 'timestamp' in df.columns:
-                display_cols.append('timestamp')
-            if 'username' in df.columns:
-                display_cols.append('username')
-            if 'action' in df.columns:
-                display_cols.append('action')
-            if 'details' in df.columns:
-                display_cols.append('details')
-            
-            if display_cols:
-                df = df[display_cols]
-            
-            # Add status icons
-            def format_action(action):
-                icons = {
-                    'LOGIN': '✅',
-                    'LOGIN_FAILED': '❌',
-                    'REGISTER': '🆕',
-                    'LOGOUT': '🚪'
-                }
-                return f"{icons.get(action, '📋')} {action}"
-            
-            if 'action' in df.columns:
-                df['action'] = df['action'].apply(format_action)
-            
-            # Rename columns for display
-            col_names = {'timestamp': 'Waktu', 'username': 'Username', 'action': 'Aksi', 'details': 'Detail'}
-            df = df.rename(columns=col_names)
-            
-            st.dataframe(df, use_container_width=True, hide_index=True)
-
-            
-            # Stats
-            st.markdown("---")
-            st.subheader("📊 Statistik Login")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                total_logins = len([l for l in activity_log if l['action'] == 'LOGIN'])
-                st.metric("Total Login Sukses", total_logins)
-            with col2:
-                failed = len([l for l in activity_log if l['action'] == 'LOGIN_FAILED'])
-                st.metric("Login Gagal", failed)
-            with col3:
-                unique_users = len(set([l['username'] for l in activity_log if l['action'] == 'LOGIN']))
-                st.metric("User Unik", unique_users)
-        else:
-            st.info("Tidak ada log yang cocok dengan filter")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        page_selector('activity_page', result['pagination'])
+        
+        # Stats (server-side counts for the current user filter)
+        st.markdown("---")
+        st.subheader("📊 Statistik Login")
+        counts = result['counts']['by_action']
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Login Sukses", counts.get('LOGIN', 0))
+        with col2:
+            st.metric("Login Gagal", counts.get('LOGIN_FAILED', 0))
+        with col3:
+            st.metric("User Unik", len(usernames) if user_filter == "Semua" else 1)
     else:
-        st.info("Belum ada aktivitas user tercatat. User akan terlog saat login.")
+        st.info("Tidak ada log yang cocok dengan filter")
+        page_selector('activity_page', result['pagination'])
 
 # ========== MANAGE USERS (SUPERADMIN ONLY) ==========
 elif menu == "👤 Manage Users":
@@ -559,15 +601,15 @@ elif menu == "🗄️ Database Explorer":
     
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     with col1:
-        st.metric("🌾 Komoditas", len(st.session_state.get('commodities_db', [])))
+        st.metric("🌾 Komoditas", stats.get('total_commodities', 0))
     with col2:
-        st.metric("💰 Harga Manual", len(st.session_state.get('manual_prices_db', [])))
+        st.metric("💰 Harga Manual", stats.get('total_manual_prices', 0))
     with col3:
         st.metric("🗺️ NPK Tanah", len(npk_soil_data))
     with col4:
         st.metric("📓 Jurnal", len(journal_data))
     with col5:
-        st.metric("👥 Activity", len(get_activity_log()))
+        st.metric("👥 Activity", stats.get('total_user_activities', 0))
     with col6:
         st.metric("👤 Users", len(get_users()))
     
@@ -582,17 +624,18 @@ elif menu == "🗄️ Database Explorer":
     
     if db_choice == "📋 Semua Database":
         # Show all databases
+        st.caption("Menampilkan 20 data terbaru per database. Pilih database untuk navigasi halaman & export.")
         st.markdown("### 🌾 Commodities Database")
-        if st.session_state.get('commodities_db'):
-            df = pd.DataFrame(st.session_state.commodities_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        commodities = api.commodities(page=1, per_page=20).get('commodities', [])
+        if commodities:
+            st.dataframe(pd.DataFrame(commodities), use_container_width=True, hide_index=True)
         else:
             st.info("Kosong")
         
         st.markdown("### 💰 Manual Prices Database")
-        if st.session_state.get('manual_prices_db'):
-            df = pd.DataFrame(st.session_state.manual_prices_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        prices = api.prices(page=1, per_page=20).get('prices', [])
+        if prices:
+            st.dataframe(flatten_prices(prices), use_container_width=True, hide_index=True)
         else:
             st.info("Kosong")
         
@@ -611,17 +654,16 @@ elif menu == "🗄️ Database Explorer":
             st.info("Kosong")
         
         st.markdown("### 📝 Audit Log Database")
-        if st.session_state.get('audit_log_db'):
-            df = pd.DataFrame(st.session_state.audit_log_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        logs = api.audit_log(page=1, per_page=20).get('logs', [])
+        if logs:
+            st.dataframe(pd.DataFrame(logs), use_container_width=True, hide_index=True)
         else:
             st.info("Kosong")
         
         st.markdown("### 👥 User Activity Log")
-        activity = get_activity_log()
+        activity = api.user_activity(page=1, per_page=20).get('activities', [])
         if activity:
-            df = pd.DataFrame(activity)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.dataframe(pd.DataFrame(activity), use_container_width=True, hide_index=True)
         else:
             st.info("Kosong")
         
@@ -645,33 +687,42 @@ elif menu == "🗄️ Database Explorer":
     
     elif db_choice == "🌾 Commodities":
         st.markdown("### 🌾 Commodities Database")
-        if st.session_state.get('commodities_db'):
-            df = pd.DataFrame(st.session_state.commodities_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        result = api.commodities(page=current_page('db_commodity_page'), per_page=50)
+        if result.get('commodities'):
+            st.dataframe(pd.DataFrame(result['commodities']), use_container_width=True, hide_index=True)
+            page_selector('db_commodity_page', result['pagination'])
             
-            # Export
+            # Export (fetched page by page, max 5000 rows)
             st.markdown("---")
-            col1, col2 = st.columns(2)
-            with col1:
-                json_str = json.dumps(st.session_state.commodities_db, indent=2, default=str)
-                st.download_button("📥 Download JSON", json_str, "commodities.json", "application/json")
-            with col2:
-                csv = df.to_csv(index=False)
-                st.download_button("📥 Download CSV", csv, "commodities.csv", "text/csv")
+            if st.button("📦 Siapkan Export", key="export_commodities"):
+                export_df = pd.DataFrame(api.iter_pages(api.commodities, 'commodities'))
+                col1, col2 = st.columns(2)
+                with col1:
+                    json_str = export_df.to_json(orient='records', indent=2)
+                    st.download_button("📥 Download JSON", json_str, "commodities.json", "application/json")
+                with col2:
+                    csv = export_df.to_csv(index=False)
+                    st.download_button("📥 Download CSV", csv, "commodities.csv", "text/csv")
         else:
             st.info("Database kosong")
+            if result.get('success'):
+                page_selector('db_commodity_page', result['pagination'])
     
     elif db_choice == "💰 Manual Prices":
         st.markdown("### 💰 Manual Prices Database")
-        if st.session_state.get('manual_prices_db'):
-            df = pd.DataFrame(st.session_state.manual_prices_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        result = api.prices(page=current_page('db_price_page'), per_page=50)
+        if result.get('prices'):
+            st.dataframe(flatten_prices(result['prices']), use_container_width=True, hide_index=True)
+            page_selector('db_price_page', result['pagination'])
             
             st.markdown("---")
-            json_str = json.dumps(st.session_state.manual_prices_db, indent=2, default=str)
-            st.download_button("📥 Download JSON", json_str, "manual_prices.json", "application/json")
+            if st.button("📦 Siapkan Export", key="export_prices"):
+                json_str = json.dumps(list(api.iter_pages(api.prices, 'prices')), indent=2, default=str)
+                st.download_button("📥 Download JSON", json_str, "manual_prices.json", "application/json")
         else:
             st.info("Database kosong")
+            if result.get('success'):
+                page_selector('db_price_page', result['pagination'])
     
     elif db_choice == "🗺️ NPK Soil Map":
         st.markdown("### 🗺️ NPK Soil Map Database")
@@ -731,28 +782,35 @@ elif menu == "🗄️ Database Explorer":
     
     elif db_choice == "📝 Audit Log":
         st.markdown("### 📝 Audit Log Database")
-        if st.session_state.get('audit_log_db'):
-            df = pd.DataFrame(st.session_state.audit_log_db)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        result = api.audit_log(page=current_page('db_audit_page'), per_page=50)
+        if result.get('logs'):
+            st.dataframe(pd.DataFrame(result['logs']), use_container_width=True, hide_index=True)
+            page_selector('db_audit_page', result['pagination'])
             
             st.markdown("---")
-            json_str = json.dumps(st.session_state.audit_log_db, indent=2, default=str)
-            st.download_button("📥 Download JSON", json_str, "audit_log.json", "application/json")
+            if st.button("📦 Siapkan Export", key="export_audit"):
+                json_str = json.dumps(list(api.iter_pages(api.audit_log, 'logs')), indent=2, default=str)
+                st.download_button("📥 Download JSON", json_str, "audit_log.json", "application/json")
         else:
             st.info("Database kosong")
+            if result.get('success'):
+                page_selector('db_audit_page', result['pagination'])
     
     elif db_choice == "👥 User Activity":
         st.markdown("### 👥 User Activity Log")
-        activity = get_activity_log()
-        if activity:
-            df = pd.DataFrame(activity)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+        result = api.user_activity(page=current_page('db_activity_page'), per_page=50)
+        if result.get('activities'):
+            st.dataframe(pd.DataFrame(result['activities']), use_container_width=True, hide_index=True)
+            page_selector('db_activity_page', result['pagination'])
             
             st.markdown("---")
-            json_str = json.dumps(activity, indent=2, default=str)
-            st.download_button("📥 Download JSON", json_str, "user_activity.json", "application/json")
+            if st.button("📦 Siapkan Export", key="export_activity"):
+                json_str = json.dumps(list(api.iter_pages(api.user_activity, 'activities')), indent=2, default=str)
+                st.download_button("📥 Download JSON", json_str, "user_activity.json", "application/json")
         else:
             st.info("Database kosong")
+            if result.get('success'):
+                page_selector('db_activity_page', result['pagination'])
     
     elif db_choice == "👤 Users":
         st.markdown("### 👤 Users Database")
@@ -823,12 +881,15 @@ elif menu == "📈 Analytics":
         except:
             journal_data = []
     
+    # Aggregates computed by the API (no full-table downloads)
+    activity_summary = api.user_activity_summary(days=90).get('summary', {})
+    category_counts = api.commodities(page=1, per_page=1).get('counts', {}).get('by_category', {})
+    
     # ========== OVERVIEW CARDS ==========
     st.markdown("### 📊 Data Overview")
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        commodities_count = len(st.session_state.get('commodities_db', []))
-        st.metric("🌾 Komoditas", commodities_count)
+        st.metric("🌾 Komoditas", stats.get('total_commodities', 0))
     with col2:
         npk_count = len(npk_soil_data)
         st.metric("🗺️ Data NPK", npk_count)
@@ -836,8 +897,7 @@ elif menu == "📈 Analytics":
         users_count = len(get_users())
         st.metric("👤 Users", users_count)
     with col4:
-        activity_count = len(get_activity_log())
-        st.metric("📝 Activities", activity_count)
+        st.metric("📝 Activities", stats.get('total_user_activities', 0))
     
     st.markdown("---")
     
@@ -848,16 +908,10 @@ elif menu == "📈 Analytics":
     
     with col1:
         # Commodity Categories Pie
-        commodities = st.session_state.get('commodities_db', [])
-        if commodities:
-            categories = {}
-            for c in commodities:
-                cat = c.get('category', 'Lainnya')
-                categories[cat] = categories.get(cat, 0) + 1
-            
+        if category_counts:
             fig = px.pie(
-                values=list(categories.values()),
-                names=list(categories.keys()),
+                values=list(category_counts.values()),
+                names=list(category_counts.keys()),
                 title="📦 Distribusi Komoditas per Kategori",
                 color_discrete_sequence=px.colors.qualitative.Set3
             )
@@ -922,13 +976,8 @@ elif menu == "📈 Analytics":
     
     with col2:
         # Activity Types Bar Chart
-        activity_log = get_activity_log()
-        if activity_log:
-            actions = {}
-            for a in activity_log:
-                action = a.get('action', 'OTHER')
-                actions[action] = actions.get(action, 0) + 1
-            
+        actions = activity_summary.get('by_action', {})
+        if actions:
             fig = px.bar(
                 x=list(actions.keys()),
                 y=list(actions.values()),
@@ -946,22 +995,12 @@ elif menu == "📈 Analytics":
     # ========== TREND CHARTS ==========
     st.markdown("### 📈 Trend Over Time")
     
-    # Activity Trend
-    activity_log = get_activity_log()
-    if activity_log:
-        # Group by date
-        from collections import defaultdict
-        daily_counts = defaultdict(int)
-        for a in activity_log:
-            timestamp = a.get('timestamp', '')
-            if timestamp:
-                date_part = timestamp[:10]  # YYYY-MM-DD
-                daily_counts[date_part] += 1
-        
-        if daily_counts:
-            dates = sorted(daily_counts.keys())
-            counts = [daily_counts[d] for d in dates]
-            
+    # Activity Trend (grouped per day by the API)
+    daily = activity_summary.get('daily', [])
+    if daily:
+        dates = [d['date'] for d in daily]
+        counts = [d['count'] for d in daily]
+        if dates:
             fig = go.Figure()
             fig.add_trace(go.Scatter(
                 x=dates, 
@@ -1022,12 +1061,12 @@ elif menu == "📈 Analytics":
     st.markdown("### 📋 Ringkasan Data")
     
     summary_data = [
-        {"Database": "🌾 Komoditas", "Total Records": len(st.session_state.get('commodities_db', [])), "Status": "✅ Active"},
-        {"Database": "💰 Harga Manual", "Total Records": len(st.session_state.get('manual_prices_db', [])), "Status": "✅ Active"},
+        {"Database": "🌾 Komoditas", "Total Records": stats.get('total_commodities', 0), "Status": "✅ Active"},
+        {"Database": "💰 Harga Manual", "Total Records": stats.get('total_manual_prices', 0), "Status": "✅ Active"},
         {"Database": "🗺️ NPK Soil Map", "Total Records": len(npk_soil_data), "Status": "✅ Active"},
         {"Database": "📓 Journal", "Total Records": len(journal_data), "Status": "✅ Active"},
-        {"Database": "📝 Audit Log", "Total Records": len(st.session_state.get('audit_log_db', [])), "Status": "✅ Active"},
-        {"Database": "👥 User Activity", "Total Records": len(get_activity_log()), "Status": "✅ Active"},
+        {"Database": "📝 Audit Log", "Total Records": stats.get('total_audit_logs', 0), "Status": "✅ Active"},
+        {"Database": "👥 User Activity", "Total Records": stats.get('total_user_activities', 0), "Status": "✅ Active"},
         {"Database": "👤 Users", "Total Records": len(get_users()), "Status": "✅ Active"},
     ]
     
@@ -0,0 +1,147 @@
+"""
+Admin API client for the AgriSensa Streamlit admin console
+Thin wrapper around the Flask /api/admin endpoints (paginated, server-side filtered)
+"""
+
+import os
+import requests
+import pandas as pd
+
+from utils.auth import API_BASE_URL
+
+ADMIN_API_URL = os.getenv('AGRISENSA_ADMIN_API_URL', f"{API_BASE_URL}/api/admin")
+CATEGORIES = ["Sayuran", "Buah", "Pangan", "Rempah", "Perkebunan"]
+
+
+class AdminAPI:
+    """Client for the admin API. Only the requested page is ever held in memory."""
+
+    def __init__(self, token: str = None, base_url: str = ADMIN_API_URL, timeout: int = 15):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def _request(self, method: str, endpoint: str, params: dict = None, json: object = None) -> dict:
+        """Make API request with error handling (same contract as utils.auth.api_request)."""
+        try:
+            # Drop empty filters so the server doesn't see "Semua"/"" values
+            if params:
+                params = {k: v for k, v in params.items() if v not in (None, '', 'Semua')}
+            response = self.session.request(method, f"{self.base_url}/{endpoint.lstrip('/')}",
+                                            params=params, json=json, timeout=self.timeout)
+            data = response.json()
+            if response.status_code >= 400 and 'success' not in data:
+                data['success'] = False
+            return data
+        except Exception as e:
+            return {'success': False, 'error': f'API Error: {str(e)}', 'api_error': True}
+
+    # ========== AUTH ==========
+    def login(self, username: str, password: str) -> dict:
+        result = self._request('POST', 'login', json={'username': username, 'password': password})
+        if result.get('success'):
+            self.session.headers['Authorization'] = f"Bearer {result['access_token']}"
+        return result
+
+    # ========== READ ==========
+    def stats(self) -> dict:
+        return self._request('GET', 'stats')
+
+    def commodities(self, page=1, per_page=20, search=None, category=None, active_only=False) -> dict:
+        return self._request('GET', 'commodities', params={
+            'page': page, 'per_page': per_page, 'search': search, 'category': category,
+            'active_only': str(active_only).lower()
+        })
+
+    def prices(self, page=1, per_page=20, search=None, price_type=None, date_from=None, date_to=None) -> dict:
+        return self._request('GET', 'prices', params={
+            'page': page, 'per_page': per_page, 'search': search, 'price_type': price_type,
+            'date_from': date_from, 'date_to': date_to
+        })
+
+    def audit_log(self, page=1, per_page=50, action=None, table=None, date_from=None, date_to=None) -> dict:
+        return self._request('GET', 'audit-log', params={
+            'page': page, 'per_page': per_page, 'action': action, 'table': table,
+            'date_from': date_from, 'date_to': date_to
+        })
+
+    def user_activity(self, page=1, per_page=50, action=None, username=None) -> dict:
+        return self._request('GET', 'user-activity', params={
+            'page': page, 'per_page': per_page, 'action': action, 'username': username
+        })
+
+    def user_activity_summary(self, days=30) -> dict:
+        return self._request('GET', 'user-activity/summary', params={'days': days})
+
+    def iter_pages(self, fetch, key: str, max_rows: int = 5000, **filters):
+        """Yield items page by page (for exports) without building one big list."""
+        page, sent = 1, 0
+        while sent < max_rows:
+            result = fetch(page=page, per_page=100, **filters)
+            items = result.get(key, []) if result.get('success') else []
+            for item in items[:max_rows - sent]:
+                yield item
+            sent += len(items)
+            if page >= result.get('pagination', {}).get('pages', 0):
+                break
+            page += 1
+
+    # ========== WRITE ==========
+    def create_commodity(self, data: dict) -> dict:
+        return self._request('POST', 'commodities', json=data)
+
+    def update_commodity(self, commodity_id: int, data: dict) -> dict:
+        return self._request('PUT', f'commodities/{commodity_id}', json=data)
+
+    def delete_commodity(self, commodity_id: int) -> dict:
+        return self._request('DELETE', f'commodities/{commodity_id}')
+
+    def bulk_import_commodities(self, rows: list) -> dict:
+        return self._request('POST', 'commodities/bulk', json=rows)
+
+    def create_price(self, data: dict) -> dict:
+        return self._request('POST', 'prices', json=data)
+
+    def log_action(self, action: str, table: str, record_id=None, details: str = "") -> dict:
+        return self._request('POST', 'audit-log', json={
+            'action': action, 'table': table, 'record_id': record_id, 'notes': details
+        })
+
+
+def prepare_commodity_import(df: pd.DataFrame) -> list:
+    """
+    Normalize an uploaded commodity CSV into bulk-import rows (vectorized).
+
+    Accepts columns name, category, unit, price (or price_reference); blank
+    names are dropped and duplicate names keep the last row.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    if 'price' in df.columns and 'price_reference' not in df.columns:
+        df = df.rename(columns={'price': 'price_reference'})
+    if 'name' not in df.columns:
+        return []
+
+    out = pd.DataFrame({'name': df['name'].astype('string').str.strip()})
+    out['category'] = df['category'].astype('string').str.strip() if 'category' in df.columns else pd.NA
+    out['unit'] = df['unit'].astype('string').str.strip() if 'unit' in df.columns else pd.NA
+    out['price_reference'] = (pd.to_numeric(df['price_reference'], errors='coerce')
+                              if 'price_reference' in df.columns else 0.0)
+
+    out = out[out['name'].notna() & (out['name'] != '')]
+    out = out.fillna({'category': 'Lainnya', 'unit': 'kg', 'price_reference': 0.0})
+    out = out.drop_duplicates('name', keep='last')
+    out['price_reference'] = out['price_reference'].astype(float)
+    return out.astype(object).to_dict('records')
+
+
+def flatten_prices(prices: list) -> pd.DataFrame:
+    """Flatten /prices items into a display table."""
+    if not prices:
+        return pd.DataFrame()
+    df = pd.json_normalize(prices)
+    return df.rename(columns={
+        'commodity_name': 'commodity', 'location.province_name': 'province',
+        'location.city_name': 'city', 'price_date': 'date', 'price_type': 'type'
+    })
@@ -1,9 +1,17 @@
 import streamlit as st
-import cv2
+import sys
+from pathlib import Path
 import numpy as np
 import plotly.express as px
 from PIL import Image
 
+# Add parent directory to path
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services.orthomosaic_service import GEOTIFF_EXTENSIONS, RASTERIO_AVAILABLE, OrthomosaicService
+
 # from utils.auth import require_auth, show_user_info_sidebar
 
 st.set_page_config(page_title="AgriSensa Vision", page_icon="🛸", layout="wide")
@@ -22,34 +30,8 @@ st.set_page_config(page_title="AgriSensa Vision", page_icon="🛸", layout="wide
 # 🧠 IMAGE PROCESSING ENGINES
 # ==========================================
 
-def calculate_vari(image_array):
-    """VARI Algorithm for Aerial View"""
-    img = image_array.astype(float) / 255.0
-    R, G, B = img[:, :, 0], img[:, :, 1], img[:, :, 2]
-    numerator = G - R
-    denominator = G + R - B + 0.00001
-    return numerator / denominator
-
-def detect_plants(image_array, sensitivity, min_area):
-    """Plant Counting for Aerial View"""
-    hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
-    lower_green = np.array([30 - (sensitivity/5), 40, 40])
-    upper_green = np.array([90 + (sensitivity/5), 255, 255])
-    mask = cv2.inRange(hsv, lower_green, upper_green)
-    kernel = np.ones((3,3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    valid_contours = []
-    output_img = image_array.copy()
-    for c in contours:
-        if cv2.contourArea(c) > min_area:
-            valid_contours.append(c)
-            cv2.drawContours(output_img, [c], -1, (255, 0, 0), 2)
-            M = cv2.moments(c)
-            if M["m00"] != 0:
-                cv2.circle(output_img, (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"])), 5, (255, 255, 0), -1)
-    return len(valid_contours), output_img, mask
+# Aerial view (VARI & plant counting) dijalankan per tile oleh OrthomosaicService
+# agar orthomosaic besar tidak perlu dimuat utuh dalam float64.
 
 def analyze_bwd(image_array, crop_type="Padi"):
     """
@@ -143,23 +125,36 @@ if mode == "🚁 Analisis Drone (Aerial)":
         min_area = st.number_input("Min. Area (px)", 10, 5000, 100)
         heatmap_opacity = st.slider("Opasitas Heatmap", 0.1, 1.0, 0.6)
 
-    uploaded_file = st.file_uploader("Upload Foto Udara (JPG/PNG)", type=['jpg', 'jpeg', 'png'], key="drone")
+    uploaded_file = st.file_uploader("Upload Foto Udara / Orthomosaic (JPG/PNG/TIFF)", type=['jpg', 'jpeg', 'png', 'tif', 'tiff'], key="drone")
 
     if uploaded_file:
-        with Image.open(uploaded_file) as src_img:
-            image = src_img.convert("RGB")
-            img_array = np.array(image)
-        
-        with st.spinner("Menganalisa lahan..."):
-            count, contour_img, mask_img = detect_plants(img_array, sens, min_area)
-            vari_map = calculate_vari(img_array)
-            
-        st.success("Selesai!")
+        if uploaded_file.name.lower().endswith(GEOTIFF_EXTENSIONS) and not RASTERIO_AVAILABLE:
+            st.warning("⚠️ Paket `rasterio` tidak terpasang: GeoTIFF didekode utuh di memori "
+                       "(bukan per tile). Pasang `rasterio` untuk orthomosaic berukuran besar.")
+        service = OrthomosaicService()
+        progress = st.progress(0.0, text="Menganalisa lahan per tile...")
+
+        def _on_tile_done(done, total):
+            progress.progress(done / total, text=f"Menganalisa lahan... tile {done}/{total}")
+
+        try:
+            result = service.analyze(uploaded_file, sensitivity=sens, min_area=min_area,
+                                     progress_callback=_on_tile_done)
+        except ValueError as e:
+            progress.empty()
+            st.error(f"❌ {e}")
+            st.stop()
+        progress.empty()
+
+        width, height = result.image_size
+        st.success(f"Selesai! {width:,} x {height:,} px diproses dalam {result.tiles_processed} tile.")
         tab1, tab2 = st.tabs(["📊 Counting", "🌡️ Health Heatmap"])
         with tab1:
-            st.image(contour_img, caption=f"Terdeteksi: {count} Tanaman", use_column_width=True)
+            overlay = OrthomosaicService.render_overlay(result)
+            st.image(overlay, caption=f"Terdeteksi: {result.plant_count} Tanaman (preview)", use_column_width=True)
         with tab2:
-            fig = px.imshow(vari_map, color_continuous_scale='RdYlGn')
+            st.metric("Rata-rata VARI", f"{result.vari_mean:.3f}")
+            fig = px.imshow(result.preview_vari, color_continuous_scale='RdYlGn', zmin=-1, zmax=1)
             fig.update_traces(opacity=heatmap_opacity)
             st.plotly_chart(fig, use_container_width=True)
 
@@ -0,0 +1,411 @@
+"""
+Orthomosaic Service
+Tiled processing for large drone orthomosaics (plant counting & VARI).
+
+Citra drone 20k x 20k px tidak muat diproses utuh dalam float64, jadi citra
+dibaca per tile (dengan overlap), dihitung di process pool, lalu hasilnya
+digabung. Tanaman di area overlap hanya dihitung oleh tile "pemilik"
+centroid-nya sehingga tidak terhitung dua kali.
+"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    import rasterio
+    from rasterio.windows import Window
+except ImportError:  # GeoTIFF windowed reads are optional
+    rasterio = None
+    Window = None
+
+GEOTIFF_EXTENSIONS = ('.tif', '.tiff')
+RASTERIO_AVAILABLE = rasterio is not None
+VARI_EPSILON = 0.00001
+RGB_BAND_INDEXES = [1, 2, 3]
+# Sisi terpanjang overview yang dibaca untuk statistik skala seluruh dataset
+SCALE_OVERVIEW_SIZE = 1024
+
+# Batas piksel untuk decode PIL: cukup untuk mosaic 40k x 40k, tetapi tetap
+# terbatas (guard decompression-bomb global PIL tidak diubah)
+MAX_MOSAIC_PIXELS = 40000 * 40000
+
+
+# ==========================================
+# 🧩 TILE GEOMETRY
+# ==========================================
+
+@dataclass(frozen=True)
+class TileWindow:
+    """Satu tile baca (dengan overlap) beserta area 'core' pemiliknya."""
+    row: int
+    col: int
+    height: int
+    width: int
+    core_top: int
+    core_left: int
+    core_bottom: int
+    core_right: int
+
+
+def iter_tiles(height, width, tile_size=2048, overlap=128):
+    """
+    Bagi citra menjadi tile berukuran `tile_size` dengan overlap.
+
+    Area core tiap tile bersebelahan tanpa celah dan tanpa tumpang tindih,
+    sehingga setiap piksel (dan setiap centroid) dimiliki tepat satu tile.
+    """
+    if tile_size <= 2 * overlap:
+        raise ValueError("tile_size harus lebih besar dari 2 x overlap")
+
+    step = tile_size - 2 * overlap
+    for core_top in range(0, height, step):
+        core_bottom = min(core_top + step, height)
+        row = max(core_top - overlap, 0)
+        bottom = min(core_bottom + overlap, height)
+        for core_left in range(0, width, step):
+            core_right = min(core_left + step, width)
+            col = max(core_left - overlap, 0)
+            right = min(core_right + overlap, width)
+            yield TileWindow(
+                row=row, col=col,
+                height=bottom - row, width=right - col,
+                core_top=core_top, core_left=core_left,
+                core_bottom=core_bottom, core_right=core_right,
+            )
+
+
+# ==========================================
+# 📂 RASTER READERS
+# ==========================================
+
+class _RasterioReader:
+    """
+    Windowed GeoTIFF reader: hanya tile yang diminta yang dibaca dari disk.
+
+    File-like object (upload Streamlit) di-spool ke file sementara dulu agar
+    tetap bisa dibaca per window, bukan didekode utuh di memori.
+    """
+
+    def __init__(self, source):
+        self._spool_path = None
+        if not isinstance(source, (str, os.PathLike)):
+            source = self._spool_path = _spool_to_tempfile(source)
+        try:
+            self._ds = rasterio.open(source)
+        except Exception:
+            self._remove_spool()
+            raise
+        if self._ds.count < len(RGB_BAND_INDEXES):
+            band_count = self._ds.count
+            self.close()
+            raise ValueError(
+                f"GeoTIFF hanya memiliki {band_count} band; analisa VARI membutuhkan "
+                "minimal 3 band (R, G, B)."
+            )
+        self.height = self._ds.height
+        self.width = self._ds.width
+        self._scale = self._dataset_scale()
+
+    def _dataset_scale(self):
+        """
+        Faktor skala ke 0-255 yang sama untuk semua tile.
+
+        Puncak diambil dari overview ter-decimate (bukan per tile) agar tidak
+        ada sambungan kecerahan antar tile; fallback ke rentang dtype.
+        """
+        dtype = np.dtype(self._ds.dtypes[0])
+        if dtype == np.uint8:
+            return 1.0
+        factor = max(1, -(-max(self.height, self.width) // SCALE_OVERVIEW_SIZE))
+        out_shape = (len(RGB_BAND_INDEXES),
+                     max(1, self.height // factor), max(1, self.width // factor))
+        overview = self._ds.read(indexes=RGB_BAND_INDEXES, out_shape=out_shape)
+        peak = float(overview.max()) if overview.size else 0.0
+        if peak <= 0 and np.issubdtype(dtype, np.integer):
+            peak = float(np.iinfo(dtype).max)
+        return 255.0 / (peak or 1.0)
+
+    def read(self, tile):
+        window = Window(tile.col, tile.row, tile.width, tile.height)
+        bands = self._ds.read(indexes=RGB_BAND_INDEXES, window=window)
+        return _to_uint8(np.moveaxis(bands, 0, -1), self._scale)
+
+    def close(self):
+        self._ds.close()
+        self._remove_spool()
+
+    def _remove_spool(self):
+        if self._spool_path:
+            try:
+                os.remove(self._spool_path)
+            except OSError:
+                pass
+            self._spool_path = None
+
+
+class _PILReader:
+    """
+    Fallback untuk JPEG/PNG (dan TIFF tanpa rasterio).
+
+    Format ini tidak bisa dibaca per window, jadi citra didekode sekali
+    sebagai uint8 (3 byte/px, bukan 24 byte/px seperti float64 RGB) lalu
+    diiris per tile tanpa salinan.
+    """
+
+    def __init__(self, source):
+        # Naikkan batas hanya selama decode ini, lalu kembalikan
+        previous_limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = MAX_MOSAIC_PIXELS
+        try:
+            with Image.open(source) as src_img:
+                self._array = np.asarray(src_img.convert("RGB"))
+        finally:
+            Image.MAX_IMAGE_PIXELS = previous_limit
+        self.height, self.width = self._array.shape[:2]
+
+    def read(self, tile):
+        return self._array[tile.row:tile.row + tile.height, tile.col:tile.col + tile.width]
+
+    def close(self):
+        self._array = None
+
+
+def _to_uint8(array, scale):
+    """Normalisasi band non-uint8 (mis. GeoTIFF 16-bit) ke 0-255 dengan skala dataset."""
+    if array.dtype == np.uint8:
+        return np.ascontiguousarray(array)
+    return (array.astype(np.float32) * scale).clip(0, 255).astype(np.uint8)
+
+
+def _spool_to_tempfile(fileobj):
+    """Salin file-like object ke file sementara (chunked) dan kembalikan path-nya."""
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    suffix = os.path.splitext(getattr(fileobj, 'name', '') or '')[1] or '.tif'
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(fileobj, tmp, length=8 * 1024 * 1024)
+    return tmp.name
+
+
+def open_raster(source):
+    """Pilih reader terbaik untuk path atau file-like object."""
+    name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+    if rasterio is not None and str(name).lower().endswith(GEOTIFF_EXTENSIONS):
+        return _RasterioReader(source)
+    return _PILReader(source)
+
+
+# ==========================================
+# 🧠 PER-TILE KERNELS
+# ==========================================
+
+def calculate_vari(image_array):
+    """
+    VARI = (G - R) / (G + R - B), dihitung dalam float32.
+
+    Indeks ini invarian terhadap skala sehingga pembagian /255 tidak perlu;
+    epsilon diskalakan agar hasil identik dengan versi ternormalisasi.
+    """
+    img = image_array.astype(np.float32, copy=False)
+    R, G, B = img[:, :, 0], img[:, :, 1], img[:, :, 2]
+    return (G - R) / (G + R - B + VARI_EPSILON * 255.0)
+
+
+def plant_mask(image_array, sensitivity):
+    """Mask hijau tanaman (HSV threshold + opening)."""
+    hsv = cv2.cvtColor(image_array, cv2.COLOR_RGB2HSV)
+    lower_green = np.array([30 - (sensitivity / 5), 40, 40])
+    upper_green = np.array([90 + (sensitivity / 5), 255, 255])
+    mask = cv2.inRange(hsv, lower_green, upper_green)
+    kernel = np.ones((3, 3), np.uint8)
+    return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
+
+
+def find_plant_centroids(image_array, sensitivity, min_area):
+    """Return (contours, centroids[x, y]) tanaman dengan luas > min_area."""
+    mask = plant_mask(image_array, sensitivity)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    valid_contours = []
+    centroids = []
+    for c in contours:
+        if cv2.contourArea(c) > min_area:
+            valid_contours.append(c)
+            M = cv2.moments(c)
+            if M["m00"] != 0:
+                centroids.append((M["m10"] / M["m00"], M["m01"] / M["m00"]))
+    return valid_contours, np.array(centroids, dtype=np.float32).reshape(-1, 2), mask
+
+
+def _process_tile(args):
+    """
+    Worker process pool: hitung tanaman & statistik VARI satu tile.
+
+    Hanya centroid di dalam area core tile yang dikembalikan (koordinat
+    global), sehingga tanaman di overlap tidak dihitung ganda.
+    """
+    tile, pixels, sensitivity, min_area, preview_scale = args
+
+    _, centroids, _ = find_plant_centroids(pixels, sensitivity, min_area)
+    if len(centroids):
+        centroids[:, 0] += tile.col
+        centroids[:, 1] += tile.row
+        owned = (
+            (centroids[:, 0] >= tile.core_left) & (centroids[:, 0] < tile.core_right)
+            & (centroids[:, 1] >= tile.core_top) & (centroids[:, 1] < tile.core_bottom)
+        )
+        centroids = centroids[owned]
+
+    # Statistik & preview hanya dari area core (tanpa overlap)
+    core = pixels[
+        tile.core_top - tile.row:tile.core_bottom - tile.row,
+        tile.core_left - tile.col:tile.core_right - tile.col,
+    ]
+    vari = calculate_vari(core)
+    finite = np.isfinite(vari)
+    vari_clipped = np.clip(np.where(finite, vari, 0), -1, 1)
+
+    # Ukuran dari batas global agar tile preview bersambung tanpa celah
+    preview_size = (
+        max(1, round(tile.core_right * preview_scale) - round(tile.core_left * preview_scale)),
+        max(1, round(tile.core_bottom * preview_scale) - round(tile.core_top * preview_scale)),
+    )
+    rgb_small = cv2.resize(core, preview_size, interpolation=cv2.INTER_AREA)
+    vari_small = cv2.resize(vari_clipped, preview_size, interpolation=cv2.INTER_AREA)
+
+    return {
+        'tile': tile,
+        'centroids': centroids,
+        'vari_sum': float(vari_clipped[finite].sum()),
+        'vari_pixels': int(finite.sum()),
+        'rgb_small': rgb_small,
+        'vari_small': vari_small,
+    }
+
+
+# ==========================================
+# 🛰️ ORCHESTRATION
+# ==========================================
+
+@dataclass
+class OrthomosaicResult:
+    """Hasil analisis orthomosaic (count global + preview downsampled)."""
+    plant_count: int
+    centroids: np.ndarray
+    tile_counts: list
+    vari_mean: float
+    preview_rgb: np.ndarray
+    preview_vari: np.ndarray
+    preview_scale: float
+    image_size: tuple
+    tiles_processed: int = 0
+    metadata: dict = field(default_factory=dict)
+
+
+class OrthomosaicService:
+    """
+    Service untuk analisis citra drone berukuran besar secara ber-tile.
+    """
+
+    def __init__(self, tile_size=2048, overlap=128, workers=None, preview_max_side=1600):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = workers if workers is not None else max(1, (os.cpu_count() or 2) - 1)
+        self.preview_max_side = preview_max_side
+
+    def analyze(self, source, sensitivity=50, min_area=100, progress_callback=None):
+        """
+        Hitung populasi tanaman dan peta VARI dari orthomosaic.
+
+        Args:
+            source: path GeoTIFF/JPEG/PNG atau file-like object (upload Streamlit)
+            sensitivity: sensitivitas warna hijau (0-100)
+            min_area: luas kontur minimum (px, resolusi asli)
+            progress_callback: fungsi opsional f(done, total)
+        """
+        reader = open_raster(source)
+        try:
+            height, width = reader.height, reader.width
+            scale = min(1.0, self.preview_max_side / max(height, width))
+            preview_h = max(1, round(height * scale))
+            preview_w = max(1, round(width * scale))
+            preview_rgb = np.zeros((preview_h, preview_w, 3), dtype=np.uint8)
+            preview_vari = np.zeros((preview_h, preview_w), dtype=np.float32)
+
+            tiles = list(iter_tiles(height, width, self.tile_size, self.overlap))
+            jobs = ((tile, reader.read(tile), sensitivity, min_area, scale) for tile in tiles)
+
+            all_centroids = []
+            tile_counts = []
+            vari_sum = 0.0
+            vari_pixels = 0
+
+            for done, result in enumerate(self._map(jobs), start=1):
+                tile = result['tile']
+                all_centroids.append(result['centroids'])
+                tile_counts.append({
+                    'row': tile.core_top, 'col': tile.core_left,
+                    'count': len(result['centroids']),
+                })
+                vari_sum += result['vari_sum']
+                vari_pixels += result['vari_pixels']
+                self._paste(preview_rgb, result['rgb_small'], tile, scale)
+                self._paste(preview_vari, result['vari_small'], tile, scale)
+                if progress_callback:
+                    progress_callback(done, len(tiles))
+        finally:
+            reader.close()
+
+        centroids = np.concatenate(all_centroids) if all_centroids else np.empty((0, 2), np.float32)
+        return OrthomosaicResult(
+            plant_count=len(centroids),
+            centroids=centroids,
+            tile_counts=tile_counts,
+            vari_mean=vari_sum / vari_pixels if vari_pixels else 0.0,
+            preview_rgb=preview_rgb,
+            preview_vari=preview_vari,
+            preview_scale=scale,
+            image_size=(width, height),
+            tiles_processed=len(tiles),
+        )
+
+    def _map(self, jobs):
+        """Jalankan tile di process pool dengan jumlah tile in-flight terbatas."""
+        if self.workers <= 1:
+            for job in jobs:
+                yield _process_tile(job)
+            return
+
+        max_in_flight = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = []
+            for job in jobs:
+                pending.append(pool.submit(_process_tile, job))
+                if len(pending) >= max_in_flight:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    @staticmethod
+    def _paste(canvas, small, tile, scale):
+        """Tempel hasil downsample tile ke kanvas preview."""
+        top = round(tile.core_top * scale)
+        left = round(tile.core_left * scale)
+        h = min(small.shape[0], canvas.shape[0] - top)
+        w = min(small.shape[1], canvas.shape[1] - left)
+        if h > 0 and w > 0:
+            canvas[top:top + h, left:left + w] = small[:h, :w]
+
+    @staticmethod
+    def render_overlay(result, marker_radius=4):
+        """Gambar centroid tanaman di atas preview (bukan citra resolusi penuh)."""
+        overlay = result.preview_rgb.copy()
+        for x, y in result.centroids * result.preview_scale:
+            cv2.circle(overlay, (int(x), int(y)), marker_radius, (255, 255, 0), -1)
+        return overlay
@@ -2,6 +2,7 @@
 import os
 import logging
 from logging.handlers import RotatingFileHandler
+import click
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -9,6 +10,7 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_caching import Cache
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -18,6 +20,7 @@ limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["100 per hour"]
 )
+cache = Cache()
 
 
 def create_app(config_name=None):
@@ -40,6 +43,7 @@ def create_app(config_name=None):
     migrate.init_app(app, db)
     jwt.init_app(app)
     limiter.init_app(app)
+    init_cache(app)
     
     # Initialize CORS
     CORS(app, 
@@ -130,6 +134,16 @@ def setup_logging(app):
         app.logger.info('AgriSensa API startup')
 
 
+def init_cache(app):
+    """Initialize the cache backend, falling back to an in-process cache."""
+    try:
+        cache.init_app(app)
+    except Exception as e:
+        # e.g. CACHE_TYPE=RedisCache without the redis package installed
+        app.logger.warning(f"⚠️ Cache backend {app.config.get('CACHE_TYPE')} unavailable ({e}), using SimpleCache")
+        cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+
 def register_error_handlers(app):
     """Register custom error handlers."""
     
@@ -292,3 +306,11 @@ def register_cli_commands(app):
             db.session.add(admin)
             db.session.commit()
         print("✅ Admin user created: username=admin, password=admin123")
+
+    @app.cli.command("sync-worldbank")
+    @click.option('--full', is_flag=True, help='Upsert every row, not only the overlap window.')
+    def sync_worldbank_command(full):
+        """Sync World Bank RTFP prices into the local warehouse."""
+        from app.services.worldbank_service import WorldBankService
+        written = WorldBankService.sync_prices(force=True, full=full)
+        print(f"✅ World Bank sync stored {written} records")
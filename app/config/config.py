@@ -1,4 +1,5 @@
 """Configuration classes for different environments."""
+import hashlib
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -7,6 +8,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def source_fingerprint(app_dir=None):
+    """Short hash of the app package sources (.py/.json); changes whenever a deploy changes them."""
+    app_dir = app_dir or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(app_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith(('.py', '.json')):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, app_dir).encode('utf-8'))
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
 class Config:
     """Base configuration class."""
     
@@ -53,10 +69,22 @@ class Config:
     
     # Redis Configuration
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-    CACHE_TYPE = 'redis'
+    
+    # Cache Configuration (Flask-Caching): Redis when REDIS_URL is set,
+    # otherwise in-process (SimpleCache) or FileSystemCache via CACHE_TYPE
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'RedisCache' if os.getenv('REDIS_URL') else 'SimpleCache')
     CACHE_REDIS_URL = REDIS_URL
+    CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'instance', 'cache'))
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
     
+    # Static JSON responses (knowledge base, pest/fruit lists): serialized and
+    # compressed once per deploy, revalidated by clients with ETags.
+    # Without an explicit version the key follows the app sources, so a new
+    # deploy never serves payloads cached by the previous one
+    RESPONSE_CACHE_VERSION = os.getenv('RESPONSE_CACHE_VERSION') or os.getenv('GIT_COMMIT') or source_fingerprint()
+    RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 86400))  # 1 day, old versions age out
+    RESPONSE_CACHE_MAX_AGE = int(os.getenv('RESPONSE_CACHE_MAX_AGE', 3600))  # 1 hour
+    
     # Rate Limiting Configuration
     RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL', 'redis://localhost:6379/1')
     RATELIMIT_DEFAULT = "100 per hour"
@@ -127,6 +155,9 @@ class TestingConfig(Config):
     # Disable rate limiting in tests
     RATELIMIT_ENABLED = False
     
+    # In-process cache in tests
+    CACHE_TYPE = 'SimpleCache'
+    
     # Disable CSRF in tests
     WTF_CSRF_ENABLED = False
 
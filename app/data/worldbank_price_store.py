@@ -0,0 +1,127 @@
+"""Local SQLite warehouse for World Bank RTFP food prices."""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+
+class WorldBankPriceStore:
+    """SQLite-backed store of RTFP price records, deduplicated by market/product/date."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rtfp_prices (
+            market   TEXT NOT NULL,
+            product  TEXT NOT NULL,
+            date     TEXT NOT NULL,
+            price    REAL NOT NULL,
+            PRIMARY KEY (market, product, date)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_rtfp_product_date ON rtfp_prices (product, date DESC);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key   TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, data_dir='instance', filename='worldbank_prices.db'):
+        """Initialize store in the data directory (use ':memory:' as filename for tests)."""
+        if filename == ':memory:':
+            self.db_path = filename
+        else:
+            os.makedirs(data_dir, exist_ok=True)
+            self.db_path = os.path.join(data_dir, filename)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.db_path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+
+    # ========== WRITE OPERATIONS ==========
+
+    @staticmethod
+    def _normalize(record: Dict) -> Optional[tuple]:
+        """Turn a raw RTFP record into a row, or None if unusable."""
+        product = (record.get('product') or '').strip()
+        date = str(record.get('date') or '').strip()
+        if not product or not date:
+            return None
+        try:
+            price = float(record.get('price', 0))
+        except (ValueError, TypeError):
+            return None
+        if price <= 0:
+            return None
+        market = (record.get('market') or 'Unknown Market').strip()
+        return market, product, date, price
+
+    def upsert_records(self, records: Iterable[Dict]) -> int:
+        """Insert records, replacing duplicates on (market, product, date). Returns rows written."""
+        rows = [row for row in map(self._normalize, records) if row]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO rtfp_prices (market, product, date, price) VALUES (?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def get_state(self, key: str, default=None):
+        """Read a sync bookkeeping value."""
+        row = self._conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_state(self, key: str, value) -> None:
+        """Persist a sync bookkeeping value."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                (key, json.dumps(value))
+            )
+
+    def clear(self) -> None:
+        """Drop all prices and sync state (forces a full resync)."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM rtfp_prices')
+            self._conn.execute('DELETE FROM sync_state')
+
+    # ========== READ OPERATIONS ==========
+
+    def count(self) -> int:
+        """Number of stored price records."""
+        return self._conn.execute('SELECT COUNT(*) FROM rtfp_prices').fetchone()[0]
+
+    def list_products(self) -> List[str]:
+        """All distinct product names, sorted."""
+        rows = self._conn.execute('SELECT DISTINCT product FROM rtfp_prices ORDER BY product')
+        return [row['product'] for row in rows]
+
+    def match_products(self, keyword: str) -> List[str]:
+        """Products whose name contains the keyword (case-insensitive)."""
+        keyword = keyword.lower()
+        return [p for p in self.list_products() if keyword in p.lower()]
+
+    def recent_prices(self, products: List[str], limit: int = 10) -> List[Dict]:
+        """Most recent price records for the given products (uses the product/date index)."""
+        if not products:
+            return []
+        placeholders = ','.join('?' * len(products))
+        rows = self._conn.execute(
+            f'SELECT market, product, date, price FROM rtfp_prices '
+            f'WHERE product IN ({placeholders}) ORDER BY date DESC LIMIT ?',
+            (*products, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def max_date(self) -> Optional[str]:
+        """Newest stored record date (the incremental sync watermark)."""
+        return self._conn.execute('SELECT MAX(date) FROM rtfp_prices').fetchone()[0]
+
+    def last_synced_at(self) -> Optional[datetime]:
+        """Timestamp of the last successful sync, if any."""
+        value = self.get_state('last_synced_at')
+        return datetime.fromisoformat(value) if value else None
@@ -7,6 +7,12 @@ class AdminAuditLog(db.Model):
     """Model untuk mencatat semua aksi admin (audit trail)."""
     
     __tablename__ = 'admin_audit_log'
+    __table_args__ = (
+        # Admin console filters by action/table and always sorts newest first
+        db.Index('ix_audit_action_created', 'action', 'created_at'),
+        db.Index('ix_audit_table_created', 'table_name', 'created_at'),
+        db.Index('ix_audit_username_created', 'username', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -7,6 +7,9 @@ class ManualPrice(db.Model):
     """Model untuk menyimpan harga manual komoditas."""
     
     __tablename__ = 'manual_prices'
+    __table_args__ = (
+        db.Index('ix_manual_price_commodity_date', 'commodity_id', 'price_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     commodity_id = db.Column(db.Integer, db.ForeignKey('commodities.id'), nullable=False, index=True)
@@ -7,6 +7,10 @@ class UserActivity(db.Model):
     """Model for logging user activities across all sessions."""
     
     __tablename__ = 'user_activities'
+    __table_args__ = (
+        db.Index('ix_activity_action_timestamp', 'action', 'timestamp'),
+        db.Index('ix_activity_username_timestamp', 'username', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
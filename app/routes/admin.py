@@ -1,11 +1,13 @@
 """Admin API routes for managing commodities, prices, and users."""
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from app import db
-from app.models import User, Commodity, ManualPrice, AdminAuditLog
+from app.models import User, Commodity, ManualPrice, AdminAuditLog, UserActivity
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -46,6 +48,50 @@ def log_admin_action(action, table_name=None, record_id=None, old_values=None, n
     )
 
 
+# ========== QUERY HELPERS ==========
+def paginate(query, default_per_page=None):
+    """Paginate a query using page/per_page args, capped at MAX_ITEMS_PER_PAGE."""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = request.args.get('per_page', default_per_page or current_app.config['ITEMS_PER_PAGE'], type=int)
+    per_page = min(max(per_page, 1), current_app.config['MAX_ITEMS_PER_PAGE'])
+    
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    return pagination.items, {
+        'page': page,
+        'per_page': per_page,
+        'total': pagination.total,
+        'pages': pagination.pages
+    }
+
+
+def parse_date_arg(name):
+    """Parse an optional YYYY-MM-DD query argument."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def filter_date_range(query, column):
+    """Apply date_from/date_to (inclusive) query args to a datetime column."""
+    date_from = parse_date_arg('date_from')
+    date_to = parse_date_arg('date_to')
+    if date_from:
+        query = query.filter(column >= date_from)
+    if date_to:
+        query = query.filter(column < date_to + timedelta(days=1))
+    return query
+
+
+def count_by(query, column):
+    """Server-side GROUP BY count for the filtered query."""
+    rows = query.with_entities(column, func.count()).group_by(column).all()
+    return {key: count for key, count in rows if key is not None}
+
+
 # ========== AUTH ENDPOINTS ==========
 @admin_bp.route('/login', methods=['POST'])
 def admin_login():
@@ -123,6 +169,8 @@ def get_dashboard_stats():
         'unverified_prices': ManualPrice.query.filter_by(is_verified=False).count(),
         'total_users': User.query.count(),
         'admin_users': User.query.filter_by(role='admin').count(),
+        'total_audit_logs': AdminAuditLog.query.count(),
+        'total_user_activities': UserActivity.query.count(),
         'recent_activity': AdminAuditLog.get_activity_summary(days=7)
     }
     
@@ -136,9 +184,7 @@ def get_dashboard_stats():
 @admin_bp.route('/commodities', methods=['GET'])
 @admin_required
 def list_commodities():
-    """List all commodities with optional filtering."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    """List commodities with server-side filtering, pagination and category counts."""
     category = request.args.get('category')
     search = request.args.get('search')
     active_only = request.args.get('active_only', 'true').lower() == 'true'
@@ -147,8 +193,6 @@ def list_commodities():
     
     if active_only:
         query = query.filter(Commodity.is_active == True)
-    if category:
-        query = query.filter(Commodity.category == category)
     if search:
         query = query.filter(
             db.or_(
@@ -157,19 +201,19 @@ def list_commodities():
             )
         )
     
-    pagination = query.order_by(Commodity.name).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    # Category counts ignore the category filter so the UI can show every facet
+    category_counts = count_by(query, Commodity.category)
+    
+    if category:
+        query = query.filter(Commodity.category == category)
+    
+    items, page_info = paginate(query.order_by(Commodity.name))
     
     return jsonify({
         'success': True,
-        'commodities': [c.to_dict() for c in pagination.items],
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total': pagination.total,
-            'pages': pagination.pages
-        }
+        'commodities': [c.to_dict() for c in items],
+        'pagination': page_info,
+        'counts': {'by_category': category_counts}
     })
 
 
@@ -314,29 +358,42 @@ def bulk_import_commodities():
     updated = 0
     errors = []
     
+    # One query for all existing names instead of one per row
+    names = {item.get('name') for item in data if isinstance(item, dict) and item.get('name')}
+    existing_by_name = {
+        c.name: c for c in Commodity.query.filter(Commodity.name.in_(names)).all()
+    } if names else {}
+    
+    new_commodities = []
     for item in data:
-        try:
-            existing = Commodity.query.filter_by(name=item.get('name')).first()
-            if existing:
-                # Update existing
-                for field in ['category', 'subcategory', 'unit', 'price_reference']:
-                    if field in item:
-                        setattr(existing, field, item[field])
-                updated += 1
-            else:
-                # Create new
-                commodity = Commodity(
-                    name=item['name'],
-                    category=item.get('category', 'Lainnya'),
-                    unit=item.get('unit', 'kg'),
-                    price_reference=item.get('price_reference'),
-                    created_by=g.current_user.id
-                )
-                db.session.add(commodity)
-                created += 1
-        except Exception as e:
-            errors.append({'item': item.get('name'), 'error': str(e)})
+        if not isinstance(item, dict) or not item.get('name'):
+            errors.append({'item': item.get('name') if isinstance(item, dict) else None,
+                           'error': 'name is required'})
+            continue
+    
+        existing = existing_by_name.get(item['name'])
+        if existing:
+            # Update existing
+            for field in ['category', 'subcategory', 'unit', 'price_reference', 'is_active']:
+                if field in item:
+                    setattr(existing, field, item[field])
+            existing.updated_by = g.current_user.id
+            updated += 1
+        else:
+            # Create new
+            commodity = Commodity(
+                name=item['name'],
+                category=item.get('category', 'Lainnya'),
+                unit=item.get('unit', 'kg'),
+                price_reference=item.get('price_reference'),
+                is_active=item.get('is_active', True),
+                created_by=g.current_user.id
+            )
+            new_commodities.append(commodity)
+            existing_by_name[commodity.name] = commodity
+            created += 1
     
+    db.session.add_all(new_commodities)
     db.session.commit()
     
     log_admin_action('BULK_IMPORT', 'commodities', 
@@ -357,32 +414,30 @@ def bulk_import_commodities():
 @admin_bp.route('/prices', methods=['GET'])
 @admin_required
 def list_manual_prices():
-    """List all manual prices."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    """List manual prices with server-side filtering and pagination."""
     commodity_id = request.args.get('commodity_id', type=int)
     province_id = request.args.get('province_id', type=int)
+    price_type = request.args.get('price_type')
+    search = request.args.get('search')
     
-    query = ManualPrice.query
+    query = ManualPrice.query.options(joinedload(ManualPrice.commodity))
     
     if commodity_id:
         query = query.filter(ManualPrice.commodity_id == commodity_id)
     if province_id:
         query = query.filter(ManualPrice.province_id == province_id)
+    if price_type:
+        query = query.filter(ManualPrice.price_type == price_type)
+    if search:
+        query = query.join(Commodity).filter(Commodity.name.ilike(f'%{search}%'))
+    query = filter_date_range(query, ManualPrice.price_date)
     
-    pagination = query.order_by(ManualPrice.price_date.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    items, page_info = paginate(query.order_by(ManualPrice.price_date.desc(), ManualPrice.id.desc()))
     
     return jsonify({
         'success': True,
-        'prices': [p.to_dict() for p in pagination.items],
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total': pagination.total,
-            'pages': pagination.pages
-        }
+        'prices': [p.to_dict() for p in items],
+        'pagination': page_info
     })
 
 
@@ -446,34 +501,105 @@ def delete_manual_price(id):
 @admin_bp.route('/audit-log', methods=['GET'])
 @admin_required
 def get_audit_log():
-    """Get audit log entries."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    """Get audit log entries (filtered, paginated, newest first)."""
     action = request.args.get('action')
     table_name = request.args.get('table')
     user_id = request.args.get('user_id', type=int)
+    username = request.args.get('username')
     
     query = AdminAuditLog.query
     
-    if action:
-        query = query.filter(AdminAuditLog.action == action)
     if table_name:
         query = query.filter(AdminAuditLog.table_name == table_name)
     if user_id:
         query = query.filter(AdminAuditLog.user_id == user_id)
+    if username:
+        query = query.filter(AdminAuditLog.username == username)
+    query = filter_date_range(query, AdminAuditLog.created_at)
     
-    pagination = query.order_by(AdminAuditLog.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    action_counts = count_by(query, AdminAuditLog.action)
+    
+    if action:
+        query = query.filter(AdminAuditLog.action == action)
+    
+    items, page_info = paginate(query.order_by(AdminAuditLog.created_at.desc()), default_per_page=50)
+    
+    return jsonify({
+        'success': True,
+        'logs': [l.to_dict() for l in items],
+        'pagination': page_info,
+        'counts': {'by_action': action_counts}
+    })
+
+
+@admin_bp.route('/audit-log', methods=['POST'])
+@admin_required
+def create_audit_log():
+    """Record an admin action performed outside this API (e.g. dashboard user management)."""
+    data = request.get_json() or {}
+    
+    if not data.get('action') or not data.get('table'):
+        return jsonify({
+            'success': False,
+            'error': 'action and table are required'
+        }), 400
+    
+    log_admin_action(data['action'], data['table'], data.get('record_id'), notes=data.get('notes'))
+    
+    return jsonify({
+        'success': True,
+        'message': 'Action logged'
+    }), 201
+
+
+# ========== USER ACTIVITY ==========
+@admin_bp.route('/user-activity', methods=['GET'])
+@admin_required
+def get_user_activity():
+    """Get user activity entries (filtered, paginated, newest first)."""
+    action = request.args.get('action')
+    username = request.args.get('username')
+    
+    query = UserActivity.query
+    
+    if username:
+        query = query.filter(UserActivity.username == username)
+    query = filter_date_range(query, UserActivity.timestamp)
+    
+    action_counts = count_by(query, UserActivity.action)
+    
+    if action:
+        query = query.filter(UserActivity.action == action)
+    
+    items, page_info = paginate(query.order_by(UserActivity.timestamp.desc()), default_per_page=50)
+    
+    return jsonify({
+        'success': True,
+        'activities': [a.to_dict() for a in items],
+        'pagination': page_info,
+        'counts': {'by_action': action_counts}
+    })
+
+
+@admin_bp.route('/user-activity/summary', methods=['GET'])
+@admin_required
+def get_user_activity_summary():
+    """Aggregates for analytics charts: counts per action, per day and distinct users."""
+    days = min(request.args.get('days', 30, type=int), 365)
+    since = datetime.utcnow() - timedelta(days=days)
+    query = UserActivity.query.filter(UserActivity.timestamp >= since)
+    
+    day = func.date(UserActivity.timestamp)
+    daily = query.with_entities(day, func.count()).group_by(day).order_by(day).all()
+    usernames = db.session.query(UserActivity.username).distinct().order_by(UserActivity.username).all()
     
     return jsonify({
         'success': True,
-        'logs': [l.to_dict() for l in pagination.items],
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total': pagination.total,
-            'pages': pagination.pages
+        'summary': {
+            'days': days,
+            'by_action': count_by(query, UserActivity.action),
+            'daily': [{'date': str(d), 'count': c} for d, c in daily],
+            'usernames': [u[0] for u in usernames]
         }
     })
 
@@ -2,27 +2,33 @@
 from flask import Blueprint, request, jsonify
 from app import limiter
 from app.services.knowledge_service import KnowledgeService
+from app.utils.response_cache import cached_json
 
 knowledge_bp = Blueprint('knowledge', __name__)
 
 
+def _wrap(data, allow_empty=False):
+    """Success envelope for cached responses (None = not found, not cached)."""
+    if not data and not allow_empty:
+        return None
+    return {'success': True, 'data': data}
+
+
 @knowledge_bp.route('/crop/<commodity>', methods=['GET'])
 @limiter.limit("50 per hour")
 def get_crop_knowledge(commodity):
     """Get knowledge base for specific crop."""
     try:
-        knowledge = KnowledgeService.get_crop_knowledge(commodity)
+        response = cached_json(f'knowledge:crop:{commodity}', lambda: _wrap(
+            KnowledgeService.get_crop_knowledge(commodity)))
         
-        if not knowledge:
+        if response is None:
             return jsonify({
                 'success': False,
                 'error': 'Knowledge not found for this commodity'
             }), 404
         
-        return jsonify({
-            'success': True,
-            'data': knowledge
-        }), 200
+        return response
         
     except Exception as e:
         return jsonify({
@@ -37,12 +43,8 @@ def get_crop_knowledge(commodity):
 def get_commodities():
     """Get list of all available commodities."""
     try:
-        commodities = KnowledgeService.get_all_commodities()
-        
-        return jsonify({
-            'success': True,
-            'data': commodities
-        }), 200
+        return cached_json('knowledge:commodities', lambda: _wrap(
+            KnowledgeService.get_all_commodities(), allow_empty=True))
         
     except Exception as e:
         return jsonify({
@@ -57,18 +59,16 @@ def get_commodities():
 def get_commodity_guide(commodity):
     """Get comprehensive guide for specific commodity."""
     try:
-        guide = KnowledgeService.get_commodity_guide(commodity)
+        response = cached_json(f'knowledge:guide:{commodity}', lambda: _wrap(
+            KnowledgeService.get_commodity_guide(commodity)))
         
-        if not guide:
+        if response is None:
             return jsonify({
                 'success': False,
                 'error': 'Guide not available for this commodity'
             }), 404
         
-        return jsonify({
-            'success': True,
-            'data': guide
-        }), 200
+        return response
         
     except Exception as e:
         return jsonify({
@@ -83,12 +83,8 @@ def get_commodity_guide(commodity):
 def get_ph_info():
     """Get pH knowledge base information."""
     try:
-        info = KnowledgeService.get_ph_knowledge()
-        
-        return jsonify({
-            'success': True,
-            'data': info
-        }), 200
+        return cached_json('knowledge:ph-info', lambda: _wrap(
+            KnowledgeService.get_ph_knowledge(), allow_empty=True))
         
     except Exception as e:
         return jsonify({
@@ -103,12 +99,8 @@ def get_ph_info():
 def get_diagnostic_tree():
     """Get plant disease diagnostic decision tree."""
     try:
-        tree = KnowledgeService.get_diagnostic_tree()
-        
-        return jsonify({
-            'success': True,
-            'data': tree
-        }), 200
+        return cached_json('knowledge:diagnostic-tree', lambda: _wrap(
+            KnowledgeService.get_diagnostic_tree(), allow_empty=True))
         
     except Exception as e:
         return jsonify({
@@ -123,12 +115,8 @@ def get_diagnostic_tree():
 def get_fertilizer_data():
     """Get fertilizer composition data."""
     try:
-        data = KnowledgeService.get_fertilizer_data()
-        
-        return jsonify({
-            'success': True,
-            'data': data
-        }), 200
+        return cached_json('knowledge:fertilizer-data', lambda: _wrap(
+            KnowledgeService.get_fertilizer_data(), allow_empty=True))
         
     except Exception as e:
         return jsonify({
@@ -11,6 +11,7 @@ from app.services.market_service import MarketService
 from app.services.ml_service import MLService
 from app.services.chatbot_service import ChatbotService
 from app.models.npk_reading import NpkReading
+from app.utils.response_cache import cached_json
 from app import db
 
 legacy_bp = Blueprint('legacy', __name__)
@@ -34,6 +35,18 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _success(data, allow_empty=False):
+    """Success envelope for cached responses (None = not found, not cached)."""
+    if not data and not allow_empty:
+        return None
+    return {'success': True, 'data': data}
+
+
+def _request_params():
+    """Query string for GET (HTTP-cacheable), JSON body for the old POST calls."""
+    return request.args if request.method == 'GET' else request.get_json()
+
+
 @legacy_bp.route('/analyze', methods=['POST'])
 def analyze_bwd_endpoint():
     """Legacy BWD analysis endpoint."""
@@ -172,16 +185,16 @@ def get_prices_endpoint():
         return jsonify({'success': False, 'error': 'Kesalahan internal pada data harga.'}), 500
 
 
-@legacy_bp.route('/get-knowledge', methods=['POST'])
+@legacy_bp.route('/get-knowledge', methods=['GET', 'POST'])
 def get_knowledge_endpoint():
     """Legacy knowledge base endpoint."""
     try:
-        data = request.get_json()
-        commodity_id = data.get('commodity')
-        knowledge_data = knowledge_service.get_crop_knowledge(commodity_id)
-        if not knowledge_data:
+        commodity_id = _request_params().get('commodity')
+        response = cached_json(f'legacy:knowledge:{commodity_id}',
+                               lambda: _success(knowledge_service.get_crop_knowledge(commodity_id)))
+        if response is None:
             return jsonify({'success': False, 'error': 'Informasi tidak ditemukan'}), 404
-        return jsonify({'success': True, 'data': knowledge_data})
+        return response
     except Exception as e:
         current_app.logger.error(f"Error in /get-knowledge: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal pada basis pengetahuan.'}), 500
@@ -191,8 +204,8 @@ def get_knowledge_endpoint():
 def get_commodities_endpoint():
     """Legacy commodities list endpoint."""
     try:
-        commodities = knowledge_service.get_all_commodities()
-        return jsonify({'success': True, 'data': commodities})
+        return cached_json('legacy:commodities',
+                           lambda: _success(knowledge_service.get_all_commodities(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error in /commodities: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal saat memuat daftar komoditas.'}), 500
@@ -350,8 +363,8 @@ def get_pest_list_endpoint():
     try:
         from app.data.pest_disease_db import PestDiseaseDatabase
         
-        pest_list = PestDiseaseDatabase.get_pest_list()
-        return jsonify({'success': True, 'data': pest_list})
+        return cached_json('legacy:pest-list',
+                           lambda: _success(PestDiseaseDatabase.get_pest_list(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error in /get-pest-list: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal.'}), 500
@@ -413,16 +426,16 @@ def get_ticker_prices_endpoint():
 
 
 
-@legacy_bp.route('/get-commodity-guide', methods=['POST'])
+@legacy_bp.route('/get-commodity-guide', methods=['GET', 'POST'])
 def get_commodity_guide_endpoint():
     """Legacy commodity guide endpoint."""
     try:
-        data = request.get_json()
-        commodity = data.get('commodity')
-        guide = knowledge_service.get_commodity_guide(commodity)
-        if not guide:
+        commodity = _request_params().get('commodity')
+        response = cached_json(f'legacy:commodity-guide:{commodity}',
+                               lambda: _success(knowledge_service.get_commodity_guide(commodity)))
+        if response is None:
             return jsonify({'success': False, 'error': 'Panduan untuk komoditas ini belum tersedia.'}), 404
-        return jsonify({'success': True, 'data': guide})
+        return response
     except Exception as e:
         current_app.logger.error(f"Error in /get-commodity-guide: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal saat memuat panduan.'}), 500
@@ -432,8 +445,8 @@ def get_commodity_guide_endpoint():
 def get_ph_info_endpoint():
     """Legacy pH knowledge base endpoint."""
     try:
-        info = knowledge_service.get_ph_knowledge()
-        return jsonify({'success': True, 'data': info})
+        return cached_json('legacy:ph-info',
+                           lambda: _success(knowledge_service.get_ph_knowledge(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error in /get-ph-info: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal saat memuat informasi pH.'}), 500
@@ -496,8 +509,8 @@ def calculate_fertilizer_bags_endpoint():
 def get_diagnostic_tree_endpoint():
     """Legacy diagnostic tree endpoint."""
     try:
-        tree = knowledge_service.get_diagnostic_tree()
-        return jsonify({'success': True, 'data': tree})
+        return cached_json('legacy:diagnostic-tree',
+                           lambda: _success(knowledge_service.get_diagnostic_tree(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error di /get-diagnostic-tree: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal saat memuat data diagnostik.'}), 500
@@ -613,8 +626,8 @@ def get_fruit_list_endpoint():
     """Get list of all available fruits."""
     try:
         from app.services.fruit_service import FruitService
-        fruits = FruitService.get_fruit_list()
-        return jsonify({'success': True, 'data': fruits})
+        return cached_json('legacy:fruit-list',
+                           lambda: _success(FruitService.get_fruit_list(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error in /get-fruit-list: {e}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -648,8 +661,8 @@ def get_fruit_info_endpoint():
 def get_commodity_list_endpoint():
     """Get list of all available commodities for the encyclopedia."""
     try:
-        commodities = knowledge_service.get_all_commodities()
-        return jsonify({'success': True, 'data': commodities})
+        return cached_json('legacy:commodities',
+                           lambda: _success(knowledge_service.get_all_commodities(), allow_empty=True))
     except Exception as e:
         current_app.logger.error(f"Error in /get-commodity-list: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Kesalahan internal.'}), 500
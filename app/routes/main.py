@@ -192,8 +192,19 @@ def chatbot():
 
 @main_bp.route('/sw.js')
 def service_worker():
-    """Serve the service worker from root."""
-    return current_app.send_static_file('sw.js')
+    """Serve the service worker from root (always revalidated so releases roll out)."""
+    response = current_app.send_static_file('sw.js')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
+
+
+@main_bp.route('/precache-manifest.js')
+def precache_manifest():
+    """Serve the generated precache manifest (scripts/build_sw_manifest.py)."""
+    response = current_app.send_static_file('precache-manifest.js')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @main_bp.route('/manifest.json')
@@ -1,7 +1,13 @@
 """World Bank Food Price Service."""
-import requests
-from datetime import datetime
+import json
 import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import requests
+
+from app.data.worldbank_price_store import WorldBankPriceStore
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +35,44 @@ class WorldBankService:
         "daging_sapi": "beef"
     }
     
+    # Incremental sync settings
+    PAGE_SIZE = 1000
+    SYNC_INTERVAL = timedelta(hours=6)
+    # Rows dated before (newest stored date - SYNC_OVERLAP) are not rewritten
+    SYNC_OVERLAP = timedelta(days=60)
+    # Safety ceiling for one pass; a pass that hits it is not marked complete
+    MAX_PAGES_PER_SYNC = 500
+
+    # Offline mode: path to a JSON fixture ({"data": [...]} or a list of records)
+    FIXTURE_PATH = os.getenv('WORLDBANK_FIXTURE')
+
+    _store = None
+    _sync_thread = None
+    _sync_lock = threading.Lock()
+
+    @classmethod
+    def get_store(cls):
+        """Lazily create the local price warehouse."""
+        if cls._store is None:
+            cls._store = WorldBankPriceStore()
+        return cls._store
+
+    @classmethod
+    def configure(cls, store=None, fixture_path=None):
+        """Swap the store and/or fixture (used by tests and offline deployments)."""
+        cls._store = store
+        cls.FIXTURE_PATH = fixture_path
+
     @classmethod
-    def fetch_latest_prices(cls, limit=1000):
-        """Fetch latest food prices from World Bank API."""
+    def fetch_latest_prices(cls, limit=1000, offset=0):
+        """Fetch one page of food prices from World Bank API (or the offline fixture)."""
+        if cls.FIXTURE_PATH:
+            return cls._load_fixture(limit, offset)
+
         try:
             params = {
                 'limit': limit,
+                'offset': offset,
                 'format': 'json'
             }
             
@@ -42,89 +80,131 @@ class WorldBankService:
             response.raise_for_status()
             
             data = response.json()
-            
-            # DEBUG: Print structure
-            print(f"\n[DEBUG] Response keys: {data.keys() if isinstance(data, dict) else 'Not a dict'}")
-            if isinstance(data, dict) and 'data' in data:
-                print(f"[DEBUG] Data length: {len(data['data'])}")
-                if data['data']:
-                    print(f"[DEBUG] First record keys: {data['data'][0].keys()}")
-                    print(f"[DEBUG] First record sample: {data['data'][0]}")
-            elif isinstance(data, list):
-                print(f"[DEBUG] Response is a list with {len(data)} items")
-                if data:
-                    print(f"[DEBUG] First item: {data[0]}")
-            
-            logger.info(f"Fetched {len(data.get('data', []))} price records from World Bank")
+            logger.debug(f"Fetched {len(data.get('data', []))} price records from World Bank (offset {offset})")
             return data
             
         except Exception as e:
             logger.error(f"Error fetching World Bank data: {e}")
-            print(f"[ERROR] {e}")
             return None
+
+    @classmethod
+    def _load_fixture(cls, limit, offset):
+        """Serve a page from the local JSON fixture."""
+        with open(cls.FIXTURE_PATH, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        records = payload.get('data', []) if isinstance(payload, dict) else payload
+        return {'data': records[offset:offset + limit]}
+
+    @classmethod
+    def sync_prices(cls, force=False, full=False):
+        """
+        Page the RTFP table into the local warehouse.
+
+        The API has no date filter and no guaranteed row order, so every pass
+        reads the table from the start instead of resuming from a stored
+        offset. Only rows dated on or after the newest stored date minus
+        SYNC_OVERLAP are upserted (`full` upserts everything); late
+        corrections inside the window overwrite the stored row. The sync is
+        marked complete only when a short page is reached. Skipped when the
+        last complete sync is younger than SYNC_INTERVAL unless `force` is set.
+
+        Blocking - call it from sync_in_background() or the CLI, not from a request.
+        """
+        store = cls.get_store()
+        last_synced = store.last_synced_at()
+        if not force and not full and last_synced and datetime.now() - last_synced < cls.SYNC_INTERVAL:
+            return 0
+
+        since = None if full else cls._overlap_start(store.max_date())
+        offset = 0
+        written = 0
+        for _ in range(cls.MAX_PAGES_PER_SYNC):
+            data = cls.fetch_latest_prices(limit=cls.PAGE_SIZE, offset=offset)
+            if not data or 'data' not in data:
+                # Keep previously synced data; retry on the next call
+                return written
+            page = data['data']
+            if since:
+                page = [r for r in page if str(r.get('date') or '')[:10] >= since]
+            written += store.upsert_records(page)
+            offset += len(data['data'])
+            if len(data['data']) < cls.PAGE_SIZE:
+                break
+        else:
+            logger.warning(f"World Bank sync stopped after {cls.MAX_PAGES_PER_SYNC} pages; will retry")
+            return written
+
+        store.set_state('last_synced_at', datetime.now().isoformat())
+        logger.info(f"World Bank sync stored {written} records ({offset} rows read, since {since or 'start'})")
+        return written
+
+    @classmethod
+    def _overlap_start(cls, max_date):
+        """First date (YYYY-MM-DD) re-synced in an incremental pass, or None for all rows."""
+        if not max_date:
+            return None
+        try:
+            newest = datetime.fromisoformat(max_date[:10])
+        except ValueError:
+            return None
+        return (newest - cls.SYNC_OVERLAP).strftime('%Y-%m-%d')
+
+    @classmethod
+    def sync_in_background(cls, force=False):
+        """
+        Start sync_prices() in a daemon thread if a sync is due.
+
+        Returns the running thread (an already running one is reused), or
+        None when the local data is still fresh.
+        """
+        with cls._sync_lock:
+            if cls._sync_thread is not None and cls._sync_thread.is_alive():
+                return cls._sync_thread
+            last_synced = cls.get_store().last_synced_at()
+            if not force and last_synced and datetime.now() - last_synced < cls.SYNC_INTERVAL:
+                return None
+            cls._sync_thread = threading.Thread(
+                target=cls._run_sync, kwargs={'force': True}, name='worldbank-sync', daemon=True
+            )
+            cls._sync_thread.start()
+            return cls._sync_thread
+
+    @classmethod
+    def _run_sync(cls, force=False):
+        try:
+            cls.sync_prices(force=force)
+        except Exception as e:
+            logger.error(f"World Bank background sync failed: {e}")
     
     @classmethod
     def get_price_for_commodity(cls, commodity_id):
-        """Get current price for a specific commodity."""
+        """Get current price for a specific commodity from the local warehouse."""
         # Map to World Bank product name
         wb_product = cls.COMMODITY_MAP.get(commodity_id)
         if not wb_product:
             logger.warning(f"Commodity {commodity_id} not mapped to World Bank product")
             return None
         
-        # Fetch data
-        data = cls.fetch_latest_prices(limit=500)
-        if not data or 'data' not in data:
-            return None
-        
-        # Filter for the specific product and get recent prices
-        prices = []
-        for record in data['data']:
-            product_name = record.get('product', '').lower()
-            if wb_product.lower() in product_name:
-                try:
-                    price = float(record.get('price', 0))
-                    market = record.get('market', 'Unknown Market')
-                    date = record.get('date', '')
-                    
-                    if price > 0:
-                        prices.append({
-                            'price': price,
-                            'market': market,
-                            'date': date,
-                            'product': record.get('product')
-                        })
-                except (ValueError, TypeError):
-                    continue
-        
-        if not prices:
-            logger.warning(f"No price data found for {wb_product}")
+        cls.sync_in_background()
+        store = cls.get_store()
+
+        # Take 10 most recent records across matching products
+        recent_prices = store.recent_prices(store.match_products(wb_product), limit=10)
+        if not recent_prices:
+            logger.warning(f"No price data found for {wb_product} (sync may still be running)")
             return None
         
-        # Sort by date (most recent first) and get average of recent prices
-        prices.sort(key=lambda x: x['date'], reverse=True)
-        recent_prices = prices[:10]  # Take 10 most recent
-        
         avg_price = sum(p['price'] for p in recent_prices) / len(recent_prices)
         
         return {
             'average_price': int(avg_price),
             'sample_size': len(recent_prices),
-            'latest_date': recent_prices[0]['date'] if recent_prices else None,
+            'latest_date': recent_prices[0]['date'],
             'markets': list(set(p['market'] for p in recent_prices))
         }
     
     @classmethod
     def get_all_available_products(cls):
         """Get list of all available products in the dataset."""
-        data = cls.fetch_latest_prices(limit=100)
-        if not data or 'data' not in data:
-            return []
-        
-        products = set()
-        for record in data['data']:
-            product = record.get('product', '')
-            if product:
-                products.add(product)
-        
-        return sorted(list(products))
+        cls.sync_in_background()
+        return cls.get_store().list_products()
@@ -0,0 +1,126 @@
+"""
+Pre-serialized, pre-compressed JSON responses for static knowledge endpoints.
+
+The knowledge/commodity/pest/fruit payloads are large constant dictionaries.
+Instead of re-serializing them on every request, each payload is serialized
+once per deploy (RESPONSE_CACHE_VERSION), compressed with gzip (and brotli
+when installed) and kept in the configured Flask-Caching backend plus a
+process-local copy. Responses carry a strong content ETag and
+Cache-Control, and conditional GETs with a matching If-None-Match get 304.
+"""
+import gzip
+import hashlib
+
+from flask import current_app, request
+
+from app import cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Process-local copy: key -> entry (payloads are constant per deploy)
+_LOCAL = {}
+
+# Suffixes keep the ETag unique per representation (strong validators)
+_ENCODING_SUFFIX = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+
+def _cache_key(key):
+    return f"resp:{current_app.config.get('RESPONSE_CACHE_VERSION', 'dev')}:{key}"
+
+
+def build_entry(payload):
+    """Serialize and compress a payload once: body bytes per encoding plus ETag."""
+    # Same bytes jsonify() would send
+    body = (current_app.json.dumps(payload) + '\n').encode('utf-8')
+    bodies = {'identity': body}
+
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        bodies['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            bodies['br'] = compressed
+
+    return {'etag': hashlib.sha256(body).hexdigest()[:32], 'bodies': bodies}
+
+
+def get_entry(key, build):
+    """
+    Cached entry for `key`; build() (returning the payload) only runs on a miss.
+
+    A build() result of None (e.g. unknown commodity) is not cached.
+    """
+    full_key = _cache_key(key)
+    entry = _LOCAL.get(full_key)
+    if entry is not None:
+        return entry
+
+    try:
+        entry = cache.get(full_key)
+    except Exception as e:
+        current_app.logger.warning(f"Response cache read failed for {key}: {e}")
+        entry = None
+
+    if entry is None:
+        payload = build()
+        if payload is None:
+            return None
+        entry = build_entry(payload)
+        try:
+            cache.set(full_key, entry, timeout=current_app.config.get('RESPONSE_CACHE_TIMEOUT', 0))
+        except Exception as e:
+            current_app.logger.warning(f"Response cache write failed for {key}: {e}")
+
+    _LOCAL[full_key] = entry
+    return entry
+
+
+def _negotiate(bodies):
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in bodies and accepted[encoding] > 0:
+            return encoding
+    return 'identity'
+
+
+def respond(entry, status=200):
+    """Response for a cache entry: content negotiation, ETag, Cache-Control, 304."""
+    etags = {encoding: entry['etag'] + suffix for encoding, suffix in _ENCODING_SUFFIX.items()}
+    encoding = _negotiate(entry['bodies'])
+
+    # Any representation the client already holds is still current
+    if request.method in ('GET', 'HEAD') and any(
+            request.if_none_match.contains_weak(tag) for tag in etags.values()):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry['bodies'][encoding], status=status,
+                                              mimetype=current_app.json.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etags[encoding])
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('RESPONSE_CACHE_MAX_AGE', 3600)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def cached_json(key, build):
+    """
+    JSON response for a static payload, or None when build() finds nothing.
+
+    Example:
+        response = cached_json('knowledge:ph-info',
+                               lambda: {'success': True, 'data': KnowledgeService.get_ph_knowledge()})
+    """
+    entry = get_entry(key, build)
+    return respond(entry) if entry is not None else None
+
+
+def clear_local():
+    """Drop the process-local copies (the shared backend is keyed by deploy version)."""
+    _LOCAL.clear()
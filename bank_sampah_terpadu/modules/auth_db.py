@@ -4,6 +4,31 @@ import datetime
 
 DB_FILE = "users.db"
 
+# Material weight columns (db name -> label used by the UI / legacy CSV)
+MATERIAL_COLUMNS = {
+    'burnable': 'Burnable', 'paper': 'Paper', 'cloth': 'Cloth',
+    'cans': 'Cans', 'electronics': 'Electronics', 'pet_bottles': 'PET_Bottles',
+    'plastic_marks': 'Plastic_Marks', 'white_trays': 'White_Trays',
+    'glass_bottles': 'Glass_Bottles', 'metal_small': 'Metal_Small',
+    'hazardous': 'Hazardous',
+}
+TOTAL_COLUMNS = {
+    'total_kg': 'Total_KG',
+    'total_paid': 'Total_Bayar_Nasabah',
+    'total_revenue': 'Est_Pendapatan_Bank',
+    'profit': 'Est_Profit',
+}
+COLUMN_LABELS = {
+    'timestamp': 'Timestamp', 'tanggal': 'Tanggal', 'nasabah': 'Nasabah',
+    'petugas': 'Petugas', 'lokasi': 'Lokasi',
+    **MATERIAL_COLUMNS,
+    **TOTAL_COLUMNS,
+}
+
+# Rollups: one row per (petugas, hari) and per (petugas, bulan), summed incrementally
+ROLLUP_SUM_COLUMNS = list(MATERIAL_COLUMNS) + list(TOTAL_COLUMNS)
+ROLLUP_TABLES = {'daily': ('rollup_daily', 'tanggal'), 'monthly': ('rollup_monthly', 'bulan')}
+
 def get_connection():
     """Create a database connection."""
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
@@ -48,10 +73,62 @@ def init_db():
             profit INTEGER
         )
     ''')
-    
+
+    # Rollup Tables (daily & monthly per petugas, per material)
+    sum_columns = ",\n            ".join(f"{col} REAL NOT NULL DEFAULT 0" for col in ROLLUP_SUM_COLUMNS)
+    for table, period in ROLLUP_TABLES.values():
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                petugas TEXT NOT NULL,
+                {period} TEXT NOT NULL,
+                n_transaksi INTEGER NOT NULL DEFAULT 0,
+                {sum_columns},
+                PRIMARY KEY (petugas, {period})
+            ) WITHOUT ROWID
+        ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_petugas_tanggal ON transactions (petugas, tanggal)")
+
+    # Backfill / self-heal: rollups must account for every stored transaction
+    counted = c.execute("SELECT COALESCE(SUM(n_transaksi), 0) FROM rollup_daily").fetchone()[0]
+    stored = c.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    if counted != stored:
+        _rebuild_rollups(c)
+
     conn.commit()
     conn.close()
 
+def _rebuild_rollups(c):
+    """Recompute both rollup tables from the transactions table."""
+    sums = ", ".join(f"SUM(COALESCE({col}, 0))" for col in ROLLUP_SUM_COLUMNS)
+    columns = ", ".join(ROLLUP_SUM_COLUMNS)
+    c.execute("DELETE FROM rollup_daily")
+    c.execute("DELETE FROM rollup_monthly")
+    c.execute(f'''
+        INSERT INTO rollup_daily (petugas, tanggal, n_transaksi, {columns})
+        SELECT COALESCE(petugas, ''), substr(tanggal, 1, 10), COUNT(*), {sums}
+        FROM transactions GROUP BY 1, 2
+    ''')
+    sums = ", ".join(f"SUM({col})" for col in ROLLUP_SUM_COLUMNS)
+    c.execute(f'''
+        INSERT INTO rollup_monthly (petugas, bulan, n_transaksi, {columns})
+        SELECT petugas, substr(tanggal, 1, 7), SUM(n_transaksi), {sums}
+        FROM rollup_daily GROUP BY 1, 2
+    ''')
+
+def _add_to_rollups(c, petugas, tanggal, values):
+    """Add one transaction to its daily and monthly rollup rows (same DB transaction as the insert)."""
+    columns = ", ".join(ROLLUP_SUM_COLUMNS)
+    placeholders = ", ".join("?" * len(ROLLUP_SUM_COLUMNS))
+    updates = ", ".join(f"{col} = {col} + excluded.{col}" for col in ROLLUP_SUM_COLUMNS)
+    day = str(tanggal)[:10]
+    for (table, period), key in zip(ROLLUP_TABLES.values(), (day, day[:7])):
+        c.execute(f'''
+            INSERT INTO {table} (petugas, {period}, n_transaksi, {columns})
+            VALUES (?, ?, 1, {placeholders})
+            ON CONFLICT (petugas, {period}) DO UPDATE SET
+                n_transaksi = n_transaksi + 1, {updates}
+        ''', (petugas or '', key, *[v or 0 for v in values]))
+
 def create_user(email, password_hash, name, role="user"):
     """Register a new user."""
     conn = get_connection()
@@ -93,6 +170,12 @@ def save_transaction(data):
     c = conn.cursor()
     
     try:
+        values = (
+            data['Burnable'], data['Paper'], data['Cloth'], data['Cans'],
+            data['Electronics'], data['PET_Bottles'], data['Plastic_Marks'],
+            data['White_Trays'], data['Glass_Bottles'], data['Metal_Small'], data['Hazardous'],
+            data['total_kg'], data['Total_Bayar_Nasabah'], data['Est_Pendapatan_Bank'], data['Est_Profit']
+        )
         c.execute('''
             INSERT INTO transactions (
                 timestamp, tanggal, nasabah, petugas, lokasi,
@@ -103,11 +186,9 @@ def save_transaction(data):
         ''', (
             datetime.datetime.now(),
             data['Tanggal'], data['Nasabah'], data['Petugas'], data['Lokasi'],
-            data['Burnable'], data['Paper'], data['Cloth'], data['Cans'],
-            data['Electronics'], data['PET_Bottles'], data['Plastic_Marks'],
-            data['White_Trays'], data['Glass_Bottles'], data['Metal_Small'], data['Hazardous'],
-            data['total_kg'], data['Total_Bayar_Nasabah'], data['Est_Pendapatan_Bank'], data['Est_Profit']
+            *values
         ))
+        _add_to_rollups(c, data['Petugas'], data['Tanggal'], values)
         conn.commit()
         return True
     except Exception as e:
@@ -132,23 +213,111 @@ def get_all_transactions(petugas_filter=None):
         # or just map them properly in the dashboard.
         
         # Mapping back to friendly names for display
-        mapper = {
-            'timestamp': 'Timestamp', 'tanggal': 'Tanggal', 'nasabah': 'Nasabah',
-            'petugas': 'Petugas', 'lokasi': 'Lokasi',
-            'burnable': 'Burnable', 'paper': 'Paper', 'cloth': 'Cloth',
-            'cans': 'Cans', 'electronics': 'Electronics', 'pet_bottles': 'PET_Bottles',
-            'plastic_marks': 'Plastic_Marks', 'white_trays': 'White_Trays',
-            'glass_bottles': 'Glass_Bottles', 'metal_small': 'Metal_Small',
-            'hazardous': 'Hazardous',
-            'total_kg': 'Total_KG',
-            'total_paid': 'Total_Bayar_Nasabah',
-            'total_revenue': 'Est_Pendapatan_Bank',
-            'profit': 'Est_Profit'
-        }
-        df.rename(columns=mapper, inplace=True)
+        df.rename(columns=COLUMN_LABELS, inplace=True)
         return df
     except Exception as e:
         print(f"Error reading transactions: {e}")
         return pd.DataFrame()
     finally:
         conn.close()
+
+# ===== Rollup queries (dashboard) =====
+
+def _as_date(value):
+    return None if value is None else pd.Timestamp(value).date()
+
+def _rollup_parts(start_date=None, end_date=None):
+    """Split [start, end] into (rollup, lo, hi_exclusive) pieces: whole months from
+    rollup_monthly, the partial months at both edges from rollup_daily."""
+    start, end = _as_date(start_date), _as_date(end_date)
+    after_end = None if end is None else end + datetime.timedelta(days=1)
+
+    first_month = start
+    if start is not None and start.day != 1:
+        first_month = (start.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    last_month = None if after_end is None else after_end.replace(day=1)
+
+    if first_month is not None and last_month is not None and first_month >= last_month:
+        return [('daily', start.isoformat(), after_end.isoformat())]
+
+    parts = [('monthly',
+              first_month and first_month.strftime('%Y-%m'),
+              last_month and last_month.strftime('%Y-%m'))]
+    if start is not None and start < first_month:
+        parts.append(('daily', start.isoformat(), first_month.isoformat()))
+    if after_end is not None and last_month < after_end:
+        parts.append(('daily', last_month.isoformat(), after_end.isoformat()))
+    return parts
+
+def _query_rollups(petugas_filter, parts, group_by=None):
+    """Sum rollup rows of every part; group_by: None, 'day' or 'month'."""
+    sums = ", ".join(f"SUM({col}) AS {col}" for col in ROLLUP_SUM_COLUMNS)
+    frames = []
+    conn = get_connection()
+    try:
+        for rollup, lo, hi in parts:
+            table, period = ROLLUP_TABLES[rollup]
+            key = {None: "NULL", 'day': period, 'month': f"substr({period}, 1, 7)"}[group_by]
+            where, params = [], []
+            if petugas_filter:
+                where.append("petugas = ?")
+                params.append(petugas_filter)
+            if lo is not None:
+                where.append(f"{period} >= ?")
+                params.append(lo)
+            if hi is not None:
+                where.append(f"{period} < ?")
+                params.append(hi)
+            query = f"SELECT {key} AS periode, SUM(n_transaksi) AS n_transaksi, {sums} FROM {table}"
+            if where:
+                query += " WHERE " + " AND ".join(where)
+            query += " GROUP BY periode"
+            frames.append(pd.read_sql_query(query, conn, params=params))
+    finally:
+        conn.close()
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if df.empty:
+        return pd.DataFrame(columns=['periode', 'n_transaksi'] + ROLLUP_SUM_COLUMNS)
+    if group_by is None:
+        return df.drop(columns='periode').sum().to_frame().T
+    return df.groupby('periode', as_index=False).sum().sort_values('periode')
+
+def get_transaction_date_range(petugas_filter=None):
+    """(first, last) transaction date from the daily rollup, or (None, None)."""
+    conn = get_connection()
+    try:
+        query = "SELECT MIN(tanggal), MAX(tanggal) FROM rollup_daily"
+        params = ()
+        if petugas_filter:
+            query += " WHERE petugas = ?"
+            params = (petugas_filter,)
+        first, last = conn.execute(query, params).fetchone()
+    finally:
+        conn.close()
+    return _as_date(first), _as_date(last)
+
+def get_rollup_totals(petugas_filter=None, start_date=None, end_date=None):
+    """Totals per material + financials for [start_date, end_date] (inclusive), keyed by display label."""
+    df = _query_rollups(petugas_filter, _rollup_parts(start_date, end_date))
+    row = df.iloc[0] if not df.empty else {}
+    totals = {'Jumlah_Transaksi': int(row.get('n_transaksi', 0) or 0)}
+    totals.update({COLUMN_LABELS[col]: float(row.get(col, 0) or 0) for col in ROLLUP_SUM_COLUMNS})
+    return totals
+
+def get_rollup_trend(petugas_filter=None, start_date=None, end_date=None, granularity='daily'):
+    """Per-day (or per-month) material/financial sums as a DataFrame with a 'Tanggal' column."""
+    if granularity == 'daily':
+        start, end = _as_date(start_date), _as_date(end_date)
+        parts = [('daily',
+                  start and start.isoformat(),
+                  end and (end + datetime.timedelta(days=1)).isoformat())]
+        df = _query_rollups(petugas_filter, parts, group_by='day')
+        df['periode'] = pd.to_datetime(df['periode'])
+    elif granularity == 'monthly':
+        df = _query_rollups(petugas_filter, _rollup_parts(start_date, end_date), group_by='month')
+        df['periode'] = pd.to_datetime(df['periode'], format='%Y-%m')
+    else:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    return df.rename(columns={'periode': 'Tanggal', 'n_transaksi': 'Jumlah_Transaksi', **COLUMN_LABELS})
@@ -12,20 +12,30 @@ def show():
     # Load Real Data if available
     # Filter by Current Logged In User
     current_user_name = st.session_state.get('user_info', {}).get('name')
-    df = auth_db.get_all_transactions(petugas_filter=current_user_name)
+    first_date, last_date = auth_db.get_transaction_date_range(petugas_filter=current_user_name)
     
-    if not df.empty:
-        # df['Tanggal'] already handled by get_all_transactions or needs to be ensured as datetime
-        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+    if first_date is not None:
+        # Periode filter - pushed down to SQL on the rollup tables
+        periode = st.date_input(
+            "Periode",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date,
+        )
+        if isinstance(periode, (tuple, list)):
+            # Only one date while the user is still picking the range
+            start_date, end_date = periode[0], periode[-1]
+        else:
+            start_date = end_date = periode
+        
+        totals = auth_db.get_rollup_totals(current_user_name, start_date, end_date)
         
         # Calculate Metrics
-        total_organic = df['Burnable'].sum() # Burnable is largely organic/compostable
+        total_organic = totals['Burnable'] # Burnable is largely organic/compostable
         
         # Precision Materials (Recyclables)
         recyclable_cols = ['Paper', 'Cloth', 'Cans', 'Electronics', 'PET_Bottles', 'Plastic_Marks', 'White_Trays', 'Glass_Bottles', 'Metal_Small', 'Hazardous']
-        total_precision = df[recyclable_cols].sum().sum()
-        
-        total_waste = total_organic + total_precision
+        total_precision = sum(totals[col] for col in recyclable_cols)
         
         total_waste = total_organic + total_precision
         
@@ -36,14 +46,11 @@ def show():
         # Calculate Current Inventory Value based on LATEST Sell Prices (Market-to-Market)
         current_market_value = 0
         for category, rates in prices_config.items():
-            if category in df.columns:
-                current_market_value += df[category].sum() * rates['sell']
+            if category in totals:
+                current_market_value += totals[category] * rates['sell']
         
         # Cost is Historical (Cash Out)
-        if 'Total_Bayar_Nasabah' in df.columns:
-            total_cost = df['Total_Bayar_Nasabah'].sum()
-        else:
-            total_cost = 0 # Assume 0 if legacy data
+        total_cost = totals['Total_Bayar_Nasabah']
             
         total_revenue = current_market_value
         total_profit = total_revenue - total_cost
@@ -70,8 +77,10 @@ def show():
         with c1:
             st.subheader("Komposisi Sampah (Live)")
             # Sum each column for composition
-            comp_data = df[['Burnable'] + recyclable_cols].sum().reset_index()
-            comp_data.columns = ['Kategori', 'Berat (kg)']
+            comp_data = pd.DataFrame({
+                'Kategori': ['Burnable'] + recyclable_cols,
+                'Berat (kg)': [totals[col] for col in ['Burnable'] + recyclable_cols],
+            })
             comp_data = comp_data[comp_data['Berat (kg)'] > 0] # Hide zeros
             
             if not comp_data.empty:
@@ -81,9 +90,14 @@ def show():
                 st.info("Belum ada data komposisi.")
 
         with c2:
-            st.subheader("Tren Pengumpulan Harian")
-            daily_trend = df.groupby('Tanggal')[['Burnable'] + recyclable_cols].sum().sum(axis=1).reset_index()
-            daily_trend.columns = ['Tanggal', 'Berat (kg)']
+            # Long periods: one point per month instead of thousands of daily points
+            granularity = 'daily' if (end_date - start_date).days <= 120 else 'monthly'
+            st.subheader("Tren Pengumpulan Harian" if granularity == 'daily' else "Tren Pengumpulan Bulanan")
+            trend = auth_db.get_rollup_trend(current_user_name, start_date, end_date, granularity=granularity)
+            daily_trend = pd.DataFrame({
+                'Tanggal': trend['Tanggal'],
+                'Berat (kg)': trend[['Burnable'] + recyclable_cols].sum(axis=1),
+            })
             
             if not daily_trend.empty:
                 fig2 = px.line(daily_trend, x='Tanggal', y='Berat (kg)', markers=True, line_shape='spline')
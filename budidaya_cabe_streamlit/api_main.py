@@ -4,15 +4,16 @@ Runs alongside Streamlit, shares same SQLite database
 Deploy to: Railway, Render, or Streamlit Cloud (separate app)
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
-import sqlite3
 import json
 import os
 from datetime import datetime
 
+from services.database_service import DatabaseService
+
 app = FastAPI(
     title="QR Product API",
     description="API for QR product traceability data",
@@ -28,8 +29,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database path - same as Streamlit
-DB_PATH = "data/budidaya_cabe.db"
+# Database path - same as Streamlit (WAL + busy_timeout via DatabaseService)
+DB_PATH = DatabaseService.DB_PATH
 
 # Pydantic Models
 class TimelineEvent(BaseModel):
@@ -51,49 +52,44 @@ class ProductResponse(BaseModel):
 
 # Helper Functions
 def get_db_connection():
-    """Get database connection"""
+    """Get this worker thread's shared database connection (do not close it)"""
     if not os.path.exists(DB_PATH):
         raise HTTPException(status_code=500, detail="Database not found")
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return DatabaseService.connection()
 
 def get_product_timeline(farmer_name: str):
     """Get product timeline from growth and journal data"""
     conn = get_db_connection()
     timeline = []
     
-    try:
-        # Get growth records
-        growth_records = conn.execute(
-            "SELECT * FROM growth_records WHERE farmer_name = ? ORDER BY hst LIMIT 10",
-            (farmer_name,)
-        ).fetchall()
+    # Get growth records
+    growth_records = conn.execute(
+        "SELECT * FROM growth_records WHERE farmer_name = ? ORDER BY hst LIMIT 10",
+        (farmer_name,)
+    ).fetchall()
         
-        for record in growth_records:
-            timeline.append({
-                'date': record['created_at'][:10] if record['created_at'] else '',
-                'event': f"Monitoring HST {record['hst']}",
-                'desc': f"Tinggi: {record['height_cm']}cm, Daun: {record['leaf_count']} helai",
-                'icon': '📏'
-            })
+    for record in growth_records:
+        timeline.append({
+            'date': record['created_at'][:10] if record['created_at'] else '',
+            'event': f"Monitoring HST {record['hst']}",
+            'desc': f"Tinggi: {record['height_cm']}cm, Daun: {record['leaf_count']} helai",
+            'icon': '📏'
+        })
         
-        # Get journal entries
-        journal_entries = conn.execute(
-            "SELECT * FROM journal_entries WHERE farmer_name = ? ORDER BY date LIMIT 10",
-            (farmer_name,)
-        ).fetchall()
+    # Get journal entries
+    journal_entries = conn.execute(
+        "SELECT * FROM journal_entries WHERE farmer_name = ? ORDER BY date LIMIT 10",
+        (farmer_name,)
+    ).fetchall()
         
-        for entry in journal_entries:
-            timeline.append({
-                'date': entry['date'],
-                'event': entry['activity_type'],
-                'desc': entry['description'] or '',
-                'icon': '📝'
-            })
-    finally:
-        conn.close()
+    for entry in journal_entries:
+        timeline.append({
+            'date': entry['date'],
+            'event': entry['activity_type'],
+            'desc': entry['description'] or '',
+            'icon': '📝'
+        })
     
     # Sort by date
     timeline.sort(key=lambda x: x['date'] if x['date'] else '')
@@ -116,112 +112,76 @@ async def get_product(product_id: str):
     """Get product by ID"""
     conn = get_db_connection()
     
-    try:
-        # Get product from qr_products table
-        product = conn.execute(
-            "SELECT * FROM qr_products WHERE product_id = ?",
-            (product_id,)
-        ).fetchone()
-        
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        
-        # Parse certifications
-        certifications = json.loads(product['certifications']) if product['certifications'] else []
+    # Get product from qr_products table
+    product = conn.execute(
+        "SELECT * FROM qr_products WHERE product_id = ?",
+        (product_id,)
+    ).fetchone()
         
-        # Get timeline
-        timeline = get_product_timeline(product['farmer_name'])
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
         
-        # Add harvest event to timeline
-        timeline.append({
-            'date': product['harvest_date'],
-            'event': 'Panen',
-            'desc': f"Panen {product['weight_kg']}kg Grade {product['grade']}",
-            'icon': '🌾'
-        })
+    # Parse certifications
+    certifications = json.loads(product['certifications']) if product['certifications'] else []
         
-        # Sort timeline by date
-        timeline.sort(key=lambda x: x['date'] if x['date'] else '')
+    # Get timeline
+    timeline = get_product_timeline(product['farmer_name'])
         
-        # Format response
-        response = {
-            'productId': product['product_id'],
-            'harvestDate': product['harvest_date'],
-            'farmLocation': product['farm_location'] or 'Garut, Jawa Barat',
-            'farmerName': product['farmer_name'] or 'Petani Demo',
-            'grade': product['grade'] or 'Grade A',
-            'weight': f"{product['weight_kg']} kg" if product['weight_kg'] else '10 kg',
-            'batchNumber': product['batch_number'] or 'B001',
-            'certifications': certifications,
-            'timeline': timeline
-        }
-        
-        return response
+    # Add harvest event to timeline
+    timeline.append({
+        'date': product['harvest_date'],
+        'event': 'Panen',
+        'desc': f"Panen {product['weight_kg']}kg Grade {product['grade']}",
+        'icon': '🌾'
+    })
+    
+    # Sort timeline by date
+    timeline.sort(key=lambda x: x['date'] if x['date'] else '')
     
-    finally:
-        conn.close()
+    # Format response
+    response = {
+        'productId': product['product_id'],
+        'harvestDate': product['harvest_date'],
+        'farmLocation': product['farm_location'] or 'Garut, Jawa Barat',
+        'farmerName': product['farmer_name'] or 'Petani Demo',
+        'grade': product['grade'] or 'Grade A',
+        'weight': f"{product['weight_kg']} kg" if product['weight_kg'] else '10 kg',
+        'batchNumber': product['batch_number'] or 'B001',
+        'certifications': certifications,
+        'timeline': timeline
+    }
+    
+    return response
 
 @app.get("/api/products")
-async def get_all_products():
-    """Get all products"""
-    conn = get_db_connection()
+async def get_all_products(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Get all products (newest first, paginated)"""
+    get_db_connection()
     
-    try:
-        products = conn.execute(
-            "SELECT * FROM qr_products ORDER BY created_at DESC LIMIT 100"
-        ).fetchall()
-        
-        result = []
-        for product in products:
-            certifications = json.loads(product['certifications']) if product['certifications'] else []
-            result.append({
-                'productId': product['product_id'],
-                'harvestDate': product['harvest_date'],
-                'farmLocation': product['farm_location'],
-                'farmerName': product['farmer_name'],
-                'grade': product['grade'],
-                'weight': f"{product['weight_kg']} kg",
-                'batchNumber': product['batch_number'],
-                'certifications': certifications
-            })
-        
-        return result
+    products = DatabaseService.get_all_qr_products(limit=limit, offset=offset)
     
-    finally:
-        conn.close()
+    result = []
+    for product in products:
+        result.append({
+            'productId': product['product_id'],
+            'harvestDate': product['harvest_date'],
+            'farmLocation': product['farm_location'],
+            'farmerName': product['farmer_name'],
+            'grade': product['grade'],
+            'weight': f"{product['weight_kg']} kg",
+            'batchNumber': product['batch_number'],
+            'certifications': product['certifications']
+        })
+        
+    return result
 
 @app.post("/api/product")
 async def create_product(product_data: dict):
     """Create new product (called from Streamlit)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Convert certifications to JSON
-        certs_json = json.dumps(product_data.get('certifications', []))
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO qr_products (
-                product_id, harvest_id, batch_number, harvest_date,
-                farm_location, farmer_name, grade, weight_kg, certifications
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            product_data['product_id'],
-            product_data.get('harvest_id', ''),
-            product_data.get('batch_number', ''),
-            product_data['harvest_date'],
-            product_data.get('farm_location', ''),
-            product_data.get('farmer_name', ''),
-            product_data.get('grade', ''),
-            product_data.get('weight_kg', 0),
-            certs_json
-        ))
-        
-        conn.commit()
-        return {"status": "success", "product_id": product_data['product_id']}
+    get_db_connection()
+    DatabaseService.save_qr_product(product_data)
     
-    finally:
-        conn.close()
+    return {"status": "success", "product_id": product_data['product_id']}
 
 if __name__ == "__main__":
     import uvicorn
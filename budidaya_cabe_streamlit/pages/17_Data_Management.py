@@ -187,7 +187,7 @@ with tab3:
     **Auto-Backup:**
     - Backup otomatis dibuat setiap hari
     - Menyimpan 7 backup terakhir
-    - Format JSON untuk portability
+    - Snapshot SQLite (.db) via online backup API - aman saat aplikasi sedang dipakai
     """)
     
     # Manual backup
@@ -209,10 +209,7 @@ with tab3:
     backup_dir = DatabaseService.BACKUP_DIR
     
     if os.path.exists(backup_dir):
-        backups = sorted([
-            f for f in os.listdir(backup_dir)
-            if f.startswith('backup_') and f.endswith('.json')
-        ], reverse=True)
+        backups = DatabaseService.list_backups()
         
         if backups:
             st.write(f"**Found {len(backups)} backup(s):**")
@@ -230,16 +227,33 @@ with tab3:
                     st.caption(f"{size_kb:.2f} KB")
                 
                 with col_b3:
-                    with open(backup_path, 'r', encoding='utf-8') as f:
+                    with open(backup_path, 'rb') as f:
                         backup_data = f.read()
                     
                     st.download_button(
                         label="⬇️",
                         data=backup_data,
                         file_name=backup,
-                        mime="application/json",
+                        mime="application/json" if backup.endswith('.json') else "application/vnd.sqlite3",
                         key=f"download_{backup}"
                     )
+            
+            # Restore
+            st.markdown("---")
+            st.subheader("♻️ Restore dari Backup")
+            
+            restore_choice = st.selectbox("Pilih backup", backups, key="restore_choice")
+            st.warning("Restore mengganti SEMUA data saat ini dengan isi backup. Data saat ini di-backup otomatis terlebih dahulu.")
+            
+            if st.checkbox("Saya yakin ingin restore", key="confirm_restore"):
+                if st.button("♻️ Restore Backup", type="primary"):
+                    with st.spinner("Restoring backup..."):
+                        try:
+                            safety_backup = DatabaseService.restore_backup(restore_choice)
+                            st.success(f"✅ Database di-restore dari `{restore_choice}`")
+                            st.info(f"📁 Data sebelum restore disimpan di: `{safety_backup}`")
+                        except Exception as e:
+                            st.error(f"❌ Restore gagal: {str(e)}")
         else:
             st.info("Belum ada backup")
     else:
@@ -269,7 +283,7 @@ st.info("""
 - Gunakan JSON export untuk portability
 - Auto-backup menyimpan 7 hari terakhir
 - Import mode 'merge' untuk menambah data
-- Import mode 'replace' untuk restore dari backup
+- Restore backup (.db) lewat "Restore dari Backup" di tab Backup Management
 
 **🔗 Integration:**
 - Data dari Module 16 (Laporan Panen) tersimpan otomatis
@@ -1,19 +1,207 @@
 """
 Database Service for Data Persistence
 SQLite database for storing harvest, growth, journal, and user data
+
+- One connection per thread (Streamlit sessions, API workers), reused across calls
+- WAL mode + busy_timeout: readers never block the writer, writers queue instead
+  of failing with "database is locked"
+- Writes run in BEGIN IMMEDIATE transactions; batch inserts use executemany
+- Backups use the SQLite online backup API (consistent snapshot while the app runs)
 """
 
 import sqlite3
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-import pandas as pd
+
+BUSY_TIMEOUT_MS = 30000
+
+HARVEST_COLUMNS = (
+    'farmer_name', 'farm_location', 'harvest_number', 'date', 'grading',
+    'weight_kg', 'price_per_kg', 'total_value', 'notes'
+)
+GROWTH_COLUMNS = (
+    'farmer_name', 'planting_date', 'hst', 'height_cm', 'leaf_count',
+    'health_score', 'notes'
+)
+JOURNAL_COLUMNS = ('farmer_name', 'date', 'activity_type', 'description', 'cost')
+PROFILE_COLUMNS = ('farmer_name', 'farm_location', 'land_area', 'planting_date', 'total_investment')
+QR_PRODUCT_COLUMNS = (
+    'product_id', 'harvest_id', 'batch_number', 'harvest_date',
+    'farm_location', 'farmer_name', 'grade', 'weight_kg', 'certifications'
+)
+
+# Tables yang boleh dihitung/dipaginasi lewat count_records
+COUNTABLE_TABLES = ('harvests', 'growth_records', 'journal_entries', 'user_profiles', 'qr_products')
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _insert_sql(table, columns, verb='INSERT'):
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _harvest_row(harvest):
+    return (
+        harvest.get('farmer_name', ''),
+        harvest.get('farm_location', ''),
+        harvest.get('harvest_number', 0),
+        harvest.get('date', ''),
+        harvest.get('grading', ''),
+        harvest.get('weight_kg', 0),
+        harvest.get('price_per_kg', 0),
+        harvest.get('total_value', 0),
+        harvest.get('notes', '')
+    )
+
+
+def _growth_row(growth):
+    return (
+        growth.get('farmer_name', ''),
+        growth.get('planting_date', ''),
+        growth.get('hst', 0),
+        growth.get('height_cm', 0),
+        growth.get('leaf_count', 0),
+        growth.get('health_score', 0),
+        growth.get('notes', '')
+    )
+
+
+def _journal_row(entry):
+    return (
+        entry.get('farmer_name', ''),
+        entry.get('date', ''),
+        entry.get('activity_type', ''),
+        entry.get('description', ''),
+        entry.get('cost', 0)
+    )
+
+
+def _profile_row(profile):
+    return (
+        profile['farmer_name'],
+        profile.get('farm_location', ''),
+        profile.get('land_area', 1.0),
+        profile.get('planting_date', ''),
+        profile.get('total_investment', 0)
+    )
+
+
+def _qr_product_row(product):
+    return (
+        product['product_id'],
+        product.get('harvest_id', ''),
+        product.get('batch_number', ''),
+        product['harvest_date'],
+        product.get('farm_location', ''),
+        product.get('farmer_name', ''),
+        product.get('grade', ''),
+        product.get('weight_kg', 0),
+        json.dumps(product.get('certifications', []))
+    )
+
+
+def _page_clause(limit, offset):
+    """LIMIT/OFFSET suffix + params (limit None = semua baris)"""
+    if limit is None and not offset:
+        return "", ()
+    return " LIMIT ? OFFSET ?", (-1 if limit is None else int(limit), int(offset or 0))
+
+
+def _parse_certifications(product):
+    product['certifications'] = json.loads(product.get('certifications') or '[]')
+    return product
+
+
+PROFILE_UPSERT_SQL = _insert_sql('user_profiles', PROFILE_COLUMNS) + '''
+    ON CONFLICT(farmer_name) DO UPDATE SET
+        farm_location = excluded.farm_location,
+        land_area = excluded.land_area,
+        planting_date = excluded.planting_date,
+        total_investment = excluded.total_investment,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
 
 class DatabaseService:
     
     DB_PATH = "data/budidaya_cabe.db"
     BACKUP_DIR = "data/backups"
     
+    # ===== CONNECTION MANAGEMENT =====
+    
+    @staticmethod
+    def connection():
+        """
+        Connection for the current thread (created once, then reused)
+        
+        Autocommit mode: reads see the latest committed data, writes go
+        through DatabaseService.transaction().
+        """
+        connections = getattr(_local, 'connections', None)
+        if connections is None:
+            connections = _local.connections = {}
+        
+        path = DatabaseService.DB_PATH
+        conn = connections.get(path)
+        if conn is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            connections[path] = conn
+        return conn
+    
+    @staticmethod
+    @contextmanager
+    def transaction(immediate=True):
+        """
+        Transaction on this thread's connection
+        
+        immediate=True (writes): BEGIN IMMEDIATE takes the write lock up front and
+        waits on busy_timeout instead of failing mid-transaction.
+        immediate=False (reads): one consistent snapshot, never blocks writers.
+        """
+        conn = DatabaseService.connection()
+        if conn.in_transaction:
+            # Nested call (e.g. save_* inside import) joins the outer transaction
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    @staticmethod
+    def close_connection():
+        """Close this thread's connection (next call reopens it)"""
+        connections = getattr(_local, 'connections', {})
+        conn = connections.pop(DatabaseService.DB_PATH, None)
+        if conn is not None:
+            conn.close()
+    
+    @staticmethod
+    def _fetch_all(query, params=()):
+        rows = DatabaseService.connection().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _fetch_one(query, params=()):
+        row = DatabaseService.connection().execute(query, params).fetchone()
+        return dict(row) if row else None
+    
     @staticmethod
     def init_database():
         """Initialize database and create tables if not exist"""
@@ -21,147 +209,150 @@ class DatabaseService:
         os.makedirs("data", exist_ok=True)
         os.makedirs(DatabaseService.BACKUP_DIR, exist_ok=True)
         
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        # Harvests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS harvests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_name TEXT NOT NULL,
-                farm_location TEXT NOT NULL,
-                harvest_number INTEGER,
-                date TEXT,
-                grading TEXT,
-                weight_kg REAL,
-                price_per_kg INTEGER,
-                total_value INTEGER,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Growth records table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS growth_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_name TEXT,
-                planting_date TEXT,
-                hst INTEGER,
-                height_cm REAL,
-                leaf_count INTEGER,
-                health_score INTEGER,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Journal entries table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS journal_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_name TEXT,
-                date TEXT,
-                activity_type TEXT,
-                description TEXT,
-                cost INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # User profiles table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_profiles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmer_name TEXT UNIQUE NOT NULL,
-                farm_location TEXT,
-                land_area REAL,
-                planting_date TEXT,
-                total_investment INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # QR Products table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS qr_products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id TEXT UNIQUE NOT NULL,
-                harvest_id TEXT,
-                batch_number TEXT,
-                harvest_date TEXT NOT NULL,
-                farm_location TEXT,
-                farmer_name TEXT,
-                grade TEXT,
-                weight_kg REAL,
-                certifications TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        path = DatabaseService.DB_PATH
+        # Pages call this on every rerun; the schema only needs one pass per process
+        if path in _initialized and os.path.exists(path):
+            return True
+        
+        with _init_lock:
+            with DatabaseService.transaction() as conn:
+                # Harvests table
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS harvests (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        farmer_name TEXT NOT NULL,
+                        farm_location TEXT NOT NULL,
+                        harvest_number INTEGER,
+                        date TEXT,
+                        grading TEXT,
+                        weight_kg REAL,
+                        price_per_kg INTEGER,
+                        total_value INTEGER,
+                        notes TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Growth records table
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS growth_records (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        farmer_name TEXT,
+                        planting_date TEXT,
+                        hst INTEGER,
+                        height_cm REAL,
+                        leaf_count INTEGER,
+                        health_score INTEGER,
+                        notes TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Journal entries table
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS journal_entries (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        farmer_name TEXT,
+                        date TEXT,
+                        activity_type TEXT,
+                        description TEXT,
+                        cost INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # User profiles table
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS user_profiles (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        farmer_name TEXT UNIQUE NOT NULL,
+                        farm_location TEXT,
+                        land_area REAL,
+                        planting_date TEXT,
+                        total_investment INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # QR Products table
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS qr_products (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        product_id TEXT UNIQUE NOT NULL,
+                        harvest_id TEXT,
+                        batch_number TEXT,
+                        harvest_date TEXT NOT NULL,
+                        farm_location TEXT,
+                        farmer_name TEXT,
+                        grade TEXT,
+                        weight_kg REAL,
+                        certifications TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Indexes: farmer filter + the ORDER BY of each getter.
+                # qr_products.product_id is already indexed by its UNIQUE constraint.
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_harvests_farmer_date ON harvests (farmer_name, date)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_harvests_date ON harvests (date)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_growth_farmer_hst ON growth_records (farmer_name, hst)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_growth_hst ON growth_records (hst)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_farmer_date ON journal_entries (farmer_name, date)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_date ON journal_entries (date)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_qr_products_farmer ON qr_products (farmer_name)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_qr_products_created ON qr_products (created_at)")
+            
+            _initialized.add(path)
         
         return True
     
+    @staticmethod
+    def count_records(table, farmer_name=None):
+        """Row count of a table (optionally per farmer) - total for paginated views"""
+        if table not in COUNTABLE_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        conn = DatabaseService.connection()
+        if farmer_name:
+            return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE farmer_name = ?", (farmer_name,)).fetchone()[0]
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    
     # ===== HARVEST OPERATIONS =====
     
     @staticmethod
     def save_harvest(harvest_data):
         """Save harvest entry to database"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO harvests (
-                farmer_name, farm_location, harvest_number, date, grading,
-                weight_kg, price_per_kg, total_value, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            harvest_data['farmer_name'],
-            harvest_data['farm_location'],
-            harvest_data['harvest_number'],
-            harvest_data['date'],
-            harvest_data['grading'],
-            harvest_data['weight_kg'],
-            harvest_data['price_per_kg'],
-            harvest_data['total_value'],
-            harvest_data.get('notes', '')
-        ))
-        
-        conn.commit()
-        harvest_id = cursor.lastrowid
-        conn.close()
-        
-        return harvest_id
+        with DatabaseService.transaction() as conn:
+            cursor = conn.execute(_insert_sql('harvests', HARVEST_COLUMNS), _harvest_row(harvest_data))
+        
+        return cursor.lastrowid
     
     @staticmethod
-    def get_all_harvests(farmer_name=None):
-        """Get all harvest entries, optionally filtered by farmer"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
+    def save_harvests(harvests):
+        """Save many harvest entries in one transaction, returns number of rows"""
+        rows = [_harvest_row(h) for h in harvests]
+        with DatabaseService.transaction() as conn:
+            conn.executemany(_insert_sql('harvests', HARVEST_COLUMNS), rows)
         
-        if farmer_name:
-            query = "SELECT * FROM harvests WHERE farmer_name = ? ORDER BY date DESC"
-            df = pd.read_sql_query(query, conn, params=(farmer_name,))
-        else:
-            query = "SELECT * FROM harvests ORDER BY date DESC"
-            df = pd.read_sql_query(query, conn)
+        return len(rows)
+    
+    @staticmethod
+    def get_all_harvests(farmer_name=None, limit=None, offset=0):
+        """Get harvest entries (newest first), optionally filtered by farmer and paginated"""
+        page, page_params = _page_clause(limit, offset)
         
-        conn.close()
+        if farmer_name:
+            query = "SELECT * FROM harvests WHERE farmer_name = ? ORDER BY date DESC, id DESC" + page
+            return DatabaseService._fetch_all(query, (farmer_name,) + page_params)
         
-        return df.to_dict('records') if not df.empty else []
+        query = "SELECT * FROM harvests ORDER BY date DESC, id DESC" + page
+        return DatabaseService._fetch_all(query, page_params)
     
     @staticmethod
     def delete_harvest(harvest_id):
         """Delete a harvest entry"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM harvests WHERE id = ?", (harvest_id,))
-        
-        conn.commit()
-        conn.close()
+        with DatabaseService.transaction() as conn:
+            conn.execute("DELETE FROM harvests WHERE id = ?", (harvest_id,))
         
         return True
     
@@ -170,174 +361,96 @@ class DatabaseService:
     @staticmethod
     def save_growth_record(growth_data):
         """Save growth monitoring record"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO growth_records (
-                farmer_name, planting_date, hst, height_cm, leaf_count,
-                health_score, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            growth_data.get('farmer_name', ''),
-            growth_data.get('planting_date', ''),
-            growth_data.get('hst', 0),
-            growth_data.get('height_cm', 0),
-            growth_data.get('leaf_count', 0),
-            growth_data.get('health_score', 0),
-            growth_data.get('notes', '')
-        ))
-        
-        conn.commit()
-        record_id = cursor.lastrowid
-        conn.close()
-        
-        return record_id
+        with DatabaseService.transaction() as conn:
+            cursor = conn.execute(_insert_sql('growth_records', GROWTH_COLUMNS), _growth_row(growth_data))
+        
+        return cursor.lastrowid
     
     @staticmethod
-    def get_growth_records(farmer_name=None):
-        """Get growth records"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
+    def save_growth_records(records):
+        """Save many growth records in one transaction, returns number of rows"""
+        rows = [_growth_row(r) for r in records]
+        with DatabaseService.transaction() as conn:
+            conn.executemany(_insert_sql('growth_records', GROWTH_COLUMNS), rows)
         
-        if farmer_name:
-            query = "SELECT * FROM growth_records WHERE farmer_name = ? ORDER BY hst"
-            df = pd.read_sql_query(query, conn, params=(farmer_name,))
-        else:
-            query = "SELECT * FROM growth_records ORDER BY hst"
-            df = pd.read_sql_query(query, conn)
+        return len(rows)
+    
+    @staticmethod
+    def get_growth_records(farmer_name=None, limit=None, offset=0):
+        """Get growth records (by HST), optionally filtered by farmer and paginated"""
+        page, page_params = _page_clause(limit, offset)
         
-        conn.close()
+        if farmer_name:
+            query = "SELECT * FROM growth_records WHERE farmer_name = ? ORDER BY hst, id" + page
+            return DatabaseService._fetch_all(query, (farmer_name,) + page_params)
         
-        return df.to_dict('records') if not df.empty else []
+        query = "SELECT * FROM growth_records ORDER BY hst, id" + page
+        return DatabaseService._fetch_all(query, page_params)
     
     # ===== JOURNAL OPERATIONS =====
     
     @staticmethod
     def save_journal_entry(entry_data):
         """Save journal entry"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO journal_entries (
-                farmer_name, date, activity_type, description, cost
-            ) VALUES (?, ?, ?, ?, ?)
-        ''', (
-            entry_data.get('farmer_name', ''),
-            entry_data.get('date', ''),
-            entry_data.get('activity_type', ''),
-            entry_data.get('description', ''),
-            entry_data.get('cost', 0)
-        ))
-        
-        conn.commit()
-        entry_id = cursor.lastrowid
-        conn.close()
-        
-        return entry_id
+        with DatabaseService.transaction() as conn:
+            cursor = conn.execute(_insert_sql('journal_entries', JOURNAL_COLUMNS), _journal_row(entry_data))
+        
+        return cursor.lastrowid
     
     @staticmethod
-    def get_journal_entries(farmer_name=None):
-        """Get journal entries"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
+    def save_journal_entries(entries):
+        """Save many journal entries in one transaction, returns number of rows"""
+        rows = [_journal_row(e) for e in entries]
+        with DatabaseService.transaction() as conn:
+            conn.executemany(_insert_sql('journal_entries', JOURNAL_COLUMNS), rows)
         
-        if farmer_name:
-            query = "SELECT * FROM journal_entries WHERE farmer_name = ? ORDER BY date DESC"
-            df = pd.read_sql_query(query, conn, params=(farmer_name,))
-        else:
-            query = "SELECT * FROM journal_entries ORDER BY date DESC"
-            df = pd.read_sql_query(query, conn)
+        return len(rows)
+    
+    @staticmethod
+    def get_journal_entries(farmer_name=None, limit=None, offset=0):
+        """Get journal entries (newest first), optionally filtered by farmer and paginated"""
+        page, page_params = _page_clause(limit, offset)
         
-        conn.close()
+        if farmer_name:
+            query = "SELECT * FROM journal_entries WHERE farmer_name = ? ORDER BY date DESC, id DESC" + page
+            return DatabaseService._fetch_all(query, (farmer_name,) + page_params)
         
-        return df.to_dict('records') if not df.empty else []
+        query = "SELECT * FROM journal_entries ORDER BY date DESC, id DESC" + page
+        return DatabaseService._fetch_all(query, page_params)
     
     # ===== USER PROFILE OPERATIONS =====
     
     @staticmethod
     def save_user_profile(profile_data):
         """Save or update user profile"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if profile exists
-        cursor.execute("SELECT id FROM user_profiles WHERE farmer_name = ?", 
-                      (profile_data['farmer_name'],))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update
-            cursor.execute('''
-                UPDATE user_profiles SET
-                    farm_location = ?,
-                    land_area = ?,
-                    planting_date = ?,
-                    total_investment = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE farmer_name = ?
-            ''', (
-                profile_data.get('farm_location', ''),
-                profile_data.get('land_area', 1.0),
-                profile_data.get('planting_date', ''),
-                profile_data.get('total_investment', 0),
-                profile_data['farmer_name']
-            ))
-        else:
-            # Insert
-            cursor.execute('''
-                INSERT INTO user_profiles (
-                    farmer_name, farm_location, land_area, planting_date, total_investment
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (
-                profile_data['farmer_name'],
-                profile_data.get('farm_location', ''),
-                profile_data.get('land_area', 1.0),
-                profile_data.get('planting_date', ''),
-                profile_data.get('total_investment', 0)
-            ))
-        
-        conn.commit()
-        conn.close()
+        with DatabaseService.transaction() as conn:
+            conn.execute(PROFILE_UPSERT_SQL, _profile_row(profile_data))
         
         return True
     
     @staticmethod
     def get_user_profile(farmer_name):
         """Get user profile"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM user_profiles WHERE farmer_name = ?", (farmer_name,))
-        row = cursor.fetchone()
-        
-        conn.close()
-        
-        if row:
-            columns = [desc[0] for desc in cursor.description]
-            return dict(zip(columns, row))
-        
-        return None
+        return DatabaseService._fetch_one("SELECT * FROM user_profiles WHERE farmer_name = ?", (farmer_name,))
     
     # ===== EXPORT/IMPORT =====
     
     @staticmethod
     def export_to_json():
         """Export all data to JSON"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
+        # One read transaction: all four tables come from the same snapshot
+        with DatabaseService.transaction(immediate=False):
+            tables = {
+                table: DatabaseService._fetch_all(f"SELECT * FROM {table}")
+                for table in ('harvests', 'growth_records', 'journal_entries', 'user_profiles')
+            }
         
         data = {
             'export_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'version': '1.0',
-            'data': {
-                'harvests': pd.read_sql_query("SELECT * FROM harvests", conn).to_dict('records'),
-                'growth_records': pd.read_sql_query("SELECT * FROM growth_records", conn).to_dict('records'),
-                'journal_entries': pd.read_sql_query("SELECT * FROM journal_entries", conn).to_dict('records'),
-                'user_profiles': pd.read_sql_query("SELECT * FROM user_profiles", conn).to_dict('records')
-            }
+            'data': tables
         }
         
-        conn.close()
-        
         return json.dumps(data, indent=2, ensure_ascii=False)
     
     @staticmethod
@@ -354,39 +467,23 @@ class DatabaseService:
         else:
             data = json_data
         
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        # If replace mode, clear existing data
-        if mode == 'replace':
-            cursor.execute("DELETE FROM harvests")
-            cursor.execute("DELETE FROM growth_records")
-            cursor.execute("DELETE FROM journal_entries")
-            cursor.execute("DELETE FROM user_profiles")
-        
-        # Import harvests
-        for harvest in data['data'].get('harvests', []):
-            cursor.execute('''
-                INSERT INTO harvests (
-                    farmer_name, farm_location, harvest_number, date, grading,
-                    weight_kg, price_per_kg, total_value, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                harvest.get('farmer_name', ''),
-                harvest.get('farm_location', ''),
-                harvest.get('harvest_number', 0),
-                harvest.get('date', ''),
-                harvest.get('grading', ''),
-                harvest.get('weight_kg', 0),
-                harvest.get('price_per_kg', 0),
-                harvest.get('total_value', 0),
-                harvest.get('notes', '')
-            ))
-        
-        # Import other tables similarly...
-        
-        conn.commit()
-        conn.close()
+        tables = data['data']
+        
+        # Single transaction: a failed import leaves the database untouched
+        with DatabaseService.transaction() as conn:
+            # If replace mode, clear existing data
+            if mode == 'replace':
+                conn.execute("DELETE FROM harvests")
+                conn.execute("DELETE FROM growth_records")
+                conn.execute("DELETE FROM journal_entries")
+                conn.execute("DELETE FROM user_profiles")
+            
+            DatabaseService.save_harvests(tables.get('harvests', []))
+            DatabaseService.save_growth_records(tables.get('growth_records', []))
+            DatabaseService.save_journal_entries(tables.get('journal_entries', []))
+            conn.executemany(PROFILE_UPSERT_SQL, [
+                _profile_row(p) for p in tables.get('user_profiles', []) if p.get('farmer_name')
+            ])
         
         return True
     
@@ -394,14 +491,17 @@ class DatabaseService:
     
     @staticmethod
     def create_backup():
-        """Create database backup"""
+        """Create database backup (online backup API: consistent copy while other sessions write)"""
+        os.makedirs(DatabaseService.BACKUP_DIR, exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_file = f"{DatabaseService.BACKUP_DIR}/backup_{timestamp}.json"
+        backup_file = f"{DatabaseService.BACKUP_DIR}/backup_{timestamp}.db"
         
-        json_data = DatabaseService.export_to_json()
-        
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            f.write(json_data)
+        target = sqlite3.connect(backup_file)
+        try:
+            # pages=1024: copy in steps so writers are not held off for the whole backup
+            DatabaseService.connection().backup(target, pages=1024)
+        finally:
+            target.close()
         
         # Cleanup old backups (keep last 7)
         DatabaseService._cleanup_old_backups()
@@ -409,110 +509,140 @@ class DatabaseService:
         return backup_file
     
     @staticmethod
-    def _cleanup_old_backups(keep_last=7):
-        """Remove old backup files"""
+    def restore_backup(backup_name):
+        """
+        Restore the database from a backup in BACKUP_DIR
+        
+        .db snapshots are copied back with the SQLite online backup API (the
+        reverse of create_backup); legacy .json backups go through
+        import_from_json(mode='replace'). The current data is backed up first.
+        
+        Returns:
+            str: path of the safety backup taken before restoring
+        """
+        backup_name = os.path.basename(backup_name)
+        if backup_name not in DatabaseService.list_backups():
+            raise ValueError(f"Backup tidak ditemukan: {backup_name}")
+        backup_path = os.path.join(DatabaseService.BACKUP_DIR, backup_name)
+        
+        if backup_name.endswith('.json'):
+            with open(backup_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            safety_backup = DatabaseService.create_backup()
+            DatabaseService.import_from_json(data, mode='replace')
+            return safety_backup
+        
+        # Load the snapshot first: the safety backup below may rotate old files out
+        snapshot = sqlite3.connect(":memory:")
+        try:
+            source = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True)
+            try:
+                source.backup(snapshot)
+            finally:
+                source.close()
+            if snapshot.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'harvests'"
+            ).fetchone()[0] == 0:
+                raise ValueError(f"Bukan backup database budidaya cabe: {backup_name}")
+            
+            safety_backup = DatabaseService.create_backup()
+            # Replaces every page of the live database; other connections see the restored data
+            snapshot.backup(DatabaseService.connection())
+        finally:
+            snapshot.close()
+        
+        # Older snapshots may predate the current tables/indexes
+        _initialized.discard(DatabaseService.DB_PATH)
+        DatabaseService.init_database()
+        
+        return safety_backup
+    
+    @staticmethod
+    def list_backups():
+        """Backup file names, newest first (.db snapshots and legacy .json exports)"""
         if not os.path.exists(DatabaseService.BACKUP_DIR):
-            return
+            return []
         
-        backups = sorted([
+        return sorted([
             f for f in os.listdir(DatabaseService.BACKUP_DIR)
-            if f.startswith('backup_') and f.endswith('.json')
-        ])
-        
-        if len(backups) > keep_last:
-            for old_backup in backups[:-keep_last]:
-                os.remove(os.path.join(DatabaseService.BACKUP_DIR, old_backup))
+            if f.startswith('backup_') and f.endswith(('.db', '.json'))
+        ], reverse=True)
+    
+    @staticmethod
+    def _cleanup_old_backups(keep_last=7):
+        """Remove old backup files"""
+        for old_backup in DatabaseService.list_backups()[keep_last:]:
+            os.remove(os.path.join(DatabaseService.BACKUP_DIR, old_backup))
     
     # ===== QR PRODUCT OPERATIONS =====
     
     @staticmethod
     def save_qr_product(product_data):
         """Save QR product data"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        # Convert certifications list to JSON string
-        certs_json = json.dumps(product_data.get('certifications', []))
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO qr_products (
-                product_id, harvest_id, batch_number, harvest_date,
-                farm_location, farmer_name, grade, weight_kg, certifications
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            product_data['product_id'],
-            product_data.get('harvest_id', ''),
-            product_data.get('batch_number', ''),
-            product_data['harvest_date'],
-            product_data.get('farm_location', ''),
-            product_data.get('farmer_name', ''),
-            product_data.get('grade', ''),
-            product_data.get('weight_kg', 0),
-            certs_json
-        ))
-        
-        conn.commit()
-        product_id = cursor.lastrowid
-        conn.close()
-        
-        return product_id
+        with DatabaseService.transaction() as conn:
+            cursor = conn.execute(
+                _insert_sql('qr_products', QR_PRODUCT_COLUMNS, verb='INSERT OR REPLACE'),
+                _qr_product_row(product_data)
+            )
+        
+        return cursor.lastrowid
+    
+    @staticmethod
+    def save_qr_products(products):
+        """Save many QR products in one transaction, returns number of rows"""
+        rows = [_qr_product_row(p) for p in products]
+        with DatabaseService.transaction() as conn:
+            conn.executemany(_insert_sql('qr_products', QR_PRODUCT_COLUMNS, verb='INSERT OR REPLACE'), rows)
+        
+        return len(rows)
     
     @staticmethod
     def get_qr_product(product_id):
         """Get QR product by ID"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM qr_products WHERE product_id = ?", (product_id,))
-        row = cursor.fetchone()
-        
-        conn.close()
-        
-        if row:
-            columns = [desc[0] for desc in cursor.description]
-            product = dict(zip(columns, row))
-            # Parse certifications JSON
-            product['certifications'] = json.loads(product.get('certifications', '[]'))
-            return product
-        
-        return None
+        product = DatabaseService._fetch_one("SELECT * FROM qr_products WHERE product_id = ?", (product_id,))
+        return _parse_certifications(product) if product else None
     
     @staticmethod
-    def get_all_qr_products():
-        """Get all QR products"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
+    def get_all_qr_products(farmer_name=None, limit=None, offset=0):
+        """Get QR products (newest first), optionally filtered by farmer and paginated"""
+        page, page_params = _page_clause(limit, offset)
         
-        query = "SELECT * FROM qr_products ORDER BY created_at DESC"
-        df = pd.read_sql_query(query, conn)
-        
-        conn.close()
-        
-        if not df.empty:
-            products = df.to_dict('records')
-            # Parse certifications for each product
-            for product in products:
-                product['certifications'] = json.loads(product.get('certifications', '[]'))
-            return products
+        if farmer_name:
+            query = "SELECT * FROM qr_products WHERE farmer_name = ? ORDER BY created_at DESC, id DESC" + page
+            products = DatabaseService._fetch_all(query, (farmer_name,) + page_params)
+        else:
+            query = "SELECT * FROM qr_products ORDER BY created_at DESC, id DESC" + page
+            products = DatabaseService._fetch_all(query, page_params)
         
-        return []
+        return [_parse_certifications(product) for product in products]
     
     # ===== STATISTICS =====
     
     @staticmethod
     def get_database_stats():
         """Get database statistics"""
-        conn = sqlite3.connect(DatabaseService.DB_PATH)
-        cursor = conn.cursor()
+        conn = DatabaseService.connection()
+        
+        row = conn.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM harvests),
+                (SELECT COUNT(*) FROM growth_records),
+                (SELECT COUNT(*) FROM journal_entries),
+                (SELECT COUNT(*) FROM user_profiles),
+                (SELECT COUNT(*) FROM qr_products)
+        ''').fetchone()
+        
+        # Logical size incl. pages still in the WAL file (os.path.getsize misses those)
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
         
         stats = {
-            'total_harvests': cursor.execute("SELECT COUNT(*) FROM harvests").fetchone()[0],
-            'total_growth_records': cursor.execute("SELECT COUNT(*) FROM growth_records").fetchone()[0],
-            'total_journal_entries': cursor.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0],
-            'total_users': cursor.execute("SELECT COUNT(*) FROM user_profiles").fetchone()[0],
-            'total_qr_products': cursor.execute("SELECT COUNT(*) FROM qr_products").fetchone()[0],
-            'database_size_kb': os.path.getsize(DatabaseService.DB_PATH) / 1024 if os.path.exists(DatabaseService.DB_PATH) else 0
+            'total_harvests': row[0],
+            'total_growth_records': row[1],
+            'total_journal_entries': row[2],
+            'total_users': row[3],
+            'total_qr_products': row[4],
+            'database_size_kb': page_count * page_size / 1024
         }
         
-        conn.close()
-        
         return stats
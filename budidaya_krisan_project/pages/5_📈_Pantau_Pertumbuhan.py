@@ -11,7 +11,7 @@ from streamlit_folium import st_folium
 # Import AI modules
 import sys
 sys.path.append('.')
-from utils.ai_growth_models import GrowthPredictor, AnomalyDetector, GrowthRateAnalyzer, HarvestPredictor
+from utils.ai_growth_models import GrowthPredictor, AnomalyDetector, GrowthRateAnalyzer, HarvestPredictor, FleetGrowthAnalyzer
 from utils.health_scoring import HealthScorer, HealthDiagnostics
 
 st.set_page_config(page_title="Pantau Pertumbuhan & AI", page_icon="📈", layout="wide")
@@ -173,6 +173,9 @@ def get_open_meteo_weather(lat, lon):
 with st.sidebar:
     st.header("📝 Input Data Pemantauan")
     
+    view_mode = st.radio("👁️ Mode Tampilan", ["Per House", "Armada (Semua Bed)"], horizontal=True,
+                         help="Armada: analisis semua bed/house sekaligus")
+    
     # House selection
     if 'house_database' in st.session_state and st.session_state.house_database:
         house_options = [h['name'] for h in st.session_state.house_database.values()]
@@ -283,6 +286,91 @@ with st.sidebar:
 
 # ==================== MAIN CONTENT ====================
 
+# ==================== FLEET VIEW ====================
+
+@st.cache_data(show_spinner=False)
+def analyze_fleet(df_fleet, bed_col, target_height, slowdown_threshold, contamination):
+    """One batched fit for all beds (cached per data + parameters)"""
+    analyzer = FleetGrowthAnalyzer(degree=3, contamination=contamination, bed_col=bed_col).fit(df_fleet)
+    report, anomalies = analyzer.fleet_report(STANDARDS, target_height, slowdown_threshold)
+    return report, anomalies, analyzer.predict(weeks_ahead=4)
+
+if view_mode == "Armada (Semua Bed)":
+    st.markdown("---")
+    st.subheader("🏭 Analisis Armada - Semua Bed/House")
+    st.caption("Satu model batch untuk semua bed: kurva pertumbuhan, perlambatan, anomali, dan estimasi panen.")
+    
+    fleet_file = st.file_uploader("Upload log pertumbuhan armada (CSV: bed/house, week, height, leaves, diameter, start_date opsional)",
+                                  type=['csv'], key='fleet_upload')
+    if fleet_file:
+        df_fleet = pd.read_csv(fleet_file)
+    elif st.session_state.growth_data:
+        df_fleet = pd.DataFrame(st.session_state.growth_data)
+    else:
+        st.warning("⚠️ Belum ada data. Input data per house di sidebar atau upload CSV armada.")
+        st.stop()
+    
+    bed_col = 'bed' if 'bed' in df_fleet.columns else 'house'
+    missing = {bed_col, 'week', 'height', 'leaves', 'diameter'} - set(df_fleet.columns)
+    if missing:
+        st.error(f"Kolom tidak ditemukan: {', '.join(sorted(missing))}")
+        st.stop()
+    df_fleet = df_fleet.dropna(subset=[bed_col, 'week', 'height'])
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        target_height = st.number_input("Target Tinggi Panen (cm)", 50, 150, 100, step=5)
+    with col2:
+        slowdown_threshold = st.number_input("Batas Perlambatan (cm/minggu)", 0.0, 10.0, 0.5, step=0.1)
+    with col3:
+        contamination = st.slider("Sensitivitas Anomali", 0.01, 0.3, 0.1, step=0.01)
+    
+    with st.spinner(f"Menganalisis {df_fleet[bed_col].nunique()} bed..."):
+        report, anomalies, forecast = analyze_fleet(df_fleet, bed_col, target_height, slowdown_threshold, contamination)
+    
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Total Bed", len(report))
+    m2.metric("Perlambatan", int(report['slowdown'].sum()))
+    m3.metric("Bed dengan Anomali", int((report['anomalies'] > 0).sum()))
+    m4.metric("Prediksi Terlambat", int((report['status'] == 'delayed').sum()))
+    
+    display = report[['current_week', 'current_height', 'avg_recent_rate', 'slowdown', 'consistency_score',
+                      'anomalies', 'status', 'harvest_week', 'confidence']].rename(columns={
+        'current_week': 'Minggu', 'current_height': 'Tinggi (cm)', 'avg_recent_rate': 'Laju 2 Minggu (cm)',
+        'slowdown': 'Perlambatan', 'consistency_score': 'Konsistensi', 'anomalies': 'Anomali',
+        'status': 'Status Panen', 'harvest_week': 'Minggu Panen', 'confidence': 'Confidence'
+    })
+    if 'harvest_date' in report.columns:
+        display['Tanggal Panen'] = report['harvest_date'].dt.strftime('%Y-%m-%d')
+    
+    only_flagged = st.checkbox("Tampilkan hanya bed bermasalah (perlambatan / anomali / terlambat)")
+    if only_flagged:
+        display = display[report['slowdown'] | (report['anomalies'] > 0) | (report['status'] == 'delayed')]
+    st.dataframe(display.round(2), use_container_width=True)
+    
+    st.download_button("📥 Download Laporan Armada (CSV)", report.to_csv().encode('utf-8'),
+                       "laporan_armada_krisan.csv", "text/csv")
+    
+    fleet_tabs = st.tabs(["📊 Distribusi Panen", "⚠️ Anomali", "🔮 Prediksi 4 Minggu"])
+    with fleet_tabs[0]:
+        harvest_counts = report['harvest_week'].dropna().astype(int).value_counts().sort_index()
+        fig = px.bar(x=harvest_counts.index, y=harvest_counts.values,
+                     labels={'x': 'Minggu Panen', 'y': 'Jumlah Bed'}, title="Estimasi Minggu Panen per Bed")
+        st.plotly_chart(fig, use_container_width=True)
+    with fleet_tabs[1]:
+        flagged = anomalies[anomalies['anomaly']]
+        if flagged.empty:
+            st.success("✅ Tidak ada anomali terdeteksi")
+        else:
+            st.dataframe(flagged[[bed_col, 'week', 'height', 'growth_rate', 'anomaly_score', 'severity']].round(3),
+                         use_container_width=True)
+    with fleet_tabs[2]:
+        selected_beds = st.multiselect("Pilih bed", list(report.index), default=list(report.index[:5]))
+        fig = px.line(forecast[forecast[bed_col].isin(selected_beds)], x='week', y='prediction',
+                      color=bed_col, markers=True, title="Prediksi Tinggi 4 Minggu ke Depan")
+        st.plotly_chart(fig, use_container_width=True)
+    st.stop()
+
 # Filter data for selected house
 house_data = [d for d in st.session_state.growth_data if d['house'] == input_house]
 
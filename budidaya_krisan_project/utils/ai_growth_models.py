@@ -108,32 +108,20 @@ class AnomalyDetector:
         Returns:
             numpy array of features
         """
-        features = []
         self.feature_names = ['height', 'leaves', 'diameter', 'growth_rate', 'height_deviation']
         
-        for i, row in growth_data.iterrows():
-            week = row['week']
-            height = row['height']
-            leaves = row['leaves']
-            diameter = row['diameter']
-            
-            # Calculate growth rate
-            if i > 0:
-                prev_height = growth_data.iloc[i-1]['height']
-                growth_rate = height - prev_height
-            else:
-                growth_rate = 0
-            
-            # Deviation from standard
-            std_height = standards.get(week, {}).get('h', height)
-            if std_height > 0:
-                height_deviation = (height - std_height) / std_height
-            else:
-                height_deviation = 0
-            
-            features.append([height, leaves, diameter, growth_rate, height_deviation])
+        height = growth_data['height'].to_numpy(dtype=float)
+        
+        # Growth rate vs previous measurement (0 for the first one)
+        growth_rate = np.diff(height, prepend=height[:1]) if len(height) else height
         
-        return np.array(features)
+        return np.column_stack([
+            height,
+            growth_data['leaves'].to_numpy(dtype=float),
+            growth_data['diameter'].to_numpy(dtype=float),
+            growth_rate,
+            height_deviation(growth_data['week'], height, standards),
+        ])
     
     def detect(self, growth_data, standards):
         """
@@ -185,14 +173,7 @@ class GrowthRateAnalyzer:
         if len(growth_data) < 2:
             return []
         
-        rates = []
-        for i in range(1, len(growth_data)):
-            prev_height = growth_data.iloc[i-1]['height']
-            curr_height = growth_data.iloc[i]['height']
-            rate = curr_height - prev_height
-            rates.append(rate)
-        
-        return rates
+        return np.diff(growth_data['height'].to_numpy(dtype=float)).tolist()
     
     @staticmethod
     def detect_growth_slowdown(growth_data, threshold=0.5):
@@ -288,24 +269,27 @@ class HarvestPredictor:
         current_week = growth_data['week'].max()
         max_week = 16  # Maximum growth period
         
-        for week in range(int(current_week) + 1, max_week + 1):
-            predicted_height = predictor.model.predict([[week]])[0]
+        # Evaluate the whole remaining season at once, take the first week reaching target
+        weeks = np.arange(int(current_week) + 1, max_week + 1)
+        heights = predictor.model.predict(weeks.reshape(-1, 1)) if len(weeks) else np.array([])
+        reached = np.flatnonzero(heights >= target_height)
+        
+        if len(reached):
+            week, predicted_height = int(weeks[reached[0]]), float(heights[reached[0]])
+            # Calculate date if start_date provided
+            if start_date:
+                harvest_date = start_date + timedelta(weeks=week)
+                date_str = harvest_date.strftime('%Y-%m-%d')
+            else:
+                date_str = None
             
-            if predicted_height >= target_height:
-                # Calculate date if start_date provided
-                if start_date:
-                    harvest_date = start_date + timedelta(weeks=week)
-                    date_str = harvest_date.strftime('%Y-%m-%d')
-                else:
-                    date_str = None
-                
-                return {
-                    'status': 'predicted',
-                    'harvest_week': week,
-                    'harvest_date': date_str,
-                    'predicted_height': predicted_height,
-                    'confidence': 'HIGH' if week <= 15 else 'MEDIUM'
-                }
+            return {
+                'status': 'predicted',
+                'harvest_week': week,
+                'harvest_date': date_str,
+                'predicted_height': predicted_height,
+                'confidence': 'HIGH' if week <= 15 else 'MEDIUM'
+            }
         
         return {
             'status': 'delayed',
@@ -362,6 +346,217 @@ class HarvestPredictor:
         }
 
 
+class FleetGrowthAnalyzer:
+    """
+    Growth analytics for many beds/houses at once.
+    
+    Takes one long DataFrame of growth logs (bed, week, height, ...) and
+    fits a polynomial growth curve per bed in a single batched least-squares
+    solve, computes growth rates / slowdown / consistency with grouped array
+    operations, runs one IsolationForest over all beds and estimates the
+    harvest week of every bed.
+    """
+    
+    def __init__(self, degree=3, contamination=0.1, bed_col='house'):
+        self.degree = degree
+        self.contamination = contamination
+        self.bed_col = bed_col
+        self.data = None
+        self.beds = None
+        self.coefs = None
+        self.std_error = None
+    
+    def fit(self, growth_logs):
+        """
+        Fit growth curves for every bed
+        
+        Args:
+            growth_logs: DataFrame with columns [bed_col, week, height] and
+                optionally leaves, diameter, start_date
+        """
+        data = growth_logs.sort_values([self.bed_col, 'week'], kind='stable').reset_index(drop=True)
+        codes, beds = pd.factorize(data[self.bed_col], sort=True)
+        self.data, self.beds, self._codes = data, pd.Index(beds, name=self.bed_col), codes
+        
+        weeks = data['week'].to_numpy(dtype=float)
+        heights = data['height'].to_numpy(dtype=float)
+        n_beds = len(beds)
+        counts = np.bincount(codes, minlength=n_beds)
+        
+        # Same least-squares problem as GrowthPredictor (centered polynomial
+        # features + intercept), stacked into one zero-padded batch per bed
+        V = self._vandermonde(weeks)
+        features = V[:, 1:]
+        n = np.maximum(counts, 1)
+        feature_mean = np.stack([np.bincount(codes, col, n_beds) for col in features.T], axis=1) / n[:, None]
+        height_mean = np.bincount(codes, heights, n_beds) / n
+        position = np.arange(len(data)) - np.searchsorted(codes, codes)
+        X = np.zeros((n_beds, counts.max(initial=0), self.degree))
+        y = np.zeros((n_beds, counts.max(initial=0)))
+        X[codes, position] = features - feature_mean[codes]
+        y[codes, position] = heights - height_mean[codes]
+        
+        # One batched solve; pinv gives the minimum-norm fit for beds with few points
+        slopes = np.einsum('bij,bj->bi', np.linalg.pinv(X), y)
+        intercept = height_mean - np.einsum('bi,bi->b', feature_mean, slopes)
+        self.coefs = np.column_stack([intercept, slopes])
+        
+        fitted = np.einsum('ij,ij->i', V, self.coefs[codes])
+        residuals = heights - fitted
+        mean_res = np.bincount(codes, residuals, n_beds) / n
+        var_res = np.bincount(codes, (residuals - mean_res[codes]) ** 2, n_beds) / n
+        self.std_error = np.sqrt(var_res)
+        self.data['fitted_height'] = fitted
+        
+        # Week-over-week growth rate inside each bed (NaN for a bed's first record)
+        first = np.r_[True, codes[1:] != codes[:-1]]
+        self.data['growth_rate'] = np.where(first, np.nan, np.diff(heights, prepend=np.nan))
+        return self
+    
+    def _vandermonde(self, weeks):
+        return np.vander(np.asarray(weeks, dtype=float), self.degree + 1, increasing=True)
+    
+    def _check_fitted(self):
+        if self.coefs is None:
+            raise ValueError("Model not fitted. Call fit() first.")
+    
+    def curve(self, weeks):
+        """Fitted heights, shape (n_beds, len(weeks))"""
+        self._check_fitted()
+        return self.coefs @ self._vandermonde(weeks).T
+    
+    def predict(self, weeks_ahead=4):
+        """
+        Forecast every bed from its own last week
+        
+        Returns:
+            long DataFrame [bed, week, prediction, upper_bound, lower_bound]
+        """
+        self._check_fitted()
+        current = self.data.groupby(self._codes)['week'].max().to_numpy(dtype=int)
+        weeks = current[:, None] + np.arange(1, weeks_ahead + 1)[None, :]
+        V = self._vandermonde(weeks.ravel()).reshape(len(self.beds), weeks_ahead, -1)
+        predictions = np.einsum('bwp,bp->bw', V, self.coefs)
+        confidence = (1.96 * self.std_error)[:, None]
+        
+        return pd.DataFrame({
+            self.bed_col: np.repeat(self.beds.to_numpy(), weeks_ahead),
+            'week': weeks.ravel(),
+            'prediction': predictions.ravel(),
+            'upper_bound': (predictions + confidence).ravel(),
+            'lower_bound': (predictions - confidence).ravel(),
+        })
+    
+    def growth_summary(self, slowdown_threshold=0.5):
+        """
+        Growth rate, slowdown flag and consistency score per bed
+        
+        Same rules as GrowthRateAnalyzer: slowdown = mean of the last two
+        rates below threshold; consistency from the coefficient of variation.
+        """
+        self._check_fitted()
+        rates = self.data[[self.bed_col, 'growth_rate']].dropna()
+        grouped = rates.groupby(self.bed_col)['growth_rate']
+        
+        summary = pd.DataFrame(index=self.beds)
+        summary['n_rates'] = grouped.size().reindex(self.beds, fill_value=0)
+        summary['avg_rate'] = grouped.mean()
+        summary['avg_recent_rate'] = rates.groupby(self.bed_col).tail(2).groupby(self.bed_col)['growth_rate'].mean()
+        summary['slowdown'] = (summary['n_rates'] >= 2) & (summary['avg_recent_rate'] < slowdown_threshold)
+        
+        mean_rate = summary['avg_rate']
+        cv = grouped.std(ddof=0) / mean_rate.replace(0, np.nan)
+        consistency = (100 * (1 - cv)).clip(0, 100)
+        consistency = consistency.where(mean_rate != 0, 50)
+        summary['consistency_score'] = consistency.where(summary['n_rates'] >= 3, 100)
+        return summary
+    
+    def detect_anomalies(self, standards, random_state=42):
+        """
+        One IsolationForest over the records of all beds
+        
+        Returns:
+            the growth log with 'anomaly', 'anomaly_score' and 'severity' columns
+        """
+        self._check_fitted()
+        data = self.data
+        height = data['height'].to_numpy(dtype=float)
+        features = np.column_stack([
+            height,
+            data['leaves'].to_numpy(dtype=float) if 'leaves' in data else np.zeros(len(data)),
+            data['diameter'].to_numpy(dtype=float) if 'diameter' in data else np.zeros(len(data)),
+            np.nan_to_num(data['growth_rate'].to_numpy(dtype=float)),
+            height_deviation(data['week'], height, standards),
+        ])
+        
+        model = IsolationForest(contamination=self.contamination, random_state=random_state,
+                                n_estimators=100, n_jobs=-1)
+        predictions = model.fit_predict(features)
+        scores = model.score_samples(features)
+        
+        result = data.copy()
+        result['anomaly'] = predictions == -1
+        result['anomaly_score'] = scores
+        result['severity'] = np.where(~result['anomaly'], None, np.where(scores < -0.5, 'HIGH', 'MEDIUM'))
+        return result
+    
+    def predict_harvest(self, target_height=100, max_week=16):
+        """
+        Harvest week estimate for every bed (first future week reaching target_height)
+        
+        Beds with fewer than 3 records get status 'insufficient_data'. If the
+        log has a start_date column, harvest_date = start_date + harvest_week.
+        """
+        self._check_fitted()
+        grouped = self.data.groupby(self._codes)
+        current = grouped['week'].max().to_numpy(dtype=int)
+        counts = grouped.size().to_numpy()
+        
+        weeks = np.arange(1, max_week + 1)
+        heights = self.curve(weeks)
+        future = weeks[None, :] > current[:, None]
+        reached = future & (heights >= target_height)
+        has_harvest = reached.any(axis=1)
+        first = reached.argmax(axis=1)
+        
+        harvest_week = np.where(has_harvest, weeks[first], np.nan)
+        status = np.where(counts < 3, 'insufficient_data', np.where(has_harvest, 'predicted', 'delayed'))
+        result = pd.DataFrame({
+            'status': status,
+            'current_week': current,
+            'harvest_week': np.where(status == 'predicted', harvest_week, np.nan),
+            'predicted_height': np.where(status == 'predicted', heights[np.arange(len(first)), first], np.nan),
+            'confidence': np.where(status == 'predicted', np.where(harvest_week <= 15, 'HIGH', 'MEDIUM'), None),
+        }, index=self.beds)
+        
+        if 'start_date' in self.data:
+            start = pd.to_datetime(grouped['start_date'].first(), errors='coerce').to_numpy()
+            result['harvest_date'] = pd.to_datetime(start) + pd.to_timedelta(result['harvest_week'].to_numpy() * 7, unit='D')
+        return result
+    
+    def fleet_report(self, standards, target_height=100, slowdown_threshold=0.5):
+        """Per-bed table combining growth, slowdown, anomalies and harvest estimates"""
+        self._check_fitted()
+        anomalies = self.detect_anomalies(standards)
+        latest = self.data.groupby(self.bed_col).tail(1).set_index(self.bed_col)
+        
+        report = pd.DataFrame(index=self.beds)
+        report['current_height'] = latest['height']
+        report['std_error'] = self.std_error
+        report = report.join(self.growth_summary(slowdown_threshold))
+        report['anomalies'] = anomalies.groupby(self.bed_col)['anomaly'].sum()
+        report = report.join(self.predict_harvest(target_height))
+        return report, anomalies
+
+
+def height_deviation(weeks, heights, standards):
+    """Relative deviation from the standard height per week (0 where no standard)"""
+    standard_h = pd.Series(weeks).map({w: v.get('h') for w, v in standards.items()}).to_numpy(dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    standard_h = np.where(np.isnan(standard_h), heights, standard_h)
+    return np.divide(heights - standard_h, standard_h, out=np.zeros_like(heights), where=standard_h > 0)
+
+
 # Utility functions
 def smooth_data(values, window=3):
     """Apply moving average smoothing"""
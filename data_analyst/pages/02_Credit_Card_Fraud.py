@@ -81,8 +81,9 @@ st.markdown("**Analisis pola fraud pada transaksi kartu kredit menggunakan tekni
 
 # Load and preprocess data
 with st.spinner("Loading credit card data..."):
-    # Load sample data for performance
-    sample_size = st.sidebar.slider("Sample Size", 10000, 100000, 50000, 10000)
+    # Stratified sample (same fraud ratio as the full data) or all 284k rows
+    use_full_data = st.sidebar.checkbox("Use Full Dataset", value=False)
+    sample_size = None if use_full_data else st.sidebar.slider("Sample Size", 10000, 100000, 50000, 10000)
     df = load_credit_card_data(sample_size=sample_size)
 
 if df is not None:
@@ -558,7 +559,8 @@ if df is not None:
                 if st.button("🔍 Predict Fraud Probability"):
                     from utils.ml_models import predict_fraud
                     
-                    fraud_prob, prediction = predict_fraud(model, scaler, transaction_input)
+                    fraud_prob, prediction = predict_fraud(model, scaler, transaction_input,
+                                                           feature_cols=st.session_state.get('feature_cols'))
                     
                     col1, col2 = st.columns(2)
                     
@@ -3,7 +3,18 @@ Data loading utilities for the data analyst portfolio
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
+import json
 import os
+import shutil
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Credit card fraud dataset: columnar store (one memory-mappable .npy per column)
+CREDITCARD_COLUMNS = ['Time'] + [f'V{i}' for i in range(1, 29)] + ['Amount', 'Class']
+CREDITCARD_DTYPES = {**{col: np.float32 for col in CREDITCARD_COLUMNS[:-1]}, 'Class': np.int8}
+CREDITCARD_STORE = os.path.join(DATA_DIR, 'creditcard_columnar')
+CSV_CHUNK_ROWS = 50000
 
 @st.cache_data
 def load_stock_data():
@@ -66,81 +77,194 @@ def load_stock_data():
         st.info("💡 Check that the CSV file exists and is properly formatted.")
         return None
 
+def _find_credit_card_csv():
+    """creditcard.csv in data_analyst/data, else in the repository root"""
+    for path in (os.path.join(DATA_DIR, 'creditcard.csv'),
+                 os.path.join(os.path.dirname(__file__), '..', '..', 'creditcard.csv')):
+        if os.path.exists(path):
+            return path
+    return None
+
+def _count_csv_rows(path):
+    """Data rows of a CSV (newline count minus header), without parsing it"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+def _read_store_meta(store_dir=CREDITCARD_STORE):
+    try:
+        with open(os.path.join(store_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def convert_credit_card_csv(csv_path, store_dir=CREDITCARD_STORE):
+    """
+    One-time CSV -> columnar conversion (float32 features, int8 Class)
+
+    The CSV is parsed in chunks straight into memory-mapped .npy files,
+    so the full table is never held in memory.
+    """
+    capacity = _count_csv_rows(csv_path)
+    tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = {
+        col: np.lib.format.open_memmap(os.path.join(tmp_dir, f'{col}.npy'), mode='w+',
+                                       dtype=CREDITCARD_DTYPES[col], shape=(capacity,))
+        for col in CREDITCARD_COLUMNS
+    }
+    rows = 0
+    for chunk in pd.read_csv(csv_path, usecols=CREDITCARD_COLUMNS, dtype=CREDITCARD_DTYPES,
+                             chunksize=CSV_CHUNK_ROWS):
+        for col, array in columns.items():
+            array[rows:rows + len(chunk)] = chunk[col].to_numpy()
+        rows += len(chunk)
+    for array in columns.values():
+        array.flush()
+    classes = np.asarray(columns['Class'][:rows])
+    del columns
+
+    meta = {
+        'rows': rows,
+        'columns': CREDITCARD_COLUMNS,
+        'class_counts': {str(k): int(v) for k, v in zip(*np.unique(classes, return_counts=True))},
+        'source': _source_signature(csv_path),
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # Publish; another session may have converted concurrently - either copy is fine
+    shutil.rmtree(store_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, store_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return meta
+
+def _credit_card_store():
+    """Metadata of an up-to-date columnar store (converting the CSV if needed), or None"""
+    meta = _read_store_meta()
+    csv_path = _find_credit_card_csv()
+    if csv_path is None:
+        # Store deployed without the CSV
+        return meta
+    if meta is None or meta.get('source') != _source_signature(csv_path):
+        meta = convert_credit_card_csv(csv_path)
+    return meta
+
+def stratified_sample_indices(classes, sample_size, random_state=42):
+    """Sorted row indices of a sample keeping the class proportions of `classes`"""
+    rng = np.random.default_rng(random_state)
+    picked = []
+    for value in np.unique(classes):
+        rows = np.flatnonzero(classes == value)
+        # At least one row per class: a fraud sample without fraud is useless
+        take = min(len(rows), max(1, int(round(sample_size * len(rows) / len(classes)))))
+        picked.append(rng.choice(rows, size=take, replace=False))
+    return np.sort(np.concatenate(picked))
+
 @st.cache_data
-def load_credit_card_data(sample_size=50000):
+def load_credit_card_data(sample_size=50000, columns=None, random_state=42):
     """
-    Load credit card fraud data with sampling for performance
+    Load credit card fraud data (stratified sample or the full dataset)
     
     Args:
-        sample_size: Number of rows to sample (default 50000)
+        sample_size: Number of rows to sample, stratified on Class (None = all rows)
+        columns: Columns to load (default all); other columns are never read
+        random_state: Seed of the sample
     """
     try:
-        # Try to load from data_analyst/data folder first
-        data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'creditcard.csv')
-        if os.path.exists(data_path):
-            # For large files, use chunksize and sample
-            df = pd.read_csv(data_path, nrows=sample_size)
-        else:
-            # Fallback to parent directory
-            parent_path = os.path.join(os.path.dirname(__file__), '..', '..', 'creditcard.csv')
-            if os.path.exists(parent_path):
-                df = pd.read_csv(parent_path, nrows=sample_size)
-            else:
-                # Generate sample fraud data for demonstration
-                st.info("📊 **Using Sample Credit Card Fraud Data**")
-                st.caption("The actual CSV file (143.84 MB) is not included in the repository. Displaying generated sample data for demonstration purposes.")
-                
-                import numpy as np
-                
-                # Generate sample data with realistic fraud patterns
-                np.random.seed(42)
-                n_samples = min(sample_size, 10000)  # Limit for performance
-                
-                # Generate PCA features (V1-V28)
-                pca_features = {}
-                for i in range(1, 29):
-                    pca_features[f'V{i}'] = np.random.randn(n_samples)
-                
-                # Generate Time (seconds elapsed)
-                time_values = np.sort(np.random.randint(0, 172800, n_samples))  # 48 hours
-                
-                # Generate Amount with realistic distribution
-                # Most transactions are small, few are large
-                amounts = np.random.lognormal(3, 1.5, n_samples)
-                amounts = np.clip(amounts, 0, 5000)  # Cap at $5000
-                
-                # Generate Class (0 = legitimate, 1 = fraud)
-                # Create imbalanced dataset (~0.17% fraud rate)
-                fraud_rate = 0.0017
-                n_fraud = int(n_samples * fraud_rate)
-                classes = np.array([0] * (n_samples - n_fraud) + [1] * n_fraud)
-                np.random.shuffle(classes)
-                
-                # Make fraud transactions have different patterns
-                fraud_mask = classes == 1
-                
-                # Fraud transactions tend to have:
-                # - Higher amounts on average
-                amounts[fraud_mask] = amounts[fraud_mask] * 1.5
-                
-                # - Different PCA patterns (modify some V features)
-                for i in [1, 3, 4, 10, 12, 14, 17]:
-                    pca_features[f'V{i}'][fraud_mask] += np.random.randn(fraud_mask.sum()) * 2
-                
-                # Create DataFrame
-                df = pd.DataFrame({
-                    'Time': time_values,
-                    **pca_features,
-                    'Amount': amounts,
-                    'Class': classes
-                })
-        
-        return df
+        meta = _credit_card_store()
+        columns = list(columns) if columns else CREDITCARD_COLUMNS
+
+        if meta is not None:
+            rows = meta['rows']
+
+            def column(name):
+                return np.load(os.path.join(CREDITCARD_STORE, f'{name}.npy'), mmap_mode='r')[:rows]
+
+            index = None
+            if sample_size is not None and sample_size < rows:
+                index = stratified_sample_indices(column('Class'), sample_size, random_state)
+
+            # Only the selected rows of the requested columns are paged in
+            return pd.DataFrame({
+                name: np.array(column(name) if index is None else column(name)[index])
+                for name in columns
+            })
+
+        df = _generate_sample_credit_card_data(sample_size)
+        return df[columns]
     except Exception as e:
         st.error(f"❌ Error loading credit card data: {e}")
         st.info("💡 Check that the CSV file exists and has the correct format.")
         return None
 
+def _generate_sample_credit_card_data(sample_size):
+    """Sample fraud data for demonstration when creditcard.csv is not available"""
+    st.info("📊 **Using Sample Credit Card Fraud Data**")
+    st.caption("The actual CSV file (143.84 MB) is not included in the repository. Displaying generated sample data for demonstration purposes.")
+
+    # Generate sample data with realistic fraud patterns
+    np.random.seed(42)
+    n_samples = min(sample_size or 10000, 10000)  # Limit for performance
+
+    # Generate PCA features (V1-V28)
+    pca_features = {}
+    for i in range(1, 29):
+        pca_features[f'V{i}'] = np.random.randn(n_samples)
+
+    # Generate Time (seconds elapsed)
+    time_values = np.sort(np.random.randint(0, 172800, n_samples))  # 48 hours
+
+    # Generate Amount with realistic distribution
+    # Most transactions are small, few are large
+    amounts = np.random.lognormal(3, 1.5, n_samples)
+    amounts = np.clip(amounts, 0, 5000)  # Cap at $5000
+
+    # Generate Class (0 = legitimate, 1 = fraud)
+    # Create imbalanced dataset (~0.17% fraud rate)
+    fraud_rate = 0.0017
+    n_fraud = int(n_samples * fraud_rate)
+    classes = np.array([0] * (n_samples - n_fraud) + [1] * n_fraud)
+    np.random.shuffle(classes)
+
+    # Make fraud transactions have different patterns
+    fraud_mask = classes == 1
+
+    # Fraud transactions tend to have:
+    # - Higher amounts on average
+    amounts[fraud_mask] = amounts[fraud_mask] * 1.5
+
+    # - Different PCA patterns (modify some V features)
+    for i in [1, 3, 4, 10, 12, 14, 17]:
+        pca_features[f'V{i}'][fraud_mask] += np.random.randn(fraud_mask.sum()) * 2
+
+    # Create DataFrame
+    df = pd.DataFrame({
+        'Time': time_values,
+        **pca_features,
+        'Amount': amounts,
+        'Class': classes
+    })
+
+    return df
+
 def get_data_info(df):
     """Get basic information about the dataset"""
     if df is None:
@@ -36,6 +36,12 @@ def train_fraud_detection_model(X, y, n_estimators=100, max_depth=20,
     import time
     start_time = time.time()
     
+    # float32 end to end: the scaler keeps it and the forest uses it as-is,
+    # so the full 284k-row dataset is never duplicated as float64. X stays a
+    # DataFrame so the scaler records the feature names/order (predict_fraud)
+    X = X.astype(np.float32, copy=False) if isinstance(X, pd.DataFrame) else np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
@@ -209,7 +215,7 @@ def plot_feature_importance(importance_df):
     
     return fig
 
-def predict_fraud(model, scaler, transaction_data):
+def predict_fraud(model, scaler, transaction_data, feature_cols=None):
     """
     Predict fraud probability for new transaction
     
@@ -217,6 +223,7 @@ def predict_fraud(model, scaler, transaction_data):
         model: Trained model
         scaler: Fitted scaler
         transaction_data: Dictionary or DataFrame with transaction features
+        feature_cols: Training feature order (default: names recorded by the scaler)
     
     Returns:
         fraud_probability, prediction
@@ -225,6 +232,16 @@ def predict_fraud(model, scaler, transaction_data):
     if isinstance(transaction_data, dict):
         transaction_data = pd.DataFrame([transaction_data])
     
+    # Same columns, same order, same dtype as in training
+    if feature_cols is None:
+        feature_cols = getattr(scaler, 'feature_names_in_', None)
+    if feature_cols is not None:
+        missing = [col for col in feature_cols if col not in transaction_data.columns]
+        if missing:
+            raise ValueError(f"Missing features: {', '.join(missing)}")
+        transaction_data = transaction_data[list(feature_cols)]
+    transaction_data = transaction_data.astype(np.float32)
+    
     # Scale features
     transaction_scaled = scaler.transform(transaction_data)
     
@@ -3,9 +3,14 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from scipy.optimize import minimize, differential_evolution
+from scipy.optimize import differential_evolution
 from scipy import stats
 import warnings
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.macro_simulation import PolicyOptimizer, monte_carlo_risk, policy_outcomes, run_stress_tests
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="Professional Macro Policy AI", page_icon="🎯", layout="wide")
@@ -162,147 +167,21 @@ if 'scenarios' not in st.session_state:
 
 # ==================== HELPER FUNCTIONS ====================
 
+@st.cache_resource
+def get_policy_optimizer():
+    """Optimizer with solution cache shared across reruns"""
+    return PolicyOptimizer()
+
 @st.cache_data
 def monte_carlo_risk_analysis(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, 
                                target_growth, target_inflation, target_unemployment, n_sim=5000):
     """Monte Carlo simulation for risk analysis"""
-    
-    # Parameter distributions (uncertainty)
-    MPC_dist = np.random.normal(0.75, 0.05, n_sim)
-    alpha_I_dist = np.random.normal(200, 20, n_sim)
-    alpha_NX_dist = np.random.normal(100, 15, n_sim)
-    
-    # Shock distributions
-    demand_shocks = np.random.normal(0, 0.5, n_sim)
-    supply_shocks = np.random.normal(0, 0.3, n_sim)
-    
-    growth_dist = []
-    inflation_dist = []
-    unemployment_dist = []
-    
-    current_gdp = C + I + G + NX
-    
-    for i in range(n_sim):
-        MPC = np.clip(MPC_dist[i], 0.5, 0.9)
-        alpha_I = np.clip(alpha_I_dist[i], 100, 300)
-        alpha_NX = np.clip(alpha_NX_dist[i], 50, 150)
-        
-        # Calculate with uncertainty
-        I_new = I - alpha_I * (r_opt - r) + demand_shocks[i] * 100
-        NX_new = NX - alpha_NX * (r_opt - r) + demand_shocks[i] * 50
-        C_new = C + MPC * (G_opt - G) + demand_shocks[i] * 200
-        
-        GDP_new = C_new + I_new + G_opt + NX_new
-        growth = ((GDP_new - current_gdp) / current_gdp) * 100
-        
-        # Inflation with uncertainty
-        output_gap = (GDP_new - current_gdp) / current_gdp * 100
-        inflation_new = inflation + 0.3 * output_gap - 0.2 * (r_opt - r) + supply_shocks[i]
-        
-        # Unemployment
-        unemployment_new = unemployment - 0.5 * (growth - 2)
-        
-        growth_dist.append(growth)
-        inflation_dist.append(inflation_new)
-        unemployment_dist.append(unemployment_new)
-    
-    # Calculate risk metrics
-    growth_mean = np.mean(growth_dist)
-    growth_std = np.std(growth_dist)
-    growth_ci_lower = np.percentile(growth_dist, 2.5)
-    growth_ci_upper = np.percentile(growth_dist, 97.5)
-    growth_var_95 = np.percentile(growth_dist, 5)
-    growth_cvar_95 = np.mean([g for g in growth_dist if g <= growth_var_95])
-    prob_recession = np.mean([g < 0 for g in growth_dist]) * 100
-    
-    inflation_mean = np.mean(inflation_dist)
-    inflation_std = np.std(inflation_dist)
-    inflation_ci_lower = np.percentile(inflation_dist, 2.5)
-    inflation_ci_upper = np.percentile(inflation_dist, 97.5)
-    
-    unemployment_mean = np.mean(unemployment_dist)
-    unemployment_std = np.std(unemployment_dist)
-    
-    return {
-        'growth': {'mean': growth_mean, 'std': growth_std, 
-                  'ci_lower': growth_ci_lower, 'ci_upper': growth_ci_upper,
-                  'var_95': growth_var_95, 'cvar_95': growth_cvar_95,
-                  'dist': growth_dist},
-        'inflation': {'mean': inflation_mean, 'std': inflation_std,
-                     'ci_lower': inflation_ci_lower, 'ci_upper': inflation_ci_upper,
-                     'dist': inflation_dist},
-        'unemployment': {'mean': unemployment_mean, 'std': unemployment_std,
-                        'dist': unemployment_dist},
-        'prob_recession': prob_recession
-    }
+    return monte_carlo_risk(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, n_sim=n_sim)
 
-def run_stress_test(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenario_params):
-    """Run stress test for a specific scenario"""
-    
-    current_gdp = C + I + G + NX
-    periods = 12
-    
-    # Initialize paths
-    gdp_path = np.zeros(periods)
-    inflation_path = np.zeros(periods)
-    unemployment_path = np.zeros(periods)
-    rate_path = np.zeros(periods)
-    
-    gdp_path[0] = current_gdp
-    inflation_path[0] = inflation
-    unemployment_path[0] = unemployment
-    rate_path[0] = r_opt
-    
-    # Apply shocks
-    for t in range(1, periods):
-        if t == 2:  # Shock hits in period 2
-            gdp_path[t] = gdp_path[t-1] * (1 + scenario_params['demand_shock']/100)
-            inflation_path[t] = inflation_path[t-1] + scenario_params['supply_shock']
-            rate_path[t] = rate_path[t-1] + scenario_params['financial_shock']
-        
-        # Policy response (Taylor Rule)
-        if t > 2:
-            inflation_gap = inflation_path[t-1] - 3.0  # Target inflation
-            output_gap = (gdp_path[t-1] - current_gdp) / current_gdp * 100
-            rate_path[t] = r_opt + 0.5 * inflation_gap + 0.5 * output_gap
-            rate_path[t] = np.clip(rate_path[t], 2.0, 10.0)
-        
-        # Economic dynamics
-        if t > 0 and gdp_path[t] == 0:
-            gdp_growth = -0.5 * (rate_path[t] - rate_path[t-1]) + 0.3 * (inflation_path[t-1] - 2)
-            gdp_path[t] = gdp_path[t-1] * (1 + gdp_growth/100)
-            
-            if inflation_path[t] == 0:
-                inflation_path[t] = inflation_path[t-1] + 0.2 * gdp_growth - 0.3 * (rate_path[t] - rate_path[t-1])
-            
-            unemployment_path[t] = unemployment_path[t-1] - 0.5 * gdp_growth
-    
-    # Calculate resilience metrics
-    max_drawdown = min((gdp_path - current_gdp) / current_gdp * 100)
-    recovery_time = 0
-    for t in range(len(gdp_path)):
-        if gdp_path[t] >= current_gdp * 0.99:
-            recovery_time = t
-            break
-    if recovery_time == 0:
-        recovery_time = periods
-    
-    avg_inflation = np.mean(inflation_path)
-    max_unemployment = max(unemployment_path)
-    
-    resilience_score = max(0, 100 - abs(max_drawdown) * 10 - recovery_time * 5)
-    
-    return {
-        'gdp_path': gdp_path,
-        'inflation_path': inflation_path,
-        'unemployment_path': unemployment_path,
-        'rate_path': rate_path,
-        'max_drawdown': max_drawdown,
-        'recovery_time': recovery_time,
-        'avg_inflation': avg_inflation,
-        'max_unemployment': max_unemployment,
-        'resilience_score': resilience_score
-    }
+@st.cache_data
+def run_all_stress_tests(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenarios):
+    """Run every stress scenario in one batched simulation"""
+    return run_stress_tests(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenarios)
 
 def generate_policy_statement(results, lang='ID'):
     """Generate central bank-style policy statement"""
@@ -429,65 +308,24 @@ with tab1:
         
         if st.button(txt['optimize'], type='primary'):
             with st.spinner('Running professional optimization...'):
-                # Parameters
-                MPC = 0.75
-                alpha_I = 200
-                alpha_NX = 100
-                
-                # Objective function
-                def objective(x):
-                    G_new, r_new = x
-                    
-                    I_new = I - alpha_I * (r_new - r)
-                    NX_new = NX - alpha_NX * (r_new - r)
-                    C_new = C + MPC * (G_new - G)
-                    
-                    GDP_new = C_new + I_new + G_new + NX_new
-                    growth_actual = ((GDP_new - current_gdp) / current_gdp) * 100
-                    
-                    output_gap = (GDP_new - current_gdp) / current_gdp * 100
-                    inflation_new = inflation + 0.3 * output_gap - 0.2 * (r_new - r)
-                    
-                    unemployment_new = unemployment - 0.5 * (growth_actual - 2)
-                    
-                    loss_growth = w_growth * (growth_actual - target_growth)**2
-                    loss_inflation = w_inflation * (inflation_new - target_inflation)**2
-                    loss_unemployment = w_unemployment * (unemployment_new - target_unemployment)**2
-                    
-                    return loss_growth + loss_inflation + loss_unemployment
-                
-                # Constraints
-                def constraint_deficit(x):
-                    G_new, r_new = x
-                    deficit = (G_new - G) / current_gdp * 100
-                    return max_deficit - deficit
-                
-                def constraint_rate_change(x):
-                    G_new, r_new = x
-                    return max_rate_change - abs(r_new - r)
-                
-                bounds = [(G * 0.8, G * 1.5), (min_rate, max_rate)]
-                constraints = [
-                    {'type': 'ineq', 'fun': constraint_deficit},
-                    {'type': 'ineq', 'fun': constraint_rate_change}
-                ]
-                
-                x0 = [G, r]
-                result = minimize(objective, x0, method='SLSQP', bounds=bounds, constraints=constraints)
+                result = get_policy_optimizer().solve(
+                    C=C, I=I, G=G, NX=NX, r=r, inflation=inflation, unemployment=unemployment,
+                    target_growth=target_growth, target_inflation=target_inflation,
+                    target_unemployment=target_unemployment,
+                    max_deficit=max_deficit, max_rate_change=max_rate_change,
+                    min_rate=min_rate, max_rate=max_rate,
+                    w_growth=w_growth, w_inflation=w_inflation, w_unemployment=w_unemployment
+                )
                 
-                if result.success:
-                    G_opt, r_opt = result.x
+                if result['success']:
+                    G_opt, r_opt = result['x']
                     
                     # Calculate predicted outcomes
-                    I_opt = I - alpha_I * (r_opt - r)
-                    NX_opt = NX - alpha_NX * (r_opt - r)
-                    C_opt = C + MPC * (G_opt - G)
-                    GDP_opt = C_opt + I_opt + G_opt + NX_opt
-                    
-                    growth_pred = ((GDP_opt - current_gdp) / current_gdp) * 100
-                    output_gap = (GDP_opt - current_gdp) / current_gdp * 100
-                    inflation_pred = inflation + 0.3 * output_gap - 0.2 * (r_opt - r)
-                    unemployment_pred = unemployment - 0.5 * (growth_pred - 2)
+                    outcome = policy_outcomes(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment)
+                    I_opt, NX_opt, C_opt, GDP_opt = outcome['I'], outcome['NX'], outcome['C'], outcome['GDP']
+                    growth_pred = outcome['growth']
+                    inflation_pred = outcome['inflation']
+                    unemployment_pred = outcome['unemployment']
                     
                     score_growth = max(0, 100 - abs(growth_pred - target_growth) * 20)
                     score_inflation = max(0, 100 - abs(inflation_pred - target_inflation) * 20)
@@ -799,12 +637,13 @@ with tab4:
             
             if st.button(txt['run_stress'], type='primary'):
                 with st.spinner('Running stress test...'):
-                    stress_result = run_stress_test(
+                    all_results = run_all_stress_tests(
                         results['G_opt'], results['r_opt'],
                         C, I, G, NX, r, inflation, unemployment,
-                        stress_scenarios[selected_scenario]
+                        stress_scenarios
                     )
-                    st.session_state['stress_result'] = stress_result
+                    st.session_state['stress_all'] = all_results
+                    st.session_state['stress_result'] = all_results[selected_scenario]
                     st.session_state['stress_scenario'] = selected_scenario
         
         with col2:
@@ -860,6 +699,19 @@ with tab4:
                     st.warning(f"⚠️ **Moderate Resilience**: Policy shows some vulnerability to {scenario_name}")
                 else:
                     st.error(f"🔴 **Low Resilience**: Policy may need adjustment for {scenario_name} scenario")
+                
+                # All scenarios (computed in the same batch)
+                if 'stress_all' in st.session_state:
+                    st.markdown("#### All Scenarios")
+                    df_stress = pd.DataFrame([
+                        {'Scenario': name,
+                         txt['resilience_score']: res['resilience_score'],
+                         txt['max_drawdown']: res['max_drawdown'],
+                         txt['recovery_time']: res['recovery_time'],
+                         'Max Unemployment': res['max_unemployment']}
+                        for name, res in st.session_state['stress_all'].items()
+                    ])
+                    st.dataframe(df_stress.round(2), use_container_width=True, hide_index=True)
             else:
                 st.info("Select a stress scenario and click 'Run Stress Test'")
     else:
@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
-import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.world_bank import fetch_indicator, fetch_indicators
 
 st.set_page_config(page_title="Global Economic Dashboard", page_icon="🌍", layout="wide")
 
@@ -22,6 +24,7 @@ T = {
         'select_indicator': "Select Indicator",
         'select_countries': "Select Countries (max 8)",
         'fetch_data': "🔄 Fetch Live Data",
+        'fetch_both': "🔄 Fetch Both Indicators",
         # Economic Indicators
         'gdp_growth': "GDP Growth (Annual %)",
         'inflation': "Inflation (CPI %)",
@@ -82,6 +85,7 @@ T = {
         'select_indicator': "Pilih Indikator",
         'select_countries': "Pilih Negara (maks 8)",
         'fetch_data': "🔄 Ambil Data Langsung",
+        'fetch_both': "🔄 Ambil Kedua Indikator",
         # Economic Indicators
         'gdp_growth': "Pertumbuhan PDB (Tahunan %)",
         'inflation': "Inflasi (IHK %)",
@@ -179,33 +183,29 @@ COUNTRIES = {
 }
 
 def fetch_world_bank_data(indicator_code, country_codes, start_year=2010, end_year=2024):
-    """Fetch data from World Bank API"""
+    """Fetch data from World Bank API (concurrent, paginated, cached on disk)"""
     try:
-        countries_str = ';'.join(country_codes)
-        url = f"https://api.worldbank.org/v2/country/{countries_str}/indicator/{indicator_code}"
-        params = {
-            'date': f'{start_year}:{end_year}',
-            'format': 'json',
-            'per_page': 1000
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if len(data) > 1 and data[1]:
-                df = pd.DataFrame(data[1])
-                df = df[['country', 'date', 'value']].copy()
-                df.columns = ['Country', 'Year', 'Value']
-                df['Country'] = df['Country'].apply(lambda x: x['value'])
-                df['Year'] = pd.to_numeric(df['Year'])
-                df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-                return df.dropna()
-        return None
+        df = fetch_indicator(indicator_code, country_codes, start_year, end_year)
+        return df if not df.empty else None
     except Exception as e:
         st.error(f"Error: {e}")
         return None
 
+def fetch_world_bank_batch(indicator_names, country_codes, start_year=2010, end_year=2024):
+    """Fetch several indicators in one batched call; returns {name: long DataFrame}"""
+    try:
+        wide = fetch_indicators({name: INDICATORS[name] for name in indicator_names},
+                                country_codes, start_year, end_year)
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return {}
+    result = {}
+    for name in indicator_names:
+        df = wide[['Country', 'Year', name]].rename(columns={name: 'Value'}).dropna().reset_index(drop=True)
+        if not df.empty:
+            result[name] = df
+    return result
+
 # TABS
 tab1, tab2, tab3, tab4 = st.tabs([txt['tab1'], txt['tab2'], txt['tab3'], txt['tab4']])
 
@@ -417,6 +417,22 @@ with tab3:
 with tab4:
     st.markdown(f"### {txt['tab4']}")
     
+    # Indicators and countries selected in tabs 1 & 2, fetched together in one batch
+    composite_countries = list(dict.fromkeys(selected_countries + selected_countries_hdi))
+    st.caption(f"{selected_indicator} vs {selected_hdi}")
+    if st.button(txt['fetch_both'], type='primary', key='composite_fetch', disabled=not composite_countries):
+        with st.spinner(txt['loading']):
+            batch = fetch_world_bank_batch([selected_indicator, selected_hdi],
+                                           [COUNTRIES[c] for c in composite_countries])
+        if selected_indicator in batch and selected_hdi in batch:
+            st.session_state['eco_data'] = batch[selected_indicator]
+            st.session_state['eco_indicator'] = selected_indicator
+            st.session_state['hdi_data'] = batch[selected_hdi]
+            st.session_state['hdi_indicator'] = selected_hdi
+            st.success(txt['success'])
+        else:
+            st.error(txt['error'])
+    
     if 'eco_data' in st.session_state and 'hdi_data' in st.session_state:
         df_eco = st.session_state['eco_data']
         df_hdi = st.session_state['hdi_data']
@@ -0,0 +1,248 @@
+"""
+Macro policy simulation engine for the Growth Optimizer.
+
+All Monte Carlo draws and stress-test scenarios are evolved together as
+(n_paths x periods) arrays: the only Python loop left is over the (short)
+time axis. Optimizer solutions are memoized per parameter set and
+warm-started from the nearest cached solution, so slider-driven what-if
+sessions don't re-solve from scratch.
+"""
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import minimize
+
+# Behavioural parameters of the IS/Okun/Phillips block
+MPC = 0.75
+ALPHA_I = 200
+ALPHA_NX = 100
+
+
+# ==================== STATIC MODEL ====================
+
+def policy_outcomes(G_new, r_new, C, I, G, NX, r, inflation, unemployment,
+                    mpc=MPC, alpha_I=ALPHA_I, alpha_NX=ALPHA_NX,
+                    demand_shock=0.0, supply_shock=0.0):
+    """
+    One-period response to a fiscal/monetary policy mix.
+
+    Every argument may be a scalar or an array; results broadcast, so a
+    whole Monte Carlo sample is evaluated in one call.
+    """
+    current_gdp = C + I + G + NX
+    I_new = I - alpha_I * (r_new - r) + demand_shock * 100
+    NX_new = NX - alpha_NX * (r_new - r) + demand_shock * 50
+    C_new = C + mpc * (G_new - G) + demand_shock * 200
+
+    GDP_new = C_new + I_new + G_new + NX_new
+    growth = (GDP_new - current_gdp) / current_gdp * 100
+    inflation_new = inflation + 0.3 * growth - 0.2 * (r_new - r) + supply_shock
+    unemployment_new = unemployment - 0.5 * (growth - 2)
+
+    return {
+        'C': C_new, 'I': I_new, 'NX': NX_new, 'GDP': GDP_new,
+        'growth': growth, 'inflation': inflation_new, 'unemployment': unemployment_new,
+    }
+
+
+def monte_carlo_risk(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment,
+                     n_sim=5000, seed=None):
+    """Monte Carlo risk analysis with parameter and shock uncertainty (vectorized)."""
+    rng = np.random.default_rng(seed)
+    mpc = np.clip(rng.normal(0.75, 0.05, n_sim), 0.5, 0.9)
+    alpha_I = np.clip(rng.normal(200, 20, n_sim), 100, 300)
+    alpha_NX = np.clip(rng.normal(100, 15, n_sim), 50, 150)
+    demand_shocks = rng.normal(0, 0.5, n_sim)
+    supply_shocks = rng.normal(0, 0.3, n_sim)
+
+    out = policy_outcomes(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment,
+                          mpc=mpc, alpha_I=alpha_I, alpha_NX=alpha_NX,
+                          demand_shock=demand_shocks, supply_shock=supply_shocks)
+    growth_dist = out['growth']
+    inflation_dist = out['inflation']
+    unemployment_dist = out['unemployment']
+
+    growth_var_95 = np.percentile(growth_dist, 5)
+    growth_ci_lower, growth_ci_upper = np.percentile(growth_dist, [2.5, 97.5])
+    inflation_ci_lower, inflation_ci_upper = np.percentile(inflation_dist, [2.5, 97.5])
+
+    return {
+        'growth': {'mean': growth_dist.mean(), 'std': growth_dist.std(),
+                   'ci_lower': growth_ci_lower, 'ci_upper': growth_ci_upper,
+                   'var_95': growth_var_95,
+                   'cvar_95': growth_dist[growth_dist <= growth_var_95].mean(),
+                   'dist': growth_dist},
+        'inflation': {'mean': inflation_dist.mean(), 'std': inflation_dist.std(),
+                      'ci_lower': inflation_ci_lower, 'ci_upper': inflation_ci_upper,
+                      'dist': inflation_dist},
+        'unemployment': {'mean': unemployment_dist.mean(), 'std': unemployment_dist.std(),
+                         'dist': unemployment_dist},
+        'prob_recession': (growth_dist < 0).mean() * 100,
+    }
+
+
+# ==================== DYNAMIC PATHS ====================
+
+def simulate_paths(gdp0, inflation0, unemployment0, rate0, demand_shock, supply_shock,
+                   financial_shock, periods=12, shock_period=2, target_inflation=3.0,
+                   min_rate=2.0, max_rate=10.0):
+    """
+    Evolve many shock scenarios at once.
+
+    Shock arguments are 1-D arrays (one entry per path). After the shock
+    quarter the central bank follows a Taylor rule around `rate0`. Returns
+    (n_paths x periods) arrays for gdp, inflation, unemployment and rate.
+    """
+    demand_shock, supply_shock, financial_shock = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (demand_shock, supply_shock, financial_shock))
+    )
+    n_paths = demand_shock.shape[0]
+
+    gdp = np.empty((n_paths, periods))
+    infl = np.empty((n_paths, periods))
+    unemp = np.empty((n_paths, periods))
+    rate = np.empty((n_paths, periods))
+    gdp[:, 0], infl[:, 0], unemp[:, 0], rate[:, 0] = gdp0, inflation0, unemployment0, rate0
+
+    for t in range(1, periods):
+        if t == shock_period:
+            growth = demand_shock
+            rate[:, t] = rate[:, t - 1] + financial_shock
+            infl[:, t] = infl[:, t - 1] + supply_shock
+        else:
+            if t > shock_period:
+                inflation_gap = infl[:, t - 1] - target_inflation
+                output_gap = (gdp[:, t - 1] - gdp0) / gdp0 * 100
+                rate[:, t] = np.clip(rate0 + 0.5 * inflation_gap + 0.5 * output_gap, min_rate, max_rate)
+            else:
+                rate[:, t] = rate[:, t - 1]
+            rate_change = rate[:, t] - rate[:, t - 1]
+            growth = -0.5 * rate_change + 0.3 * (infl[:, t - 1] - 2)
+            infl[:, t] = infl[:, t - 1] + 0.2 * growth - 0.3 * rate_change
+
+        gdp[:, t] = gdp[:, t - 1] * (1 + growth / 100)
+        unemp[:, t] = unemp[:, t - 1] - 0.5 * growth
+
+    return {'gdp': gdp, 'inflation': infl, 'unemployment': unemp, 'rate': rate}
+
+
+def run_stress_tests(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenarios,
+                     periods=12, shock_period=2):
+    """
+    Run every stress scenario in one batched simulation.
+
+    Args:
+        scenarios: dict {name: {'demand_shock', 'supply_shock', 'financial_shock'}}
+
+    Returns:
+        dict {name: result} with paths and resilience metrics per scenario.
+    """
+    names = list(scenarios)
+    current_gdp = C + I + G + NX
+    paths = simulate_paths(
+        current_gdp, inflation, unemployment, r_opt,
+        demand_shock=[scenarios[n]['demand_shock'] for n in names],
+        supply_shock=[scenarios[n]['supply_shock'] for n in names],
+        financial_shock=[scenarios[n]['financial_shock'] for n in names],
+        periods=periods,
+        shock_period=shock_period,
+    )
+
+    drawdown = ((paths['gdp'] - current_gdp) / current_gdp * 100).min(axis=1)
+    # Quarters from the shock until GDP is back within 1% of baseline
+    recovered = paths['gdp'][:, shock_period:] >= current_gdp * 0.99
+    recovery_time = np.where(recovered.any(axis=1), recovered.argmax(axis=1), periods)
+    resilience = np.maximum(0, 100 - np.abs(drawdown) * 10 - recovery_time * 5)
+    avg_inflation = paths['inflation'].mean(axis=1)
+    max_unemployment = paths['unemployment'].max(axis=1)
+
+    return {
+        name: {
+            'gdp_path': paths['gdp'][i],
+            'inflation_path': paths['inflation'][i],
+            'unemployment_path': paths['unemployment'][i],
+            'rate_path': paths['rate'][i],
+            'max_drawdown': float(drawdown[i]),
+            'recovery_time': int(recovery_time[i]),
+            'avg_inflation': float(avg_inflation[i]),
+            'max_unemployment': float(max_unemployment[i]),
+            'resilience_score': float(resilience[i]),
+        }
+        for i, name in enumerate(names)
+    }
+
+
+# ==================== OPTIMIZER ====================
+
+class PolicyOptimizer:
+    """
+    SLSQP policy optimizer with a solution cache.
+
+    Solutions are memoized per (rounded) parameter vector. A new parameter
+    set starts from the solution of the nearest cached neighbour, which is
+    usually one slider step away and converges in a few iterations.
+    """
+
+    PARAM_KEYS = ('C', 'I', 'G', 'NX', 'r', 'inflation', 'unemployment',
+                  'target_growth', 'target_inflation', 'target_unemployment',
+                  'max_deficit', 'max_rate_change', 'min_rate', 'max_rate',
+                  'w_growth', 'w_inflation', 'w_unemployment')
+
+    def __init__(self, max_entries=512, decimals=6):
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, params):
+        return tuple(round(float(params[k]), self.decimals) for k in self.PARAM_KEYS)
+
+    def _warm_start(self, key, default):
+        """Solution of the nearest cached parameter set (scaled distance)."""
+        if not self._cache:
+            return default
+        keys = np.array(list(self._cache.keys()))
+        target = np.array(key)
+        scale = np.maximum(np.abs(keys).max(axis=0), 1e-9)
+        nearest = int(np.argmin((((keys - target) / scale) ** 2).sum(axis=1)))
+        return list(self._cache.values())[nearest]['x']
+
+    def solve(self, **params):
+        """
+        Find the (G, r) mix minimizing the weighted squared target misses.
+
+        Returns dict with 'success', 'x' (G_opt, r_opt), 'nit' and 'cached'.
+        """
+        key = self._key(params)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return {**self._cache[key], 'cached': True}
+        self.misses += 1
+
+        p = params
+        current_gdp = p['C'] + p['I'] + p['G'] + p['NX']
+
+        def objective(x):
+            out = policy_outcomes(x[0], x[1], p['C'], p['I'], p['G'], p['NX'], p['r'],
+                                  p['inflation'], p['unemployment'])
+            return (p['w_growth'] * (out['growth'] - p['target_growth']) ** 2
+                    + p['w_inflation'] * (out['inflation'] - p['target_inflation']) ** 2
+                    + p['w_unemployment'] * (out['unemployment'] - p['target_unemployment']) ** 2)
+
+        bounds = [(p['G'] * 0.8, p['G'] * 1.5), (p['min_rate'], p['max_rate'])]
+        constraints = [
+            {'type': 'ineq', 'fun': lambda x: p['max_deficit'] - (x[0] - p['G']) / current_gdp * 100},
+            {'type': 'ineq', 'fun': lambda x: p['max_rate_change'] - abs(x[1] - p['r'])},
+        ]
+        x0 = np.clip(self._warm_start(key, [p['G'], p['r']]),
+                     [b[0] for b in bounds], [b[1] for b in bounds])
+        result = minimize(objective, x0, method='SLSQP', bounds=bounds, constraints=constraints)
+
+        solution = {'success': bool(result.success), 'x': [float(v) for v in result.x], 'nit': int(result.nit)}
+        if result.success:
+            self._cache[key] = solution
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return {**solution, 'cached': False}
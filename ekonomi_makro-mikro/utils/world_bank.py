@@ -0,0 +1,177 @@
+"""
+World Bank indicator data layer.
+
+Fetches indicator x country series concurrently from the World Bank v2 API,
+follows pagination, and keeps every series in an on-disk cache so repeated
+comparisons (and Streamlit reruns) are served locally.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+API_URL = "https://api.worldbank.org/v2/country/{country}/indicator/{indicator}"
+CACHE_DIR = os.getenv(
+    'WB_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'world_bank')
+)
+CACHE_TTL = 24 * 3600  # indicator values are annual; revalidate once a day
+PER_PAGE = 1000
+MAX_WORKERS = 8
+
+
+class IndicatorCache:
+    """One JSON file per (indicator, country, year range) with ETag/TTL metadata."""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, indicator, country, start_year, end_year):
+        key = f"{indicator}|{country}|{start_year}:{end_year}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{indicator}_{country}_{digest}.json")
+
+    def get(self, indicator, country, start_year, end_year):
+        path = self._path(indicator, country, start_year, end_year)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, indicator, country, start_year, end_year, entry):
+        path = self._path(indicator, country, start_year, end_year)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)  # atomic, safe with concurrent writers
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+def _fetch_series(session, cache, indicator, country, start_year, end_year, timeout=10):
+    """
+    Fetch one indicator for one country, following every page.
+
+    Returns the cached records when still fresh or when the server answers
+    304 Not Modified. On network errors a stale cache entry is used.
+    """
+    entry = cache.get(indicator, country, start_year, end_year)
+    if cache.is_fresh(entry):
+        return entry['records']
+
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    url = API_URL.format(country=country, indicator=indicator)
+    records = []
+    etag = last_modified = None
+    page, pages = 1, 1
+    try:
+        while page <= pages:
+            params = {'date': f'{start_year}:{end_year}', 'format': 'json',
+                      'per_page': PER_PAGE, 'page': page}
+            response = session.get(url, params=params, headers=headers if page == 1 else None,
+                                   timeout=timeout)
+            if page == 1 and response.status_code == 304 and entry:
+                entry['fetched_at'] = time.time()
+                cache.put(indicator, country, start_year, end_year, entry)
+                return entry['records']
+            response.raise_for_status()
+
+            payload = response.json()
+            if page == 1:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+            if len(payload) < 2 or not payload[1]:
+                break
+            pages = int(payload[0].get('pages', 1))
+            records.extend(
+                {'Country': row['country']['value'], 'CountryCode': row.get('countryiso3code') or country,
+                 'Year': row['date'], 'Value': row['value']}
+                for row in payload[1]
+            )
+            page += 1
+    except (requests.RequestException, ValueError, KeyError):
+        if entry:
+            return entry['records']
+        raise
+
+    cache.put(indicator, country, start_year, end_year, {
+        'fetched_at': time.time(), 'etag': etag, 'last_modified': last_modified, 'records': records,
+    })
+    return records
+
+
+def fetch_indicators(indicators, country_codes, start_year=2010, end_year=2024,
+                     cache=None, max_workers=MAX_WORKERS):
+    """
+    Fetch many indicators for many countries in one call.
+
+    Args:
+        indicators: list of indicator codes, or dict {column name: indicator code}
+        country_codes: list of ISO3 country codes
+
+    Returns:
+        Wide DataFrame with Country, CountryCode, Year and one column per indicator.
+        Series that fail to download (without cache) are left as NaN.
+    """
+    if not isinstance(indicators, dict):
+        indicators = {code: code for code in indicators}
+    cache = cache or IndicatorCache()
+
+    jobs = [(name, code, country) for name, code in indicators.items() for country in country_codes]
+    frames = []
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_fetch_series, session, cache, code, country, start_year, end_year): name
+            for name, code, country in jobs
+        }
+        for future, name in futures.items():
+            try:
+                records = future.result()
+            except (requests.RequestException, ValueError, KeyError):
+                continue
+            if records:
+                frame = pd.DataFrame.from_records(records)
+                frame['Indicator'] = name
+                frames.append(frame)
+
+    columns = ['Country', 'CountryCode', 'Year', *indicators.keys()]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    tidy = pd.concat(frames, ignore_index=True)
+    tidy['Year'] = pd.to_numeric(tidy['Year'])
+    tidy['Value'] = pd.to_numeric(tidy['Value'], errors='coerce')
+    wide = (
+        tidy.groupby(['Country', 'CountryCode', 'Year', 'Indicator'])['Value'].first()
+        .unstack('Indicator')
+        .reindex(columns=list(indicators.keys()))
+        .reset_index()
+        .sort_values(['Country', 'Year'], ignore_index=True)
+    )
+    wide.columns.name = None
+    return wide[columns]
+
+
+def fetch_indicator(indicator_code, country_codes, start_year=2010, end_year=2024, cache=None):
+    """Single indicator in the long (Country, Year, Value) shape used by the pages."""
+    wide = fetch_indicators([indicator_code], country_codes, start_year, end_year, cache=cache)
+    df = wide.rename(columns={indicator_code: 'Value'})[['Country', 'Year', 'Value']]
+    return df.dropna().reset_index(drop=True)
@@ -2,19 +2,29 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
-from sklearn.metrics.pairwise import cosine_similarity
+import sys
+import os
+import copy
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.recommender import ItemKNNRecommender, data_fingerprint
+
+MODEL_DIR = Path(__file__).parent.parent / '.cache' / 'recommender'
 
 st.set_page_config(page_title="AI Recommender System", page_icon="🛍️", layout="wide")
 
 st.title("🛍️ AI Product Recommendation Engine")
 st.markdown("""
-**Collaborative Filtering**: This system uses **Cosine Similarity** to find users with similar purchase history and recommends products they haven't bought yet.
-It answers: *"Users like you also bought..."*
+**Collaborative Filtering**: This system uses **Item-Item Cosine Similarity** (top-k neighbours on a sparse purchase matrix) and recommends products that are bought together with what the customer already owns.
+It answers: *"Customers who bought this also bought..."* — and scales to hundreds of thousands of customers.
 """)
 
 # --- 1. Dynamic Data Loading ---
 st.sidebar.header("🎛️ Data Configuration")
-data_source = st.sidebar.radio("Data Source", ["Generate Synthetic Data", "Upload CSV File"])
+data_source = st.sidebar.radio("Data Source", ["Generate Synthetic Data", "Upload CSV File", "Large Store (Order Lines)"])
 
 @st.cache_data
 def generate_user_item_matrix(n_users, n_products):
@@ -32,7 +42,7 @@ def generate_user_item_matrix(n_users, n_products):
     if n_products <= len(base_products):
         products = base_products[:n_products]
     else:
-        products = base_products + [f"Product {i+dummy_start}" for i in range(n_products - len(base_products))]
+        products = base_products + [f"Product {i + len(base_products) + 1}" for i in range(n_products - len(base_products))]
     
     # 0 = No purchase, 1-5 = Rating/Purchase Count
     data = np.random.randint(0, 6, size=(n_users, n_products))
@@ -49,7 +59,60 @@ def generate_user_item_matrix(n_users, n_products):
     df = pd.DataFrame(data, columns=products, index=[f"User {i+1}" for i in range(n_users)])
     return df
 
+@st.cache_data
+def generate_orders(n_customers, n_products, n_orders):
+    """Long-format synthetic order lines for a large store (popularity follows a power law)"""
+    rng = np.random.default_rng(42)
+    products = rng.zipf(1.6, n_orders) % n_products
+    return pd.DataFrame({
+        'customer_id': [f"C{c:06d}" for c in rng.integers(0, n_customers, n_orders)],
+        'product': [f"Product {p + 1}" for p in products],
+        'quantity': rng.integers(1, 5, n_orders),
+    })
+
+
+def model_path(fingerprint, k):
+    return MODEL_DIR / f"itemknn_{fingerprint}_k{k}.joblib"
+
+
+@st.cache_resource(show_spinner="Training recommender...")
+def load_or_train(fingerprint, _df_matrix=None, _orders=None, k=50):
+    """Reuse the persisted model for this exact dataset, otherwise train and persist it."""
+    path = model_path(fingerprint, k)
+    if path.exists():
+        return ItemKNNRecommender.load(path)
+    model = ItemKNNRecommender(k=k)
+    if _orders is not None:
+        model.fit_orders(_orders, 'customer_id', 'product', 'quantity')
+    else:
+        model.fit_frame(_df_matrix)
+    model.save(path)
+    return model
+
+
+@st.cache_resource
+def model_update_lock():
+    """One lock shared by all sessions: model updates are serialized."""
+    return threading.Lock()
+
+
+def update_model(model, path, new_orders):
+    """
+    Apply new orders to a copy of the model, persist it and drop the cached
+    models. The cached instance is shared by every session, so it is never
+    mutated while other sessions may be reading it.
+    """
+    with model_update_lock():
+        # Start from the latest saved version so concurrent updates are not lost
+        updated = ItemKNNRecommender.load(path) if path.exists() else copy.deepcopy(model)
+        updated.partial_fit_orders(new_orders, 'customer_id', 'product', 'quantity')
+        updated.save(path)
+        load_or_train.clear()
+    return updated
+
+
 df_matrix = None
+orders = None
 
 if data_source == "Generate Synthetic Data":
     n_users = st.sidebar.slider("Number of Users", 10, 100, 20)
@@ -60,6 +123,25 @@ if data_source == "Generate Synthetic Data":
         
     df_matrix = generate_user_item_matrix(n_users, n_products)
 
+elif data_source == "Large Store (Order Lines)":
+    st.sidebar.info("CSV Format: customer_id, product, quantity (one row per order line).")
+    orders_file = st.sidebar.file_uploader("Upload Order Lines (CSV)", type=["csv"])
+    if orders_file:
+        try:
+            orders = pd.read_csv(orders_file)
+            orders.columns = [str(c).strip().lower() for c in orders.columns]
+            if 'quantity' not in orders.columns:
+                orders['quantity'] = 1
+            orders = orders[['customer_id', 'product', 'quantity']]
+            st.sidebar.success(f"{len(orders):,} order lines loaded!")
+        except Exception as e:
+            st.sidebar.error(f"Error reading CSV: {e}")
+            orders = None
+    else:
+        n_customers = st.sidebar.select_slider("Customers", [1_000, 10_000, 50_000, 200_000], value=10_000)
+        n_skus = st.sidebar.slider("Products (SKU)", 50, 2000, 500, step=50)
+        orders = generate_orders(n_customers, n_skus, n_customers * 5)
+
 else:
     uploaded_file = st.sidebar.file_uploader("Upload User-Item Matrix (CSV)", type=["csv"])
     st.sidebar.info("CSV Format: Rows = Users, Columns = Products, Values = Ratings/Counts (0 for empty).")
@@ -72,112 +154,131 @@ else:
             st.sidebar.error(f"Error reading CSV: {e}")
 
 # --- 2. Main Logic ---
-if df_matrix is not None:
-    # Compute Similarity
-    user_similarity = cosine_similarity(df_matrix)
-    df_similarity = pd.DataFrame(user_similarity, index=df_matrix.index, columns=df_matrix.index)
+if df_matrix is not None or orders is not None:
+    k_neighbors = st.sidebar.slider("Neighbours per Product (k)", 5, 200, 50, step=5)
+    fingerprint = data_fingerprint(orders if orders is not None else df_matrix)
+    if orders is not None:
+        model = load_or_train(fingerprint, _orders=orders, k=k_neighbors)
+    else:
+        model = load_or_train(fingerprint, _df_matrix=df_matrix, k=k_neighbors)
+
+    # New orders update the model incrementally (no retraining over all customers)
+    with st.sidebar.expander("➕ Add New Orders"):
+        new_orders_file = st.file_uploader("New order lines (customer_id, product, quantity)", type=["csv"], key="new_orders")
+        if new_orders_file and st.button("Update Model"):
+            new_orders = pd.read_csv(new_orders_file)
+            new_orders.columns = [str(c).strip().lower() for c in new_orders.columns]
+            if 'quantity' not in new_orders.columns:
+                new_orders['quantity'] = 1
+            model = update_model(model, model_path(fingerprint, k_neighbors), new_orders)
+            st.success(f"Model updated with {len(new_orders):,} order lines.")
+
+    st.caption(f"📦 {len(model.users):,} customers × {len(model.items):,} products · "
+               f"{model.interactions.nnz:,} interactions · top-{model.k} neighbours per product")
 
     col1, col2 = st.columns([1, 2])
 
     with col1:
         st.subheader("👤 Select Profile")
-        selected_user = st.selectbox("Choose a Customer", df_matrix.index)
+        if len(model.users) <= 1000:
+            selected_user = st.selectbox("Choose a Customer", model.users)
+        else:
+            selected_user = st.text_input("Customer ID", value=str(model.users[0]))
+            if not model.has_user(selected_user):
+                st.error("Customer not found.")
+                st.stop()
         
         # Show their history
         st.markdown("##### Purchase History:")
-        user_history = df_matrix.loc[selected_user]
-        purchased = user_history[user_history > 0].sort_values(ascending=False)
+        purchased = model.user_history(selected_user)
         
         if not purchased.empty:
-            for product, rating in purchased.items():
-                st.write(f"- {product} (Rating: {rating})")
+            for product, rating in purchased.head(15).items():
+                st.write(f"- {product} (Rating: {rating:.0f})")
+            if len(purchased) > 15:
+                st.caption(f"... and {len(purchased) - 15} more")
         else:
             st.write("No purchases yet.")
 
     with col2:
         st.subheader("💡 AI Recommendations")
         
-        # Recommendation Logic
-        sim_scores = df_similarity[selected_user]
+        recommendations = model.recommend([selected_user], n=3)
         
-        # Find most similar user (excluding self)
-        # Handle case where user has no similar neighbors (all 0 sim)
-        try:
-             most_similar_user = sim_scores.drop(selected_user).idxmax()
-             similarity_score = sim_scores[most_similar_user]
-        except:
-             most_similar_user = None
-             similarity_score = 0
-        
-        if similarity_score > 0:
-            st.info(f"**Most Similar Profile:** {most_similar_user} (Similarity: {similarity_score:.2f})")
-            
-            # Recommend items
-            similar_user_history = df_matrix.loc[most_similar_user]
-            recommendations = []
-            
-            for product, rating in similar_user_history.items():
-                if rating > 0 and user_history[product] == 0:
-                    recommendations.append((product, rating))
+        if purchased.empty:
+            st.warning("No purchase history yet (cold start).")
+        elif not recommendations.empty:
+            st.success("🔥 Top Recommendations:")
             
-            # Sort by rating of similar user
-            recommendations.sort(key=lambda x: x[1], reverse=True)
-            
-            if recommendations:
-                st.success("🔥 Top Recommendations:")
-                
-                # Dynamic columns for variable number of recs
-                cols = st.columns(3)
-                for i, (prod, rate) in enumerate(recommendations[:3]):
-                    with cols[i % 3]:
-                        st.markdown(f"""
-                        <div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #e0e0e0;">
-                            <h4 style="margin:0; color: #2c3e50;">{prod}</h4>
-                            <p style="margin:5px 0; color: #7f8c8d;">Rated {rate:.0f}/5 by similar users</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.warning("No new recommendations found (User has bought everything similar users bought).")
+            cols = st.columns(3)
+            for i, row in enumerate(recommendations.itertuples()):
+                because = model.explain(selected_user, row.item)
+                reason = f"Because you bought {because[0]} (similarity {because[1]:.2f})" if because else ""
+                with cols[i % 3]:
+                    st.markdown(f"""
+                    <div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #e0e0e0;">
+                        <h4 style="margin:0; color: #2c3e50;">{row.item}</h4>
+                        <p style="margin:5px 0; color: #7f8c8d;">Score {row.score:.2f}</p>
+                        <p style="margin:5px 0; color: #7f8c8d; font-size: 0.85em;">{reason}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
         else:
-            st.warning("No similar users found yet (cold start).")
+            st.warning("No new recommendations found (User has bought everything related products point to).")
+
+    # --- 3. Batch Recommendations ---
+    st.divider()
+    st.subheader("📤 Batch Recommendations (All Customers)")
+    n_batch = st.number_input("Recommendations per customer", 1, 20, 5)
+    if st.button("Generate for All Customers"):
+        with st.spinner(f"Scoring {len(model.users):,} customers..."):
+            all_recs = model.recommend(n=int(n_batch))
+        st.dataframe(all_recs.head(100), use_container_width=True)
+        st.download_button("📥 Download Recommendations (CSV)", all_recs.to_csv(index=False).encode('utf-8'),
+                           "recommendations.csv", "text/csv")
 
-    # --- 3. Visualizations ---
+    # --- 4. Visualizations ---
     st.divider()
     st.subheader("🧠 Under the Hood: The AI Brain")
 
-    tab1, tab2 = st.tabs(["User-Item Matrix (Raw Data)", "Similarity Heatmap (The AI Model)"])
+    tab1, tab2, tab3 = st.tabs(["User-Item Matrix (Sample)", "Product Similarity (The AI Model)", "Customer Similarity (Sample)"])
 
     with tab1:
         st.caption("Rows = Users, Columns = Products, Values = Rating/Purchase")
-        st.dataframe(df_matrix.style.background_gradient(cmap='Blues'))
+        if df_matrix is not None and len(df_matrix) <= 200:
+            st.dataframe(df_matrix.style.background_gradient(cmap='Blues'))
+        else:
+            sample_rows = np.arange(min(50, len(model.users)))
+            sample = model.interactions[sample_rows]
+            sample_items = np.unique(sample.indices)[:30]
+            st.caption(f"Showing {len(sample_rows)} of {len(model.users):,} customers (non-empty products only).")
+            st.dataframe(pd.DataFrame(sample[:, sample_items].toarray(),
+                                      index=[model.users[i] for i in sample_rows],
+                                      columns=[model.items[j] for j in sample_items]).style.background_gradient(cmap='Blues'))
 
-    with tab2:
-        st.caption("How close is User A to User B? (1.0 = Identical, 0.0 = Different)")
-        
+    def similarity_heatmap(df_similarity, label, title):
         # Convert similarity matrix to long format for Altair
-        similarity_long = df_similarity.reset_index().melt(
-            id_vars='index', 
-            var_name='User_B', 
+        similarity_long = df_similarity.rename_axis('A').reset_index().melt(
+            id_vars='A', 
+            var_name='B', 
             value_name='Similarity'
         )
-        similarity_long.rename(columns={'index': 'User_A'}, inplace=True)
         
         # Create Altair heatmap
         heatmap = alt.Chart(similarity_long).mark_rect().encode(
-            x=alt.X('User_B:N', title='User B'),
-            y=alt.Y('User_A:N', title='User A'),
+            x=alt.X('B:N', title=f'{label} B'),
+            y=alt.Y('A:N', title=f'{label} A'),
             color=alt.Color('Similarity:Q', 
                           scale=alt.Scale(scheme='redblue', domain=[0, 1], reverse=True),
                           title='Similarity Score'),
             tooltip=[
-                alt.Tooltip('User_A:N', title='User A'),
-                alt.Tooltip('User_B:N', title='User B'),
+                alt.Tooltip('A:N', title=f'{label} A'),
+                alt.Tooltip('B:N', title=f'{label} B'),
                 alt.Tooltip('Similarity:Q', title='Similarity', format='.2f')
             ]
         ).properties(
             width=600,
             height=600,
-            title='User Similarity Matrix'
+            title=title
         ).configure_axis(
             labelFontSize=10,
             titleFontSize=12
@@ -185,5 +286,13 @@ if df_matrix is not None:
         
         st.altair_chart(heatmap, use_container_width=True)
 
+    with tab2:
+        st.caption("Top-k neighbour similarity between the most popular products (0 = not a neighbour).")
+        similarity_heatmap(model.item_similarity_frame(max_items=30), 'Product', 'Product Similarity Matrix')
+
+    with tab3:
+        st.caption("How close is User A to User B? (1.0 = Identical, 0.0 = Different) — random sample of customers.")
+        similarity_heatmap(model.user_similarity_frame(max_users=50), 'User', 'User Similarity Matrix (Sample)')
+
 else:
     st.info("👈 Please upload a CSV file or use synthetic data to begin.")
@@ -21,6 +21,7 @@ from sklearn.decomposition import LatentDirichletAllocation
 # Add parent directory
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.data_generator import generate_sentiment_data
+from utils.advanced_nlp import analyze_sentiment_batch, detect_sarcasm_batch, sarcasm_adjusted_compound, ASPECT_KEYWORDS
 
 # Download NLTK data
 try:
@@ -40,8 +41,8 @@ st.markdown("Enterprise-grade NLP platform with **emotion detection**, **topic m
 
 # ========== HELPER FUNCTIONS ==========
 
-def analyze_sentiment_multilevel(text):
-    """Multi-level sentiment analysis"""
+def analyze_sentiment_multilevel(text, sarcasm=None):
+    """Multi-level sentiment analysis (VADER score flipped for confident sarcasm)"""
     if not text or pd.isna(text):
         return {
             'polarity': 0,
@@ -63,6 +64,8 @@ def analyze_sentiment_multilevel(text):
     sia = SentimentIntensityAnalyzer()
     vader_scores = sia.polarity_scores(text)
     compound = vader_scores['compound']
+    if sarcasm is not None:
+        compound = sarcasm_adjusted_compound(compound, sarcasm)
     
     # Sentiment classification
     if compound >= 0.05:
@@ -124,16 +127,8 @@ def extract_aspects(text):
     """Extract product aspects from text"""
     text_lower = text.lower()
     
-    aspects = {
-        'Product': ['product', 'quality', 'item', 'goods'],
-        'Price': ['price', 'cost', 'expensive', 'cheap', 'value', 'money'],
-        'Service': ['service', 'support', 'help', 'customer', 'staff'],
-        'Delivery': ['delivery', 'shipping', 'ship', 'arrived', 'package'],
-        'Packaging': ['packaging', 'box', 'wrapped', 'package']
-    }
-    
     found_aspects = []
-    for aspect, keywords in aspects.items():
+    for aspect, keywords in ASPECT_KEYWORDS.items():
         if any(keyword in text_lower for keyword in keywords):
             found_aspects.append(aspect)
     
@@ -190,13 +185,19 @@ def calculate_engagement_rate(df):
 # ========== SIDEBAR ==========
 st.sidebar.header("⚙️ Configuration")
 
-data_source = st.sidebar.radio("Data Source", ["Demo Data", "Custom Input"])
+data_source = st.sidebar.radio("Data Source", ["Demo Data", "Custom Input", "Upload CSV (Large Export)"])
 
 if data_source == "Custom Input":
     user_input = st.sidebar.text_area(
         "Paste comments (one per line)",
         "I love this product!\nTerrible customer service.\nGreat value for money.\nShipping was too slow."
     )
+elif data_source == "Upload CSV (Large Export)":
+    uploaded_file = st.sidebar.file_uploader("Upload reviews/comments (CSV)", type=["csv"])
+    with st.sidebar.expander("⚡ Batch Settings"):
+        batch_size = st.number_input("Model batch size (CPU)", 1, 256, 32)
+        chunk_size = st.number_input("Texts per chunk", 100, 10000, 1000, step=100)
+        detect_lang = st.checkbox("Detect language", value=False, help="Slowest non-model step")
 
 st.sidebar.divider()
 
@@ -207,6 +208,13 @@ show_advanced = st.sidebar.checkbox("Show Advanced Analytics", value=True)
 # ========== DATA LOADING ==========
 if data_source == "Demo Data":
     df = generate_sentiment_data()
+elif data_source == "Upload CSV (Large Export)":
+    df = pd.DataFrame(columns=['Comment'])
+    if uploaded_file:
+        raw = pd.read_csv(uploaded_file)
+        text_col = st.sidebar.selectbox("Text column", raw.columns)
+        df = raw.rename(columns={text_col: 'Comment'})
+        df['Comment'] = df['Comment'].fillna('').astype(str)
 else:
     if user_input:
         comments = [c.strip() for c in user_input.split('\n') if c.strip()]
@@ -214,9 +222,32 @@ else:
     else:
         df = pd.DataFrame(columns=['Comment'])
 
-if not df.empty:
+if not df.empty and data_source == "Upload CSV (Large Export)":
+    # Batched pipeline: dedupe, model batches, disk cache by text hash, chunked progress
+    progress = st.progress(0.0, text="Analyzing comments...")
+    batch = analyze_sentiment_batch(
+        df['Comment'], batch_size=int(batch_size), chunk_size=int(chunk_size), detect_lang=detect_lang,
+        progress_callback=lambda done, total: progress.progress(done / max(total, 1), text=f"Analyzed {done:,}/{total:,} unique comments")
+    )
+    progress.empty()
+    
+    df['Polarity'] = batch['polarity'].to_numpy()
+    df['Subjectivity'] = batch['subjectivity'].to_numpy()
+    df['VADER_Score'] = batch['vader_compound'].to_numpy()
+    df['Sentiment'] = batch['sentiment'].to_numpy()
+    df['Intensity'] = np.select(
+        [df['VADER_Score'] >= 0.5, df['VADER_Score'] >= 0.05, df['VADER_Score'] <= -0.5, df['VADER_Score'] <= -0.05],
+        ['Very Positive', 'Positive', 'Very Negative', 'Negative'], default='Neutral'
+    )
+    df['Emotion'] = batch['emotion'].str.title().to_numpy()
+    df['Aspects'] = batch['aspects'].to_numpy()
+    
+elif not df.empty:
     # Perform sentiment analysis
-    sentiment_results = df['Comment'].apply(analyze_sentiment_multilevel)
+    sarcasm = detect_sarcasm_batch(df['Comment'].fillna('').astype(str).tolist())
+    sentiment_results = pd.Series(
+        [analyze_sentiment_multilevel(text, s) for text, s in zip(df['Comment'], sarcasm)], index=df.index
+    )
     
     df['Polarity'] = sentiment_results.apply(lambda x: x['polarity'])
     df['Subjectivity'] = sentiment_results.apply(lambda x: x['subjectivity'])
@@ -227,7 +258,8 @@ if not df.empty:
     
     # Extract aspects
     df['Aspects'] = df['Comment'].apply(extract_aspects)
-    
+
+if not df.empty:
     # Extract hashtags
     df['Hashtags'] = df['Comment'].apply(extract_hashtags)
     
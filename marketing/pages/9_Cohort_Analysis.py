@@ -5,18 +5,20 @@ import altair as alt
 import plotly.express as px
 import sys
 import os
+import hashlib
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.data_generator import generate_transaction_log
+from utils.cohort import build_cohorts, build_cohorts_from_chunks
 
 st.set_page_config(page_title="Cohort Analysis | Retention", page_icon="📅", layout="wide")
 
 st.title("📅 Cohort Analysis: Retention Heatmap")
 st.markdown("""
-Analyze user retention by grouping customers into **Cohorts** based on their first purchase month.
-*   **Vertical Axis**: Cohort Month (When they joined).
-*   **Horizontal Axis**: Months since first purchase.
+Analyze user retention by grouping customers into **Cohorts** based on their first purchase period (week, month or quarter).
+*   **Vertical Axis**: Cohort (When they joined).
+*   **Horizontal Axis**: Periods since first purchase.
 *   **Cell Value**: Percentage of users who came back to buy again.
 """)
 
@@ -24,6 +26,10 @@ Analyze user retention by grouping customers into **Cohorts** based on their fir
 st.sidebar.header("Data Configuration")
 data_source = st.sidebar.radio("Select Data Source", ["Generate Synthetic Data", "Upload CSV File"])
 
+granularity = st.sidebar.selectbox("Cohort Granularity", ["month", "week", "quarter"],
+                                   format_func=lambda g: {'week': 'Weekly', 'month': 'Monthly', 'quarter': 'Quarterly'}[g])
+period_name = {'week': 'Weeks', 'month': 'Months', 'quarter': 'Quarters'}[granularity]
+
 if data_source == "Generate Synthetic Data":
     n_cust = st.sidebar.slider("Number of Customers", 100, 2000, 800)
     n_txn = st.sidebar.slider("Transaction Volume", 500, 10000, 3000)
@@ -37,6 +43,7 @@ if data_source == "Generate Synthetic Data":
         
     df = get_synthetic_data(n_cust, n_txn)
     st.info(f"Using Synthetic Data: {len(df)} transactions from {df['CustomerID'].nunique()} customers.")
+    cohorts = build_cohorts(df, granularity)
 
 else:
     uploaded_file = st.sidebar.file_uploader("Upload Transaction CSV", type=["csv"])
@@ -44,10 +51,14 @@ else:
     
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            # Ensure datetime conversion
-            df['TransactionDate'] = pd.to_datetime(df['TransactionDate'])
-            st.success(f"Loaded {len(df)} transactions from uploaded file.")
+            # Stream the file in chunks; results are memoized per file content + granularity
+            fingerprint = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+            uploaded_file.seek(0)
+            chunks = pd.read_csv(uploaded_file, chunksize=500_000,
+                                 usecols=lambda c: c in ('CustomerID', 'TransactionDate', 'Amount'))
+            with st.spinner("Building cohorts..."):
+                cohorts = build_cohorts_from_chunks(chunks, fingerprint, granularity)
+            st.success(f"Loaded {cohorts.n_transactions:,} transactions from uploaded file.")
         except Exception as e:
             st.error(f"Error reading file: {e}")
             st.stop()
@@ -55,66 +66,38 @@ else:
         st.warning("Please upload a CSV file to proceed. Showing placeholder data (Empty).")
         st.stop()
 
-# Data Preprocessing for Cohort Analysis
-def get_month(x): 
-    return datetime(x.year, x.month, 1)
-
-from datetime import datetime
-
-df['TransactionMonth'] = df['TransactionDate'].apply(lambda x: datetime(x.year, x.month, 1))
-df['CohortMonth'] = df.groupby('CustomerID')['TransactionMonth'].transform('min')
-
-def get_date_int(df, column):
-    year = df[column].dt.year
-    month = df[column].dt.month
-    return year, month
-
-txn_year, txn_month = get_date_int(df, 'TransactionMonth')
-cohort_year, cohort_month = get_date_int(df, 'CohortMonth')
-
-years_diff = txn_year - cohort_year
-months_diff = txn_month - cohort_month
+cohort_labels = cohorts.labels()
 
-df['CohortIndex'] = years_diff * 12 + months_diff + 1
-
-# 1. Retention Matrix
-grouping = df.groupby(['CohortMonth', 'CohortIndex'])
-cohort_data = grouping['CustomerID'].apply(pd.Series.nunique).reset_index()
-cohort_counts = cohort_data.pivot(index='CohortMonth', columns='CohortIndex', values='CustomerID')
-cohort_sizes = cohort_counts.iloc[:,0]
-retention = cohort_counts.divide(cohort_sizes, axis=0)
-
-# 2. Average Quantity Matrix (Proxied by Count of Txns)
-cohort_data_qty = grouping['TransactionDate'].count().reset_index() # Count transactions
-avg_qty = cohort_data_qty.pivot(index='CohortMonth', columns='CohortIndex', values='TransactionDate')
+def to_long(matrix, value_name):
+    """Cohort matrix -> long format for Altair"""
+    table = matrix.copy()
+    table.index = cohort_labels
+    table.index.name = 'Cohort'
+    long = table.reset_index().melt(id_vars='Cohort', var_name='CohortIndex', value_name=value_name)
+    long[value_name] = long[value_name].fillna(0)
+    return long
 
 # Visualization
 st.divider()
 
-option = st.selectbox("Select Metric to Visualize", ["Retention Rate (%)", "Active Users (Count)"])
+option = st.selectbox("Select Metric to Visualize",
+                      ["Retention Rate (%)", "Active Users (Count)", "Revenue (Rp)", "Transactions (Count)"])
 
 if option == "Retention Rate (%)":
     st.subheader("🔥 User Retention Heatmap")
     
-    # Convert to long format for Altair
-    retention_long = retention.reset_index().melt(
-        id_vars='CohortMonth',
-        var_name='CohortIndex',
-        value_name='Retention'
-    )
-    retention_long['CohortMonth'] = retention_long['CohortMonth'].dt.strftime('%Y-%m')
-    retention_long['Retention'] = retention_long['Retention'].fillna(0)
+    retention_long = to_long(cohorts.retention, 'Retention')
     
     # Create Altair heatmap
     heatmap = alt.Chart(retention_long).mark_rect().encode(
-        x=alt.X('CohortIndex:O', title='Months Since First Purchase'),
-        y=alt.Y('CohortMonth:N', title='Cohort Month'),
+        x=alt.X('CohortIndex:O', title=f'{period_name} Since First Purchase'),
+        y=alt.Y('Cohort:N', title='Cohort'),
         color=alt.Color('Retention:Q',
                       scale=alt.Scale(scheme='yellowgreenblue', domain=[0, 0.5]),
                       title='Retention Rate'),
         tooltip=[
-            alt.Tooltip('CohortMonth:N', title='Cohort'),
-            alt.Tooltip('CohortIndex:O', title='Month'),
+            alt.Tooltip('Cohort:N', title='Cohort'),
+            alt.Tooltip('CohortIndex:O', title='Period'),
             alt.Tooltip('Retention:Q', title='Retention', format='.1%')
         ]
     ).properties(
@@ -127,33 +110,31 @@ if option == "Retention Rate (%)":
     
     st.info("**Insight:** Darker blue cells indicate higher retention. Look for vertical consistency (product health) or horizontal improvements (better onboarding).")
 
-elif option == "Active Users (Count)":
-    st.subheader("👥 Active Users Heatmap")
+else:
+    matrix, value_name, scheme, fmt = {
+        "Active Users (Count)": (cohorts.active_users, 'Users', 'blues', '.0f'),
+        "Revenue (Rp)": (cohorts.revenue, 'Revenue', 'greens', ',.0f'),
+        "Transactions (Count)": (cohorts.quantity, 'Transactions', 'purples', '.0f'),
+    }[option]
+    st.subheader(f"👥 {option} Heatmap")
     
-    # Convert to long format for Altair
-    counts_long = cohort_counts.reset_index().melt(
-        id_vars='CohortMonth',
-        var_name='CohortIndex',
-        value_name='Users'
-    )
-    counts_long['CohortMonth'] = counts_long['CohortMonth'].dt.strftime('%Y-%m')
-    counts_long['Users'] = counts_long['Users'].fillna(0)
+    values_long = to_long(matrix, value_name)
     
-    heatmap = alt.Chart(counts_long).mark_rect().encode(
-        x=alt.X('CohortIndex:O', title='Months Since First Purchase'),
-        y=alt.Y('CohortMonth:N', title='Cohort Month'),
-        color=alt.Color('Users:Q',
-                      scale=alt.Scale(scheme='blues'),
-                      title='Active Users'),
+    heatmap = alt.Chart(values_long).mark_rect().encode(
+        x=alt.X('CohortIndex:O', title=f'{period_name} Since First Purchase'),
+        y=alt.Y('Cohort:N', title='Cohort'),
+        color=alt.Color(f'{value_name}:Q',
+                      scale=alt.Scale(scheme=scheme),
+                      title=option),
         tooltip=[
-            alt.Tooltip('CohortMonth:N', title='Cohort'),
-            alt.Tooltip('CohortIndex:O', title='Month'),
-            alt.Tooltip('Users:Q', title='Users', format='.0f')
+            alt.Tooltip('Cohort:N', title='Cohort'),
+            alt.Tooltip('CohortIndex:O', title='Period'),
+            alt.Tooltip(f'{value_name}:Q', title=value_name, format=fmt)
         ]
     ).properties(
         width=700,
         height=400,
-        title='Cohort Analysis - Active Users Count'
+        title=f'Cohort Analysis - {option}'
     )
     
     st.altair_chart(heatmap, use_container_width=True)
@@ -162,14 +143,8 @@ elif option == "Active Users (Count)":
 st.divider()
 st.subheader("📋 Cohort Performance Table")
 
-# Calculate metrics per cohort
-cohort_metrics = df.groupby('CohortMonth').agg({
-    'CustomerID': 'nunique',
-    'Amount': ['sum', 'mean']
-}).reset_index()
-cohort_metrics.columns = ['CohortMonth', 'New Users', 'Total Revenue', 'Avg LTV (Initial)']
-
-cohort_metrics['CohortMonth'] = cohort_metrics['CohortMonth'].dt.strftime('%Y-%m')
+cohort_metrics = cohorts.cohort_metrics.copy()
+cohort_metrics['Cohort'] = cohort_labels
 
 st.dataframe(cohort_metrics.style.format({
     "Total Revenue": "Rp {:,.0f}",
@@ -177,5 +152,6 @@ st.dataframe(cohort_metrics.style.format({
 }))
 
 # Specific Insight
-best_cohort = cohort_metrics.loc[cohort_metrics['Total Revenue'].idxmax()]
-st.success(f"🏆 **Best Performing Cohort:** {best_cohort['CohortMonth']} with Total Revenue of **Rp {best_cohort['Total Revenue']:,.0f}**")
+if not cohort_metrics.empty:
+    best_cohort = cohort_metrics.loc[cohort_metrics['Total Revenue'].idxmax()]
+    st.success(f"🏆 **Best Performing Cohort:** {best_cohort['Cohort']} with Total Revenue of **Rp {best_cohort['Total Revenue']:,.0f}**")
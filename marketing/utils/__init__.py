@@ -2,7 +2,7 @@
 Marketing Mix Modeling Utilities
 
 This package provides advanced MMM capabilities:
-- Adstock transformations (geometric, Weibull, delayed, carryover)
+- Adstock transformations (geometric, Weibull, delayed, carryover), batched sweeps
 - Saturation functions (Hill, logistic, Michaelis-Menten)
 - Optimization (single-objective, multi-objective, scenario planning)
 - Decomposition (ROAS, iROAS, contribution analysis)
@@ -15,7 +15,11 @@ from .adstock import (
     delayed_adstock,
     carryover_adstock,
     apply_adstock_to_dataframe,
-    get_adstock_curve
+    get_adstock_curve,
+    geometric_adstock_batch,
+    weibull_adstock_batch,
+    delayed_adstock_batch,
+    adstock_batch
 )
 
 from .saturation import (
@@ -25,7 +29,8 @@ from .saturation import (
     fit_hill_saturation,
     apply_saturation_to_dataframe,
     get_saturation_curve,
-    calculate_optimal_spend
+    calculate_optimal_spend,
+    saturation_batch
 )
 
 from .optimization import (
@@ -63,6 +68,10 @@ __all__ = [
     'carryover_adstock',
     'apply_adstock_to_dataframe',
     'get_adstock_curve',
+    'geometric_adstock_batch',
+    'weibull_adstock_batch',
+    'delayed_adstock_batch',
+    'adstock_batch',
     
     # Saturation
     'hill_saturation',
@@ -72,6 +81,7 @@ __all__ = [
     'apply_saturation_to_dataframe',
     'get_saturation_curve',
     'calculate_optimal_spend',
+    'saturation_batch',
     
     # Optimization
     'single_objective_optimizer',
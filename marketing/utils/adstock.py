@@ -8,14 +8,173 @@ Different adstock types:
 - Geometric: Exponential decay (traditional, fast decay)
 - Weibull: Flexible decay shape (can model delayed peak effects)
 - Delayed: Ads take time to impact (e.g., brand campaigns)
+
+Every transform also has a batched form (``*_batch``) that takes spend of
+shape (..., time) and parameter arrays broadcast against the leading axes,
+so a whole (channels x params x time) hyperparameter sweep runs in one call.
 """
 
 import numpy as np
 import pandas as pd
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.signal import lfilter
 from scipy.special import gamma as gamma_func
 from typing import Union, List
 
 
+# ==================== BATCH KERNELS ====================
+
+def _batch_shape(X: np.ndarray, *params) -> tuple:
+    """Leading (batch) shape of X broadcast against the parameter arrays"""
+    return np.broadcast_shapes(X.shape[:-1], *(np.shape(p) for p in params))
+
+
+def _expand_like(X: np.ndarray, kernels: np.ndarray) -> np.ndarray:
+    """Give X the same number of dims as kernels so the batch axes broadcast."""
+    missing = kernels.ndim - X.ndim
+    return X.reshape((1,) * missing + X.shape) if missing > 0 else X
+
+
+def causal_convolve_batch(X: np.ndarray, kernels: np.ndarray) -> np.ndarray:
+    """
+    Causal convolution of many series with many kernels via FFT.
+
+    out[..., t] = sum_{lag <= t} X[..., t - lag] * kernels[..., lag]
+
+    Parameters:
+    -----------
+    X : np.ndarray
+        Spend, shape (..., T)
+    kernels : np.ndarray
+        Decay weights, shape (..., L); leading axes broadcast against X's
+
+    Returns:
+    --------
+    np.ndarray : shape (broadcast leading axes..., T)
+    """
+    X = np.asarray(X, dtype=float)
+    kernels = np.asarray(kernels, dtype=float)
+    T, L = X.shape[-1], kernels.shape[-1]
+    n_fft = next_fast_len(T + L - 1, real=True)
+    # Transform each operand once, broadcast only in the frequency domain
+    out = irfft(rfft(X, n_fft, axis=-1) * rfft(kernels, n_fft, axis=-1), n_fft, axis=-1)
+    return out[..., :T]
+
+
+def geometric_adstock_batch(X: np.ndarray, decays) -> np.ndarray:
+    """
+    Geometric adstock for many series / decay rates at once.
+
+    Parameters:
+    -----------
+    X : np.ndarray
+        Spend, shape (..., T). Use X[:, None, :] with decays of shape
+        (channels, n_params) or (n_params,) for a channels x params sweep.
+    decays : float or np.ndarray
+        Decay rates in [0, 1), broadcast against X.shape[:-1]
+
+    Returns:
+    --------
+    np.ndarray : shape (broadcast leading axes..., T)
+    """
+    X = np.asarray(X, dtype=float)
+    decays = np.asarray(decays, dtype=float)
+    if np.any((decays < 0) | (decays >= 1)):
+        raise ValueError(f"Decay must be in [0, 1), got {decays[(decays < 0) | (decays >= 1)].ravel()[:3]}")
+
+    if decays.ndim == 0:
+        # One IIR filter for every series: adstock[t] = x[t] + decay * adstock[t-1]
+        return lfilter([1.0], [1.0, -float(decays)], X, axis=-1)
+
+    # lfilter takes one coefficient set per call, so per-row decays run the same
+    # recurrence with the time loop over whole (channels x params) slices
+    shape = _batch_shape(X, decays)
+    X = np.broadcast_to(X, shape + X.shape[-1:])
+    decays = np.broadcast_to(decays, shape)
+    adstocked = np.empty(X.shape, dtype=float)
+    adstocked[..., 0] = X[..., 0]
+    for t in range(1, X.shape[-1]):
+        adstocked[..., t] = X[..., t] + decays * adstocked[..., t - 1]
+    return adstocked
+
+
+def weibull_kernels(shapes, scales, peak_delay=0, n: int = None) -> np.ndarray:
+    """
+    Normalized Weibull decay kernels, shape (broadcast params..., max_lag).
+
+    Each kernel is truncated at min(n, 5 * scale) lags (like weibull_adstock).
+    """
+    shapes, scales, peak_delay = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (shapes, scales, peak_delay))
+    )
+    if np.any(shapes <= 0) or np.any(scales <= 0):
+        raise ValueError("Shape and scale must be positive")
+
+    max_lag = (scales * 5).astype(int)
+    if n is not None:
+        max_lag = np.minimum(max_lag, n)
+    width = max(int(max_lag.max(initial=0)), 1)
+
+    t = np.arange(width) + peak_delay[..., None]
+    k, lam = shapes[..., None], scales[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pdf = (k / lam) * (t / lam) ** (k - 1) * np.exp(-(t / lam) ** k)
+    pdf = np.where((t > 0) & (np.arange(width) < max_lag[..., None]), pdf, 0.0)
+
+    total = pdf.sum(axis=-1, keepdims=True)
+    return np.divide(pdf, total, out=pdf, where=total > 0)
+
+
+def weibull_adstock_batch(X: np.ndarray, shapes, scales, peak_delay=0) -> np.ndarray:
+    """
+    Weibull adstock for many series / parameter sets at once (FFT convolution).
+
+    Parameters broadcast against X.shape[:-1], as in geometric_adstock_batch.
+    """
+    X = np.asarray(X, dtype=float)
+    kernels = weibull_kernels(shapes, scales, peak_delay, n=X.shape[-1])
+    return causal_convolve_batch(_expand_like(X, kernels), kernels)
+
+
+def delayed_kernels(thetas, L: int) -> np.ndarray:
+    """Normalized delayed-adstock weights theta^i (i < L), shape (params..., L)"""
+    thetas = np.asarray(thetas, dtype=float)
+    if np.any((thetas < 0) | (thetas >= 1)):
+        raise ValueError("Theta must be in [0, 1)")
+    if L < 1:
+        raise ValueError(f"L must be >= 1, got {L}")
+    weights = thetas[..., None] ** np.arange(L)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+def delayed_adstock_batch(X: np.ndarray, thetas, L: int) -> np.ndarray:
+    """Delayed adstock for many series / retention rates at once (FFT convolution)."""
+    X = np.asarray(X, dtype=float)
+    kernels = delayed_kernels(thetas, L)[..., :X.shape[-1]]
+    return causal_convolve_batch(_expand_like(X, kernels), kernels)
+
+
+def adstock_batch(X: np.ndarray, adstock_type: str = 'geometric', **params) -> np.ndarray:
+    """
+    Dispatch to the batched transform for `adstock_type`.
+
+    Example:
+    --------
+    >>> # 10 channels x 104 weeks, 5000 decay candidates -> (10, 5000, 104)
+    >>> decays = np.linspace(0, 0.95, 5000)
+    >>> swept = adstock_batch(spend[:, None, :], 'geometric', decay=decays)
+    """
+    if adstock_type == 'geometric':
+        return geometric_adstock_batch(X, params.get('decay', 0.5))
+    elif adstock_type == 'weibull':
+        return weibull_adstock_batch(X, params.get('shape', 1.0), params.get('scale', 2.0),
+                                     params.get('peak_delay', 0))
+    elif adstock_type == 'delayed':
+        return delayed_adstock_batch(X, params.get('theta', 0.7), params.get('L', 4))
+    else:
+        raise ValueError(f"Unknown adstock type for batch transform: {adstock_type}")
+
+
 def geometric_adstock(x: np.ndarray, decay: float) -> np.ndarray:
     """
     Geometric (Exponential) Adstock Transformation
@@ -47,13 +206,7 @@ def geometric_adstock(x: np.ndarray, decay: float) -> np.ndarray:
     if not 0 <= decay < 1:
         raise ValueError(f"Decay must be in [0, 1), got {decay}")
     
-    adstocked = np.zeros_like(x, dtype=float)
-    adstocked[0] = x[0]
-    
-    for t in range(1, len(x)):
-        adstocked[t] = x[t] + decay * adstocked[t-1]
-    
-    return adstocked
+    return lfilter([1.0], [1.0, -decay], np.asarray(x, dtype=float))
 
 
 def weibull_adstock(x: np.ndarray, shape: float, scale: float, peak_delay: int = 0) -> np.ndarray:
@@ -98,30 +251,13 @@ def weibull_adstock(x: np.ndarray, shape: float, scale: float, peak_delay: int =
     if shape <= 0 or scale <= 0:
         raise ValueError(f"Shape and scale must be positive, got shape={shape}, scale={scale}")
     
-    n = len(x)
-    adstocked = np.zeros(n, dtype=float)
-    
-    # Weibull PDF for decay weights
-    def weibull_pdf(t, k, lam):
-        """Weibull probability density function"""
-        if t <= 0:
-            return 0
-        return (k / lam) * (t / lam)**(k - 1) * np.exp(-(t / lam)**k)
-    
-    # Create convolution kernel (decay weights)
-    max_lag = min(n, int(scale * 5))  # Truncate at 5*scale for efficiency
-    kernel = np.array([weibull_pdf(t + peak_delay, shape, scale) for t in range(max_lag)])
+    x = np.asarray(x, dtype=float)
     
-    # Normalize kernel to preserve total effect
-    if kernel.sum() > 0:
-        kernel = kernel / kernel.sum()
+    # Normalized Weibull PDF weights, truncated at 5*scale (see weibull_kernels)
+    kernel = weibull_kernels(shape, scale, peak_delay, n=len(x))
     
     # Apply convolution (adstock transformation)
-    for t in range(n):
-        for lag in range(min(t + 1, max_lag)):
-            adstocked[t] += x[t - lag] * kernel[lag]
-    
-    return adstocked
+    return np.convolve(x, kernel)[:len(x)]
 
 
 def delayed_adstock(x: np.ndarray, theta: float, L: int) -> np.ndarray:
@@ -155,19 +291,13 @@ def delayed_adstock(x: np.ndarray, theta: float, L: int) -> np.ndarray:
     if L < 1:
         raise ValueError(f"L must be >= 1, got {L}")
     
-    n = len(x)
-    adstocked = np.zeros(n, dtype=float)
+    x = np.asarray(x, dtype=float)
     
-    # Create decay weights
-    weights = np.array([theta**i for i in range(L)])
-    weights = weights / weights.sum()  # Normalize
+    # Create normalized decay weights
+    weights = delayed_kernels(theta, L)
     
     # Apply convolution
-    for t in range(n):
-        for lag in range(min(t + 1, L)):
-            adstocked[t] += x[t - lag] * weights[lag]
-    
-    return adstocked
+    return np.convolve(x, weights)[:len(x)]
 
 
 def carryover_adstock(x: np.ndarray, peak: int, decay: float, concentration: float = 1.0) -> np.ndarray:
@@ -219,12 +349,7 @@ def carryover_adstock(x: np.ndarray, peak: int, decay: float, concentration: flo
         kernel = kernel / kernel.sum()
     
     # Apply convolution
-    adstocked = np.zeros(n, dtype=float)
-    for t in range(n):
-        for lag in range(min(t + 1, max_lag)):
-            adstocked[t] += x[t - lag] * kernel[lag]
-    
-    return adstocked
+    return np.convolve(np.asarray(x, dtype=float), kernel)[:n]
 
 
 def apply_adstock_to_dataframe(
@@ -1,13 +1,49 @@
 """
 Advanced NLP Helper Functions for Enterprise Sentiment Analysis
 Uses deep learning models for emotion detection, topic modeling, and sarcasm detection
+
+Large exports go through analyze_sentiment_batch(): identical texts are
+analysed once, texts are fed to the transformer pipelines and spaCy's
+nlp.pipe in batches, results are cached on disk by text hash, and work
+proceeds in chunks with progress reporting.
 """
 
+import hashlib
+import json
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
 import streamlit as st
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 import pandas as pd
 import numpy as np
 
+CACHE_PATH = Path(__file__).parent.parent / '.cache' / 'nlp_results.sqlite'
+
+EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+SARCASM_MODEL_NAME = "helinivan/english-sarcasm-detector"
+# Minimum sarcasm confidence before the VADER compound score is flipped
+SARCASM_FLIP_CONFIDENCE = 0.7
+
+EMOTION_KEYWORDS = {
+    'joy': ['happy', 'joy', 'love', 'excited', 'great', 'excellent', 'amazing'],
+    'anger': ['angry', 'hate', 'furious', 'terrible', 'worst', 'horrible'],
+    'sadness': ['sad', 'disappointed', 'unhappy', 'depressed', 'miserable'],
+    'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous'],
+    'surprise': ['surprised', 'shocked', 'unexpected', 'wow'],
+    'disgust': ['disgusting', 'gross', 'nasty', 'revolting']
+}
+
+# Shared with pages/3_Social_Media_Sentiment.py so both data paths label aspects alike
+ASPECT_KEYWORDS = {
+    'Product': ['product', 'quality', 'item', 'goods'],
+    'Price': ['price', 'cost', 'expensive', 'cheap', 'value', 'money'],
+    'Service': ['service', 'support', 'help', 'customer', 'staff'],
+    'Delivery': ['delivery', 'shipping', 'ship', 'arrived', 'package'],
+    'Packaging': ['packaging', 'box', 'wrapped', 'package']
+}
+
 # Lazy imports for heavy models (only load when needed)
 _emotion_model = None
 _sarcasm_model = None
@@ -23,7 +59,7 @@ def load_emotion_model():
             from transformers import pipeline
             _emotion_model = pipeline(
                 "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
+                model=EMOTION_MODEL_NAME,
                 top_k=None,
                 device=-1  # CPU
             )
@@ -41,7 +77,7 @@ def load_sarcasm_model():
             from transformers import pipeline
             _sarcasm_model = pipeline(
                 "text-classification",
-                model="helinivan/english-sarcasm-detector",
+                model=SARCASM_MODEL_NAME,
                 device=-1
             )
         except Exception as e:
@@ -62,80 +98,93 @@ def load_embedding_model():
             _embedding_model = "fallback"
     return _embedding_model
 
+@st.cache_resource
+def load_spacy_model():
+    """Load spaCy English pipeline once (parser + tagger only)"""
+    try:
+        import spacy
+        return spacy.load("en_core_web_sm", disable=["ner", "lemmatizer"])
+    except ImportError:
+        return "fallback"
+    except OSError:
+        st.warning("spaCy model not found. Run: python -m spacy download en_core_web_sm")
+        return "fallback"
+
+
+# ========== RESULT CACHE ==========
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class TextResultCache:
+    """
+    Disk cache of per-text results keyed by (task, text hash).
+
+    `task` should encode the models used, so results computed with a
+    fallback are not served once the real model is available.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "task TEXT NOT NULL, text_hash TEXT NOT NULL, result TEXT NOT NULL, "
+                "PRIMARY KEY (task, text_hash))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, task: str, hashes: List[str]) -> Dict[str, Dict]:
+        found = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, result FROM results WHERE task = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [task, *chunk]
+                ).fetchall()
+                found.update((h, json.loads(r)) for h, r in rows)
+        return found
+
+    def set_many(self, task: str, items: Dict[str, Dict]):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (task, text_hash, result) VALUES (?, ?, ?)",
+                [(task, h, json.dumps(r, default=float)) for h, r in items.items()]
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+
+
+# ========== SINGLE TEXT API ==========
+
 def detect_emotion_advanced(text: str) -> Dict:
     """
     Advanced emotion detection using deep learning
     Returns top 3 emotions with confidence scores
     """
-    model = load_emotion_model()
-    
-    if model == "fallback":
-        # Fallback to keyword-based
-        return detect_emotion_keywords(text)
-    
-    try:
-        results = model(text)[0]
-        
-        # Get top 3 emotions
-        top_emotions = sorted(results, key=lambda x: x['score'], reverse=True)[:3]
-        
-        return {
-            'primary_emotion': top_emotions[0]['label'],
-            'confidence': top_emotions[0]['score'],
-            'all_emotions': {e['label']: e['score'] for e in top_emotions}
-        }
-    except Exception as e:
-        st.warning(f"Emotion detection error: {e}")
-        return detect_emotion_keywords(text)
+    return detect_emotion_batch([text])[0]
 
 def detect_emotion_keywords(text: str) -> Dict:
     """Fallback keyword-based emotion detection"""
-    text_lower = text.lower()
-    
-    emotions = {
-        'joy': ['happy', 'joy', 'love', 'excited', 'great', 'excellent', 'amazing'],
-        'anger': ['angry', 'hate', 'furious', 'terrible', 'worst', 'horrible'],
-        'sadness': ['sad', 'disappointed', 'unhappy', 'depressed', 'miserable'],
-        'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous'],
-        'surprise': ['surprised', 'shocked', 'unexpected', 'wow'],
-        'disgust': ['disgusting', 'gross', 'nasty', 'revolting']
-    }
-    
-    emotion_scores = {}
-    for emotion, keywords in emotions.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        if score > 0:
-            emotion_scores[emotion] = score
-    
-    if not emotion_scores:
-        return {'primary_emotion': 'neutral', 'confidence': 0.5, 'all_emotions': {'neutral': 1.0}}
-    
-    primary = max(emotion_scores, key=emotion_scores.get)
-    total = sum(emotion_scores.values())
-    
-    return {
-        'primary_emotion': primary,
-        'confidence': emotion_scores[primary] / total,
-        'all_emotions': {k: v/total for k, v in emotion_scores.items()}
-    }
+    return detect_emotion_keywords_batch([text])[0]
 
 def detect_sarcasm(text: str) -> Dict:
     """Detect sarcasm in text"""
-    model = load_sarcasm_model()
-    
-    if model == "fallback":
-        return {'is_sarcastic': False, 'confidence': 0.0}
-    
-    try:
-        result = model(text)[0]
-        is_sarcastic = result['label'] == 'SARCASM'
-        
-        return {
-            'is_sarcastic': is_sarcastic,
-            'confidence': result['score']
-        }
-    except Exception as e:
-        return {'is_sarcastic': False, 'confidence': 0.0}
+    return detect_sarcasm_batch([text])[0]
+
+def sarcasm_adjusted_compound(compound: float, sarcasm_result: Dict) -> float:
+    """VADER compound score, flipped when the text is confidently sarcastic"""
+    if sarcasm_result['is_sarcastic'] and sarcasm_result['confidence'] > SARCASM_FLIP_CONFIDENCE:
+        return -compound
+    return compound
 
 def perform_bertopic_modeling(texts: List[str], n_topics: int = 5) -> Tuple:
     """
@@ -201,54 +250,11 @@ def extract_aspects_advanced(text: str) -> List[Tuple[str, str, float]]:
     Advanced aspect-based sentiment extraction using spaCy
     Returns: List of (aspect, opinion, sentiment_score) tuples
     """
-    try:
-        import spacy
-        from textblob import TextBlob
-        
-        # Try to load spaCy model
-        try:
-            nlp = spacy.load("en_core_web_sm")
-        except:
-            st.warning("spaCy model not found. Run: python -m spacy download en_core_web_sm")
-            return extract_aspects_simple(text)
-        
-        doc = nlp(text)
-        aspects = []
-        
-        # Extract noun-adjective pairs
-        for token in doc:
-            if token.pos_ == "NOUN":
-                for child in token.children:
-                    if child.pos_ == "ADJ":
-                        # Get sentiment of the adjective
-                        blob = TextBlob(child.text)
-                        sentiment = blob.sentiment.polarity
-                        
-                        aspects.append((token.text, child.text, sentiment))
-        
-        return aspects if aspects else [("General", "neutral", 0.0)]
-        
-    except Exception as e:
-        return extract_aspects_simple(text)
+    return extract_aspects_advanced_batch([text])[0]
 
 def extract_aspects_simple(text: str) -> List[str]:
     """Simple keyword-based aspect extraction (fallback)"""
-    text_lower = text.lower()
-    
-    aspects_map = {
-        'Product': ['product', 'quality', 'item', 'goods'],
-        'Price': ['price', 'cost', 'expensive', 'cheap', 'value'],
-        'Service': ['service', 'support', 'help', 'customer'],
-        'Delivery': ['delivery', 'shipping', 'ship', 'arrived'],
-        'Packaging': ['packaging', 'box', 'wrapped']
-    }
-    
-    found = []
-    for aspect, keywords in aspects_map.items():
-        if any(kw in text_lower for kw in keywords):
-            found.append(aspect)
-    
-    return found if found else ['General']
+    return extract_aspects_simple_batch([text])[0]
 
 def detect_language(text: str) -> str:
     """Detect language of text"""
@@ -263,49 +269,241 @@ def analyze_sentiment_comprehensive(text: str) -> Dict:
     Comprehensive sentiment analysis combining multiple models
     Returns all analysis results in one dict
     """
+    return analyze_sentiment_batch([text], use_cache=False).iloc[0].to_dict()
+
+
+# ========== BATCH API ==========
+
+def _keyword_hits(texts: Iterable[str], keyword_map: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Count of distinct keywords present per (text, group), vectorized over texts.
+
+    Same rule as the per-text loops: a keyword counts once if it occurs as a substring.
+    """
+    lowered = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower()
+    return pd.DataFrame({
+        group: sum(lowered.str.contains(kw, regex=False).to_numpy(dtype=int) for kw in keywords)
+        for group, keywords in keyword_map.items()
+    })
+
+def detect_emotion_keywords_batch(texts: List[str]) -> List[Dict]:
+    """Keyword-based emotion detection for many texts at once"""
+    scores = _keyword_hits(texts, EMOTION_KEYWORDS)
+    values = scores.to_numpy(dtype=float)
+    totals = values.sum(axis=1)
+    labels = np.array(scores.columns)
+    primary = labels[values.argmax(axis=1)] if len(labels) else []
+
+    results = []
+    for i, total in enumerate(totals):
+        if total == 0:
+            results.append({'primary_emotion': 'neutral', 'confidence': 0.5, 'all_emotions': {'neutral': 1.0}})
+            continue
+        row = values[i]
+        results.append({
+            'primary_emotion': str(primary[i]),
+            'confidence': float(row.max() / total),
+            'all_emotions': {str(labels[j]): float(row[j] / total) for j in np.flatnonzero(row)}
+        })
+    return results
+
+def extract_aspects_simple_batch(texts: List[str]) -> List[List[str]]:
+    """Keyword-based aspect extraction for many texts at once"""
+    hits = _keyword_hits(texts, ASPECT_KEYWORDS) > 0
+    labels = np.array(hits.columns)
+    return [[str(label) for label in labels[row]] or ['General'] for row in hits.to_numpy()]
+
+def detect_emotion_batch(texts: List[str], batch_size: int = 32) -> List[Dict]:
+    """Emotion detection for many texts; the transformer sees `batch_size` texts per forward pass"""
+    return _emotion_batch(texts, batch_size)[0]
+
+def _emotion_batch(texts: List[str], batch_size: int) -> Tuple[List[Dict], bool]:
+    """Emotion results plus whether they fell back to keywords after a model error"""
+    model = load_emotion_model()
+    
+    if model == "fallback" or not texts:
+        return detect_emotion_keywords_batch(texts), False
+    
+    try:
+        outputs = model(list(texts), batch_size=batch_size, truncation=True)
+    except Exception as e:
+        st.warning(f"Emotion detection error: {e}")
+        return detect_emotion_keywords_batch(texts), True
+    
+    results = []
+    for scores in outputs:
+        # Get top 3 emotions
+        top_emotions = sorted(scores, key=lambda x: x['score'], reverse=True)[:3]
+        results.append({
+            'primary_emotion': top_emotions[0]['label'],
+            'confidence': top_emotions[0]['score'],
+            'all_emotions': {e['label']: e['score'] for e in top_emotions}
+        })
+    return results, False
+
+def detect_sarcasm_batch(texts: List[str], batch_size: int = 32) -> List[Dict]:
+    """Sarcasm detection for many texts (batched transformer inference)"""
+    return _sarcasm_batch(texts, batch_size)[0]
+
+def _sarcasm_batch(texts: List[str], batch_size: int) -> Tuple[List[Dict], bool]:
+    """Sarcasm results plus whether they were defaulted after a model error"""
+    model = load_sarcasm_model()
+    
+    if model == "fallback" or not texts:
+        return [{'is_sarcastic': False, 'confidence': 0.0} for _ in texts], False
+    
+    try:
+        outputs = model(list(texts), batch_size=batch_size, truncation=True)
+    except Exception:
+        return [{'is_sarcastic': False, 'confidence': 0.0} for _ in texts], True
+    
+    return [{'is_sarcastic': out['label'] == 'SARCASM', 'confidence': out['score']} for out in outputs], False
+
+@lru_cache(maxsize=50000)
+def _word_polarity(word: str) -> float:
     from textblob import TextBlob
+    return TextBlob(word).sentiment.polarity
+
+def extract_aspects_advanced_batch(texts: List[str], batch_size: int = 256,
+                                   n_process: int = 1) -> List[List[Tuple[str, str, float]]]:
+    """
+    Noun-adjective aspect extraction for many texts via nlp.pipe
+
+    Falls back to keyword aspects when spaCy or its model is unavailable.
+    """
+    nlp = load_spacy_model()
+    if nlp == "fallback":
+        return extract_aspects_simple_batch(texts)
+    
+    try:
+        results = []
+        for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+            aspects = [
+                (token.text, child.text, _word_polarity(child.text.lower()))
+                for token in doc if token.pos_ == "NOUN"
+                for child in token.children if child.pos_ == "ADJ"
+            ]
+            results.append(aspects if aspects else [("General", "neutral", 0.0)])
+        return results
+    except Exception:
+        return extract_aspects_simple_batch(texts)
+
+def _analysis_task(detect_lang: bool) -> str:
+    """Cache namespace: changes whenever the set of models producing the results changes"""
+    emotion = 'kw' if load_emotion_model() == "fallback" else EMOTION_MODEL_NAME
+    sarcasm = 'none' if load_sarcasm_model() == "fallback" else SARCASM_MODEL_NAME
+    return f"comprehensive:v1:{emotion}:{sarcasm}:lang={int(detect_lang)}"
+
+@lru_cache(maxsize=1)
+def _vader():
     from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+def _analyze_chunk(texts: List[str], batch_size: int, detect_lang: bool) -> Tuple[List[Dict], bool]:
+    """
+    Run every model over one chunk of unique texts
+    
+    Also returns whether a loaded model failed mid-run; such degraded results
+    must not be cached under the task tag of the real model.
+    """
+    from textblob import TextBlob
     
-    # Basic sentiment
-    blob = TextBlob(text)
-    sia = SentimentIntensityAnalyzer()
-    vader_scores = sia.polarity_scores(text)
+    sia = _vader()
+    emotions, emotion_degraded = _emotion_batch(texts, batch_size)
+    sarcasm, sarcasm_degraded = _sarcasm_batch(texts, batch_size)
+    aspects = extract_aspects_simple_batch(texts)
     
-    # Advanced emotion
-    emotion_result = detect_emotion_advanced(text)
+    results = []
+    for text, emotion_result, sarcasm_result, text_aspects in zip(texts, emotions, sarcasm, aspects):
+        blob = TextBlob(text)
+        # Determine final sentiment (adjusted for sarcasm)
+        compound = sarcasm_adjusted_compound(sia.polarity_scores(text)['compound'], sarcasm_result)
+        
+        if compound >= 0.05:
+            sentiment = 'Positive'
+        elif compound <= -0.05:
+            sentiment = 'Negative'
+        else:
+            sentiment = 'Neutral'
+        
+        results.append({
+            'language': detect_language(text) if detect_lang else 'en',
+            'polarity': blob.sentiment.polarity,
+            'subjectivity': blob.sentiment.subjectivity,
+            'vader_compound': compound,
+            'sentiment': sentiment,
+            'emotion': emotion_result['primary_emotion'],
+            'emotion_confidence': emotion_result['confidence'],
+            'all_emotions': emotion_result['all_emotions'],
+            'is_sarcastic': sarcasm_result['is_sarcastic'],
+            'sarcasm_confidence': sarcasm_result['confidence'],
+            'aspects': text_aspects
+        })
+    return results, emotion_degraded or sarcasm_degraded
+
+def analyze_sentiment_batch(
+    texts: Iterable[str],
+    batch_size: int = 32,
+    chunk_size: int = 1000,
+    use_cache: bool = True,
+    cache: Optional[TextResultCache] = None,
+    detect_lang: bool = True,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> pd.DataFrame:
+    """
+    Comprehensive sentiment analysis for a whole export
+    
+    Parameters:
+    -----------
+    texts : iterable of str
+        Comments/reviews (order is preserved in the output)
+    batch_size : int
+        Texts per transformer forward pass (CPU)
+    chunk_size : int
+        Unique texts processed (and cached) per step; bounds memory and
+        makes an interrupted run resumable from the disk cache
+    use_cache / cache : 
+        Disk cache of results by text hash (default: .cache/nlp_results.sqlite)
+    detect_lang : bool
+        Run language detection (slowest non-model step)
+    progress_callback : callable(done, total)
+        Called after each chunk with counts of unique texts
     
-    # Sarcasm
-    sarcasm_result = detect_sarcasm(text)
+    Returns:
+    --------
+    pd.DataFrame : one row per input text, same columns as analyze_sentiment_comprehensive
+    """
+    texts = pd.Series(list(texts), dtype=object).fillna('').astype(str)
     
-    # Language
-    language = detect_language(text)
+    # Dedupe: every distinct text is analysed once
+    codes, unique_texts = pd.factorize(texts)
+    unique_texts = list(unique_texts)
+    hashes = [text_hash(t) for t in unique_texts]
     
-    # Aspects
-    aspects = extract_aspects_simple(text)
+    task = _analysis_task(detect_lang)
+    if use_cache and cache is None:
+        cache = TextResultCache()
+    results = cache.get_many(task, hashes) if use_cache else {}
     
-    # Determine final sentiment (adjusted for sarcasm)
-    compound = vader_scores['compound']
-    if sarcasm_result['is_sarcastic'] and sarcasm_result['confidence'] > 0.7:
-        compound = -compound  # Flip sentiment if sarcastic
+    pending = [i for i, h in enumerate(hashes) if h not in results]
+    total, done = len(unique_texts), len(unique_texts) - len(pending)
+    if progress_callback:
+        progress_callback(done, total)
     
-    if compound >= 0.05:
-        sentiment = 'Positive'
-    elif compound <= -0.05:
-        sentiment = 'Negative'
-    else:
-        sentiment = 'Neutral'
+    for start in range(0, len(pending), chunk_size):
+        idx = pending[start:start + chunk_size]
+        chunk_results, degraded = _analyze_chunk([unique_texts[i] for i in idx], batch_size, detect_lang)
+        fresh = {hashes[i]: r for i, r in zip(idx, chunk_results)}
+        results.update(fresh)
+        if use_cache and not degraded:
+            cache.set_many(task, fresh)
+        done += len(idx)
+        if progress_callback:
+            progress_callback(done, total)
     
-    return {
-        'text': text,
-        'language': language,
-        'polarity': blob.sentiment.polarity,
-        'subjectivity': blob.sentiment.subjectivity,
-        'vader_compound': compound,
-        'sentiment': sentiment,
-        'emotion': emotion_result['primary_emotion'],
-        'emotion_confidence': emotion_result['confidence'],
-        'all_emotions': emotion_result['all_emotions'],
-        'is_sarcastic': sarcasm_result['is_sarcastic'],
-        'sarcasm_confidence': sarcasm_result['confidence'],
-        'aspects': aspects
-    }
+    unique_frame = pd.DataFrame([results[h] for h in hashes])
+    if unique_frame.empty:
+        return pd.DataFrame(columns=['text'])
+    out = unique_frame.iloc[codes].reset_index(drop=True)
+    out.insert(0, 'text', texts.to_numpy())
+    return out
@@ -0,0 +1,207 @@
+"""
+Cohort & Retention Engine
+
+Builds retention, active-user, revenue and quantity matrices in one pass:
+- Periods come from period-dtype arithmetic (week / month / quarter ordinals),
+  never from row-wise Python
+- Transactions are reduced to one row per (customer, period) as they stream
+  in, so multi-million-row logs can be fed chunk by chunk
+- Finished matrices are memoized per data fingerprint and granularity
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+GRANULARITY_FREQ = {'week': 'W', 'month': 'M', 'quarter': 'Q'}
+
+
+@dataclass
+class CohortMatrices:
+    """Cohort x period-index matrices (index 1 = acquisition period)."""
+    granularity: str
+    active_users: pd.DataFrame
+    retention: pd.DataFrame
+    revenue: pd.DataFrame
+    quantity: pd.DataFrame
+    cohort_sizes: pd.Series
+    cohort_metrics: pd.DataFrame
+    n_transactions: int
+
+    def labels(self) -> pd.Index:
+        """Display labels for the cohort index (e.g. 2025-01, 2025Q1, week start date)."""
+        return period_labels(self.active_users.index)
+
+
+def period_labels(index: pd.PeriodIndex) -> pd.Index:
+    if index.freqstr.startswith('W'):
+        return pd.Index(index.start_time.strftime('%Y-%m-%d'))
+    if index.freqstr.startswith('M'):
+        return pd.Index(index.strftime('%Y-%m'))
+    return pd.Index(index.astype(str))
+
+
+class CohortBuilder:
+    """
+    Streaming cohort aggregation.
+
+    Each update() reduces its chunk to (customer, period) -> revenue,
+    transactions; result() assigns each customer's first period as cohort
+    and aggregates everything with a single groupby.
+
+    Example:
+    --------
+    >>> builder = CohortBuilder('month')
+    >>> for chunk in pd.read_csv('transactions.csv', chunksize=500_000):
+    ...     builder.update(chunk)
+    >>> cohorts = builder.result()
+    """
+
+    def __init__(self, granularity: str = 'month', customer_col: str = 'CustomerID',
+                 date_col: str = 'TransactionDate', amount_col: Optional[str] = 'Amount',
+                 compact_every: int = 20):
+        if granularity not in GRANULARITY_FREQ:
+            raise ValueError(f"Unknown granularity: {granularity}. Use one of {list(GRANULARITY_FREQ)}")
+        self.granularity = granularity
+        self.freq = GRANULARITY_FREQ[granularity]
+        self.customer_col = customer_col
+        self.date_col = date_col
+        self.amount_col = amount_col
+        self.compact_every = compact_every
+        self._parts = []
+        self.n_transactions = 0
+
+    def update(self, chunk: pd.DataFrame) -> 'CohortBuilder':
+        dates = pd.to_datetime(chunk[self.date_col], errors='coerce')
+        valid = dates.notna().to_numpy() & chunk[self.customer_col].notna().to_numpy()
+        dates = dates[valid]
+
+        part = pd.DataFrame({
+            'customer': chunk[self.customer_col].to_numpy()[valid],
+            # Period ordinals: consecutive integers per week/month/quarter
+            'period': dates.dt.to_period(self.freq).array.asi8,
+            'revenue': (pd.to_numeric(chunk[self.amount_col], errors='coerce').fillna(0).to_numpy()[valid]
+                        if self.amount_col and self.amount_col in chunk.columns else 0.0),
+        })
+        self.n_transactions += len(part)
+        self._parts.append(self._reduce(part, 'size'))
+        if len(self._parts) >= self.compact_every:
+            self._parts = [self._reduce(pd.concat(self._parts, ignore_index=True), 'sum')]
+        return self
+
+    @staticmethod
+    def _reduce(part: pd.DataFrame, count: str) -> pd.DataFrame:
+        """Collapse to one row per (customer, period)."""
+        if count == 'size':
+            part = part.assign(quantity=1)
+        return part.groupby(['customer', 'period'], sort=False, observed=True).agg(
+            revenue=('revenue', 'sum'), quantity=('quantity', 'sum')
+        ).reset_index()
+
+    def result(self) -> CohortMatrices:
+        if self._parts:
+            pairs = self._reduce(pd.concat(self._parts, ignore_index=True), 'sum')
+        else:
+            pairs = pd.DataFrame({'customer': [], 'period': np.array([], dtype=np.int64),
+                                  'revenue': [], 'quantity': []})
+        self._parts = [pairs]
+
+        cohort = pairs.groupby('customer', sort=False)['period'].transform('min')
+        pairs['cohort'] = cohort.to_numpy(dtype=np.int64)
+        pairs['cohort_index'] = pairs['period'].to_numpy(dtype=np.int64) - pairs['cohort'].to_numpy() + 1
+
+        # Rows are distinct (customer, period), so the row count per cell is the
+        # number of unique active customers: one aggregation yields every matrix
+        cells = pairs.groupby(['cohort', 'cohort_index']).agg(
+            active_users=('customer', 'size'), revenue=('revenue', 'sum'), quantity=('quantity', 'sum')
+        )
+        period_index = pd.PeriodIndex.from_ordinals(
+            cells.index.get_level_values('cohort').unique().sort_values(), freq=self.freq
+        ) if len(cells) else pd.PeriodIndex([], freq=self.freq)
+
+        def matrix(column):
+            table = cells[column].unstack('cohort_index')
+            table.index = pd.PeriodIndex.from_ordinals(table.index, freq=self.freq)
+            table.index.name = 'Cohort'
+            return table.reindex(period_index)
+
+        active_users = matrix('active_users')
+        revenue = matrix('revenue')
+        quantity = matrix('quantity')
+        cohort_sizes = active_users[1] if 1 in active_users.columns else pd.Series(dtype=float)
+        retention = active_users.divide(cohort_sizes, axis=0)
+
+        total_revenue = revenue.sum(axis=1)
+        total_quantity = quantity.sum(axis=1)
+        cohort_metrics = pd.DataFrame({
+            'Cohort': period_index,
+            'New Users': cohort_sizes.to_numpy(),
+            'Total Revenue': total_revenue.to_numpy(),
+            'Avg LTV (Initial)': (total_revenue / total_quantity.replace(0, np.nan)).to_numpy(),
+        })
+
+        return CohortMatrices(
+            granularity=self.granularity,
+            active_users=active_users,
+            retention=retention,
+            revenue=revenue,
+            quantity=quantity,
+            cohort_sizes=cohort_sizes,
+            cohort_metrics=cohort_metrics,
+            n_transactions=self.n_transactions,
+        )
+
+
+# ========== MEMOIZED ENTRY POINTS ==========
+
+_CACHE = OrderedDict()
+_CACHE_MAX = 32
+
+
+def frame_fingerprint(df: pd.DataFrame, columns: Iterable[str]) -> str:
+    """Content hash of the columns the cohort engine reads."""
+    columns = [c for c in columns if c in df.columns]
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.sha1(('|'.join(columns)).encode('utf-8') + hashed.tobytes()).hexdigest()
+
+
+def _memoized(key, build) -> CohortMatrices:
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+    value = build()
+    _CACHE[key] = value
+    if len(_CACHE) > _CACHE_MAX:
+        _CACHE.popitem(last=False)
+    return value
+
+
+def build_cohorts(df: pd.DataFrame, granularity: str = 'month', customer_col: str = 'CustomerID',
+                  date_col: str = 'TransactionDate', amount_col: Optional[str] = 'Amount') -> CohortMatrices:
+    """Cohort matrices for an in-memory transaction log (memoized by content + granularity)."""
+    key = (frame_fingerprint(df, [customer_col, date_col, amount_col]), granularity,
+           customer_col, date_col, amount_col)
+    return _memoized(key, lambda: CohortBuilder(granularity, customer_col, date_col, amount_col)
+                     .update(df).result())
+
+
+def build_cohorts_from_chunks(chunks: Iterable[pd.DataFrame], fingerprint: str, granularity: str = 'month',
+                              customer_col: str = 'CustomerID', date_col: str = 'TransactionDate',
+                              amount_col: Optional[str] = 'Amount') -> CohortMatrices:
+    """
+    Cohort matrices from streamed chunks (e.g. pd.read_csv(..., chunksize=...)).
+
+    `fingerprint` identifies the source (e.g. a hash of the file bytes); the
+    chunks are only consumed on a cache miss.
+    """
+    def build():
+        builder = CohortBuilder(granularity, customer_col, date_col, amount_col)
+        for chunk in chunks:
+            builder.update(chunk)
+        return builder.result()
+
+    return _memoized((fingerprint, granularity, customer_col, date_col, amount_col), build)
@@ -16,6 +16,29 @@ import warnings
 warnings.filterwarnings('ignore')
 
 
+def _predict_batch(model, X: np.ndarray) -> np.ndarray:
+    """Predict a whole population of allocations (rows of X) in one call"""
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    try:
+        return np.asarray(model.predict(X), dtype=float).ravel()
+    except Exception:
+        # Models that only accept one sample at a time
+        return np.array([model.predict([row])[0] for row in X], dtype=float)
+
+
+def _objective_matrix(pred_sales: np.ndarray, X: np.ndarray, objectives: List[str]) -> np.ndarray:
+    """Objective values (to maximize) per allocation, shape (n_samples, n_objectives)"""
+    total_spend = X.sum(axis=1)
+    per_spend = np.divide(pred_sales, total_spend, out=np.zeros_like(pred_sales), where=total_spend > 0)
+    columns = []
+    for obj in objectives:
+        if obj in ('roi', 'efficiency'):
+            columns.append(per_spend)
+        else:
+            columns.append(pred_sales)
+    return np.column_stack(columns)
+
+
 def single_objective_optimizer(
     model,
     total_budget: float,
@@ -224,36 +247,11 @@ def multi_objective_optimizer(
                 )
             
             def _evaluate(self, X, out, *args, **kwargs):
-                """Evaluate objectives and constraints"""
-                n_samples = X.shape[0]
+                """Evaluate objectives and constraints for the whole population"""
+                pred_sales = _predict_batch(model, X)
                 
                 # Objectives (to minimize, so negate for maximization)
-                obj_values = np.zeros((n_samples, len(objectives)))
-                
-                for i in range(n_samples):
-                    spends = X[i]
-                    
-                    # Predict sales
-                    try:
-                        pred_sales = model.predict(spends.reshape(1, -1))[0]
-                    except:
-                        pred_sales = model.predict([spends])[0]
-                    
-                    total_spend = spends.sum()
-                    
-                    for j, obj in enumerate(objectives):
-                        if obj == 'sales':
-                            obj_values[i, j] = -pred_sales  # Negate for minimization
-                        elif obj == 'roi':
-                            roi = pred_sales / total_spend if total_spend > 0 else 0
-                            obj_values[i, j] = -roi
-                        elif obj == 'efficiency':
-                            eff = pred_sales / total_spend if total_spend > 0 else 0
-                            obj_values[i, j] = -eff
-                        else:
-                            obj_values[i, j] = -pred_sales
-                
-                out["F"] = obj_values
+                out["F"] = -_objective_matrix(pred_sales, X, objectives)
                 
                 # Constraint: sum(spends) = total_budget
                 out["G"] = np.abs(X.sum(axis=1) - total_budget)
@@ -309,36 +307,16 @@ def _multi_objective_grid_search(
     """
     n_channels = len(channel_names)
     
-    # Generate random allocations
+    # Generate random allocations that sum to total_budget (more than needed, then filter)
     np.random.seed(42)
-    solutions = []
+    allocations = np.random.dirichlet(np.ones(n_channels), size=n_solutions * 10) * total_budget
     
-    for _ in range(n_solutions * 10):  # Generate more, then filter
-        # Random allocation that sums to total_budget
-        weights = np.random.dirichlet(np.ones(n_channels))
-        allocation = weights * total_budget
-        
-        # Predict sales
-        try:
-            pred_sales = model.predict(allocation.reshape(1, -1))[0]
-        except:
-            pred_sales = model.predict([allocation])[0]
-        
-        total_spend = allocation.sum()
-        
-        solution = {channel: allocation[i] for i, channel in enumerate(channel_names)}
-        
-        for obj in objectives:
-            if obj == 'sales':
-                solution[obj] = pred_sales
-            elif obj == 'roi':
-                solution[obj] = pred_sales / total_spend if total_spend > 0 else 0
-            elif obj == 'efficiency':
-                solution[obj] = pred_sales / total_spend if total_spend > 0 else 0
-        
-        solutions.append(solution)
+    # Predict the whole sample at once
+    pred_sales = _predict_batch(model, allocations)
     
-    df = pd.DataFrame(solutions)
+    df = pd.DataFrame(allocations, columns=channel_names)
+    known = [obj for obj in objectives if obj in ('sales', 'roi', 'efficiency')]
+    df[known] = _objective_matrix(pred_sales, allocations, known)
     
     # Filter to Pareto front (simple 2D case)
     if len(objectives) == 2:
@@ -395,24 +373,8 @@ def scenario_analysis(
     ... }
     >>> results = scenario_analysis(model, current_allocation, scenarios, channels)
     """
-    # Baseline prediction
-    try:
-        baseline_sales = model.predict(base_allocation.reshape(1, -1))[0]
-    except:
-        baseline_sales = model.predict([base_allocation])[0]
-    
-    results = []
-    
-    # Add baseline
-    baseline_row = {'Scenario': 'Baseline (Current)'}
-    for i, channel in enumerate(channel_names):
-        baseline_row[channel] = base_allocation[i]
-    baseline_row['Predicted_Sales'] = baseline_sales
-    baseline_row['Change_vs_Baseline'] = 0
-    baseline_row['Change_Pct'] = 0.0
-    results.append(baseline_row)
-    
-    # Test scenarios
+    # Build every scenario allocation first, then predict them with the baseline in one call
+    allocations = [base_allocation.copy()]
     for scenario_name, changes in scenarios.items():
         new_allocation = base_allocation.copy()
         
@@ -430,12 +392,24 @@ def scenario_analysis(
                 # Ensure non-negative
                 new_allocation[idx] = max(0, new_allocation[idx])
         
-        # Predict
-        try:
-            pred_sales = model.predict(new_allocation.reshape(1, -1))[0]
-        except:
-            pred_sales = model.predict([new_allocation])[0]
-        
+        allocations.append(new_allocation)
+    
+    predictions = _predict_batch(model, np.vstack(allocations))
+    baseline_sales = predictions[0]
+    
+    results = []
+    
+    # Add baseline
+    baseline_row = {'Scenario': 'Baseline (Current)'}
+    for i, channel in enumerate(channel_names):
+        baseline_row[channel] = base_allocation[i]
+    baseline_row['Predicted_Sales'] = baseline_sales
+    baseline_row['Change_vs_Baseline'] = 0
+    baseline_row['Change_Pct'] = 0.0
+    results.append(baseline_row)
+    
+    # Test scenarios
+    for scenario_name, new_allocation, pred_sales in zip(scenarios, allocations[1:], predictions[1:]):
         scenario_row = {'Scenario': scenario_name}
         for i, channel in enumerate(channel_names):
             scenario_row[channel] = new_allocation[i]
@@ -479,39 +453,23 @@ def sensitivity_analysis(
     >>> sensitivities = sensitivity_analysis(model, current_allocation, channels, 0.1)
     >>> # {'TV': 50_000_000, 'Facebook': 30_000_000, ...}
     """
-    # Baseline
-    try:
-        baseline_sales = model.predict(base_allocation.reshape(1, -1))[0]
-    except:
-        baseline_sales = model.predict([base_allocation])[0]
+    n_channels = len(channel_names)
+    base = np.asarray(base_allocation, dtype=float)
     
-    sensitivities = {}
+    # Rows: baseline, each channel +perturbation, each channel -perturbation
+    up = np.tile(base, (n_channels, 1))
+    up[np.arange(n_channels), np.arange(n_channels)] *= (1 + perturbation_pct)
+    down = np.tile(base, (n_channels, 1))
+    down[np.arange(n_channels), np.arange(n_channels)] *= (1 - perturbation_pct)
     
+    predictions = _predict_batch(model, np.vstack([base, up, down]))
+    baseline_sales = predictions[0]
+    impact_up = predictions[1:n_channels + 1] - baseline_sales
+    impact_down = predictions[n_channels + 1:] - baseline_sales
+    
+    sensitivities = {}
     for i, channel in enumerate(channel_names):
-        # Increase channel budget by perturbation_pct
-        perturbed_allocation = base_allocation.copy()
-        perturbed_allocation[i] *= (1 + perturbation_pct)
-        
-        # Predict
-        try:
-            perturbed_sales = model.predict(perturbed_allocation.reshape(1, -1))[0]
-        except:
-            perturbed_sales = model.predict([perturbed_allocation])[0]
-        
-        # Calculate impact
-        impact = perturbed_sales - baseline_sales
-        sensitivities[f"{channel} +{perturbation_pct:.0%}"] = impact
-        
-        # Decrease channel budget
-        perturbed_allocation = base_allocation.copy()
-        perturbed_allocation[i] *= (1 - perturbation_pct)
-        
-        try:
-            perturbed_sales = model.predict(perturbed_allocation.reshape(1, -1))[0]
-        except:
-            perturbed_sales = model.predict([perturbed_allocation])[0]
-        
-        impact = perturbed_sales - baseline_sales
-        sensitivities[f"{channel} -{perturbation_pct:.0%}"] = impact
+        sensitivities[f"{channel} +{perturbation_pct:.0%}"] = impact_up[i]
+        sensitivities[f"{channel} -{perturbation_pct:.0%}"] = impact_down[i]
     
     return sensitivities
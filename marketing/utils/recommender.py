@@ -0,0 +1,293 @@
+"""
+Item-Item Collaborative Filtering Recommender
+
+Built for large stores (hundreds of thousands of customers):
+- Interactions live in a sparse CSR user x item matrix
+- Item-item cosine similarity is truncated to the top-k neighbours per item
+- Candidate items are scored for many users at once (chunked sparse products)
+- New orders update the model incrementally (no full recompute)
+- Models persist to disk with joblib so app reruns reuse them
+
+Memory is O(nnz + items x k) instead of the O(users^2) of a dense
+user-user similarity matrix.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def _index_map(labels) -> Dict:
+    return {label: i for i, label in enumerate(labels)}
+
+
+def _topk_rows(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """Keep the k largest entries of every row of a CSR matrix."""
+    matrix = matrix.tocsr()
+    counts = np.diff(matrix.indptr)
+    if counts.max(initial=0) <= k:
+        return matrix
+
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    indices, data = [], []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        row_data = matrix.data[start:end]
+        keep = np.argpartition(-row_data, k - 1)[:k] if end - start > k else np.arange(end - start)
+        indices.append(matrix.indices[start:end][keep])
+        data.append(row_data[keep])
+        indptr[row + 1] = indptr[row] + len(keep)
+
+    return sparse.csr_matrix(
+        (np.concatenate(data) if data else [], np.concatenate(indices) if indices else [], indptr),
+        shape=matrix.shape
+    )
+
+
+class ItemKNNRecommender:
+    """
+    Item-based collaborative filtering on a sparse interaction matrix.
+
+    score(u, i) = sum over neighbours j of i: sim(i, j) * r(u, j)
+
+    Example:
+    --------
+    >>> model = ItemKNNRecommender(k=50).fit_orders(orders, 'customer_id', 'product', 'quantity')
+    >>> recs = model.recommend(['C001', 'C002'], n=5)
+    >>> model.partial_fit_orders(new_orders, 'customer_id', 'product', 'quantity')
+    >>> model.save('.cache/recommender.joblib')
+    """
+
+    def __init__(self, k: int = 50):
+        self.k = k
+        self.users: List = []
+        self.items: List = []
+        self._user_index: Dict = {}
+        self._item_index: Dict = {}
+        self.interactions = sparse.csr_matrix((0, 0))
+        self._gram = sparse.csr_matrix((0, 0))      # item x item co-occurrence X^T X
+        self.similarity = sparse.csr_matrix((0, 0))  # item x item, top-k per row
+
+    # ========== FIT ==========
+
+    def fit(self, interactions, users: List = None, items: List = None) -> 'ItemKNNRecommender':
+        """Fit from a (users x items) sparse or dense interaction matrix."""
+        self.interactions = sparse.csr_matrix(interactions, dtype=np.float64)
+        self.interactions.eliminate_zeros()
+        self.users = list(users) if users is not None else list(range(self.interactions.shape[0]))
+        self.items = list(items) if items is not None else list(range(self.interactions.shape[1]))
+        self._user_index = _index_map(self.users)
+        self._item_index = _index_map(self.items)
+
+        self._gram = (self.interactions.T @ self.interactions).tocsr()
+        self._rebuild_similarity()
+        return self
+
+    def fit_frame(self, df_matrix: pd.DataFrame) -> 'ItemKNNRecommender':
+        """Fit from a wide user-item DataFrame (rows = users, columns = items)."""
+        values = df_matrix.fillna(0).to_numpy(dtype=np.float64)
+        return self.fit(sparse.csr_matrix(values), df_matrix.index, df_matrix.columns)
+
+    def fit_orders(self, orders: pd.DataFrame, user_col: str, item_col: str,
+                   value_col: Optional[str] = None) -> 'ItemKNNRecommender':
+        """Fit from long-format orders (one row per purchase line)."""
+        users = pd.Index(orders[user_col].unique())
+        items = pd.Index(orders[item_col].unique())
+        matrix = self._orders_to_matrix(orders, user_col, item_col, value_col, users, items)
+        return self.fit(matrix, users, items)
+
+    @staticmethod
+    def _orders_to_matrix(orders, user_col, item_col, value_col, users, items) -> sparse.csr_matrix:
+        rows = users.get_indexer(orders[user_col])
+        cols = items.get_indexer(orders[item_col])
+        values = orders[value_col].to_numpy(dtype=np.float64) if value_col else np.ones(len(orders))
+        # Duplicate (user, item) pairs are summed by the COO -> CSR conversion
+        return sparse.coo_matrix((values, (rows, cols)), shape=(len(users), len(items))).tocsr()
+
+    def _rebuild_similarity(self):
+        """Cosine similarity from the co-occurrence matrix, pruned to top-k per item."""
+        norms = np.sqrt(np.maximum(self._gram.diagonal(), 0))
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        scale = sparse.diags(inv)
+        sim = (scale @ self._gram @ scale).tocsr()
+        sim.setdiag(0)
+        sim.eliminate_zeros()
+        self.similarity = _topk_rows(sim, self.k)
+
+    # ========== INCREMENTAL UPDATE ==========
+
+    def partial_fit_orders(self, orders: pd.DataFrame, user_col: str, item_col: str,
+                           value_col: Optional[str] = None) -> 'ItemKNNRecommender':
+        """
+        Add new orders to the model.
+
+        Only the rows of the customers in `orders` are touched: the item
+        co-occurrence matrix is corrected by (new rows)^T(new rows) -
+        (old rows)^T(old rows), then the top-k pruning is redone on the
+        item x item matrix. Unknown customers/items are appended.
+
+        The model is updated in place; update a copy when the instance is
+        shared with concurrent readers.
+        """
+        for user in pd.unique(orders[user_col]):
+            if user not in self._user_index:
+                self._user_index[user] = len(self.users)
+                self.users.append(user)
+        for item in pd.unique(orders[item_col]):
+            if item not in self._item_index:
+                self._item_index[item] = len(self.items)
+                self.items.append(item)
+
+        n_users, n_items = len(self.users), len(self.items)
+        self.interactions = self._resize(self.interactions, n_users, n_items)
+        self._gram = self._resize(self._gram, n_items, n_items)
+
+        delta = self._orders_to_matrix(orders, user_col, item_col, value_col,
+                                       pd.Index(self.users), pd.Index(self.items))
+        touched = np.unique(delta.nonzero()[0])
+        old_rows = self.interactions[touched]
+        self.interactions = (self.interactions + delta).tocsr()
+        new_rows = self.interactions[touched]
+
+        self._gram = (self._gram + new_rows.T @ new_rows - old_rows.T @ old_rows).tocsr()
+        self._gram.eliminate_zeros()
+        self._rebuild_similarity()
+        return self
+
+    @staticmethod
+    def _resize(matrix: sparse.csr_matrix, rows: int, cols: int) -> sparse.csr_matrix:
+        matrix = matrix.tocsr()
+        if matrix.shape == (rows, cols):
+            return matrix
+        coo = matrix.tocoo()
+        return sparse.csr_matrix((coo.data, (coo.row, coo.col)), shape=(rows, cols))
+
+    # ========== SCORING ==========
+
+    def score(self, user_rows: np.ndarray) -> sparse.csr_matrix:
+        """Raw item scores for the given user row indices, shape (len(user_rows), items)."""
+        return (self.interactions[user_rows] @ self.similarity.T).tocsr()
+
+    def recommend(self, users: List = None, n: int = 5, exclude_seen: bool = True,
+                  chunk_size: int = 2048) -> pd.DataFrame:
+        """
+        Top-n recommendations for many users at once.
+
+        Returns:
+        --------
+        pd.DataFrame with columns user, rank, item, score (users without
+        any positive score get no rows).
+        """
+        if users is None:
+            user_rows = np.arange(len(self.users))
+        else:
+            user_rows = np.array([self._user_index[u] for u in users if u in self._user_index], dtype=int)
+
+        frames = []
+        for start in range(0, len(user_rows), chunk_size):
+            rows = user_rows[start:start + chunk_size]
+            scores = self.score(rows).toarray()
+            if exclude_seen:
+                seen = self.interactions[rows]
+                scores[seen.nonzero()] = 0.0
+
+            top_n = min(n, scores.shape[1])
+            if top_n == 0:
+                break
+            top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            keep = top_scores > 0
+            frames.append(pd.DataFrame({
+                'user': np.asarray(self.users, dtype=object)[np.repeat(rows, top_n).reshape(-1, top_n)[keep]],
+                'rank': np.tile(np.arange(1, top_n + 1), (len(rows), 1))[keep],
+                'item': np.asarray(self.items, dtype=object)[top[keep]],
+                'score': top_scores[keep],
+            }))
+
+        if not frames:
+            return pd.DataFrame(columns=['user', 'rank', 'item', 'score'])
+        return pd.concat(frames, ignore_index=True)
+
+    def explain(self, user, item) -> Optional[tuple]:
+        """The purchased item contributing most to `item`'s score for `user`: (item, similarity)."""
+        if user not in self._user_index or item not in self._item_index:
+            return None
+        history = self.interactions[self._user_index[user]]
+        sims = self.similarity[self._item_index[item]]
+        contrib = history.multiply(sims)
+        if contrib.nnz == 0:
+            return None
+        best = contrib.indices[np.argmax(contrib.data)]
+        return self.items[best], float(sims[0, best])
+
+    def has_user(self, user) -> bool:
+        return user in self._user_index
+
+    def user_history(self, user) -> pd.Series:
+        """Purchased items of one user (value > 0), largest first."""
+        row = self.interactions[self._user_index[user]]
+        history = pd.Series(row.data, index=[self.items[j] for j in row.indices], dtype=float)
+        return history.sort_values(ascending=False)
+
+    # ========== SAMPLING (VISUALIZATION) ==========
+
+    def item_similarity_frame(self, max_items: int = 30) -> pd.DataFrame:
+        """Dense item-item similarity for the most popular items only (for heatmaps)."""
+        popularity = np.asarray((self.interactions > 0).sum(axis=0)).ravel()
+        sample = np.sort(np.argsort(-popularity)[:max_items])
+        labels = [self.items[j] for j in sample]
+        return pd.DataFrame(self.similarity[sample][:, sample].toarray(), index=labels, columns=labels)
+
+    def user_similarity_frame(self, max_users: int = 50, seed: int = 42) -> pd.DataFrame:
+        """Cosine similarity between a random sample of users (for heatmaps)."""
+        rng = np.random.default_rng(seed)
+        n_users = len(self.users)
+        sample = np.sort(rng.choice(n_users, size=min(max_users, n_users), replace=False))
+        rows = self.interactions[sample]
+        norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        normalized = sparse.diags(inv) @ rows
+        labels = [self.users[i] for i in sample]
+        return pd.DataFrame((normalized @ normalized.T).toarray(), index=labels, columns=labels)
+
+    # ========== PERSISTENCE ==========
+
+    def save(self, path) -> Path:
+        """Persist atomically (temp file + rename), so readers never load a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+        os.close(fd)
+        joblib.dump({
+            'k': self.k, 'users': self.users, 'items': self.items,
+            'interactions': self.interactions, 'gram': self._gram, 'similarity': self.similarity,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'ItemKNNRecommender':
+        state = joblib.load(path)
+        model = cls(k=state['k'])
+        model.users, model.items = state['users'], state['items']
+        model._user_index, model._item_index = _index_map(model.users), _index_map(model.items)
+        model.interactions, model._gram, model.similarity = state['interactions'], state['gram'], state['similarity']
+        return model
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Stable hash of a DataFrame's content (for persisted model file names)."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    header = '|'.join(map(str, df.columns)).encode('utf-8')
+    return hashlib.sha1(header + hashed.tobytes()).hexdigest()[:16]
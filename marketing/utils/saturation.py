@@ -8,6 +8,10 @@ Different saturation curves:
 - Hill: S-shaped curve (most common in MMM)
 - Logistic: Similar to Hill, different parameterization
 - Michaelis-Menten: From biochemistry, models enzyme kinetics (and ad saturation!)
+
+The transforms broadcast: x of shape (channels, 1, time) with parameter
+arrays of shape (channels, n_params, 1) evaluates a whole parameter sweep
+in one call.
 """
 
 import numpy as np
@@ -58,15 +62,16 @@ def hill_saturation(x: np.ndarray, alpha: float, gamma: float) -> np.ndarray:
     array([0.0, 0.167, 0.5, 0.667, 0.909])
     # At spend=50 (gamma), response is 50%
     """
-    if alpha <= 0:
+    if np.any(np.asarray(alpha) <= 0):
         raise ValueError(f"Alpha must be positive, got {alpha}")
-    if gamma <= 0:
+    if np.any(np.asarray(gamma) <= 0):
         raise ValueError(f"Gamma must be positive, got {gamma}")
     
     # Avoid division by zero
     x = np.maximum(x, 1e-10)
     
-    return x**alpha / (x**alpha + gamma**alpha)
+    x_alpha = x**alpha
+    return x_alpha / (x_alpha + gamma**alpha)
 
 
 def logistic_saturation(x: np.ndarray, k: float, x0: float, L: float = 1.0) -> np.ndarray:
@@ -101,9 +106,9 @@ def logistic_saturation(x: np.ndarray, k: float, x0: float, L: float = 1.0) -> n
     >>> logistic_saturation(spend, k=0.05, x0=100, L=1.0)
     # S-shaped curve centered at spend=100
     """
-    if k <= 0:
+    if np.any(np.asarray(k) <= 0):
         raise ValueError(f"k must be positive, got {k}")
-    if L <= 0:
+    if np.any(np.asarray(L) <= 0):
         raise ValueError(f"L must be positive, got {L}")
     
     return L / (1 + np.exp(-k * (x - x0)))
@@ -142,9 +147,9 @@ def michaelis_menten_saturation(x: np.ndarray, vmax: float, km: float) -> np.nda
     >>> michaelis_menten_saturation(spend, vmax=1.0, km=50)
     array([0.0, 0.333, 0.5, 0.667, 0.8])
     """
-    if vmax <= 0:
+    if np.any(np.asarray(vmax) <= 0):
         raise ValueError(f"Vmax must be positive, got {vmax}")
-    if km <= 0:
+    if np.any(np.asarray(km) <= 0):
         raise ValueError(f"Km must be positive, got {km}")
     
     return (vmax * x) / (km + x)
@@ -223,6 +228,28 @@ def fit_hill_saturation(
         return 1.0, np.median(x), 0.0
 
 
+def saturation_batch(X: np.ndarray, saturation_type: str = 'hill', **params) -> np.ndarray:
+    """
+    Evaluate a saturation curve for many series / parameter sets in one call.
+    
+    Parameter values may be arrays; they broadcast against X.
+    
+    Example:
+    --------
+    >>> # adstocked: (channels, n_decay, weeks); 50 gamma candidates per channel
+    >>> gammas = np.linspace(0.5, 2.0, 50)[:, None, None] * adstocked.mean(axis=-1)
+    >>> swept = saturation_batch(adstocked[None], 'hill', alpha=1.0, gamma=gammas[..., None])
+    """
+    if saturation_type == 'hill':
+        return hill_saturation(X, params.get('alpha', 1.0), params['gamma'])
+    elif saturation_type == 'logistic':
+        return logistic_saturation(X, params.get('k', 0.01), params['x0'], params.get('L', 1.0))
+    elif saturation_type == 'michaelis_menten':
+        return michaelis_menten_saturation(X, params.get('vmax', 1.0), params['km'])
+    else:
+        raise ValueError(f"Unknown saturation type: {saturation_type}")
+
+
 def apply_saturation_to_dataframe(
     df: pd.DataFrame,
     channels: List[str],
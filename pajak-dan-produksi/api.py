@@ -3,10 +3,13 @@ TaxPro Indonesia - FastAPI Backend
 RESTful API for tax calculations and analytics
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Header, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
+import asyncio
+import importlib.util
 # Import models
 from api_models import *
 
@@ -20,14 +23,23 @@ from tax_calculator import (
 # Import other services
 from ai_tax_advisor import get_ai_response
 
-# Conditional import for PDF generator (reportlab might fail on Vercel)
+# Conditional import for PDF report jobs (reportlab might fail on Vercel).
+# Rendering happens in report_jobs workers, so only check that reportlab is there
 try:
-    from pdf_generator import generate_tax_report_pdf
-    PDF_GENERATOR_AVAILABLE = True
+    from report_jobs import ReportQueue
+    PDF_GENERATOR_AVAILABLE = importlib.util.find_spec("reportlab") is not None
 except ImportError:
     PDF_GENERATOR_AVAILABLE = False
     print("Warning: PDF generator not available (reportlab missing/failed)")
 
+# Conditional import for batch payroll (numpy)
+try:
+    from payroll_batch import PayrollBatch, BatchInputError
+    BATCH_PAYROLL_AVAILABLE = True
+except ImportError:
+    BATCH_PAYROLL_AVAILABLE = False
+    print("Warning: Batch payroll not available (numpy missing)")
+
 # Conditional import for dashboard data (heavy dependencies)
 try:
     import pandas as pd
@@ -44,13 +56,23 @@ except ImportError:
 # FastAPI Application
 # ============================================================================
 
+# Background PDF rendering (worker pool + content-hash cache)
+report_queue = ReportQueue() if PDF_GENERATOR_AVAILABLE else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if report_queue is not None:
+        report_queue.shutdown(wait=False)
+
 app = FastAPI(
     title="TaxPro Indonesia API",
     description="RESTful API for Indonesian tax calculations and analytics",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # ============================================================================
@@ -139,6 +161,41 @@ async def api_calculate_pph21(request: PPh21Request):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/v1/tax/pph21/batch",
+          tags=["Tax Calculations"],
+          summary="Calculate PPh 21 for a whole payroll (CSV or JSON)",
+          dependencies=[Depends(verify_api_key)])
+async def api_calculate_pph21_batch(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|json)$", description="ndjson (streamed) atau json")
+):
+    """
+    Calculate PPh 21 for every employee of a payroll run in one call
+    
+    Body: CSV with header `gaji_pokok,tunjangan,bonus,status_kawin[,employee_id,nama]`
+    (Content-Type: text/csv) or a JSON array / `{"employees": [...]}` with the same fields.
+    
+    - **format=ndjson**: one JSON line per employee (result or validation errors),
+      last line `{"type": "summary", ...}` with company totals
+    - **format=json**: single response with `summary` and `employees`
+    
+    Invalid rows do not fail the batch; they are reported with `status: "error"`.
+    """
+    if not BATCH_PAYROLL_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Batch payroll not available in this environment")
+
+    try:
+        batch = PayrollBatch.from_body(await request.body(), request.headers.get("content-type", ""))
+    except BatchInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "json":
+        return SuccessResponse(
+            data={"summary": batch.summary(), "employees": list(batch.records())},
+            message=f"PPh 21 calculated for {int(batch.valid.sum())} of {len(batch.rows)} employees"
+        )
+    return StreamingResponse(batch.iter_ndjson(), media_type="application/x-ndjson")
+
 @app.post("/api/v1/tax/pph23",
           response_model=SuccessResponse,
           tags=["Tax Calculations"],
@@ -402,6 +459,13 @@ async def ai_tax_advisor(request: AIAdvisorRequest):
 # Report Generation Endpoint
 # ============================================================================
 
+def _require_report_queue():
+    if report_queue is None:
+        raise HTTPException(status_code=503, detail="PDF generation service not available in this environment")
+
+def _report_payload(report: ReportGenerateRequest) -> Dict[str, Any]:
+    return report.model_dump(include={"calc_type", "user_name", "company_name", "input_data", "output_data"})
+
 @app.post("/api/v1/reports/generate",
           tags=["Reports"],
           summary="Generate PDF Tax Report",
@@ -410,19 +474,15 @@ async def generate_report(request: ReportGenerateRequest):
     """
     Generate PDF tax report
     
-    Returns base64 encoded PDF
+    Returns base64 encoded PDF. Rendering runs in the report worker pool;
+    for large or many reports use `/api/v1/reports/jobs` (binary download).
     """
+    _require_report_queue()
     try:
-        if not PDF_GENERATOR_AVAILABLE:
-            raise HTTPException(status_code=503, detail="PDF generation service not available in this environment")
-
-        pdf_bytes = generate_tax_report_pdf(
-            calc_type=request.calc_type,
-            user_name=request.user_name,
-            company_name=request.company_name,
-            input_data=request.input_data,
-            output_data=request.output_data
-        )
+        job = report_queue.submit([_report_payload(request)])
+        path = await asyncio.wrap_future(job.items[0].future)
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
         
         import base64
         pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
@@ -439,6 +499,84 @@ async def generate_report(request: ReportGenerateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/reports/jobs",
+          status_code=status.HTTP_202_ACCEPTED,
+          tags=["Reports"],
+          summary="Submit PDF Report Job (single or batch)",
+          dependencies=[Depends(verify_api_key)])
+async def submit_report_job(request: ReportBatchRequest):
+    """
+    Queue one or more reports for background generation
+    
+    Returns a job ID immediately. Identical reports (same input/output payload)
+    are rendered once and shared. Poll `/api/v1/reports/jobs/{job_id}`, then
+    download `/api/v1/reports/jobs/{job_id}/download` (PDF, or ZIP for batches).
+    """
+    _require_report_queue()
+    job = report_queue.submit([_report_payload(report) for report in request.reports])
+    return {
+        "status": "success",
+        "data": {
+            **job.to_dict(),
+            "status_url": f"/api/v1/reports/jobs/{job.id}",
+            "download_url": f"/api/v1/reports/jobs/{job.id}/download"
+        },
+        "message": f"{len(job.items)} report(s) queued",
+        "timestamp": datetime.now().isoformat()
+    }
+
+def _get_report_job(job_id: str):
+    _require_report_queue()
+    job = report_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@app.get("/api/v1/reports/jobs/{job_id}",
+         response_model=SuccessResponse,
+         tags=["Reports"],
+         summary="Get Report Job Status",
+         dependencies=[Depends(verify_api_key)])
+async def get_report_job(job_id: str):
+    """Job status with per-report state (queued, running, done, failed)"""
+    job = _get_report_job(job_id)
+    return SuccessResponse(data=job.to_dict(), message=f"Report job {job.status}")
+
+@app.get("/api/v1/reports/jobs/{job_id}/download",
+         tags=["Reports"],
+         summary="Download Report Job Result (PDF or ZIP)",
+         dependencies=[Depends(verify_api_key)])
+async def download_report_job(job_id: str):
+    """Binary download: the PDF for single-report jobs, a ZIP of all finished PDFs for batches"""
+    job = _get_report_job(job_id)
+    if job.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Report job is still {job.status}")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail="Report generation failed")
+
+    if len(job.items) == 1:
+        item = job.items[0]
+        if not report_queue.report_ready(item.key):
+            raise HTTPException(status_code=410, detail="Report expired, submit the job again")
+        return FileResponse(report_queue.pdf_path(item.key), media_type="application/pdf", filename=item.filename)
+
+    archive = await asyncio.to_thread(report_queue.build_zip, job)
+    return FileResponse(archive, media_type="application/zip", filename=f"Tax_Reports_{job.id[:8]}.zip")
+
+@app.get("/api/v1/reports/files/{report_id}",
+         tags=["Reports"],
+         summary="Download a Generated PDF by Report ID",
+         dependencies=[Depends(verify_api_key)])
+async def download_report_file(report_id: str):
+    """Binary PDF of one report (report_id from the job status)"""
+    _require_report_queue()
+    if len(report_id) != 64 or any(c not in "0123456789abcdef" for c in report_id):
+        raise HTTPException(status_code=404, detail="Report not found")
+    if not report_queue.report_ready(report_id):
+        raise HTTPException(status_code=404, detail="Report not found or not ready")
+    return FileResponse(report_queue.pdf_path(report_id), media_type="application/pdf",
+                        filename=f"Tax_Report_{report_id[:12]}.pdf")
+
 # ============================================================================
 # Error Handlers
 # ============================================================================
@@ -192,6 +192,10 @@ class ReportGenerateRequest(BaseModel):
     input_data: Dict[str, Any] = Field(..., description="Input data")
     output_data: Dict[str, Any] = Field(..., description="Output data")
 
+class ReportBatchRequest(BaseModel):
+    reports: List[ReportGenerateRequest] = Field(..., min_length=1, max_length=1000,
+                                                 description="Reports to generate (max 1000 per job)")
+
 # ============================================================================
 # Webhook Request Models
 # ============================================================================
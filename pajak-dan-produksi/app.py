@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
-from audit_logger import save_audit_log, load_audit_logs, export_audit_logs, get_audit_summary
+from audit_logger import save_audit_log, load_audit_logs, export_audit_logs, get_audit_summary, verify_audit_chain
 from pdf_generator import generate_tax_report_pdf
 from ai_tax_advisor import get_ai_response, get_suggested_questions
 import altair as alt
@@ -2668,6 +2668,13 @@ elif page == "📋 Audit Trail":
         most_used = max(summary['calculations_by_type'].items(), key=lambda x: x[1])[0] if summary['calculations_by_type'] else "N/A"
         st.metric("Paling Sering", most_used)
     
+    if st.button("🔐 Verifikasi Integritas Audit Trail"):
+        check = verify_audit_chain()
+        if check['valid']:
+            st.success(f"✅ Hash chain valid ({check['rows']:,} record)")
+        else:
+            st.error(f"⚠️ Audit trail telah diubah: hash chain putus pada record #{check['broken_at']}")
+    
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Calculations by Type Chart
@@ -2,16 +2,186 @@ import os
 import csv
 import json
 import uuid
+import sqlite3
+import hashlib
+import threading
 from datetime import datetime
 import pandas as pd
 
 # Directory for audit logs
 AUDIT_DIR = "audit_logs"
+AUDIT_DB = os.path.join(AUDIT_DIR, "audit_trail.db")
+# Legacy CSV log, imported once into AUDIT_DB
 AUDIT_FILE = os.path.join(AUDIT_DIR, "tax_calculations.csv")
 
 # Ensure audit directory exists
 os.makedirs(AUDIT_DIR, exist_ok=True)
 
+LOG_COLUMNS = ['timestamp', 'session_id', 'user_name', 'company_name',
+               'calculation_type', 'input_data', 'output_data']
+
+# Output field holding the tax amount per calculation type (for dashboard rollups)
+TAX_AMOUNT_FIELDS = {
+    'PPh 21': 'pajak_bulanan',
+    'PPh 23': 'pph23',
+    'PPN': 'ppn',
+    'PPh Badan': 'pph_badan',
+    'PBB': 'pbb',
+    'PKB': 'total',
+    'BPHTB': 'bphtb',
+}
+
+GENESIS_HASH = '0' * 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    user_name TEXT,
+    company_name TEXT,
+    calculation_type TEXT NOT NULL,
+    input_data TEXT,
+    output_data TEXT,
+    amount REAL NOT NULL DEFAULT 0,
+    prev_hash TEXT NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_audit_session ON audit_log(session_id);
+CREATE INDEX IF NOT EXISTS ix_audit_timestamp ON audit_log(timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_type_timestamp ON audit_log(calculation_type, timestamp);
+
+-- Rollups maintained in the same transaction as every append
+CREATE TABLE IF NOT EXISTS audit_monthly (
+    month TEXT NOT NULL,
+    calculation_type TEXT NOT NULL,
+    calculations INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (month, calculation_type)
+);
+CREATE TABLE IF NOT EXISTS audit_users (user_name TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS audit_companies (company_name TEXT PRIMARY KEY);
+
+-- Audit rows are append-only
+CREATE TRIGGER IF NOT EXISTS audit_log_no_update BEFORE UPDATE ON audit_log
+BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS audit_log_no_delete BEFORE DELETE ON audit_log
+BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END;
+
+CREATE TABLE IF NOT EXISTS audit_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Per-thread connection (WAL: readers never block the appender)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'path', None) == AUDIT_DB:
+        return conn
+
+    os.makedirs(os.path.dirname(AUDIT_DB) or '.', exist_ok=True)
+    conn = sqlite3.connect(AUDIT_DB, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _local.conn, _local.path = conn, AUDIT_DB
+    import_csv_logs(conn=conn)
+    return conn
+
+
+def _row_hash(prev_hash, entry):
+    """sha256 over the previous hash and the canonical row content"""
+    payload = json.dumps([prev_hash] + [entry[c] for c in LOG_COLUMNS], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _tax_amount(calc_type, output_json):
+    field = TAX_AMOUNT_FIELDS.get(calc_type)
+    if field is None:
+        return 0.0
+    try:
+        return float(json.loads(output_json).get(field, 0) or 0)
+    except (ValueError, TypeError, AttributeError):
+        return 0.0
+
+
+def _append(conn, entries, once_key=None):
+    """
+    Append entries under one write lock: hash chain + rollups stay consistent.
+    With `once_key` the append happens at most once per store (importers).
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if once_key and conn.execute("SELECT 1 FROM audit_meta WHERE key = ?", (once_key,)).fetchone():
+            conn.execute("ROLLBACK")
+            return 0
+        last = conn.execute("SELECT hash FROM audit_log ORDER BY id DESC LIMIT 1").fetchone()
+        prev_hash = last['hash'] if last else GENESIS_HASH
+        rows, monthly = [], {}
+        for entry in entries:
+            entry_hash = _row_hash(prev_hash, entry)
+            amount = _tax_amount(entry['calculation_type'], entry['output_data'])
+            rows.append([entry[c] for c in LOG_COLUMNS] + [amount, prev_hash, entry_hash])
+            bucket = monthly.setdefault((entry['timestamp'][:7], entry['calculation_type']), [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += amount
+            prev_hash = entry_hash
+
+        conn.executemany(
+            "INSERT INTO audit_log (timestamp, session_id, user_name, company_name, calculation_type, "
+            "input_data, output_data, amount, prev_hash, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.executemany(
+            "INSERT INTO audit_monthly (month, calculation_type, calculations, amount) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(month, calculation_type) DO UPDATE SET calculations = calculations + excluded.calculations, "
+            "amount = amount + excluded.amount",
+            [key + tuple(value) for key, value in monthly.items()]
+        )
+        conn.executemany("INSERT OR IGNORE INTO audit_users VALUES (?)", {(e['user_name'],) for e in entries})
+        conn.executemany("INSERT OR IGNORE INTO audit_companies VALUES (?)", {(e['company_name'],) for e in entries})
+        if once_key:
+            conn.execute("INSERT INTO audit_meta VALUES (?, ?)", (once_key, datetime.now().isoformat()))
+        conn.execute("COMMIT")
+        return len(entries)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def import_csv_logs(csv_path=None, conn=None):
+    """
+    One-time import of the legacy CSV audit log (oldest first, hash-chained)
+
+    Returns:
+        int: Number of imported rows (0 if already imported or no CSV)
+    """
+    csv_path = csv_path or AUDIT_FILE
+    conn = conn or _connect()
+    key = f"csv_imported:{os.path.abspath(csv_path)}"
+    if not os.path.isfile(csv_path) or conn.execute("SELECT 1 FROM audit_meta WHERE key = ?", (key,)).fetchone():
+        return 0
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        entries = [{c: (row.get(c) or '') for c in LOG_COLUMNS} for row in csv.DictReader(f)]
+    entries.sort(key=lambda e: e['timestamp'])
+
+    # Re-checked under the write lock: concurrent first starts import only once
+    return _append(conn, entries, once_key=key)
+
+
+def _new_session_id(conn):
+    while True:
+        session_id = str(uuid.uuid4())[:8]
+        if not conn.execute("SELECT 1 FROM audit_log WHERE session_id = ?", (session_id,)).fetchone():
+            return session_id
+
+
+def _as_text(value):
+    return '' if value is None else str(value)
+
+
 def save_audit_log(calc_type, user_name, company_name, input_data, output_data):
     """
     Save audit log for tax calculation
@@ -24,37 +194,24 @@ def save_audit_log(calc_type, user_name, company_name, input_data, output_data):
         output_data (dict): Calculation results
     """
     try:
+        conn = _connect()
+
         # Generate session ID
-        session_id = str(uuid.uuid4())[:8]
+        session_id = _new_session_id(conn)
         
-        # Get current timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Prepare log entry
+        # Prepare log entry. Text columns are stored as str: the hash must match
+        # what SQLite (TEXT affinity) gives back to verify_audit_chain
         log_entry = {
-            'timestamp': timestamp,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             'session_id': session_id,
-            'user_name': user_name,
-            'company_name': company_name,
-            'calculation_type': calc_type,
+            'user_name': _as_text(user_name),
+            'company_name': _as_text(company_name),
+            'calculation_type': _as_text(calc_type),
             'input_data': json.dumps(input_data, ensure_ascii=False),
             'output_data': json.dumps(output_data, ensure_ascii=False)
         }
         
-        # Check if file exists
-        file_exists = os.path.isfile(AUDIT_FILE)
-        
-        # Write to CSV
-        with open(AUDIT_FILE, 'a', newline='', encoding='utf-8') as f:
-            fieldnames = ['timestamp', 'session_id', 'user_name', 'company_name', 
-                         'calculation_type', 'input_data', 'output_data']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            
-            # Write header if file is new
-            if not file_exists:
-                writer.writeheader()
-            
-            writer.writerow(log_entry)
+        _append(conn, [log_entry])
         
         return True, session_id
     
@@ -62,9 +219,16 @@ def save_audit_log(calc_type, user_name, company_name, input_data, output_data):
         print(f"Error saving audit log: {e}")
         return False, None
 
+def _query_logs(where="", params=(), limit=None):
+    sql = f"SELECT {', '.join(LOG_COLUMNS)} FROM audit_log {where} ORDER BY timestamp DESC, id DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    rows = _connect().execute(sql, params).fetchall()
+    return pd.DataFrame([tuple(r) for r in rows], columns=LOG_COLUMNS) if rows else pd.DataFrame()
+
 def load_audit_logs(limit=None):
     """
-    Load audit logs from CSV file
+    Load audit logs (most recent first)
     
     Args:
         limit (int): Maximum number of records to load (most recent)
@@ -73,24 +237,13 @@ def load_audit_logs(limit=None):
         pandas.DataFrame: Audit logs
     """
     try:
-        if not os.path.isfile(AUDIT_FILE):
-            return pd.DataFrame()
-        
-        df = pd.read_csv(AUDIT_FILE, encoding='utf-8')
-        
-        # Sort by timestamp descending (most recent first)
-        df = df.sort_values('timestamp', ascending=False)
-        
-        if limit:
-            df = df.head(limit)
-        
-        return df
+        return _query_logs(limit=limit)
     
     except Exception as e:
         print(f"Error loading audit logs: {e}")
         return pd.DataFrame()
 
-def export_audit_logs(start_date=None, end_date=None, calc_type=None, user_name=None):
+def export_audit_logs(start_date=None, end_date=None, calc_type=None, user_name=None, limit=None):
     """
     Export filtered audit logs
     
@@ -98,31 +251,35 @@ def export_audit_logs(start_date=None, end_date=None, calc_type=None, user_name=
         start_date (str): Start date filter (YYYY-MM-DD)
         end_date (str): End date filter (YYYY-MM-DD)
         calc_type (str): Calculation type filter
-        user_name (str): User name filter
+        user_name (str): User name filter (substring, case-insensitive)
+        limit (int): Maximum number of records (most recent)
     
     Returns:
         pandas.DataFrame: Filtered audit logs
     """
     try:
-        df = load_audit_logs()
-        
-        if df.empty:
-            return df
+        clauses, params = [], []
         
-        # Apply filters
+        # Date range and type use the (calculation_type, timestamp) / timestamp indexes
         if start_date:
-            df = df[df['timestamp'] >= start_date]
+            clauses.append("timestamp >= ?")
+            params.append(start_date)
         
         if end_date:
-            df = df[df['timestamp'] <= end_date + ' 23:59:59']
+            clauses.append("timestamp <= ?")
+            params.append(end_date + ' 23:59:59')
         
         if calc_type and calc_type != "Semua":
-            df = df[df['calculation_type'] == calc_type]
+            clauses.append("calculation_type = ?")
+            params.append(calc_type)
         
         if user_name:
-            df = df[df['user_name'].str.contains(user_name, case=False, na=False)]
+            clauses.append("user_name LIKE ? ESCAPE '\\'")
+            escaped = user_name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
         
-        return df
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return _query_logs(where, params, limit)
     
     except Exception as e:
         print(f"Error exporting audit logs: {e}")
@@ -136,26 +293,27 @@ def get_audit_summary():
         dict: Summary statistics
     """
     try:
-        df = load_audit_logs()
+        conn = _connect()
         
-        if df.empty:
-            return {
-                'total_calculations': 0,
-                'unique_users': 0,
-                'unique_companies': 0,
-                'calculations_by_type': {},
-                'recent_activity': []
-            }
+        # Rollup tables: cost independent of the number of audit rows
+        by_type = conn.execute(
+            "SELECT calculation_type, SUM(calculations) FROM audit_monthly "
+            "GROUP BY calculation_type ORDER BY SUM(calculations) DESC"
+        ).fetchall()
+        recent = conn.execute(
+            "SELECT timestamp, user_name, calculation_type FROM audit_log ORDER BY timestamp DESC, id DESC LIMIT 5"
+        ).fetchall()
         
-        summary = {
-            'total_calculations': len(df),
-            'unique_users': df['user_name'].nunique(),
-            'unique_companies': df['company_name'].nunique(),
-            'calculations_by_type': df['calculation_type'].value_counts().to_dict(),
-            'recent_activity': df.head(5)[['timestamp', 'user_name', 'calculation_type']].to_dict('records')
+        return {
+            'total_calculations': sum(count for _, count in by_type),
+            # Blank names are not counted (as nunique() did on the old CSV log)
+            'unique_users': conn.execute(
+                "SELECT COUNT(*) FROM audit_users WHERE NULLIF(user_name, '') IS NOT NULL").fetchone()[0],
+            'unique_companies': conn.execute(
+                "SELECT COUNT(*) FROM audit_companies WHERE NULLIF(company_name, '') IS NOT NULL").fetchone()[0],
+            'calculations_by_type': {calc_type: count for calc_type, count in by_type},
+            'recent_activity': [dict(r) for r in recent]
         }
-        
-        return summary
     
     except Exception as e:
         print(f"Error getting audit summary: {e}")
@@ -167,6 +325,20 @@ def get_audit_summary():
             'recent_activity': []
         }
 
+def get_monthly_tax_totals():
+    """
+    Tax amount per month and calculation type (from the rollup table)
+
+    Returns:
+        pandas.DataFrame: month (Timestamp), tax_type, amount, calculations
+    """
+    rows = _connect().execute(
+        "SELECT month, calculation_type, amount, calculations FROM audit_monthly ORDER BY month"
+    ).fetchall()
+    df = pd.DataFrame([tuple(r) for r in rows], columns=['month', 'tax_type', 'amount', 'calculations'])
+    df['month'] = pd.to_datetime(df['month'] + '-01', errors='coerce')
+    return df.dropna(subset=['month'])
+
 def get_calculation_details(session_id):
     """
     Get detailed information for a specific calculation
@@ -178,28 +350,35 @@ def get_calculation_details(session_id):
         dict: Calculation details
     """
     try:
-        df = load_audit_logs()
-        
-        if df.empty:
-            return None
-        
-        record = df[df['session_id'] == session_id]
+        record = _connect().execute(
+            f"SELECT {', '.join(LOG_COLUMNS)} FROM audit_log WHERE session_id = ? ORDER BY id DESC LIMIT 1",
+            (session_id,)
+        ).fetchone()
         
-        if record.empty:
+        if record is None:
             return None
         
-        record = record.iloc[0]
-        
-        return {
-            'timestamp': record['timestamp'],
-            'session_id': record['session_id'],
-            'user_name': record['user_name'],
-            'company_name': record['company_name'],
-            'calculation_type': record['calculation_type'],
-            'input_data': json.loads(record['input_data']),
-            'output_data': json.loads(record['output_data'])
-        }
+        details = dict(record)
+        details['input_data'] = json.loads(details['input_data'])
+        details['output_data'] = json.loads(details['output_data'])
+        return details
     
     except Exception as e:
         print(f"Error getting calculation details: {e}")
         return None
+
+def verify_audit_chain():
+    """
+    Recompute the hash chain over the whole trail
+
+    Returns:
+        dict: {'valid': bool, 'rows': checked rows, 'broken_at': first bad row id or None}
+    """
+    cursor = _connect().execute(f"SELECT id, prev_hash, hash, {', '.join(LOG_COLUMNS)} FROM audit_log ORDER BY id")
+    prev_hash, rows = GENESIS_HASH, 0
+    for row in cursor:
+        rows += 1
+        if row['prev_hash'] != prev_hash or _row_hash(prev_hash, row) != row['hash']:
+            return {'valid': False, 'rows': rows, 'broken_at': row['id']}
+        prev_hash = row['hash']
+    return {'valid': True, 'rows': rows, 'broken_at': None}
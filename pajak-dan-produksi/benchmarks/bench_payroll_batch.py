@@ -0,0 +1,88 @@
+"""
+Benchmark: batch PPh 21 endpoint vs one request per employee
+
+Runs in-process (FastAPI TestClient), so network latency and the TLS
+handshake of the per-employee path are NOT included - the real gap is
+larger. Also checks every batch result against calculate_pph21_api.
+
+    python benchmarks/bench_payroll_batch.py --employees 10000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from api import app
+from payroll_batch import PTKP_VALUES
+from tax_calculator import calculate_pph21_api
+
+HEADERS = {"X-API-Key": "demo-key-12345"}
+
+
+def make_payroll(n, seed=42):
+    rng = random.Random(seed)
+    statuses = list(PTKP_VALUES)
+    return [{
+        "employee_id": f"EMP{i:06d}",
+        "gaji_pokok": rng.choice([4_500_000, 6_000_000, 9_000_000, 15_000_000, 30_000_000, 75_000_000]),
+        "tunjangan": rng.randrange(0, 5_000_000, 50_000),
+        "bonus": rng.choice([0, 0, 0, 1_000_000, 10_000_000]),
+        "status_kawin": rng.choice(statuses),
+    } for i in range(n)]
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--single-sample", type=int, default=500,
+                        help="per-employee requests actually sent (time is extrapolated)")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    rows = make_payroll(args.employees)
+
+    for label, body, content_type in (("JSON", json.dumps(rows).encode(), "application/json"),
+                                      ("CSV", to_csv(rows), "text/csv")):
+        started = time.perf_counter()
+        response = client.post("/api/v1/tax/pph21/batch", content=body,
+                               headers={**HEADERS, "Content-Type": content_type})
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        elapsed = time.perf_counter() - started
+
+        employees, summary = lines[:-1], lines[-1]
+        mismatches = sum(
+            1 for row, result in zip(rows, employees)
+            if any(abs(result[k] - v) > 1e-6 for k, v in calculate_pph21_api(
+                row["gaji_pokok"], row["tunjangan"], row["bonus"], row["status_kawin"]).items())
+        )
+        print(f"batch {label:<4}: {args.employees} employees in {elapsed * 1000:7.1f} ms "
+              f"({len(body) / 1e6:.1f} MB in), total PPh21/bulan Rp {summary['total_pajak_bulanan']:,.0f}, "
+              f"{mismatches} mismatches")
+
+    sample = rows[:args.single_sample]
+    started = time.perf_counter()
+    for row in sample:
+        client.post("/api/v1/tax/pph21", json=row, headers=HEADERS)
+    per_request = (time.perf_counter() - started) / len(sample)
+    print(f"single     : {per_request * 1000:.2f} ms/request -> {per_request * args.employees:.1f} s "
+          f"for {args.employees} employees (in-process, no network)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,58 +11,15 @@ import sqlite3
 # ============================================================================
 
 def load_from_audit_trail():
-    """Load real data from audit trail CSV"""
-    audit_file = "audit_logs/tax_calculations.csv"
-    
-    if not os.path.exists(audit_file):
-        return None
-    
+    """Load real data from the audit trail (monthly rollup, no full-log scan)"""
     try:
-        df = pd.read_csv(audit_file)
-        
-        # Parse timestamp
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Extract month
-        df['month'] = df['timestamp'].dt.to_period('M').dt.to_timestamp()
-        
-        # Parse output_data JSON to extract tax amounts
-        import json
-        
-        tax_data = []
-        for _, row in df.iterrows():
-            try:
-                output = json.loads(row['output_data'])
-                
-                # Determine tax amount based on tax_type
-                amount = 0
-                if row['tax_type'] == 'PPh 21':
-                    amount = output.get('pajak_bulanan', 0)
-                elif row['tax_type'] == 'PPh 23':
-                    amount = output.get('pph23', 0)
-                elif row['tax_type'] == 'PPN':
-                    amount = output.get('ppn', 0)
-                elif row['tax_type'] == 'PPh Badan':
-                    amount = output.get('pph_badan', 0)
-                elif row['tax_type'] == 'PBB':
-                    amount = output.get('pbb', 0)
-                elif row['tax_type'] == 'PKB':
-                    amount = output.get('total', 0)
-                elif row['tax_type'] == 'BPHTB':
-                    amount = output.get('bphtb', 0)
-                
-                tax_data.append({
-                    'month': row['month'],
-                    'tax_type': row['tax_type'],
-                    'amount': amount
-                })
-            except:
-                continue
+        from audit_logger import get_monthly_tax_totals
         
-        if not tax_data:
+        df = get_monthly_tax_totals()
+        if df.empty:
             return None
         
-        return pd.DataFrame(tax_data)
+        return df[['month', 'tax_type', 'amount']]
     
     except Exception as e:
         print(f"Error loading audit trail: {e}")
@@ -0,0 +1,197 @@
+"""
+Batch Payroll PPh 21 Module
+Vectorized PPh 21 for whole-company payroll runs (CSV or JSON input)
+"""
+
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from tax_calculator import (
+    BIAYA_JABATAN_MAX, BIAYA_JABATAN_RATE, PPH21_BRACKETS, PTKP_VALUES
+)
+
+MAX_BATCH_ROWS = 50000
+STREAM_CHUNK_ROWS = 1000
+
+STATUS_PATTERN = re.compile(r"^(TK|K)/[0-3]$")
+STATUS_CODES = list(PTKP_VALUES)
+PTKP_ARRAY = np.array([PTKP_VALUES[code] for code in STATUS_CODES], dtype=float)
+
+BRACKET_UPPER = np.array([upper for upper, _ in PPH21_BRACKETS])
+BRACKET_LOWER = np.concatenate([[0.0], BRACKET_UPPER[:-1]])
+BRACKET_RATE = np.array([rate for _, rate in PPH21_BRACKETS])
+
+ID_FIELDS = ("employee_id", "nik", "nama")
+RESULT_FIELDS = ("penghasilan_bruto", "biaya_jabatan", "penghasilan_netto", "ptkp", "pkp",
+                 "pajak_bulanan", "pajak_tahunan")
+
+
+class BatchInputError(ValueError):
+    """Input batch cannot be parsed at all (per-row problems are reported per row)"""
+
+
+# ============================================================================
+# Parsing
+# ============================================================================
+
+def parse_employees(body: bytes, content_type: str = "") -> List[Dict[str, Any]]:
+    """CSV (header row) or JSON (array, or {"employees": [...]}) -> list of row dicts"""
+    text = body.decode("utf-8-sig").strip()
+    if not text:
+        raise BatchInputError("Empty payroll batch")
+
+    is_csv = "csv" in content_type or not text.startswith(("[", "{"))
+    if is_csv:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise BatchInputError(f"Invalid JSON: {e}")
+        rows = payload.get("employees") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise BatchInputError("JSON body must be an array of employees or {\"employees\": [...]}")
+
+    if len(rows) > MAX_BATCH_ROWS:
+        raise BatchInputError(f"Batch too large: {len(rows)} rows (max {MAX_BATCH_ROWS})")
+    return rows
+
+
+def _numeric_column(rows, field, required, minimum, strict, errors):
+    values = np.zeros(len(rows))
+    for i, row in enumerate(rows):
+        raw = row.get(field) if isinstance(row, dict) else None
+        if raw is None or raw == "":
+            if required:
+                errors[i].append(f"{field}: wajib diisi")
+            continue
+        try:
+            values[i] = float(raw)
+        except (TypeError, ValueError):
+            errors[i].append(f"{field}: bukan angka ({raw!r})")
+            continue
+        if not np.isfinite(values[i]) or (values[i] <= minimum if strict else values[i] < minimum):
+            errors[i].append(f"{field}: harus {'>' if strict else '>='} {minimum:g}")
+    return values
+
+
+def _validate(rows):
+    """Column arrays + per-row error lists (same rules as PPh21Request)"""
+    errors = [[] if isinstance(row, dict) else ["baris harus berupa objek"] for row in rows]
+    gaji = _numeric_column(rows, "gaji_pokok", True, 0, True, errors)
+    tunjangan = _numeric_column(rows, "tunjangan", False, 0, False, errors)
+    bonus = _numeric_column(rows, "bonus", False, 0, False, errors)
+
+    status_index = np.zeros(len(rows), dtype=np.int64)
+    code_of = {code: i for i, code in enumerate(STATUS_CODES)}
+    for i, row in enumerate(rows):
+        status = str(row.get("status_kawin", "")).strip().upper() if isinstance(row, dict) else ""
+        if STATUS_PATTERN.match(status):
+            status_index[i] = code_of[status]
+        elif isinstance(row, dict):
+            errors[i].append(f"status_kawin: format TK/0-3 atau K/0-3 ({status or 'kosong'})")
+    return gaji, tunjangan, bonus, status_index, errors
+
+
+# ============================================================================
+# Vectorized PPh 21
+# ============================================================================
+
+def calculate_pph21_vectorized(gaji_pokok, tunjangan, bonus, status_index) -> Dict[str, np.ndarray]:
+    """Same formula as tax_calculator.calculate_pph21_api, on whole arrays"""
+    bruto = gaji_pokok + tunjangan + bonus
+    biaya_jabatan = np.minimum(bruto * BIAYA_JABATAN_RATE, BIAYA_JABATAN_MAX)
+    netto_tahunan = (bruto - biaya_jabatan) * 12
+    ptkp = PTKP_ARRAY[status_index]
+    pkp = np.maximum(netto_tahunan - ptkp, 0)
+
+    # Taxable slice of every bracket, summed bracket by bracket
+    slices = np.clip(pkp[:, None], BRACKET_LOWER, BRACKET_UPPER) - BRACKET_LOWER
+    pajak_tahunan = np.zeros(len(pkp))
+    for k, rate in enumerate(BRACKET_RATE):
+        pajak_tahunan = pajak_tahunan + slices[:, k] * rate
+
+    return {
+        "penghasilan_bruto": bruto,
+        "biaya_jabatan": biaya_jabatan,
+        "penghasilan_netto": netto_tahunan,
+        "ptkp": ptkp,
+        "pkp": pkp,
+        "pajak_bulanan": pajak_tahunan / 12,
+        "pajak_tahunan": pajak_tahunan,
+    }
+
+
+class PayrollBatch:
+    """
+    One payroll run: validation, vectorized PPh 21, company totals.
+
+    Example:
+    --------
+    >>> batch = PayrollBatch.from_body(csv_bytes, "text/csv")
+    >>> batch.summary()["total_pajak_bulanan"]
+    >>> for line in batch.iter_ndjson(): ...
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        gaji, tunjangan, bonus, self.status_index, self.errors = _validate(rows)
+        self.valid = np.array([not e for e in self.errors], dtype=bool)
+        self.results = calculate_pph21_vectorized(gaji, tunjangan, bonus, self.status_index)
+
+    @classmethod
+    def from_body(cls, body: bytes, content_type: str = "") -> "PayrollBatch":
+        return cls(parse_employees(body, content_type))
+
+    def summary(self) -> Dict[str, Any]:
+        valid = self.valid
+        per_status = np.bincount(self.status_index[valid], minlength=len(STATUS_CODES))
+        tax_per_status = np.bincount(self.status_index[valid], weights=self.results["pajak_bulanan"][valid],
+                                     minlength=len(STATUS_CODES))
+        return {
+            "total_karyawan": len(self.rows),
+            "valid": int(valid.sum()),
+            "invalid": int((~valid).sum()),
+            "total_penghasilan_bruto": float(self.results["penghasilan_bruto"][valid].sum()),
+            "total_pajak_bulanan": float(self.results["pajak_bulanan"][valid].sum()),
+            "total_pajak_tahunan": float(self.results["pajak_tahunan"][valid].sum()),
+            "karyawan_kena_pajak": int((self.results["pajak_tahunan"][valid] > 0).sum()),
+            "per_status_kawin": {
+                code: {"jumlah": int(per_status[i]), "pajak_bulanan": float(tax_per_status[i])}
+                for i, code in enumerate(STATUS_CODES) if per_status[i]
+            },
+        }
+
+    def _identity(self, i: int) -> Dict[str, Any]:
+        row = self.rows[i] if isinstance(self.rows[i], dict) else {}
+        return {field: row[field] for field in ID_FIELDS if row.get(field) not in (None, "")}
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Per-employee result or per-row validation errors, in input order"""
+        columns = {field: self.results[field].tolist() for field in RESULT_FIELDS}
+        for i in range(len(self.rows)):
+            record = {"type": "employee", "row": i + 1, **self._identity(i)}
+            if self.valid[i]:
+                record["status"] = "ok"
+                record["status_kawin"] = STATUS_CODES[self.status_index[i]]
+                record.update({field: columns[field][i] for field in RESULT_FIELDS})
+            else:
+                record["status"] = "error"
+                record["errors"] = self.errors[i]
+            yield record
+
+    def iter_ndjson(self) -> Iterator[str]:
+        """NDJSON chunks: one line per employee, then a {"type": "summary"} line"""
+        chunk = []
+        for record in self.records():
+            chunk.append(json.dumps(record, ensure_ascii=False))
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        chunk.append(json.dumps({"type": "summary", **self.summary()}, ensure_ascii=False))
+        yield "\n".join(chunk) + "\n"
@@ -0,0 +1,227 @@
+"""
+Report Job Queue Module
+Background PDF generation with content-hash deduplication
+
+- Reports are rendered in a worker pool (processes: reportlab is CPU-bound),
+  never on the API event loop
+- Every report is keyed by the sha256 of its payload; a PDF that exists on
+  disk or is already being rendered is reused instead of rendered again
+- Finished PDFs live in REPORT_CACHE_DIR and are served as binary files
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "taxpro_reports"))
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 7 * 24 * 3600))  # seconds
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", os.cpu_count() or 2))
+MAX_JOBS = 10000
+MAX_REPORTS_PER_JOB = 1000
+
+PAYLOAD_FIELDS = ("calc_type", "user_name", "company_name", "input_data", "output_data")
+
+
+def report_key(payload: Dict[str, Any]) -> str:
+    """Content hash of a report request (canonical JSON of the payload fields)"""
+    canonical = json.dumps({k: payload.get(k) for k in PAYLOAD_FIELDS}, sort_keys=True,
+                           ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _render_report(payload: Dict[str, Any], path: str) -> str:
+    """Worker: render one PDF and publish it atomically (runs in the pool)"""
+    from pdf_generator import generate_tax_report_pdf
+
+    pdf_bytes = generate_tax_report_pdf(**{k: payload[k] for k in PAYLOAD_FIELDS})
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp, path)
+    return path
+
+
+@dataclass
+class ReportItem:
+    key: str
+    filename: str
+    future: Future
+
+
+@dataclass
+class ReportJob:
+    id: str
+    created_at: datetime
+    items: List[ReportItem] = field(default_factory=list)
+
+    def _state(self, item: ReportItem) -> str:
+        if not item.future.done():
+            return "running" if item.future.running() else "queued"
+        return "failed" if item.future.exception() is not None else "done"
+
+    @property
+    def status(self) -> str:
+        states = {self._state(item) for item in self.items}
+        if states <= {"done"}:
+            return "done"
+        if "queued" in states or "running" in states:
+            return "running" if states & {"running", "done", "failed"} else "queued"
+        return "failed" if states == {"failed"} else "partial"
+
+    def to_dict(self) -> Dict[str, Any]:
+        reports = []
+        for index, item in enumerate(self.items):
+            state = self._state(item)
+            entry = {"index": index, "report_id": item.key, "filename": item.filename, "status": state}
+            if state == "failed":
+                entry["error"] = str(item.future.exception())
+            reports.append(entry)
+        counts = {state: sum(1 for r in reports if r["status"] == state) for state in ("queued", "running", "done", "failed")}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "total": len(self.items),
+            **counts,
+            "reports": reports,
+        }
+
+
+class ReportQueue:
+    """
+    Submit report batches, poll jobs, read finished PDFs.
+
+    Example:
+    --------
+    >>> queue = ReportQueue()
+    >>> job = queue.submit([{"calc_type": "PPh 21", "user_name": "A", "company_name": "PT B",
+    ...                      "input_data": {...}, "output_data": {...}}])
+    >>> queue.get(job.id).status          # queued / running / done / partial / failed
+    >>> queue.pdf_path(job.items[0].key)  # path of the finished PDF
+    """
+
+    def __init__(self, cache_dir: str = REPORT_CACHE_DIR, max_workers: int = REPORT_WORKERS,
+                 use_processes: bool = True, ttl: int = REPORT_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.ttl = ttl
+        self._executor = None
+        self._inflight: Dict[str, Future] = {}
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.stats = {"rendered": 0, "deduplicated": 0}
+
+    # ========== POOL ==========
+
+    def _pool(self):
+        if self._executor is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.use_processes:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, NotImplementedError):
+                    # Sandboxed/serverless runtimes without multiprocessing
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    # ========== SUBMIT ==========
+
+    def pdf_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _schedule(self, payload: Dict[str, Any]) -> Future:
+        """Future for the PDF of `payload`: cached file, in-flight render, or a new render"""
+        key = report_key(payload)
+        path = self.pdf_path(key)
+        with self._lock:
+            if os.path.isfile(path):
+                self.stats["deduplicated"] += 1
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["deduplicated"] += 1
+                return future
+            future = self._pool().submit(_render_report, {k: payload.get(k) for k in PAYLOAD_FIELDS}, path)
+            self._inflight[key] = future
+            self.stats["rendered"] += 1
+        future.add_done_callback(lambda f, k=key: self._finish(k, f))
+        return future
+
+    def _finish(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def submit(self, payloads: List[Dict[str, Any]]) -> ReportJob:
+        if not payloads:
+            raise ValueError("Report job needs at least one report")
+        if len(payloads) > MAX_REPORTS_PER_JOB:
+            raise ValueError(f"Too many reports in one job: {len(payloads)} (max {MAX_REPORTS_PER_JOB})")
+
+        self._prune_files()
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        job = ReportJob(id=uuid.uuid4().hex, created_at=datetime.now())
+        for index, payload in enumerate(payloads):
+            filename = f"Tax_Report_{payload.get('calc_type', 'report')}_{stamp}_{index + 1:04d}.pdf".replace(" ", "_")
+            job.items.append(ReportItem(report_key(payload), filename, self._schedule(payload)))
+
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    # ========== FILES ==========
+
+    def report_ready(self, key: str) -> bool:
+        return os.path.isfile(self.pdf_path(key))
+
+    def build_zip(self, job: ReportJob) -> str:
+        """ZIP of the finished PDFs of a job (stored uncompressed: PDFs already are)"""
+        path = os.path.join(self.cache_dir, f"job_{job.id}.zip")
+        if not os.path.isfile(path):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as archive:
+                for item in job.items:
+                    if self.report_ready(item.key):
+                        archive.write(self.pdf_path(item.key), item.filename)
+            os.replace(tmp, path)
+        return path
+
+    def _prune_files(self):
+        """Drop cached PDFs/ZIPs older than the TTL (at most once a minute)"""
+        now = time.time()
+        if now - self._last_prune < 60 or not os.path.isdir(self.cache_dir):
+            return
+        self._last_prune = now
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
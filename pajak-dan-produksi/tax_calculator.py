@@ -7,41 +7,49 @@ Contains calculation functions for all tax types
 # PPh 21 Calculation
 # ============================================================================
 
+# PTKP (Penghasilan Tidak Kena Pajak) per tahun
+PTKP_VALUES = {
+    "TK/0": 54000000,
+    "TK/1": 58500000,
+    "TK/2": 63000000,
+    "TK/3": 67500000,
+    "K/0": 58500000,
+    "K/1": 63000000,
+    "K/2": 67500000,
+    "K/3": 72000000
+}
+
+# Tarif progresif Pasal 17: (batas atas PKP, tarif)
+PPH21_BRACKETS = [
+    (60000000, 0.05),
+    (250000000, 0.15),
+    (500000000, 0.25),
+    (float("inf"), 0.30)
+]
+
+BIAYA_JABATAN_RATE = 0.05
+BIAYA_JABATAN_MAX = 500000  # per bulan
+
 def calculate_pph21_api(gaji_pokok: float, tunjangan: float = 0, bonus: float = 0, status_kawin: str = "TK/0"):
     """Calculate PPh 21 for API"""
     
-    # PTKP values
-    ptkp_values = {
-        "TK/0": 54000000,
-        "TK/1": 58500000,
-        "TK/2": 63000000,
-        "TK/3": 67500000,
-        "K/0": 58500000,
-        "K/1": 63000000,
-        "K/2": 67500000,
-        "K/3": 72000000
-    }
-    
     # Calculate
     penghasilan_bruto = gaji_pokok + tunjangan + bonus
-    biaya_jabatan = min(penghasilan_bruto * 0.05, 500000)
+    biaya_jabatan = min(penghasilan_bruto * BIAYA_JABATAN_RATE, BIAYA_JABATAN_MAX)
     penghasilan_netto_bulanan = penghasilan_bruto - biaya_jabatan
     penghasilan_netto_tahunan = penghasilan_netto_bulanan * 12
     
-    ptkp = ptkp_values.get(status_kawin, 54000000)
+    ptkp = PTKP_VALUES.get(status_kawin, PTKP_VALUES["TK/0"])
     pkp = max(penghasilan_netto_tahunan - ptkp, 0)
     
     # Progressive tax rates
     pajak_tahunan = 0
-    if pkp > 0:
-        if pkp <= 60000000:
-            pajak_tahunan = pkp * 0.05
-        elif pkp <= 250000000:
-            pajak_tahunan = (60000000 * 0.05) + ((pkp - 60000000) * 0.15)
-        elif pkp <= 500000000:
-            pajak_tahunan = (60000000 * 0.05) + (190000000 * 0.15) + ((pkp - 250000000) * 0.25)
-        else:
-            pajak_tahunan = (60000000 * 0.05) + (190000000 * 0.15) + (250000000 * 0.25) + ((pkp - 500000000) * 0.30)
+    lower = 0
+    for upper, rate in PPH21_BRACKETS:
+        if pkp <= lower:
+            break
+        pajak_tahunan += (min(pkp, upper) - lower) * rate
+        lower = upper
     
     pajak_bulanan = pajak_tahunan / 12
     
@@ -7,18 +7,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
 import sys
 import os
 
 # Add utils to path
 sys.path.append(os.path.dirname(__file__))
 
-from utils.weather_api import (
-    get_current_weather,
-    get_hourly_forecast,
-    get_daily_forecast,
-    get_weather_description
-)
+from utils.weather_api import get_weather_description
+from utils.async_weather import AsyncWeatherClient, WeatherUpstreamError
+from utils.forecast_service import ForecastService, MAX_HORIZON
+
+# Shared non-blocking Open-Meteo client (connection pool + TTL cache)
+weather_client = AsyncWeatherClient()
+
+# Trained-model registry; models are (re)trained in a background thread
+forecast_service = ForecastService(max_age_hours=float(os.getenv("MODEL_MAX_AGE_HOURS", "24")))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    forecast_service.start()
+    yield
+    forecast_service.stop()
+    await weather_client.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -26,7 +37,8 @@ app = FastAPI(
     description="Advanced weather forecasting and prediction API with ML capabilities",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -43,6 +55,10 @@ class LocationRequest(BaseModel):
     latitude: float = Field(..., ge=-90, le=90, description="Latitude (-90 to 90)")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude (-180 to 180)")
 
+class TemperaturePredictionRequest(LocationRequest):
+    days: int = Field(7, ge=1, le=MAX_HORIZON, description=f"Forecast days (1-{MAX_HORIZON})")
+    model: str = Field("ensemble", description="ensemble, arima, prophet, lstm or xgboost")
+
 class CurrentWeatherResponse(BaseModel):
     location: Dict[str, float]
     timestamp: str
@@ -85,6 +101,8 @@ async def root():
             "current": "/api/v1/weather/current",
             "hourly": "/api/v1/weather/hourly",
             "daily": "/api/v1/weather/daily",
+            "predict_temperature": "/api/v1/predict/temperature",
+            "models_status": "/api/v1/models/status",
             "docs": "/docs"
         }
     }
@@ -116,7 +134,7 @@ async def get_current(
     - Current weather data including temperature, humidity, wind, etc.
     """
     try:
-        weather = get_current_weather(latitude, longitude)
+        weather = await weather_client.current(latitude, longitude)
         
         if not weather:
             raise HTTPException(status_code=404, detail="Weather data not found")
@@ -135,6 +153,10 @@ async def get_current(
             "description": get_weather_description(weather.get('weather_code', 0)),
             "timezone": weather.get('timezone', 'UTC')
         }
+    except HTTPException:
+        raise
+    except WeatherUpstreamError as e:
+        raise HTTPException(status_code=502, detail=f"Weather upstream unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching weather data: {str(e)}")
 
@@ -157,7 +179,7 @@ async def get_hourly(
     - Hourly forecast data
     """
     try:
-        forecast = get_hourly_forecast(latitude, longitude, hours)
+        forecast = await weather_client.hourly(latitude, longitude, hours)
         
         if forecast is None or len(forecast) == 0:
             raise HTTPException(status_code=404, detail="Forecast data not found")
@@ -170,6 +192,10 @@ async def get_hourly(
             "forecast": forecast_list,
             "hours": len(forecast_list)
         }
+    except HTTPException:
+        raise
+    except WeatherUpstreamError as e:
+        raise HTTPException(status_code=502, detail=f"Weather upstream unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching forecast: {str(e)}")
 
@@ -192,7 +218,7 @@ async def get_daily(
     - Daily forecast data
     """
     try:
-        forecast = get_daily_forecast(latitude, longitude, days)
+        forecast = await weather_client.daily(latitude, longitude, days)
         
         if forecast is None or len(forecast) == 0:
             raise HTTPException(status_code=404, detail="Forecast data not found")
@@ -205,25 +231,62 @@ async def get_daily(
             "forecast": forecast_list,
             "days": len(forecast_list)
         }
+    except HTTPException:
+        raise
+    except WeatherUpstreamError as e:
+        raise HTTPException(status_code=502, detail=f"Weather upstream unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching forecast: {str(e)}")
 
-# Prediction endpoint (for future ML integration)
+# Prediction endpoint (served from the trained-model registry)
 @app.post("/api/v1/predict/temperature", tags=["Prediction"])
-async def predict_temperature(location: LocationRequest):
+async def predict_temperature(request: TemperaturePredictionRequest):
     """
-    Predict temperature using ML models (placeholder for future implementation)
+    Predict daily mean temperature using ARIMA, Prophet, LSTM and XGBoost
     
     Parameters:
-    - location: Location coordinates
+    - latitude, longitude: Location coordinates
+    - days: Number of forecast days (default: 7, max: 14)
+    - model: "ensemble" (inverse-MAPE weighted) or a single model name
     
     Returns:
-    - Temperature prediction
+    - Forecast from the already-fitted models, or status "training" when the
+      location has no model yet, or its model no longer covers the requested
+      days (it is queued for background training)
+    """
+    location = {"latitude": request.latitude, "longitude": request.longitude}
+    if request.model != "ensemble" and request.model not in forecast_service.trainers:
+        raise HTTPException(status_code=422, detail=f"Unknown model '{request.model}'")
+
+    prediction = forecast_service.forecast(request.latitude, request.longitude, request.days, request.model)
+    if prediction is None:
+        forecast_service.request_training(request.latitude, request.longitude)
+        return {
+            "message": "No trained model covering these days for this location yet - training scheduled, retry in a few minutes",
+            "status": "training",
+            "location": location,
+        }
+
+    if prediction["model_status"]["stale"]:
+        forecast_service.request_training(request.latitude, request.longitude)
+    return {
+        "message": f"Temperature forecast ({prediction['model']})",
+        "status": "ready",
+        "location": location,
+        **prediction,
+    }
+
+# Model registry status endpoint
+@app.get("/api/v1/models/status", tags=["Prediction"])
+async def models_status():
+    """
+    Trained locations with staleness, training time and backtest MAPE per model
     """
     return {
-        "message": "ML prediction endpoint - Coming soon!",
-        "location": location.dict(),
-        "note": "This endpoint will use ARIMA, Prophet, LSTM, and XGBoost models"
+        "max_age_hours": forecast_service.max_age_hours,
+        "pending": forecast_service.pending_count,
+        "locations": forecast_service.status(),
+        "errors": forecast_service.last_error,
     }
 
 # Weather statistics endpoint
@@ -246,7 +309,7 @@ async def get_statistics(
     """
     try:
         # Get historical data
-        forecast = get_daily_forecast(latitude, longitude, min(days, 16))
+        forecast = await weather_client.daily(latitude, longitude, min(days, 16))
         
         if forecast is None or len(forecast) == 0:
             raise HTTPException(status_code=404, detail="Data not found")
@@ -267,6 +330,10 @@ async def get_statistics(
         }
         
         return stats
+    except HTTPException:
+        raise
+    except WeatherUpstreamError as e:
+        raise HTTPException(status_code=502, detail=f"Weather upstream unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating statistics: {str(e)}")
 
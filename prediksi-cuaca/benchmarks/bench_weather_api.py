@@ -0,0 +1,102 @@
+"""
+Offline throughput / latency benchmark for the weather endpoints
+
+Drives api.app in-process (httpx.ASGITransport) against the fake
+Open-Meteo upstream, so no network is needed.
+
+    python -m benchmarks.bench_weather_api --requests 2000 --concurrency 100 --latency-ms 200
+
+--mode blocking emulates the previous implementation: a synchronous
+upstream call (time.sleep for the upstream latency) inside the async
+endpoint, without cache or coalescing.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+import api
+from benchmarks.fake_open_meteo import create_fake_app, forecast_payload
+from utils.async_weather import AsyncWeatherClient
+
+ENDPOINTS = [
+    "/api/v1/weather/current?latitude={lat}&longitude={lon}",
+    "/api/v1/weather/hourly?latitude={lat}&longitude={lon}&hours=24",
+    "/api/v1/weather/daily?latitude={lat}&longitude={lon}&days=7",
+]
+
+
+class BlockingClient(AsyncWeatherClient):
+    """Old behaviour: every request blocks the event loop for the upstream round trip"""
+
+    def __init__(self, latency_ms):
+        super().__init__()
+        self.latency_ms = latency_ms
+
+    async def fetch(self, key, params):
+        self.stats["upstream_calls"] += 1
+        time.sleep(self.latency_ms / 1000)
+        query = {k: v for k, v in params.items()}
+        return type("Result", (), {"data": forecast_payload(query)})()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run(args):
+    fake = create_fake_app(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    if args.mode == "async":
+        client = AsyncWeatherClient(forecast_url="http://fake-open-meteo/v1/forecast",
+                                    transport=httpx.ASGITransport(app=fake))
+    else:
+        client = BlockingClient(args.latency_ms)
+    api.weather_client = client
+
+    rng = random.Random(0)
+    # Farmers cluster around a limited number of districts
+    locations = [(round(-8 + rng.random() * 4, 3), round(106 + rng.random() * 6, 3)) for _ in range(args.locations)]
+    urls = [rng.choice(ENDPOINTS).format(lat=lat, lon=lon)
+            for lat, lon in (rng.choice(locations) for _ in range(args.requests))]
+
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://api") as http:
+        async def one(url):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(url) for url in urls))
+        elapsed = time.perf_counter() - start
+    await client.aclose()
+
+    print(f"mode={args.mode} requests={args.requests} concurrency={args.concurrency} "
+          f"locations={args.locations} upstream latency={args.latency_ms}ms")
+    print(f"  throughput : {args.requests / elapsed:,.0f} req/s ({elapsed:.2f} s)")
+    print(f"  latency    : p50 {statistics.median(latencies):.1f} ms, p99 {percentile(latencies, 99):.1f} ms")
+    print(f"  statuses   : {statuses}")
+    print(f"  upstream   : {client.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["async", "blocking"], default="async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--locations", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Backtest: direct multi-horizon XGBoost vs the recursive per-day loop
+
+For every city and every backtest origin the models are fitted on the
+history up to the origin and scored on the next `horizon` days.
+
+- legacy    : previous train_xgboost (one-row DataFrame + scaler + predict per
+              day, rolling features frozen at the last observed window)
+- recursive : train_xgboost(method='recursive'), rolling features on the path
+- direct    : train_xgboost_batch, all cities x all horizons in one call
+
+    python -m benchmarks.bench_xgboost_horizons --cities 20 --horizon 90
+    python -m benchmarks.bench_xgboost_horizons --live --horizon 30   # Open-Meteo archive
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.ml_forecasting import (
+    create_lag_features,
+    create_rolling_features,
+    create_time_features,
+    train_xgboost,
+    train_xgboost_batch,
+)
+
+TARGET = 'temperature_2m_mean'
+LIVE_CITIES = {
+    'Jakarta': (-6.2, 106.8), 'Bandung': (-6.9, 107.6), 'Surabaya': (-7.25, 112.75),
+    'Medan': (3.6, 98.7), 'Makassar': (-5.15, 119.4), 'Denpasar': (-8.65, 115.2),
+    'Malang': (-7.98, 112.63), 'Padang': (-0.95, 100.35),
+}
+
+
+def legacy_train_xgboost(df, forecast_days=7):
+    """The per-day loop this change replaces (kept verbatim for comparison)"""
+    from xgboost import XGBRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    df = create_time_features(df)
+    df = create_lag_features(df, TARGET, lags=[1, 2, 3, 7])
+    df = create_rolling_features(df, TARGET, windows=[7, 14])
+    df = df.dropna()
+
+    feature_cols = [col for col in df.columns if col not in ['date', TARGET, 'time']]
+    X, y = df[feature_cols], df[TARGET]
+    scaler = StandardScaler()
+    model = XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=42)
+    model.fit(scaler.fit_transform(X), y)
+
+    last_date = df['date'].max()
+    forecasts = []
+    for future_date in [last_date + timedelta(days=i + 1) for i in range(forecast_days)]:
+        row = {
+            'day_of_week': future_date.dayofweek, 'day_of_month': future_date.day, 'month': future_date.month,
+            'quarter': (future_date.month - 1) // 3 + 1, 'is_weekend': 1 if future_date.dayofweek >= 5 else 0,
+        }
+        recent = list(df[TARGET].tail(7).values) + forecasts
+        for lag in [1, 2, 3, 7]:
+            row[f'{TARGET}_lag_{lag}'] = recent[-lag] if len(recent) >= lag else df[TARGET].mean()
+        for window in [7, 14]:
+            row[f'{TARGET}_rolling_mean_{window}'] = df[TARGET].tail(window).mean()
+            row[f'{TARGET}_rolling_std_{window}'] = df[TARGET].tail(window).std()
+        forecasts.append(model.predict(scaler.transform(pd.DataFrame([row])[feature_cols]))[0])
+    return {'forecast': np.array(forecasts)}
+
+
+def synthetic_cities(n_cities, days, seed=0):
+    """Seasonal cycle + persistent AR(1) anomalies, different climate per city"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp(date.today()) - pd.Timedelta(days=5), periods=days, freq='D')
+    angle = 2 * np.pi * dates.dayofyear.values / 365.25
+    frames = {}
+    for i in range(n_cities):
+        anomaly = np.zeros(days)
+        noise = rng.normal(0, 0.6, days)
+        for t in range(1, days):
+            anomaly[t] = 0.8 * anomaly[t - 1] + noise[t]
+        values = rng.uniform(18, 29) + rng.uniform(0.5, 3) * np.sin(angle + rng.uniform(0, 2 * np.pi)) + anomaly
+        frames[f'city_{i:02d}'] = pd.DataFrame({'time': dates.strftime('%Y-%m-%d'), 'date': dates, TARGET: values})
+    return frames
+
+
+def live_cities(days):
+    from utils.weather_api import get_historical_weather
+    end = date.today() - timedelta(days=5)
+    frames = {}
+    for name, (lat, lon) in LIVE_CITIES.items():
+        df = get_historical_weather(lat, lon, (end - timedelta(days=days)).isoformat(), end.isoformat())
+        if df is not None:
+            df['date'] = pd.to_datetime(df['time'])
+            frames[name] = df[['time', 'date', TARGET]].dropna()
+    return frames
+
+
+def backtest(frames, horizon, origins):
+    errors = {name: [] for name in ('legacy', 'recursive', 'direct')}
+    timings = dict.fromkeys(errors, 0.0)
+    length = min(len(df) for df in frames.values())
+
+    for cut in np.linspace(length * 0.6, length - horizon, origins).astype(int):
+        train = {name: df.iloc[:cut].reset_index(drop=True) for name, df in frames.items()}
+        actual = {name: df[TARGET].values[cut:cut + horizon] for name, df in frames.items()}
+
+        for method, fit in (('legacy', legacy_train_xgboost),
+                            ('recursive', lambda df, h: train_xgboost(df, h, method='recursive'))):
+            started = time.perf_counter()
+            preds = {name: fit(df, horizon)['forecast'] for name, df in train.items()}
+            timings[method] += time.perf_counter() - started
+            errors[method] += [np.abs(preds[name] - actual[name]) for name in frames]
+
+        started = time.perf_counter()
+        batch = train_xgboost_batch(train, horizon)
+        timings['direct'] += time.perf_counter() - started
+        errors['direct'] += [np.abs(batch[name]['forecast'] - actual[name]) for name in frames]
+
+    return {method: np.mean(errs, axis=0) for method, errs in errors.items()}, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cities', type=int, default=10)
+    parser.add_argument('--days', type=int, default=730, help='history length per city')
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--origins', type=int, default=3, help='backtest origins')
+    parser.add_argument('--live', action='store_true', help='use the Open-Meteo archive instead of synthetic data')
+    args = parser.parse_args()
+
+    frames = live_cities(args.days) if args.live else synthetic_cities(args.cities, args.days)
+    mae, timings = backtest(frames, args.horizon, args.origins)
+
+    buckets = [(1, 7), (8, 14), (15, 30), (31, 60), (61, 90)]
+    buckets = [(lo, min(hi, args.horizon)) for lo, hi in buckets if lo <= args.horizon]
+    print(f"{len(frames)} cities, horizon {args.horizon} d, {args.origins} origins")
+    print(f"{'method':<10} {'fit+forecast':>13}  " + "  ".join(f"MAE d{lo}-{hi}".rjust(11) for lo, hi in buckets))
+    for method in mae:
+        cols = "  ".join(f"{mae[method][lo - 1:hi].mean():11.3f}" for lo, hi in buckets)
+        print(f"{method:<10} {timings[method]:12.2f}s  {cols}")
+
+
+if __name__ == '__main__':
+    main()
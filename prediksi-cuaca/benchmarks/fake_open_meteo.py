@@ -0,0 +1,86 @@
+"""
+Fake Open-Meteo upstream for offline tests and benchmarks
+
+Serves /v1/forecast with deterministic data shaped like the real API for
+the `current`, `hourly` and `daily` blocks. Latency and error rate are
+configurable, so slow or failing upstreams can be reproduced locally.
+
+Run standalone (requires uvicorn):
+    FAKE_LATENCY_MS=300 uvicorn benchmarks.fake_open_meteo:app --port 8081
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:8081/v1/forecast uvicorn api:app
+
+Or in-process: httpx.ASGITransport(app=create_fake_app(latency_ms=300))
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+# Integer-valued fields in the real API
+INT_FIELDS = {"relative_humidity_2m", "weather_code", "cloud_cover", "wind_direction_10m",
+              "wind_direction_10m_dominant", "precipitation_probability", "precipitation_probability_max"}
+
+
+def _series(name, n, lat, lon):
+    base = 25 + (lat % 5) - (lon % 3)
+    values = [round(base + ((i * 7 + len(name)) % 11) / 2, 1) for i in range(n)]
+    return [int(v) for v in values] if name in INT_FIELDS else values
+
+
+def forecast_payload(params):
+    """Deterministic Open-Meteo-like response for the requested blocks"""
+    lat = float(params.get("latitude", 0))
+    lon = float(params.get("longitude", 0))
+    days = int(params.get("forecast_days", 7))
+    start = datetime(2026, 1, 1)
+    payload = {"latitude": lat, "longitude": lon, "timezone": "Asia/Jakarta"}
+
+    current = params.getlist("current") if hasattr(params, "getlist") else params.get("current", [])
+    hourly = params.getlist("hourly") if hasattr(params, "getlist") else params.get("hourly", [])
+    daily = params.getlist("daily") if hasattr(params, "getlist") else params.get("daily", [])
+
+    if current:
+        payload["current"] = {"time": start.strftime("%Y-%m-%dT%H:%M")}
+        payload["current"].update({name: _series(name, 1, lat, lon)[0] for name in current})
+    if hourly:
+        n = days * 24
+        payload["hourly"] = {"time": [(start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(n)]}
+        payload["hourly"].update({name: _series(name, n, lat, lon) for name in hourly})
+    if daily:
+        payload["daily"] = {"time": [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]}
+        for name in daily:
+            if name in ("sunrise", "sunset"):
+                hour = 5 if name == "sunrise" else 17
+                payload["daily"][name] = [(start + timedelta(days=i, hours=hour)).strftime("%Y-%m-%dT%H:%M")
+                                          for i in range(days)]
+            else:
+                payload["daily"][name] = _series(name, days, lat, lon)
+    return payload
+
+
+def create_fake_app(latency_ms=None, jitter_ms=None, error_rate=None, seed=42):
+    """Fake upstream app; defaults come from FAKE_LATENCY_MS / FAKE_JITTER_MS / FAKE_ERROR_RATE"""
+    fake = FastAPI(title="Fake Open-Meteo")
+    fake.state.latency_ms = float(os.getenv("FAKE_LATENCY_MS", 200) if latency_ms is None else latency_ms)
+    fake.state.jitter_ms = float(os.getenv("FAKE_JITTER_MS", 50) if jitter_ms is None else jitter_ms)
+    fake.state.error_rate = float(os.getenv("FAKE_ERROR_RATE", 0) if error_rate is None else error_rate)
+    fake.state.calls = 0
+    rng = random.Random(seed)
+
+    @fake.get("/v1/forecast")
+    async def forecast(request: Request):
+        fake.state.calls += 1
+        delay = fake.state.latency_ms + rng.uniform(0, fake.state.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if rng.random() < fake.state.error_rate:
+            return JSONResponse({"error": True, "reason": "fake upstream failure"}, status_code=503)
+        return forecast_payload(request.query_params)
+
+    return fake
+
+
+app = create_fake_app()
@@ -23,7 +23,7 @@ def test_health_check():
 def test_current_weather():
     """Test current weather endpoint"""
     response = client.get("/api/v1/weather/current?latitude=-6.2&longitude=106.8")
-    assert response.status_code in [200, 500]  # May fail if API is down
+    assert response.status_code in [200, 502]  # May fail if API is down
     
 def test_current_weather_invalid_coords():
     """Test current weather with invalid coordinates"""
@@ -33,17 +33,17 @@ def test_current_weather_invalid_coords():
 def test_hourly_forecast():
     """Test hourly forecast endpoint"""
     response = client.get("/api/v1/weather/hourly?latitude=-6.2&longitude=106.8&hours=24")
-    assert response.status_code in [200, 500]
+    assert response.status_code in [200, 502]
 
 def test_daily_forecast():
     """Test daily forecast endpoint"""
     response = client.get("/api/v1/weather/daily?latitude=-6.2&longitude=106.8&days=7")
-    assert response.status_code in [200, 500]
+    assert response.status_code in [200, 502]
 
 def test_statistics():
     """Test statistics endpoint"""
     response = client.get("/api/v1/weather/statistics?latitude=-6.2&longitude=106.8&days=30")
-    assert response.status_code in [200, 500]
+    assert response.status_code in [200, 502]
 
 def test_predict_temperature():
     """Test temperature prediction endpoint"""
@@ -0,0 +1,153 @@
+"""
+Tests for the async Open-Meteo client (against the local fake upstream)
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from benchmarks.fake_open_meteo import create_fake_app
+from utils.async_weather import AsyncWeatherClient, PRODUCT_TTL, WeatherUpstreamError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(fake, clock=None, **kwargs):
+    return AsyncWeatherClient(forecast_url="http://fake/v1/forecast",
+                              transport=httpx.ASGITransport(app=fake),
+                              clock=clock or FakeClock(), **kwargs)
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    fake = create_fake_app(latency_ms=50, jitter_ms=0)
+    client = make_client(fake)
+
+    async def scenario():
+        results = await asyncio.gather(*[client.current(-6.2, 106.8) for _ in range(50)])
+        await client.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert fake.state.calls == 1
+    assert all(r == results[0] for r in results)
+    assert results[0]['timezone'] == 'Asia/Jakarta'
+
+
+def test_cache_is_keyed_by_rounded_location_and_expires():
+    fake = create_fake_app(latency_ms=0, jitter_ms=0)
+    clock = FakeClock()
+    client = make_client(fake, clock)
+
+    async def scenario():
+        await client.daily(-6.2001, 106.8001, days=7)
+        await client.daily(-6.2004, 106.7996, days=7)   # same ~1 km cell
+        await client.daily(-6.2, 106.8, days=3)         # different product length
+        clock.now += PRODUCT_TTL['daily'] + 1
+        await client.daily(-6.2, 106.8, days=7)
+        await client.aclose()
+
+    asyncio.run(scenario())
+    assert fake.state.calls == 3
+
+
+def test_stale_entry_is_served_when_upstream_fails():
+    fake = create_fake_app(latency_ms=0, jitter_ms=0)
+    clock = FakeClock()
+    client = make_client(fake, clock)
+
+    async def scenario():
+        first = await client.current(-6.2, 106.8)
+        fake.state.error_rate = 1.0
+        clock.now += PRODUCT_TTL['current'] + 1
+        second = await client.current(-6.2, 106.8)
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert second == first
+    assert client.stats['stale_served'] == 1
+
+
+def test_slow_upstream_falls_back_to_stale_quickly():
+    fake = create_fake_app(latency_ms=0, jitter_ms=0)
+    clock = FakeClock()
+    client = make_client(fake, clock, stale_after=0.05)
+
+    async def scenario():
+        await client.hourly(-6.2, 106.8, hours=24)
+        fake.state.latency_ms = 1000
+        clock.now += PRODUCT_TTL['hourly'] + 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        forecast = await client.hourly(-6.2, 106.8, hours=24)
+        elapsed = loop.time() - start
+        await client.aclose()
+        return forecast, elapsed
+
+    forecast, elapsed = asyncio.run(scenario())
+    assert len(forecast) == 24
+    assert elapsed < 0.5
+
+
+def test_error_without_cached_data_raises():
+    fake = create_fake_app(latency_ms=0, jitter_ms=0, error_rate=1.0)
+    client = make_client(fake)
+
+    async def scenario():
+        try:
+            await client.current(-6.2, 106.8)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(WeatherUpstreamError):
+        asyncio.run(scenario())
+
+
+def test_pool_from_previous_loop_is_closed():
+    fake = create_fake_app(latency_ms=0, jitter_ms=0)
+    client = make_client(fake)
+
+    async def first():
+        await client.current(-6.2, 106.8)
+        return client._http
+
+    async def second():
+        await client.daily(-6.2, 106.8, days=3)
+        await asyncio.sleep(0)  # let the scheduled close of the old pool run
+        await client.aclose()
+
+    old_pool = asyncio.run(first())
+    asyncio.run(second())
+    assert old_pool.is_closed
+    assert not client._closing
+
+
+def test_upstream_error_maps_to_502(monkeypatch):
+    fake = create_fake_app(latency_ms=0, jitter_ms=0, error_rate=1.0)
+    monkeypatch.setattr(api, 'weather_client', make_client(fake))
+    client = TestClient(api.app)
+
+    response = client.get("/api/v1/weather/current?latitude=-6.2&longitude=106.8")
+    assert response.status_code == 502
+
+
+def test_endpoints_use_async_client(monkeypatch):
+    fake = create_fake_app(latency_ms=0, jitter_ms=0)
+    monkeypatch.setattr(api, 'weather_client', make_client(fake))
+    client = TestClient(api.app)
+
+    response = client.get("/api/v1/weather/current?latitude=-6.2&longitude=106.8")
+    assert response.status_code == 200
+    assert response.json()['timezone'] == 'Asia/Jakarta'
+
+    response = client.get("/api/v1/weather/statistics?latitude=-6.2&longitude=106.8&days=30")
+    assert response.status_code == 200
+    assert response.json()['period_days'] == 16
@@ -0,0 +1,145 @@
+"""
+Tests for the trained-model registry and the temperature prediction endpoint
+"""
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from utils.forecast_service import (
+    ARCHIVE_LAG_DAYS,
+    MAX_HORIZON,
+    TARGET,
+    ForecastService,
+    ModelRegistry,
+    location_key,
+)
+
+
+def fake_history(lat, lon, days=120, lag=ARCHIVE_LAG_DAYS):
+    # Ends where the real archive does: ARCHIVE_LAG_DAYS before today
+    end = datetime.utcnow().date() - timedelta(days=lag)
+    dates = pd.date_range(end=end, periods=days, freq="D")
+    return pd.DataFrame({"time": dates.strftime("%Y-%m-%d"), "date": dates,
+                         TARGET: 27 + np.sin(np.arange(days) / 7)})
+
+
+def constant_trainer(offset):
+    def train(df, horizon):
+        level = float(df[TARGET].iloc[-1]) + offset
+        forecast = np.full(horizon, level)
+        return {"forecast": forecast, "lower_bound": forecast - 1, "upper_bound": forecast + 1, "model": None}
+    return train
+
+
+def failing_trainer(df, horizon):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def service(tmp_path):
+    trainers = {"good": constant_trainer(0.1), "bad": constant_trainer(3.0), "broken": failing_trainer}
+    service = ForecastService(registry=ModelRegistry(str(tmp_path)), trainers=trainers,
+                              history_fn=fake_history, check_interval=0.05)
+    yield service
+    service.stop()
+
+
+def test_train_and_serve_from_registry(service):
+    record = service.train_now(-6.2, 106.8)
+    assert set(record.models) == {"good", "bad"}
+    assert "broken" in record.errors
+    assert record.models["good"].backtest_mape < record.models["bad"].backtest_mape
+
+    weights = record.ensemble_weights()
+    assert weights["good"] > weights["bad"]
+    assert sum(weights.values()) == pytest.approx(1.0)
+
+    prediction = service.forecast(-6.2, 106.8, days=5)
+    assert len(prediction["forecast"]) == len(prediction["dates"]) == 5
+    assert prediction["dates"][0] == datetime.utcnow().date().isoformat()
+    assert prediction["model_status"]["stale"] is False
+    single = service.forecast(-6.2, 106.8, days=5, model="bad")
+    assert single["forecast"][0] > prediction["forecast"][0]
+
+
+def test_full_horizon_from_today_despite_archive_lag(service):
+    service.train_now(-6.2, 106.8)
+    prediction = service.forecast(-6.2, 106.8, days=MAX_HORIZON)
+    today = datetime.utcnow().date()
+    assert prediction["dates"] == [(today + timedelta(days=i)).isoformat() for i in range(MAX_HORIZON)]
+    assert len(prediction["forecast"]) == MAX_HORIZON
+    assert prediction["model_status"]["days_covered"] >= MAX_HORIZON
+
+
+def test_aged_record_is_refused_and_retrained(service):
+    # History ending 10 days further back than the archive lag: the record no longer covers 14 days
+    service.history_fn = lambda lat, lon: fake_history(lat, lon, lag=ARCHIVE_LAG_DAYS + 10)
+    record = service.train_now(-6.2, 106.8)
+    assert record.days_covered() < MAX_HORIZON
+
+    assert service.forecast(-6.2, 106.8, days=MAX_HORIZON) is None
+    assert len(service.forecast(-6.2, 106.8, days=record.days_covered())["forecast"]) == record.days_covered()
+    assert service.status()[0]["stale"] is True
+    assert service._stale_locations() == [(-6.2, 106.8)]
+
+
+def test_registry_is_shared_through_disk(service, tmp_path):
+    service.train_now(-6.2, 106.8)
+    other_worker = ModelRegistry(str(tmp_path))
+    assert other_worker.keys() == [location_key(-6.2, 106.8)]
+    assert other_worker.get(location_key(-6.24, 106.76)).n_observations == 120
+
+
+def test_lock_prevents_duplicate_training(service):
+    key = location_key(-7.0, 110.4)
+    assert service.registry.try_lock(key)
+    assert service.train_now(-7.0, 110.4) is None
+    service.registry.unlock(key)
+    assert service.train_now(-7.0, 110.4) is not None
+
+
+def test_background_training_and_stale_retrain(service):
+    service.request_training(-6.9, 107.6)
+    deadline = time.time() + 5
+    while service.forecast(-6.9, 107.6) is None and time.time() < deadline:
+        time.sleep(0.02)
+    first = service.registry.get(location_key(-6.9, 107.6))
+    assert first is not None and not service.is_pending(-6.9, 107.6)
+
+    service.max_age_hours = 0
+    assert service.status()[0]["stale"] is True
+    while service.registry.get(first.key).trained_at == first.trained_at and time.time() < deadline:
+        time.sleep(0.02)
+    assert service.registry.get(first.key).trained_at > first.trained_at
+
+
+def test_predict_endpoint_uses_registry(service, monkeypatch):
+    monkeypatch.setattr(api, "forecast_service", service)
+    client = TestClient(api.app)
+
+    pending = client.post("/api/v1/predict/temperature", json={"latitude": 1.5, "longitude": 124.8})
+    assert pending.status_code == 200
+    assert pending.json()["status"] == "training"
+
+    service.train_now(-6.2, 106.8)
+    ready = client.post("/api/v1/predict/temperature", json={"latitude": -6.2, "longitude": 106.8, "days": 3})
+    body = ready.json()
+    assert body["status"] == "ready"
+    assert len(body["forecast"]) == 3
+    assert set(body["weights"]) == {"good", "bad"}
+
+    unknown = client.post("/api/v1/predict/temperature", json={"latitude": -6.2, "longitude": 106.8, "model": "nope"})
+    assert unknown.status_code == 422
+    too_long = client.post("/api/v1/predict/temperature",
+                           json={"latitude": -6.2, "longitude": 106.8, "days": MAX_HORIZON + 1})
+    assert too_long.status_code == 422
+
+    status = client.get("/api/v1/models/status").json()
+    trained = {loc["location_key"]: loc for loc in status["locations"]}
+    assert trained[location_key(-6.2, 106.8)]["models"]["good"]["backtest_mape"] is not None
+    assert trained[location_key(-6.2, 106.8)]["training_seconds"] >= 0
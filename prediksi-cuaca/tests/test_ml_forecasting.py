@@ -0,0 +1,47 @@
+"""
+Tests for the direct multi-horizon XGBoost forecaster
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+
+from utils.ml_forecasting import train_xgboost, train_xgboost_batch
+
+
+def make_frame(days=300, base=26.0, seed=0, extra_columns=False):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    values = base + 2 * np.sin(2 * np.pi * dates.dayofyear.values / 365.25) + rng.normal(0, 0.3, days)
+    df = pd.DataFrame({"time": dates.strftime("%Y-%m-%d"), "date": dates, "temperature_2m_mean": values})
+    if extra_columns:
+        df["precipitation_sum"] = rng.random(days)
+        df["temperature_2m_max"] = values + 4
+    return df
+
+
+@pytest.mark.parametrize("method", ["direct", "recursive"])
+def test_forecast_shape_and_dates(method):
+    df = make_frame(extra_columns=True)
+    result = train_xgboost(df, 30, method=method)
+    assert result is not None
+    assert result["forecast"].shape == (30,)
+    assert np.all(result["lower_bound"] <= result["forecast"])
+    assert result["dates"][0] == df["date"].iloc[-1] + pd.Timedelta(days=1)
+
+
+def test_direct_intervals_grow_with_horizon():
+    result = train_xgboost(make_frame(), 30)
+    width = result["upper_bound"] - result["lower_bound"]
+    assert np.all(np.diff(width) >= 0)
+    assert width[-1] > width[0]
+
+
+def test_batch_forecasts_every_city_in_one_model():
+    frames = {"cool": make_frame(base=18, seed=1), "warm": make_frame(base=28, seed=2)}
+    results = train_xgboost_batch(frames, 60)
+    assert set(results) == {"cool", "warm"}
+    assert results["cool"]["model"] is results["warm"]["model"]
+    assert abs(results["cool"]["forecast"].mean() - 18) < 3
+    assert abs(results["warm"]["forecast"].mean() - 28) < 3
@@ -0,0 +1,206 @@
+"""
+Asynchronous Open-Meteo client for the FastAPI service
+
+- One shared httpx.AsyncClient (connection pool, keep-alive) per event loop
+- TTL cache keyed by product + rounded lat/lon (+ forecast length)
+- Concurrent identical requests are coalesced into one upstream call
+- Stale-on-error: an expired entry keeps being served while Open-Meteo is
+  failing or slower than `stale_after` seconds; the refresh keeps running
+  in the background and updates the cache when it lands
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+import httpx
+
+from utils.weather_api import (
+    FORECAST_URL,
+    current_params,
+    daily_params,
+    hourly_forecast_days,
+    hourly_params,
+    parse_current,
+    parse_daily,
+    parse_hourly,
+)
+
+# Fresh lifetime per product (seconds)
+PRODUCT_TTL = {
+    "current": 300,     # 5 minutes
+    "hourly": 1800,     # 30 minutes
+    "daily": 3600,      # 1 hour
+}
+STALE_TTL = 6 * 3600    # how long an expired entry may still be served on errors
+COORD_DECIMALS = 2      # ~1 km, finer than the Open-Meteo grid
+MAX_CACHE_ENTRIES = 10000
+
+
+class WeatherUpstreamError(Exception):
+    """Open-Meteo failed and no cached (even stale) data is available"""
+
+
+@dataclass
+class CacheEntry:
+    data: Dict[str, Any]
+    fetched_at: float
+    ttl: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.fetched_at < self.ttl
+
+    def is_usable(self, now: float) -> bool:
+        return now - self.fetched_at < self.ttl + STALE_TTL
+
+
+@dataclass
+class FetchResult:
+    data: Dict[str, Any]
+    stale: bool = False
+    cached: bool = False
+
+
+class AsyncWeatherClient:
+    """
+    Non-blocking Open-Meteo client.
+
+    Example:
+    --------
+    >>> client = AsyncWeatherClient()
+    >>> weather = await client.current(-6.2, 106.8)
+    >>> daily = await client.daily(-6.2, 106.8, days=7)
+    >>> await client.aclose()
+    """
+
+    def __init__(self, forecast_url: str = FORECAST_URL, timeout: float = 10.0,
+                 stale_after: float = 2.0, max_connections: int = 100,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.forecast_url = forecast_url
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.transport = transport
+        self.clock = clock
+
+        self._cache: 'OrderedDict[Tuple, CacheEntry]' = OrderedDict()
+        # Pool and in-flight futures are bound to the event loop that created them
+        self._loop = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.stats = {"upstream_calls": 0, "cache_hits": 0, "coalesced": 0, "stale_served": 0, "errors": 0}
+
+    # ========== CONNECTION POOL ==========
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            if self._http is not None:
+                self._retire(self._http, self._loop)
+            self._loop = loop
+            self._inflight = {}
+            self._http = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self.transport)
+        return self._http
+
+    def _retire(self, http: httpx.AsyncClient, old_loop):
+        """Close a pool left behind by a previous event loop instead of leaking it"""
+        if old_loop is not None and old_loop.is_running():
+            # Still alive (e.g. another thread): close it on the loop that owns it
+            asyncio.run_coroutine_threadsafe(http.aclose(), old_loop)
+            return
+        task = asyncio.ensure_future(self._close_quietly(http))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(http: httpx.AsyncClient):
+        try:
+            await http.aclose()
+        except Exception:
+            pass  # its loop is gone; sockets are released with the client
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # ========== CACHE + COALESCING ==========
+
+    @staticmethod
+    def cache_key(product: str, lat: float, lon: float, *extra) -> Tuple:
+        return (product, round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS)) + extra
+
+    async def _upstream(self, key: Tuple, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["upstream_calls"] += 1
+        try:
+            response = await self._client().get(self.forecast_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self._cache[key] = CacheEntry(data, self.clock(), PRODUCT_TTL[key[0]])
+        self._cache.move_to_end(key)
+        if len(self._cache) > MAX_CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+        return data
+
+    async def fetch(self, key: Tuple, params: Dict[str, Any]) -> FetchResult:
+        """Raw Open-Meteo JSON for `key` (cached, coalesced, stale-on-error)"""
+        now = self.clock()
+        entry = self._cache.get(key)
+        if entry is not None and entry.is_fresh(now):
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return FetchResult(entry.data, cached=True)
+
+        self._client()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._upstream(key, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        else:
+            self.stats["coalesced"] += 1
+
+        stale = entry if entry is not None and entry.is_usable(now) else None
+        try:
+            if stale is None:
+                return FetchResult(await asyncio.shield(task))
+            # Slow upstream: answer from the stale entry, the refresh continues
+            return FetchResult(await asyncio.wait_for(asyncio.shield(task), self.stale_after))
+        except Exception as e:
+            if stale is not None:
+                self.stats["stale_served"] += 1
+                return FetchResult(stale.data, stale=True, cached=True)
+            raise WeatherUpstreamError(f"Open-Meteo request failed: {e!r}") from e
+
+    def _finish(self, key: Tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: errors are reported to the awaiting callers
+
+    def clear(self):
+        self._cache.clear()
+
+    # ========== PRODUCTS ==========
+
+    async def current(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        key = self.cache_key("current", lat, lon)
+        result = await self.fetch(key, current_params(key[1], key[2]))
+        return parse_current(result.data)
+
+    async def daily(self, lat: float, lon: float, days: int = 7):
+        key = self.cache_key("daily", lat, lon, days)
+        result = await self.fetch(key, daily_params(key[1], key[2], days))
+        return parse_daily(result.data)
+
+    async def hourly(self, lat: float, lon: float, hours: int = 48):
+        forecast_days = hourly_forecast_days(hours)
+        key = self.cache_key("hourly", lat, lon, forecast_days)
+        result = await self.fetch(key, hourly_params(key[1], key[2], forecast_days))
+        return parse_hourly(result.data, hours)
@@ -0,0 +1,395 @@
+"""
+Temperature Forecasting Service
+Per-location model registry with background (re)training
+
+- Models from utils.ml_forecasting are trained per location in a background
+  thread, never inside a request
+- Each training run backtests every model on the last BACKTEST_DAYS of
+  history (MAPE), then refits on the full history and stores the fitted
+  forecast for the whole horizon in an on-disk registry (joblib)
+- Requests are answered from the registry in milliseconds; the ensemble
+  weights every model by its inverse backtest MAPE
+- Models are fitted past the archive lag, so a fresh record covers
+  MAX_HORIZON days from today; records older than `max_age`, or that no
+  longer cover MAX_HORIZON future days, are retrained on a schedule
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.ml_forecasting import (
+    calculate_mape,
+    ensemble_forecast,
+    train_arima,
+    train_lstm,
+    train_prophet,
+    train_xgboost,
+)
+from utils.weather_api import get_historical_weather
+
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "registry"))
+TARGET = "temperature_2m_mean"
+MAX_HORIZON = 14          # future days served per request
+BACKTEST_DAYS = 7
+HISTORY_DAYS = 365
+ARCHIVE_LAG_DAYS = 5      # Open-Meteo archive lags a few days behind today
+MAX_STALE_DAYS = 2        # days a record keeps covering MAX_HORIZON after training
+# Days fitted past history_end: the archive lag plus MAX_HORIZON plus slack for ageing
+TRAIN_HORIZON = ARCHIVE_LAG_DAYS + MAX_HORIZON + MAX_STALE_DAYS
+LOCK_TIMEOUT = 3600       # a training lock older than this is considered dead
+
+# name -> trainer(history_df, horizon) returning the ml_forecasting result dict (or None)
+DEFAULT_TRAINERS: Dict[str, Callable[[pd.DataFrame, int], Optional[dict]]] = {
+    "arima": lambda df, horizon: train_arima(df[TARGET].values, horizon),
+    "prophet": lambda df, horizon: train_prophet(df, horizon),
+    "lstm": lambda df, horizon: train_lstm(df[TARGET].values, horizon),
+    "xgboost": lambda df, horizon: train_xgboost(df, horizon),
+}
+
+
+def location_key(lat: float, lon: float) -> str:
+    """Registry key: coordinates rounded to 0.1° (~11 km, the model grid scale)"""
+    return f"{round(float(lat), 1):+.1f}_{round(float(lon), 1):+.1f}"
+
+
+def fetch_history(lat: float, lon: float, days: int = HISTORY_DAYS) -> Optional[pd.DataFrame]:
+    """Daily history ending at the latest archived day, with a `date` column"""
+    end = datetime.utcnow().date() - timedelta(days=ARCHIVE_LAG_DAYS)
+    start = end - timedelta(days=days)
+    df = get_historical_weather(lat, lon, start.isoformat(), end.isoformat())
+    if df is None or TARGET not in df.columns:
+        return None
+    df = df.dropna(subset=[TARGET]).reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["time"])
+    return df
+
+
+@dataclass
+class ModelFit:
+    forecast: np.ndarray
+    lower_bound: np.ndarray
+    upper_bound: np.ndarray
+    backtest_mape: Optional[float]
+    training_seconds: float
+
+
+@dataclass
+class LocationRecord:
+    key: str
+    latitude: float
+    longitude: float
+    trained_at: datetime
+    history_start: datetime
+    history_end: datetime
+    n_observations: int
+    training_seconds: float
+    models: Dict[str, ModelFit] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    horizon: int = MAX_HORIZON  # records trained before TRAIN_HORIZON stored 14 days
+
+    @property
+    def forecast_dates(self) -> List[datetime]:
+        return [self.history_end + timedelta(days=i + 1) for i in range(self.horizon)]
+
+    def first_future_index(self, today=None) -> int:
+        """Index of the first forecast date that is not in the past"""
+        today = today or datetime.utcnow().date()
+        return next((i for i, d in enumerate(self.forecast_dates) if d.date() >= today), self.horizon)
+
+    def days_covered(self, today=None) -> int:
+        """Future days (from today) this record can still serve"""
+        return self.horizon - self.first_future_index(today)
+
+    def is_stale(self, max_age_hours: float) -> bool:
+        return self.age_hours() > max_age_hours or self.days_covered() < MAX_HORIZON
+
+    def age_hours(self, now: Optional[datetime] = None) -> float:
+        return ((now or datetime.utcnow()) - self.trained_at).total_seconds() / 3600
+
+    def ensemble_weights(self) -> Dict[str, float]:
+        """Inverse-MAPE weights (equal weights if no model has a backtest)"""
+        scores = {name: fit.backtest_mape for name, fit in self.models.items()}
+        if not scores:
+            return {}
+        if any(v is None or not np.isfinite(v) or v <= 0 for v in scores.values()):
+            return {name: 1 / len(scores) for name in scores}
+        inverse = {name: 1 / mape for name, mape in scores.items()}
+        total = sum(inverse.values())
+        return {name: w / total for name, w in inverse.items()}
+
+    def ensemble(self) -> Optional[dict]:
+        weights = self.ensemble_weights()
+        if not weights:
+            return None
+        names = list(weights)
+        combine = lambda attr: ensemble_forecast([getattr(self.models[n], attr) for n in names],
+                                                 [weights[n] for n in names])
+        return {"forecast": combine("forecast"), "lower_bound": combine("lower_bound"),
+                "upper_bound": combine("upper_bound"), "weights": weights}
+
+    def status(self, max_age_hours: float) -> dict:
+        age = self.age_hours()
+        return {
+            "location_key": self.key,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "trained_at": self.trained_at.isoformat(),
+            "age_hours": round(age, 2),
+            "stale": self.is_stale(max_age_hours),
+            "history_end": self.history_end.date().isoformat(),
+            "days_covered": self.days_covered(),
+            "n_observations": self.n_observations,
+            "training_seconds": round(self.training_seconds, 2),
+            "models": {name: {"backtest_mape": None if fit.backtest_mape is None else round(fit.backtest_mape, 3),
+                              "training_seconds": round(fit.training_seconds, 2)}
+                       for name, fit in self.models.items()},
+            "ensemble_weights": {name: round(w, 4) for name, w in self.ensemble_weights().items()},
+            "errors": self.errors,
+        }
+
+
+class ModelRegistry:
+    """On-disk store of LocationRecords (one joblib file per location)"""
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+        self._loaded: Dict[str, tuple] = {}  # key -> (mtime, record)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def save(self, record: LocationRecord):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(record.key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(record, tmp)
+        os.replace(tmp, path)  # atomic: readers never see a half-written file
+        self._loaded[record.key] = (os.path.getmtime(path), record)
+
+    def get(self, key: str) -> Optional[LocationRecord]:
+        """Record for a location; reloaded only when another worker rewrote the file"""
+        path = self._path(key)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._loaded.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        record = joblib.load(path)
+        self._loaded[key] = (mtime, record)
+        return record
+
+    def keys(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-len(".joblib")] for name in os.listdir(self.root) if name.endswith(".joblib"))
+
+    def records(self) -> List[LocationRecord]:
+        return [r for r in (self.get(k) for k in self.keys()) if r is not None]
+
+    # Cross-process training lock (several API workers share the registry)
+    def try_lock(self, key: str) -> bool:
+        os.makedirs(self.root, exist_ok=True)
+        lock = self._path(key) + ".lock"
+        try:
+            if time.time() - os.path.getmtime(lock) > LOCK_TIMEOUT:
+                os.remove(lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def unlock(self, key: str):
+        try:
+            os.remove(self._path(key) + ".lock")
+        except OSError:
+            pass
+
+
+def train_location(lat: float, lon: float, history: pd.DataFrame,
+                   trainers: Dict[str, Callable] = None) -> LocationRecord:
+    """Backtest + full fit of every model for one location"""
+    trainers = trainers or DEFAULT_TRAINERS
+    started = time.perf_counter()
+    train, holdout = history.iloc[:-BACKTEST_DAYS], history[TARGET].values[-BACKTEST_DAYS:]
+    models, errors = {}, {}
+
+    for name, trainer in trainers.items():
+        model_start = time.perf_counter()
+        try:
+            backtest = trainer(train.reset_index(drop=True), BACKTEST_DAYS)
+            mape = (float(calculate_mape(holdout, np.asarray(backtest["forecast"])[:BACKTEST_DAYS]))
+                    if backtest is not None else None)
+            fit = trainer(history, TRAIN_HORIZON)
+        except Exception as e:
+            fit, errors[name] = None, str(e)
+        if fit is None:
+            errors.setdefault(name, "training failed")
+            continue
+        models[name] = ModelFit(
+            forecast=np.asarray(fit["forecast"], dtype=float),
+            lower_bound=np.asarray(fit["lower_bound"], dtype=float),
+            upper_bound=np.asarray(fit["upper_bound"], dtype=float),
+            backtest_mape=mape,
+            training_seconds=time.perf_counter() - model_start,
+        )
+
+    return LocationRecord(
+        key=location_key(lat, lon), latitude=float(lat), longitude=float(lon),
+        trained_at=datetime.utcnow(),
+        history_start=history["date"].iloc[0].to_pydatetime(),
+        history_end=history["date"].iloc[-1].to_pydatetime(),
+        n_observations=len(history),
+        training_seconds=time.perf_counter() - started,
+        models=models, errors=errors, horizon=TRAIN_HORIZON,
+    )
+
+
+class ForecastService:
+    """
+    Serves forecasts from the registry and trains locations in the background.
+
+    Example:
+    --------
+    >>> service = ForecastService()
+    >>> service.request_training(-6.2, 106.8)      # queued, returns immediately
+    >>> service.forecast(-6.2, 106.8, days=7)      # None until trained, then from disk
+    """
+
+    def __init__(self, registry: ModelRegistry = None, trainers: Dict[str, Callable] = None,
+                 history_fn: Callable = fetch_history, max_age_hours: float = 24.0,
+                 check_interval: float = 900.0):
+        self.registry = registry or ModelRegistry()
+        self.trainers = trainers or DEFAULT_TRAINERS
+        self.history_fn = history_fn
+        self.max_age_hours = max_age_hours
+        self.check_interval = check_interval
+
+        self._pending: Dict[str, tuple] = {}
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_error: Dict[str, str] = {}
+
+    # ========== SERVING ==========
+
+    def forecast(self, lat: float, lon: float, days: int = 7, model: str = "ensemble") -> Optional[dict]:
+        """
+        Forecast for the next `days` days, or None when the location has no
+        record or its record no longer covers `days` future days (retrain it).
+        """
+        record = self.registry.get(location_key(lat, lon))
+        if record is None:
+            return None
+
+        if model == "ensemble":
+            fit = record.ensemble()
+            weights = fit["weights"] if fit else {}
+        else:
+            fit = record.models.get(model)
+            fit = fit and {"forecast": fit.forecast, "lower_bound": fit.lower_bound, "upper_bound": fit.upper_bound}
+            weights = None
+        if fit is None:
+            return None
+
+        # Forecast starts the day after the last archived observation; skip days already past
+        offset = record.first_future_index()
+        if offset + days > record.horizon:
+            return None  # never answer with fewer days than requested
+        dates = record.forecast_dates
+        window = slice(offset, offset + days)
+        return {
+            "model": model,
+            "dates": [d.date().isoformat() for d in dates[window]],
+            "forecast": np.round(fit["forecast"][window], 2).tolist(),
+            "lower_bound": np.round(fit["lower_bound"][window], 2).tolist(),
+            "upper_bound": np.round(fit["upper_bound"][window], 2).tolist(),
+            "weights": weights,
+            "model_status": record.status(self.max_age_hours),
+        }
+
+    def status(self) -> List[dict]:
+        return [record.status(self.max_age_hours) for record in self.registry.records()]
+
+    def is_pending(self, lat: float, lon: float) -> bool:
+        return location_key(lat, lon) in self._pending
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # ========== TRAINING ==========
+
+    def request_training(self, lat: float, lon: float):
+        """Queue a location for background training (no-op if already queued)"""
+        with self._condition:
+            self._pending.setdefault(location_key(lat, lon), (float(lat), float(lon)))
+            self._condition.notify()
+        self.start()
+
+    def train_now(self, lat: float, lon: float) -> Optional[LocationRecord]:
+        """Train one location synchronously (used by the worker and the CLI)"""
+        key = location_key(lat, lon)
+        if not self.registry.try_lock(key):
+            return None  # another worker is already training it
+        try:
+            history = self.history_fn(lat, lon)
+            if history is None or len(history) <= BACKTEST_DAYS + 30:
+                self.last_error[key] = "insufficient history"
+                return None
+            record = train_location(lat, lon, history, self.trainers)
+            if record.models:
+                self.registry.save(record)
+                self.last_error.pop(key, None)
+            else:
+                self.last_error[key] = "; ".join(f"{n}: {e}" for n, e in record.errors.items())
+            return record
+        finally:
+            self.registry.unlock(key)
+
+    def _stale_locations(self) -> List[tuple]:
+        return [(r.latitude, r.longitude) for r in self.registry.records() if r.is_stale(self.max_age_hours)]
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._condition:
+                if not self._pending:
+                    self._condition.wait(self.check_interval)
+                jobs = list(self._pending.items())
+            jobs += [(location_key(*loc), loc) for loc in self._stale_locations()
+                     if location_key(*loc) not in dict(jobs)]
+
+            for key, (lat, lon) in jobs:
+                if self._stop.is_set():
+                    break
+                try:
+                    self.train_now(lat, lon)
+                except Exception as e:
+                    self.last_error[key] = str(e)
+                finally:
+                    with self._condition:
+                        self._pending.pop(key, None)
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="forecast-trainer", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
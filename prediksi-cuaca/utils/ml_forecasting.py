@@ -192,82 +192,226 @@ def train_lstm(data, forecast_days=7, lookback=30):
         return None
 
 # XGBoost Model
-def train_xgboost(df, forecast_days=7):
-    """Train XGBoost model"""
-    try:
-        from xgboost import XGBRegressor
-        from sklearn.preprocessing import StandardScaler
-        
-        # Feature engineering
-        df = create_time_features(df)
-        df = create_lag_features(df, 'temperature_2m_mean', lags=[1, 2, 3, 7])
-        df = create_rolling_features(df, 'temperature_2m_mean', windows=[7, 14])
-        
-        # Drop NaN
-        df = df.dropna()
-        
-        # Prepare features
-        feature_cols = [col for col in df.columns if col not in ['date', 'temperature_2m_mean', 'time']]
-        X = df[feature_cols]
-        y = df['temperature_2m_mean']
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # Train model
-        model = XGBRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=5,
-            random_state=42
-        )
-        model.fit(X_scaled, y)
-        
-        # Create future features
-        last_date = df['date'].max()
-        future_dates = [last_date + timedelta(days=i+1) for i in range(forecast_days)]
-        
-        forecasts = []
-        for future_date in future_dates:
-            # Create features for future date
-            future_row = {
-                'day_of_week': future_date.dayofweek,
-                'day_of_month': future_date.day,
-                'month': future_date.month,
-                'quarter': (future_date.month - 1) // 3 + 1,
-                'is_weekend': 1 if future_date.dayofweek >= 5 else 0
-            }
-            
-            # Add lag features (use last known values and predictions)
-            recent_temps = list(df['temperature_2m_mean'].tail(7).values) + forecasts
-            for lag in [1, 2, 3, 7]:
-                if len(recent_temps) >= lag:
-                    future_row[f'temperature_2m_mean_lag_{lag}'] = recent_temps[-lag]
-                else:
-                    future_row[f'temperature_2m_mean_lag_{lag}'] = df['temperature_2m_mean'].mean()
-            
-            # Add rolling features (approximate)
-            for window in [7, 14]:
-                future_row[f'temperature_2m_mean_rolling_mean_{window}'] = df['temperature_2m_mean'].tail(window).mean()
-                future_row[f'temperature_2m_mean_rolling_std_{window}'] = df['temperature_2m_mean'].tail(window).std()
-            
-            # Predict
-            X_future = pd.DataFrame([future_row])[feature_cols]
-            X_future_scaled = scaler.transform(X_future)
-            pred = model.predict(X_future_scaled)[0]
-            forecasts.append(pred)
-        
-        # Estimate confidence intervals
-        std = np.std(y[-30:])
-        
-        return {
-            'forecast': np.array(forecasts),
-            'lower_bound': np.array(forecasts) - std,
-            'upper_bound': np.array(forecasts) + std,
+XGB_TARGET = 'temperature_2m_mean'
+XGB_LAGS = [1, 2, 3, 7]
+XGB_WINDOWS = [7, 14]
+XGB_PARAMS = dict(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=42)
+
+
+def _xgb_regressor():
+    from xgboost import XGBRegressor
+    return XGBRegressor(tree_method='hist', **XGB_PARAMS)
+
+
+def _history_features(values):
+    """
+    Lag/rolling features known at every origin t (values up to and including t):
+    lag_k = y[t-k+1], rolling stats over y[t-w+1..t]. Rows without full history are NaN.
+    """
+    s = pd.Series(values, dtype=float)
+    cols = [s.shift(k - 1) for k in XGB_LAGS]
+    for window in XGB_WINDOWS:
+        rolling = s.rolling(window)
+        cols += [rolling.mean(), rolling.std()]
+    return np.column_stack(cols)
+
+
+def _history_feature_names():
+    names = [f'{XGB_TARGET}_lag_{k}' for k in XGB_LAGS]
+    for window in XGB_WINDOWS:
+        names += [f'{XGB_TARGET}_rolling_mean_{window}', f'{XGB_TARGET}_rolling_std_{window}']
+    return names
+
+
+def _calendar_features(dates):
+    dates = pd.DatetimeIndex(dates)
+    angle = 2 * np.pi * dates.dayofyear.values / 365.25
+    return np.column_stack([np.sin(angle), np.cos(angle), dates.month.values, dates.dayofweek.values])
+
+
+def _seasonal_basis(dates, harmonics):
+    angle = 2 * np.pi * pd.DatetimeIndex(dates).dayofyear.values / 365.25
+    cols = [np.ones(len(angle))]
+    for k in range(1, harmonics + 1):
+        cols += [np.sin(k * angle), np.cos(k * angle)]
+    return np.column_stack(cols)
+
+
+def _climatology(values, dates):
+    """Least-squares annual cycle of one series (2 harmonics with >= 1 year of history)"""
+    harmonics = 2 if len(values) >= 365 else (1 if len(values) >= 120 else 0)
+    coef, *_ = np.linalg.lstsq(_seasonal_basis(dates, harmonics), values, rcond=None)
+    return lambda target_dates: _seasonal_basis(target_dates, harmonics) @ coef
+
+
+def _direct_rows(values, dates, horizon, origins, climate):
+    """
+    Stacked direct-horizon design: one row per (origin, h) with h = 1..horizon.
+    Level-relative features (lags/rolling means minus the 14-day mean) and the
+    series' own climatology let one model serve every city and every horizon.
+    """
+    hist = _history_features(values)[origins]
+    mean_cols = [len(XGB_LAGS) + 2 * i for i in range(len(XGB_WINDOWS))]
+    level = hist[:, mean_cols[-1]]  # longest rolling mean
+    relative = hist.copy()
+    relative[:, :len(XGB_LAGS)] -= level[:, None]
+    relative[:, mean_cols] -= level[:, None]
+
+    steps = np.tile(np.arange(1, horizon + 1), len(origins))
+    origin_idx = np.repeat(np.arange(len(origins)), horizon)
+    target_dates = pd.DatetimeIndex(dates[origins]).repeat(horizon) + pd.to_timedelta(steps, unit='D')
+    level_rows = level[origin_idx]
+    X = np.column_stack([
+        relative[origin_idx],
+        level_rows,
+        (level - climate(dates[origins]))[origin_idx],  # anomaly at the origin
+        climate(target_dates) - level_rows,             # where climatology pulls the target
+        steps,
+        _calendar_features(target_dates),
+    ])
+    return X, level_rows, steps, origins[origin_idx]
+
+
+DIRECT_FEATURES = _history_feature_names() + ['level', 'anomaly', 'climatology_delta', 'horizon', 'doy_sin', 'doy_cos', 'month', 'day_of_week']
+
+
+def train_xgboost_batch(frames, forecast_days=7, calibration_fraction=0.2, max_rows=100_000):
+    """
+    Direct multi-horizon XGBoost for many series at once.
+
+    One global model is fitted on (origin, horizon) rows of every series and all
+    horizons of all series are predicted in a single `predict` call - no
+    per-day loop, no frozen rolling window.
+
+    Args:
+        frames: {name: DataFrame with 'date' and 'temperature_2m_mean'}
+        forecast_days: Horizon (days)
+        calibration_fraction: Share of latest origins held out to size the intervals
+        max_rows: Training rows kept (random sample) - neighbouring origins are
+            nearly duplicates, so long horizons x many cities need not all be fitted
+
+    Returns:
+        {name: {'forecast', 'lower_bound', 'upper_bound', 'dates', 'model', 'feature_importance'}}
+    """
+    warmup = max(max(XGB_LAGS), max(XGB_WINDOWS)) - 1
+    series = {}
+    X_all, y_all, h_all, calibration = [], [], [], []
+    for name, df in frames.items():
+        df = df.dropna(subset=[XGB_TARGET]).sort_values('date')
+        values = df[XGB_TARGET].to_numpy(dtype=float)
+        dates = pd.DatetimeIndex(df['date']).to_numpy()
+        climate = _climatology(values, dates)
+        series[name] = (values, dates, climate)
+
+        origins = np.arange(warmup, len(values) - 1)
+        if len(origins) == 0:
+            continue
+        X, level, steps, origin = _direct_rows(values, dates, forecast_days, origins, climate)
+        seen = origin + steps < len(values)
+        cutoff = warmup + int((len(values) - warmup) * (1 - calibration_fraction))
+        X_all.append(X[seen])
+        y_all.append(values[(origin + steps)[seen]] - level[seen])
+        h_all.append(steps[seen])
+        # Calibration rows: origins after the cutoff; their targets never enter the calibration fit
+        calibration.append(np.where(origin[seen] >= cutoff, 1, np.where((origin + steps)[seen] < cutoff, 0, -1)))
+
+    X_all = np.vstack(X_all)
+    y_all, h_all, calibration = np.concatenate(y_all), np.concatenate(h_all), np.concatenate(calibration)
+    if len(y_all) > max_rows:
+        keep = np.sort(np.random.default_rng(XGB_PARAMS['random_state']).choice(len(y_all), max_rows, replace=False))
+        X_all, y_all, h_all, calibration = X_all[keep], y_all[keep], h_all[keep], calibration[keep]
+
+    # Horizon-dependent spread from out-of-sample residuals (earlier origins -> later targets)
+    held_out = calibration == 1
+    spread = np.full(forecast_days, np.nan)
+    if held_out.any() and (calibration == 0).any():
+        probe = _xgb_regressor()
+        probe.fit(X_all[calibration == 0], y_all[calibration == 0])
+        residual = y_all[held_out] - probe.predict(X_all[held_out])
+        counts = np.bincount(h_all[held_out], minlength=forecast_days + 1)[1:]
+        sq = np.bincount(h_all[held_out], weights=residual ** 2, minlength=forecast_days + 1)[1:]
+        spread[counts > 0] = np.sqrt(sq[counts > 0] / counts[counts > 0])
+    # Long horizons without held-out targets keep the widest spread seen so far
+    spread = np.fmax.accumulate(np.nan_to_num(spread, nan=0.0))
+    if not spread.any():
+        spread[:] = np.std(y_all)
+
+    model = _xgb_regressor()
+    model.fit(X_all, y_all)
+
+    # All series x all horizons in one call
+    names = [name for name, (values, _, _) in series.items() if len(values) > warmup + 1]
+    X_future, levels = [], []
+    for name in names:
+        values, dates, climate = series[name]
+        X, level, _, _ = _direct_rows(values, dates, forecast_days, np.array([len(values) - 1]), climate)
+        X_future.append(X)
+        levels.append(level)
+    predictions = (model.predict(np.vstack(X_future)) + np.concatenate(levels)).reshape(len(names), forecast_days)
+
+    importance = dict(zip(DIRECT_FEATURES, model.feature_importances_))
+    results = {}
+    for name, forecast in zip(names, predictions):
+        last_date = pd.Timestamp(series[name][1][-1])
+        results[name] = {
+            'forecast': forecast,
+            'lower_bound': forecast - spread,
+            'upper_bound': forecast + spread,
+            'dates': [last_date + timedelta(days=i + 1) for i in range(forecast_days)],
             'model': model,
-            'feature_importance': dict(zip(feature_cols, model.feature_importances_))
+            'feature_importance': importance,
         }
+    return results
+
+
+def _train_xgboost_recursive(df, forecast_days):
+    """One-step model rolled forward day by day; lag/rolling features are recomputed on the forecast path"""
+    df = df.dropna(subset=[XGB_TARGET]).sort_values('date').reset_index(drop=True)
+    values = df[XGB_TARGET].to_numpy(dtype=float)
+    dates = pd.DatetimeIndex(df['date'])
+
+    # Row t predicts y[t] from history up to t-1
+    hist = _history_features(values)
+    X = np.column_stack([hist[:-1], _calendar_features(dates[1:])])
+    y = values[1:]
+    valid = ~np.isnan(X).any(axis=1)
+    model = _xgb_regressor()
+    model.fit(X[valid], y[valid])
+
+    path = list(values[-max(max(XGB_LAGS), max(XGB_WINDOWS)):])
+    future_dates = [dates[-1] + timedelta(days=i + 1) for i in range(forecast_days)]
+    calendar = _calendar_features(future_dates)
+    forecasts = []
+    for i in range(forecast_days):
+        row = np.concatenate([_history_features(path)[-1], calendar[i]])
+        pred = float(model.predict(row[None, :])[0])
+        forecasts.append(pred)
+        path.append(pred)
+
+    std = np.std(values[-30:])
+    forecasts = np.array(forecasts)
+    return {
+        'forecast': forecasts,
+        'lower_bound': forecasts - std,
+        'upper_bound': forecasts + std,
+        'dates': future_dates,
+        'model': model,
+        'feature_importance': dict(zip(_history_feature_names() + ['doy_sin', 'doy_cos', 'month', 'day_of_week'],
+                                       model.feature_importances_)),
+    }
+
+
+def train_xgboost(df, forecast_days=7, method='direct'):
+    """
+    Train XGBoost model
+
+    method='direct' predicts every horizon in one vectorized call (see
+    train_xgboost_batch); method='recursive' feeds one-step predictions back in.
+    """
+    try:
+        if method == 'recursive':
+            return _train_xgboost_recursive(df, forecast_days)
+        return train_xgboost_batch({'series': df}, forecast_days)['series']
     except Exception as e:
         print(f"XGBoost Error: {e}")
         return None
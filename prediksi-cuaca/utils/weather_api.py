@@ -2,12 +2,13 @@
 Weather API Integration using Open-Meteo
 Free weather API with no API key required
 """
+import os
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
 
-# Open-Meteo API endpoints
-FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+# Open-Meteo API endpoints (forecast URL overridable, e.g. to point at a local fake)
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
 GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
 HISTORICAL_URL = "https://archive-api.open-meteo.com/v1/archive"
 
@@ -50,6 +51,64 @@ def search_city(city_name):
         print(f"Error searching city: {e}")
         return []
 
+def current_params(lat, lon):
+    """Open-Meteo query for current conditions (+ today's sun data)"""
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": [
+            "temperature_2m",
+            "relative_humidity_2m",
+            "apparent_temperature",
+            "precipitation",
+            "weather_code",
+            "cloud_cover",
+            "pressure_msl",
+            "surface_pressure",
+            "wind_speed_10m",
+            "wind_direction_10m",
+            "wind_gusts_10m"
+        ],
+        "daily": [
+            "sunrise",
+            "sunset",
+            "sunshine_duration"
+        ],
+        "timezone": "auto",
+        "forecast_days": 1
+    }
+
+def parse_current(data):
+    """Flatten an Open-Meteo current-conditions response (None if missing)"""
+    if "current" not in data:
+        return None
+    
+    current = data["current"]
+    daily = data.get("daily", {})
+    
+    # Get today's astronomical data
+    sunrise = daily.get("sunrise", [None])[0] if daily else None
+    sunset = daily.get("sunset", [None])[0] if daily else None
+    sunshine_duration = daily.get("sunshine_duration", [0])[0] if daily else 0
+    
+    return {
+        "temperature": current.get("temperature_2m"),
+        "feels_like": current.get("apparent_temperature"),
+        "humidity": current.get("relative_humidity_2m"),
+        "precipitation": current.get("precipitation"),
+        "weather_code": current.get("weather_code"),
+        "cloud_cover": current.get("cloud_cover"),
+        "pressure": current.get("pressure_msl"),
+        "wind_speed": current.get("wind_speed_10m"),
+        "wind_direction": current.get("wind_direction_10m"),
+        "wind_gusts": current.get("wind_gusts_10m"),
+        "time": current.get("time"),
+        "timezone": data.get("timezone", "UTC"),
+        "sunrise": sunrise,
+        "sunset": sunset,
+        "sunshine_duration": sunshine_duration
+    }
+
 def get_current_weather(lat, lon):
     """
     Get current weather for a location
@@ -62,66 +121,45 @@ def get_current_weather(lat, lon):
         Dictionary with current weather data
     """
     try:
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "current": [
-                "temperature_2m",
-                "relative_humidity_2m",
-                "apparent_temperature",
-                "precipitation",
-                "weather_code",
-                "cloud_cover",
-                "pressure_msl",
-                "surface_pressure",
-                "wind_speed_10m",
-                "wind_direction_10m",
-                "wind_gusts_10m"
-            ],
-            "daily": [
-                "sunrise",
-                "sunset",
-                "sunshine_duration"
-            ],
-            "timezone": "auto",
-            "forecast_days": 1
-        }
-        
-        response = requests.get(FORECAST_URL, params=params, timeout=10)
+        response = requests.get(FORECAST_URL, params=current_params(lat, lon), timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
-        if "current" in data:
-            current = data["current"]
-            daily = data.get("daily", {})
-            
-            # Get today's astronomical data
-            sunrise = daily.get("sunrise", [None])[0] if daily else None
-            sunset = daily.get("sunset", [None])[0] if daily else None
-            sunshine_duration = daily.get("sunshine_duration", [0])[0] if daily else 0
-            
-            return {
-                "temperature": current.get("temperature_2m"),
-                "feels_like": current.get("apparent_temperature"),
-                "humidity": current.get("relative_humidity_2m"),
-                "precipitation": current.get("precipitation"),
-                "weather_code": current.get("weather_code"),
-                "cloud_cover": current.get("cloud_cover"),
-                "pressure": current.get("pressure_msl"),
-                "wind_speed": current.get("wind_speed_10m"),
-                "wind_direction": current.get("wind_direction_10m"),
-                "wind_gusts": current.get("wind_gusts_10m"),
-                "time": current.get("time"),
-                "timezone": data.get("timezone", "UTC"),
-                "sunrise": sunrise,
-                "sunset": sunset,
-                "sunshine_duration": sunshine_duration
-            }
-        return None
+        return parse_current(response.json())
     except Exception as e:
         print(f"Error fetching current weather: {e}")
         return None
 
+def daily_params(lat, lon, days=7):
+    """Open-Meteo query for a daily forecast of `days` days"""
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "daily": [
+            "weather_code",
+            "temperature_2m_max",
+            "temperature_2m_min",
+            "apparent_temperature_max",
+            "apparent_temperature_min",
+            "precipitation_sum",
+            "precipitation_probability_max",
+            "wind_speed_10m_max",
+            "wind_gusts_10m_max",
+            "wind_direction_10m_dominant",
+            "sunrise",
+            "sunset",
+            "uv_index_max"
+        ],
+        "timezone": "auto",
+        "forecast_days": days
+    }
+
+def parse_daily(data):
+    """Daily block of an Open-Meteo response as a DataFrame (None if missing)"""
+    if "daily" not in data:
+        return None
+    df = pd.DataFrame(data["daily"])
+    df['time'] = pd.to_datetime(df['time'])
+    return df
+
 def get_daily_forecast(lat, lon, days=7):
     """
     Get daily weather forecast
@@ -135,41 +173,48 @@ def get_daily_forecast(lat, lon, days=7):
         DataFrame with daily forecast
     """
     try:
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "daily": [
-                "weather_code",
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "apparent_temperature_max",
-                "apparent_temperature_min",
-                "precipitation_sum",
-                "precipitation_probability_max",
-                "wind_speed_10m_max",
-                "wind_gusts_10m_max",
-                "wind_direction_10m_dominant",
-                "sunrise",
-                "sunset",
-                "uv_index_max"
-            ],
-            "timezone": "auto",
-            "forecast_days": days
-        }
-        
-        response = requests.get(FORECAST_URL, params=params, timeout=10)
+        response = requests.get(FORECAST_URL, params=daily_params(lat, lon, days), timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
-        if "daily" in data:
-            df = pd.DataFrame(data["daily"])
-            df['time'] = pd.to_datetime(df['time'])
-            return df
-        return None
+        return parse_daily(response.json())
     except Exception as e:
         print(f"Error fetching daily forecast: {e}")
         return None
 
+def hourly_forecast_days(hours):
+    """Forecast days needed to cover `hours` hours"""
+    return min(16, (hours // 24) + 1)
+
+def hourly_params(lat, lon, forecast_days):
+    """Open-Meteo query for an hourly forecast covering `forecast_days` days"""
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": [
+            "temperature_2m",
+            "relative_humidity_2m",
+            "apparent_temperature",
+            "precipitation_probability",
+            "precipitation",
+            "weather_code",
+            "cloud_cover",
+            "visibility",
+            "wind_speed_10m",
+            "wind_direction_10m",
+            "wind_gusts_10m"
+        ],
+        "timezone": "auto",
+        "forecast_days": forecast_days
+    }
+
+def parse_hourly(data, hours):
+    """First `hours` rows of the hourly block as a DataFrame (None if missing)"""
+    if "hourly" not in data:
+        return None
+    df = pd.DataFrame(data["hourly"])
+    df['time'] = pd.to_datetime(df['time'])
+    # Limit to requested hours
+    return df.head(hours)
+
 def get_hourly_forecast(lat, lon, hours=48):
     """
     Get hourly weather forecast
@@ -183,40 +228,10 @@ def get_hourly_forecast(lat, lon, hours=48):
         DataFrame with hourly forecast
     """
     try:
-        # Calculate forecast days needed
-        forecast_days = min(16, (hours // 24) + 1)
-        
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "hourly": [
-                "temperature_2m",
-                "relative_humidity_2m",
-                "apparent_temperature",
-                "precipitation_probability",
-                "precipitation",
-                "weather_code",
-                "cloud_cover",
-                "visibility",
-                "wind_speed_10m",
-                "wind_direction_10m",
-                "wind_gusts_10m"
-            ],
-            "timezone": "auto",
-            "forecast_days": forecast_days
-        }
-        
+        params = hourly_params(lat, lon, hourly_forecast_days(hours))
         response = requests.get(FORECAST_URL, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
-        if "hourly" in data:
-            df = pd.DataFrame(data["hourly"])
-            df['time'] = pd.to_datetime(df['time'])
-            # Limit to requested hours
-            df = df.head(hours)
-            return df
-        return None
+        return parse_hourly(response.json(), hours)
     except Exception as e:
         print(f"Error fetching hourly forecast: {e}")
         return None
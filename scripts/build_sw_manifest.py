@@ -0,0 +1,126 @@
+"""
+Build the service worker precache manifest.
+
+Hashes every file under static/ and every page route that renders a
+template (home + modules), then writes static/precache-manifest.js:
+
+    self.__PRECACHE_MANIFEST = {version: '<hash>', entries: [{url, revision}, ...]};
+
+sw.js imports it; a changed revision is re-downloaded on the next
+service worker install and a new version drops the old caches. Run on
+every deploy (the Dockerfile does):
+
+    python scripts/build_sw_manifest.py
+"""
+import ast
+import hashlib
+import json
+import os
+import re
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+ROUTES_DIR = os.path.join(BASE_DIR, 'app', 'routes')
+OUTPUT_FILE = os.path.join(STATIC_DIR, 'precache-manifest.js')
+
+# Not precached: the worker itself, its manifest, editor backups
+STATIC_EXCLUDE = {'sw.js', 'precache-manifest.js'}
+EXCLUDE_SUFFIXES = ('.backup', '.map', '.DS_Store')
+PAGE_EXCLUDE = {'/test'}
+
+BLUEPRINT_RE = re.compile(r"register_blueprint\((\w+)(?:,\s*url_prefix='([^']*)')?\)")
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def static_entries():
+    entries = []
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in sorted(files):
+            if name in STATIC_EXCLUDE or name.endswith(EXCLUDE_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            url = '/static/' + os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+            entries.append({'url': url, 'revision': file_hash(path)})
+    return entries
+
+
+def blueprint_prefixes():
+    with open(os.path.join(BASE_DIR, 'app', '__init__.py'), encoding='utf-8') as f:
+        return {name: (prefix or '').rstrip('/') for name, prefix in BLUEPRINT_RE.findall(f.read())}
+
+
+def _route_decorators(func):
+    """(blueprint, path, methods) for every @<bp>.route(...) on a view."""
+    for decorator in func.decorator_list:
+        if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                and decorator.func.attr == 'route' and isinstance(decorator.func.value, ast.Name)
+                and decorator.args and isinstance(decorator.args[0], ast.Constant)):
+            continue
+        methods = ['GET']
+        for keyword in decorator.keywords:
+            if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple)):
+                methods = [elt.value for elt in keyword.value.elts if isinstance(elt, ast.Constant)]
+        yield decorator.func.value.id, decorator.args[0].value, methods
+
+
+def _rendered_template(func):
+    for node in ast.walk(func):
+        if (isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'render_template'
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            return node.args[0].value
+    return None
+
+
+def page_routes():
+    """url -> template for parameterless GET routes whose view renders a template."""
+    prefixes = blueprint_prefixes()
+    pages = {}
+    for name in sorted(os.listdir(ROUTES_DIR)):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(ROUTES_DIR, name), encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+
+        for func in tree.body:
+            if not isinstance(func, ast.FunctionDef):
+                continue
+            template = _rendered_template(func)
+            if template is None:
+                continue
+            for blueprint, path, methods in _route_decorators(func):
+                if 'GET' in methods and '<' not in path and blueprint in prefixes:
+                    pages.setdefault(prefixes[blueprint] + path or '/', template)
+    return pages
+
+
+def page_entries():
+    """One entry per template (aliases like /home are cached at runtime instead)."""
+    entries, seen = [], set()
+    for url, template in sorted(page_routes().items()):
+        path = os.path.join(TEMPLATES_DIR, template)
+        if url in PAGE_EXCLUDE or template in seen or not os.path.exists(path):
+            continue
+        seen.add(template)
+        entries.append({'url': url, 'revision': file_hash(path)})
+    return entries
+
+
+def build():
+    entries = static_entries() + page_entries()
+    version = hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    manifest = {'version': version, 'entries': entries}
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        f.write('// Generated by scripts/build_sw_manifest.py - do not edit\n')
+        f.write(f'self.__PRECACHE_MANIFEST = {json.dumps(manifest, indent=2)};\n')
+    return manifest
+
+
+if __name__ == '__main__':
+    manifest = build()
+    print(f"✅ Precache manifest {manifest['version']}: {len(manifest['entries'])} entries -> {OUTPUT_FILE}")
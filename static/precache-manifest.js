@@ -0,0 +1,178 @@
+// Generated by scripts/build_sw_manifest.py - do not edit
+self.__PRECACHE_MANIFEST = {
+  "version": "7f9ae9c17054",
+  "entries": [
+    {
+      "url": "/static/manifest.json",
+      "revision": "a5b051e77fa6f68b"
+    },
+    {
+      "url": "/static/css/dashboard.css",
+      "revision": "0fb35de30575ab76"
+    },
+    {
+      "url": "/static/css/main.css",
+      "revision": "0fb35de30575ab76"
+    },
+    {
+      "url": "/static/js/pages/analisis_tren_harga.js",
+      "revision": "cf64ab50c16daac7"
+    },
+    {
+      "url": "/static/js/pages/dasbor_rekomendasi_terpadu.js",
+      "revision": "5e1088a6ff539104"
+    },
+    {
+      "url": "/",
+      "revision": "654edbf28c77332e"
+    },
+    {
+      "url": "/coming-soon",
+      "revision": "e949e53502fa2f5e"
+    },
+    {
+      "url": "/fruit-guide",
+      "revision": "ed2bf3db60b50727"
+    },
+    {
+      "url": "/modules/agrishop",
+      "revision": "d0144120c640d8d9"
+    },
+    {
+      "url": "/modules/analis-risiko-keberhasilan-ai",
+      "revision": "8bc2049684c45b6a"
+    },
+    {
+      "url": "/modules/analisis-npk-manual",
+      "revision": "4d2ba52adff6572f"
+    },
+    {
+      "url": "/modules/analisis-tren-harga",
+      "revision": "382911f58fff73ff"
+    },
+    {
+      "url": "/modules/asisten-agronomi",
+      "revision": "f9cc749e1ca19958"
+    },
+    {
+      "url": "/modules/asisten_penelitian",
+      "revision": "2ede97c6e0aa1166"
+    },
+    {
+      "url": "/modules/basis-pengetahuan-budidaya",
+      "revision": "e52b5e49eb8b1988"
+    },
+    {
+      "url": "/modules/bwd-analysis",
+      "revision": "ab7a8618d5fd6ca5"
+    },
+    {
+      "url": "/modules/chatbot",
+      "revision": "6af26b3ec3b5babb"
+    },
+    {
+      "url": "/modules/crop-rec",
+      "revision": "dbe76c84ffab7e8f"
+    },
+    {
+      "url": "/modules/dasbor-rekomendasi-terpadu",
+      "revision": "eebecfdb4162c722"
+    },
+    {
+      "url": "/modules/diagnostik-gejala-cerdas",
+      "revision": "fed9f49bc8cda010"
+    },
+    {
+      "url": "/modules/dokter-tanaman",
+      "revision": "1580cd1463e99954"
+    },
+    {
+      "url": "/modules/dokter-tanaman-asisten-agronomi",
+      "revision": "f11eb4aff4d8a7f6"
+    },
+    {
+      "url": "/modules/dokter-tanaman-canggih-roboflow-ai",
+      "revision": "f742193780756598"
+    },
+    {
+      "url": "/modules/ensiklopedia-komoditas-cerdas",
+      "revision": "dd7e321e4a66bbb1"
+    },
+    {
+      "url": "/modules/fertilizer-rec",
+      "revision": "0a68f98425629149"
+    },
+    {
+      "url": "/modules/harvest-database",
+      "revision": "4ece3d0d7ab17e4d"
+    },
+    {
+      "url": "/modules/intelijen-harga-pasar",
+      "revision": "07b6829bc86139e1"
+    },
+    {
+      "url": "/modules/intelijen-prediktif-xai",
+      "revision": "1abffa0f7b57af19"
+    },
+    {
+      "url": "/modules/kalkulator-konversi-pupuk",
+      "revision": "9762de5460245740"
+    },
+    {
+      "url": "/modules/kalkulator-pupuk-holistik",
+      "revision": "ece28a37afff4970"
+    },
+    {
+      "url": "/modules/katalog-pupuk",
+      "revision": "f31d62de7c13eb5f"
+    },
+    {
+      "url": "/modules/perencana-hasil-panen-ai",
+      "revision": "137c66c718cbc4c6"
+    },
+    {
+      "url": "/modules/pest-guide",
+      "revision": "cc1dbe2743bd27e4"
+    },
+    {
+      "url": "/modules/pesticide-knowledge",
+      "revision": "ecd41540f55f2447"
+    },
+    {
+      "url": "/modules/pestisida-nabati",
+      "revision": "6b14b9e2401e493d"
+    },
+    {
+      "url": "/modules/peta-data-tanah",
+      "revision": "a97cba677cc7038e"
+    },
+    {
+      "url": "/modules/prediksi-hasil-panen-cerdas",
+      "revision": "c4085756cd09fe60"
+    },
+    {
+      "url": "/modules/price-intel",
+      "revision": "07b6829bc86139e1"
+    },
+    {
+      "url": "/modules/pusat-pengetahuan-pertanian",
+      "revision": "ddeb7a197dc86372"
+    },
+    {
+      "url": "/modules/pusat-pengetahuan-ph-tanah",
+      "revision": "0dd56e3afd898123"
+    },
+    {
+      "url": "/modules/pustaka-dokumen",
+      "revision": "541841a5addd96bf"
+    },
+    {
+      "url": "/modules/rekomendasi-tanaman-cerdas-agrimap-ai",
+      "revision": "e07ac5fc3291f667"
+    },
+    {
+      "url": "/modules/strategi-penyemprotan-cerdas",
+      "revision": "f25dba56e81560bd"
+    }
+  ]
+};
@@ -1,31 +1,248 @@
 // Service Worker for AgriSensa PWA
-const CACHE_NAME = 'agrisensa-v1';
-const urlsToCache = [
-    '/',
-    '/static/manifest.json',
-    '/static/icons/icon-512x512.png'
+// Precache list + version come from scripts/build_sw_manifest.py (run per deploy)
+importScripts('/precache-manifest.js');
+
+const MANIFEST = self.__PRECACHE_MANIFEST || { version: 'dev', entries: [] };
+const VERSION = MANIFEST.version;
+const PRECACHE = `agrisensa-precache-${VERSION}`;
+const RUNTIME_PAGES = `agrisensa-pages-${VERSION}`;
+const RUNTIME_API = 'agrisensa-api-v1';
+const REVISION_HEADER = 'X-Precache-Revision';
+
+const SYNC_TAG = 'agrisensa-submissions';
+const QUEUE_DB = 'agrisensa-sync';
+const QUEUE_STORE = 'requests';
+const NAVIGATION_TIMEOUT_MS = 4000;
+const API_MAX_ENTRIES = 200;
+
+// JSON that is fine to show slightly stale while refreshing in the background
+const STALE_WHILE_REVALIDATE = [
+    /^\/api\/knowledge\//,
+    /^\/api\/market\/ticker/,
+    /^\/api\/weather\//,
+    /^\/api\/pesticide\//,
+    /^\/api\/natural-pesticide\//,
+    /^\/get-(knowledge|commodity-guide|ph-info|diagnostic-tree|pest-list|fruit-list|commodity-list|ticker-prices)/,
+    /^\/commodities$/
+];
+
+// Writes that are queued while offline and replayed by background sync
+const QUEUEABLE_WRITES = [
+    /^\/api\/analysis\/npk$/,
+    /^\/api\/agrimap\/npk-data$/,
+    /^\/api\/harvest\/records$/
 ];
 
+const matches = (patterns, path) => patterns.some(pattern => pattern.test(path));
+
+// ==================== INSTALL / ACTIVATE ====================
+
 self.addEventListener('install', event => {
-    // Perform install steps
-    event.waitUntil(
-        caches.open(CACHE_NAME)
-            .then(cache => {
-                console.log('Opened cache');
-                return cache.addAll(urlsToCache);
-            })
-    );
+    event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const keep = [PRECACHE, RUNTIME_PAGES, RUNTIME_API];
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith('agrisensa-') && !keep.includes(name))
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+        await replayQueue().catch(() => undefined);
+    })());
 });
 
+async function precache() {
+    const cache = await caches.open(PRECACHE);
+    const previous = (await caches.keys()).filter(name => name.startsWith('agrisensa-precache-') && name !== PRECACHE);
+
+    await Promise.all(MANIFEST.entries.map(async ({ url, revision }) => {
+        // Unchanged revision from the previous deploy: copy instead of downloading again
+        for (const name of previous) {
+            const old = await (await caches.open(name)).match(url);
+            if (old && old.headers.get(REVISION_HEADER) === revision) {
+                return cache.put(url, old);
+            }
+        }
+        // A single broken page must not block the release: skip it, it is cached at runtime later
+        try {
+            const response = await fetch(new Request(url, { cache: 'reload', credentials: 'same-origin' }));
+            if (response.ok) {
+                return cache.put(url, await withRevision(response, revision));
+            }
+            console.warn(`Precache skipped ${url}: ${response.status}`);
+        } catch (err) {
+            console.warn(`Precache skipped ${url}: ${err.message}`);
+        }
+    }));
+}
+
+async function withRevision(response, revision) {
+    const headers = new Headers(response.headers);
+    headers.set(REVISION_HEADER, revision);
+    return new Response(await response.blob(), { status: response.status, statusText: response.statusText, headers });
+}
+
+// ==================== RUNTIME ROUTING ====================
+
 self.addEventListener('fetch', event => {
-    event.respondWith(
-        caches.match(event.request)
-            .then(response => {
-                // Cache hit - return response
-                if (response) {
-                    return response;
-                }
-                return fetch(event.request);
-            })
-    );
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    if (request.method !== 'GET') {
+        event.respondWith(networkFirstWrite(request, url));
+    } else if (request.mode === 'navigate') {
+        event.respondWith(networkFirstPage(request));
+    } else if (matches(STALE_WHILE_REVALIDATE, url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event, request));
+    } else if (url.pathname.startsWith('/static/')) {
+        event.respondWith(cacheFirst(request));
+    }
+    // Everything else goes straight to the network
+});
+
+function timeout(ms) {
+    return new Promise((_, reject) => setTimeout(() => reject(new Error('timeout')), ms));
+}
+
+async function networkFirstPage(request) {
+    // Fresh app shell after every release; cached copy only when the network is slow or down
+    const cache = await caches.open(RUNTIME_PAGES);
+    try {
+        const response = await Promise.race([fetch(request), timeout(NAVIGATION_TIMEOUT_MS)]);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (err) {
+        const cached = await cache.match(request) || await caches.match(request, { ignoreSearch: true })
+            || await caches.match('/');
+        return cached || offlineResponse();
+    }
+}
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request, { ignoreSearch: true });
+    return cached || fetch(request);
+}
+
+async function staleWhileRevalidate(event, request) {
+    const cache = await caches.open(RUNTIME_API);
+    const cached = await cache.match(request);
+    const refresh = fetch(request).then(async response => {
+        if (response.ok) {
+            await cache.put(request, response.clone());
+            await trimCache(cache, API_MAX_ENTRIES);
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(refresh.catch(() => undefined));
+        return cached;
+    }
+    return refresh.catch(() => offlineResponse());
+}
+
+async function trimCache(cache, maxEntries) {
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map(key => cache.delete(key)));
+}
+
+async function networkFirstWrite(request, url) {
+    const queueable = matches(QUEUEABLE_WRITES, url.pathname);
+    const body = queueable ? await request.clone().text() : null;
+    try {
+        return await fetch(request);
+    } catch (err) {
+        if (!queueable) {
+            return offlineResponse();
+        }
+        await enqueue({
+            url: request.url,
+            method: request.method,
+            headers: [...request.headers.entries()],
+            body,
+            queuedAt: Date.now()
+        });
+        if (self.registration.sync) {
+            await self.registration.sync.register(SYNC_TAG).catch(() => undefined);
+        }
+        return new Response(JSON.stringify({
+            success: true,
+            queued: true,
+            message: 'Offline: data disimpan dan akan dikirim otomatis saat koneksi tersedia.'
+        }), { status: 202, headers: { 'Content-Type': 'application/json' } });
+    }
+}
+
+function offlineResponse() {
+    return new Response(JSON.stringify({
+        success: false,
+        offline: true,
+        error: 'Tidak ada koneksi internet.'
+    }), { status: 503, headers: { 'Content-Type': 'application/json' } });
+}
+
+// ==================== BACKGROUND SYNC QUEUE ====================
+
+function openQueue() {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(QUEUE_DB, 1);
+        open.onupgradeneeded = () => open.result.createObjectStore(QUEUE_STORE, { keyPath: 'id', autoIncrement: true });
+        open.onsuccess = () => resolve(open.result);
+        open.onerror = () => reject(open.error);
+    });
+}
+
+async function queueTransaction(mode, action) {
+    const db = await openQueue();
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(QUEUE_STORE, mode);
+        const result = action(tx.objectStore(QUEUE_STORE));
+        tx.oncomplete = () => resolve(result.result);
+        tx.onerror = () => reject(tx.error);
+    });
+}
+
+const enqueue = entry => queueTransaction('readwrite', store => store.add(entry));
+const queuedEntries = () => queueTransaction('readonly', store => store.getAll());
+const dequeue = id => queueTransaction('readwrite', store => store.delete(id));
+
+async function replayQueue() {
+    const entries = await queuedEntries();
+    let sent = 0;
+    for (const entry of entries) {
+        // Throws while still offline: the rest stays queued and sync retries later
+        const response = await fetch(entry.url, { method: entry.method, headers: entry.headers, body: entry.body });
+        // Server errors and throttling are retried; other client errors will never succeed
+        if (response.status >= 500 || response.status === 408 || response.status === 429) {
+            throw new Error(`Replay failed with ${response.status}`);
+        }
+        await dequeue(entry.id);
+        sent += 1;
+    }
+
+    if (sent) {
+        const clients = await self.clients.matchAll();
+        clients.forEach(client => client.postMessage({ type: 'QUEUE_REPLAYED', count: sent }));
+    }
+    return sent;
+}
+
+self.addEventListener('sync', event => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(replayQueue());
+    }
+});
+
+// Browsers without Background Sync: pages ask for a replay when they come online
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'REPLAY_QUEUE') {
+        event.waitUntil(replayQueue().catch(() => undefined));
+    }
 });
@@ -0,0 +1,91 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User, AdminAuditLog, UserActivity
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        admin = User(username='admin', email='admin@agrisensa.com', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    admin = User.query.filter_by(username='admin').first()
+    token = create_access_token(identity=str(admin.id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_bulk_import_then_paginated_listing(client, auth_headers):
+    rows = [{'name': f'Komoditas {i:03d}', 'category': 'Sayuran' if i % 2 else 'Buah',
+             'unit': 'kg', 'price_reference': 1000 + i} for i in range(45)]
+    response = client.post('/api/admin/commodities/bulk', json=rows, headers=auth_headers)
+    assert response.get_json()['result']['created'] == 45
+
+    # Re-importing updates instead of duplicating
+    response = client.post('/api/admin/commodities/bulk', json=rows[:5], headers=auth_headers)
+    assert response.get_json()['result'] == {'created': 0, 'updated': 5, 'errors': []}
+
+    response = client.get('/api/admin/commodities?page=2&per_page=20&category=Sayuran', headers=auth_headers)
+    data = response.get_json()
+    assert data['pagination']['total'] == 22
+    assert data['pagination']['pages'] == 2
+    assert len(data['commodities']) == 2
+    assert data['counts']['by_category'] == {'Sayuran': 22, 'Buah': 23}
+
+
+def test_per_page_is_capped(client, auth_headers):
+    response = client.get('/api/admin/commodities?per_page=100000', headers=auth_headers)
+    assert response.get_json()['pagination']['per_page'] == 100
+
+
+def test_audit_log_server_side_filters(app, client, auth_headers):
+    for i in range(30):
+        AdminAuditLog.log_action(user_id=None, username='admin',
+                                 action='CREATE' if i % 3 else 'DELETE', table_name='commodities')
+
+    response = client.get('/api/admin/audit-log?action=DELETE&per_page=5', headers=auth_headers)
+    data = response.get_json()
+    assert data['pagination']['total'] == 10
+    assert len(data['logs']) == 5
+    assert data['counts']['by_action'] == {'CREATE': 20, 'DELETE': 10}
+
+
+def test_dashboard_actions_are_recorded_in_audit_log(client, auth_headers):
+    response = client.post('/api/admin/audit-log', headers=auth_headers,
+                           json={'action': 'UPDATE_ROLE', 'table': 'users', 'notes': 'Changed petani to admin'})
+    assert response.status_code == 201
+
+    response = client.post('/api/admin/audit-log', json={'action': 'UPDATE_ROLE'}, headers=auth_headers)
+    assert response.status_code == 400
+
+    logs = client.get('/api/admin/audit-log?table=users', headers=auth_headers).get_json()['logs']
+    assert [(l['username'], l['action'], l['notes']) for l in logs] == [('admin', 'UPDATE_ROLE', 'Changed petani to admin')]
+
+
+def test_user_activity_listing_and_summary(app, client, auth_headers):
+    for name in ['petani', 'petani', 'demo']:
+        UserActivity.log_activity(username=name, action='LOGIN')
+
+    response = client.get('/api/admin/user-activity?username=petani', headers=auth_headers)
+    assert response.get_json()['pagination']['total'] == 2
+
+    response = client.get('/api/admin/user-activity/summary', headers=auth_headers)
+    summary = response.get_json()['summary']
+    assert summary['by_action'] == {'LOGIN': 3}
+    assert summary['usernames'] == ['demo', 'petani']
+    assert sum(day['count'] for day in summary['daily']) == 3
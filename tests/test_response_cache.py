@@ -0,0 +1,63 @@
+import gzip
+
+import pytest
+
+from app import create_app
+from app.services.knowledge_service import KnowledgeService
+from app.utils import response_cache
+
+
+@pytest.fixture
+def client():
+    response_cache.clear_local()
+    app = create_app('testing')
+    return app.test_client()
+
+
+def test_static_payload_matches_service_and_is_cacheable(client):
+    response = client.get('/get-ph-info')
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'data': KnowledgeService.get_ph_knowledge()}
+    assert response.headers['ETag'].startswith('"')
+    assert 'public' in response.headers['Cache-Control']
+    assert 'max-age=' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_gzip_representation_has_own_etag(client):
+    plain = client.get('/get-pest-list')
+    compressed = client.get('/get-pest-list', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+
+def test_if_none_match_returns_304(client):
+    first = client.get('/api/knowledge/diagnostic-tree', headers={'Accept-Encoding': 'gzip'})
+    again = client.get('/api/knowledge/diagnostic-tree', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+    stale = client.get('/api/knowledge/diagnostic-tree', headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_legacy_post_and_get_share_payload(client):
+    commodity = KnowledgeService.get_all_commodities()[0]['id']
+    posted = client.post('/get-commodity-guide', json={'commodity': commodity})
+    fetched = client.get(f'/get-commodity-guide?commodity={commodity}')
+    assert posted.status_code == fetched.status_code == 200
+    assert posted.data == fetched.data
+
+    missing = client.post('/get-knowledge', json={'commodity': 'tidak-ada'})
+    assert missing.status_code == 404
+
+
+def test_cache_version_follows_app_sources(tmp_path):
+    from app.config.config import Config, source_fingerprint
+
+    (tmp_path / 'knowledge.py').write_text('DATA = 1\n')
+    before = source_fingerprint(str(tmp_path))
+    (tmp_path / 'knowledge.py').write_text('DATA = 2\n')
+    assert source_fingerprint(str(tmp_path)) != before
+    assert Config.RESPONSE_CACHE_TIMEOUT > 0
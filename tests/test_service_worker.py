@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+from app import create_app
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import build_sw_manifest  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return create_app('testing').test_client()
+
+
+def test_manifest_lists_existing_static_files_and_pages():
+    entries = build_sw_manifest.static_entries() + build_sw_manifest.page_entries()
+    urls = [entry['url'] for entry in entries]
+
+    assert '/' in urls
+    assert '/modules/harvest-database' in urls
+    assert '/static/sw.js' not in urls
+    assert '/test' not in urls
+    assert len(urls) == len(set(urls))
+    for url in urls:
+        if url.startswith('/static/'):
+            assert os.path.exists(os.path.join(build_sw_manifest.STATIC_DIR, url[len('/static/'):]))
+
+
+def test_revision_changes_with_content(tmp_path):
+    path = tmp_path / 'app.js'
+    path.write_text('v1')
+    first = build_sw_manifest.file_hash(str(path))
+    path.write_text('v2')
+    assert build_sw_manifest.file_hash(str(path)) != first
+
+
+def test_worker_and_manifest_are_always_revalidated(client):
+    for url in ('/sw.js', '/precache-manifest.js'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-cache'
+        response.close()
@@ -0,0 +1,115 @@
+"""
+Tests for the WAGRI market service price store, refresh and vectorized analytics
+"""
+import json
+
+import numpy as np
+import pytest
+
+from agrisensa_commodities.services.wagri_market_service import WagriMarketService
+from agrisensa_commodities.services.wagri_mock_server import mock_survey, start_mock_server
+
+
+@pytest.fixture
+def service(tmp_path):
+    return WagriMarketService(cache_dir=tmp_path)
+
+
+@pytest.fixture
+def mock_wagri(monkeypatch):
+    server, base_url = start_mock_server()
+    monkeypatch.setattr(WagriMarketService, "BASE_URL", base_url)
+    yield server
+    server.shutdown()
+
+
+def store_prices(service, code, prices, start_day=1):
+    service.cache_price_batch([
+        (code, {"TargetDate": f"2025-01-{start_day + i:02d}", "AveragePrice": price, "TradingVolume": 10})
+        for i, price in enumerate(prices)
+    ])
+
+
+def test_history_has_no_retention_limit_and_supports_ranges(service):
+    for day in range(1, 32):
+        store_prices(service, "33100", [1000 + day], start_day=day)
+    for day in range(1, 29):
+        service.cache_price_data("33100", {"TargetDate": f"2025-02-{day:02d}", "AveragePrice": 2000 + day})
+
+    assert len(service.get_price_history("33100", days=1000)) == 59
+    last_week = service.get_price_history("33100", days=7)
+    assert [p["date"] for p in last_week][-1] == "2025-02-28"
+    assert len(last_week) == 7
+
+    january = service.get_price_range(["33100"], "2025-01-10", "2025-01-20")
+    assert list(january["date"]) == [f"2025-01-{d}" for d in range(10, 21)]
+
+
+def test_same_market_day_is_updated_not_duplicated(service):
+    store_prices(service, "33100", [1000])
+    store_prices(service, "33100", [1200])
+    history = service.get_price_history("33100")
+    assert len(history) == 1 and history[0]["price"] == 1200
+
+
+def test_batch_trends_match_single_trend(service):
+    store_prices(service, "UP", [100, 104, 110])
+    store_prices(service, "DOWN", [100, 90, 80])
+    store_prices(service, "FLAT", [100, 101])
+    store_prices(service, "ONE", [100])
+
+    trends = service.calculate_price_trends(["UP", "DOWN", "FLAT", "ONE", "NONE"])
+    assert trends["UP"]["direction"] == "rising"
+    assert trends["UP"]["change_percentage"] == pytest.approx(10.0)
+    assert trends["DOWN"]["direction"] == "falling"
+    assert trends["FLAT"]["direction"] == "stable"
+    assert trends["ONE"]["trend"] == trends["NONE"]["trend"] == "Unknown"
+    assert service.calculate_price_trend("DOWN") == trends["DOWN"]
+
+
+def test_vectorized_margins_match_scalar(service):
+    prices = np.array([500.0, 1500.0, 1800.0, 4000.0, 0.0])
+    margins = service.calculate_export_margins(prices, 20000)
+    records = service.margin_records(margins)
+    for price, record in zip(prices, records):
+        assert record == service.calculate_export_margin(price, 20000)
+    assert list(margins["profitability_score"]) == [1, 3, 4, 5, 1]
+    assert records[-1]["margin_percentage"] == 0
+
+
+def test_legacy_json_cache_is_imported(tmp_path):
+    (tmp_path / "prices_history").mkdir()
+    (tmp_path / "prices_latest.json").write_text(json.dumps({
+        "33100": {"data": {"AveragePrice": 2651}, "timestamp": "2025-03-01T10:00:00"}
+    }))
+    (tmp_path / "prices_history" / "33100.json").write_text(json.dumps([
+        {"date": "2025-02-28", "price": 2600, "volume": 10, "timestamp": "2025-02-28T10:00:00"},
+        {"date": "2025-03-01", "price": 2651, "volume": 12, "timestamp": "2025-03-01T10:00:00"},
+    ]))
+    service = WagriMarketService(cache_dir=tmp_path)
+    assert [p["price"] for p in service.get_price_history("33100")] == [2600, 2651]
+
+
+def test_refresh_fetches_concurrently_and_skips_fresh_cache(service, mock_wagri):
+    surveys = {f"C{i:03d}": f"survey{i}-20250301" for i in range(40)}
+
+    results = service.refresh_prices(surveys, max_workers=8)
+    assert results["C007"] == mock_survey("survey7-20250301")
+    assert mock_wagri.request_count == 40
+    assert service.get_price_history("C007")[-1]["price"] == results["C007"]["AveragePrice"]
+
+    # All fresh now: nothing is refetched unless forced
+    assert service.refresh_prices(surveys) == results
+    assert mock_wagri.request_count == 40
+    service.refresh_prices({"C001": surveys["C001"]}, force=True)
+    assert mock_wagri.request_count == 41
+
+
+def test_refresh_reports_failed_fetches(service, monkeypatch):
+    server, base_url = start_mock_server(error_rate=1.0)
+    monkeypatch.setattr(WagriMarketService, "BASE_URL", base_url)
+    try:
+        assert service.refresh_prices({"A": "s1", "B": "s2"}) == {"A": None, "B": None}
+    finally:
+        server.shutdown()
+    assert service.get_cached_price("A") is None
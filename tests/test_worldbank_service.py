@@ -0,0 +1,109 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from app.data.worldbank_price_store import WorldBankPriceStore
+from app.services.worldbank_service import WorldBankService
+
+
+@pytest.fixture
+def offline_service(tmp_path, monkeypatch):
+    """WorldBankService backed by an in-memory store and a JSON fixture."""
+    records = [
+        {'market': 'Jakarta', 'product': 'Chili (red)', 'date': '2024-01-01', 'price': 40000},
+        {'market': 'Jakarta', 'product': 'Chili (red)', 'date': '2024-02-01', 'price': 50000},
+        {'market': 'Bandung', 'product': 'Chili (red)', 'date': '2024-02-01', 'price': 60000},
+        {'market': 'Jakarta', 'product': 'Rice (medium)', 'date': '2024-02-01', 'price': 12000},
+        {'market': 'Jakarta', 'product': 'Rice (medium)', 'date': '2024-02-01', 'price': 12000},
+        {'market': 'Jakarta', 'product': 'Onions', 'date': '2024-02-01', 'price': 'n/a'},
+    ]
+    fixture = tmp_path / 'rtfp.json'
+    fixture.write_text(json.dumps({'data': records}))
+
+    monkeypatch.setattr(WorldBankService, 'PAGE_SIZE', 2)
+    WorldBankService.configure(store=WorldBankPriceStore(filename=':memory:'), fixture_path=str(fixture))
+    yield WorldBankService
+    WorldBankService.configure()
+
+
+def test_sync_pages_and_deduplicates(offline_service):
+    written = offline_service.sync_prices(force=True)
+    store = offline_service.get_store()
+
+    assert written == 5  # invalid price row skipped
+    assert store.count() == 4  # duplicate rice row collapsed
+    assert store.max_date() == '2024-02-01'
+    assert store.last_synced_at() is not None
+
+
+def test_incremental_sync_rewrites_only_overlap_window(offline_service, monkeypatch):
+    offline_service.sync_prices(force=True)
+    assert offline_service.sync_prices() == 0  # fresh, skipped
+
+    monkeypatch.setattr(offline_service, 'SYNC_OVERLAP', timedelta(days=10))
+    # Only the 2024-02-01 rows fall inside the window; 2024-01-01 is not rewritten
+    assert offline_service.sync_prices(force=True) == 4
+    assert offline_service.sync_prices(force=True, full=True) == 5
+
+
+def test_sync_does_not_depend_on_source_row_order(offline_service, tmp_path):
+    offline_service.sync_prices(force=True)
+
+    # Source reordered, one row inserted in the middle, one price corrected
+    records = [
+        {'market': 'Bandung', 'product': 'Chili (red)', 'date': '2024-02-01', 'price': 65000},
+        {'market': 'Surabaya', 'product': 'Chili (red)', 'date': '2024-01-25', 'price': 55000},
+        {'market': 'Jakarta', 'product': 'Rice (medium)', 'date': '2024-02-01', 'price': 12000},
+        {'market': 'Jakarta', 'product': 'Chili (red)', 'date': '2024-02-01', 'price': 50000},
+        {'market': 'Jakarta', 'product': 'Chili (red)', 'date': '2024-01-01', 'price': 40000},
+    ]
+    fixture = tmp_path / 'rtfp_reordered.json'
+    fixture.write_text(json.dumps({'data': records}))
+    offline_service.FIXTURE_PATH = str(fixture)
+
+    offline_service.sync_prices(force=True)
+    store = offline_service.get_store()
+    assert store.count() == 5
+    chili = {(r['market'], r['date']): r['price'] for r in store.recent_prices(['Chili (red)'])}
+    assert chili[('Surabaya', '2024-01-25')] == 55000
+    assert chili[('Bandung', '2024-02-01')] == 65000
+
+
+def test_page_limit_does_not_mark_sync_complete(offline_service, monkeypatch):
+    monkeypatch.setattr(offline_service, 'MAX_PAGES_PER_SYNC', 2)
+    offline_service.sync_prices(force=True)
+    store = offline_service.get_store()
+
+    assert store.count() == 4  # 4 of 6 rows read
+    assert store.last_synced_at() is None
+
+    monkeypatch.setattr(offline_service, 'MAX_PAGES_PER_SYNC', 10)
+    thread = offline_service.sync_in_background()  # still due
+    thread.join(timeout=5)
+    assert store.last_synced_at() is not None
+
+
+def test_request_path_syncs_in_background(offline_service):
+    assert offline_service.get_price_for_commodity('cabai_merah_keriting') is None  # empty store, not blocked
+    offline_service._sync_thread.join(timeout=5)
+
+    assert offline_service.get_price_for_commodity('cabai_merah_keriting')['sample_size'] == 3
+    assert offline_service.sync_in_background() is None  # fresh now
+
+
+def test_price_for_commodity_reads_local_store(offline_service):
+    offline_service.sync_prices(force=True)
+    result = offline_service.get_price_for_commodity('cabai_merah_keriting')
+
+    assert result['sample_size'] == 3
+    assert result['average_price'] == 50000
+    assert result['latest_date'] == '2024-02-01'
+    assert sorted(result['markets']) == ['Bandung', 'Jakarta']
+
+
+def test_unmapped_and_missing_commodities(offline_service):
+    offline_service.sync_prices(force=True)
+    assert offline_service.get_price_for_commodity('durian') is None
+    assert offline_service.get_price_for_commodity('bawang_putih') is None
+    assert offline_service.get_all_available_products() == ['Chili (red)', 'Rice (medium)']